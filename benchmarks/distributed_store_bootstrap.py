@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import time
+
+from cupyx.distributed import _store
+
+# This benchmark measures the time taken to bootstrap a communicator through
+# the TCPStore used by `cupyx.distributed`, i.e., rank 0 publishes a unique
+# id, all the ranks meet at a barrier and then fetch the id. Only CPU
+# processes on the local host are used.
+
+
+def _worker(rank, world_size, port, n_repeat, queue):
+    proxy = _store.TCPStoreProxy(port=port)
+    # Make sure that all the ranks are connected before measuring.
+    proxy.barrier()
+    times = []
+    for i in range(n_repeat):
+        start = time.perf_counter()
+        key = 'nccl_id/{}'.format(i)
+        if rank == 0:
+            proxy[key] = os.urandom(128)
+            proxy.barrier()
+        else:
+            proxy.barrier()
+            proxy[key]
+        proxy.barrier()
+        times.append(time.perf_counter() - start)
+    queue.put(times)
+    proxy.close()
+
+
+def _run(world_size, port, n_repeat):
+    store = _store.TCPStore(world_size)
+    store.run(port=port)
+    queue = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=_worker, args=(rank, world_size, port, n_repeat, queue))
+        for rank in range(world_size)]
+    try:
+        for p in processes:
+            p.start()
+        results = [queue.get() for _ in processes]
+        for p in processes:
+            p.join()
+    finally:
+        store.stop()
+    # The bootstrap is complete when the slowest rank is done.
+    return [max(ts) for ts in zip(*results)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--world-sizes', type=int, nargs='+',
+                        default=[2, 8, 32, 128])
+    parser.add_argument('--port', type=int, default=_store._DEFAULT_PORT)
+    parser.add_argument('--n-repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    print('{:>10} {:>12} {:>12}'.format('world_size', 'mean (ms)', 'max (ms)'))
+    for i, world_size in enumerate(args.world_sizes):
+        # Use a different port for every run not to wait for the previous
+        # server to release it.
+        times = _run(world_size, args.port + i, args.n_repeat)
+        print('{:>10} {:>12.2f} {:>12.2f}'.format(
+            world_size, sum(times) / len(times) * 1e3, max(times) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import argparse
+
+import cupy
+from cupyx.profiler import benchmark
+
+# This benchmark measures the host-side overhead (in microseconds per call)
+# of dispatching common ufuncs on small arrays, where the time spent on the
+# GPU is negligible and the cost is dominated by argument preprocessing,
+# type resolution, broadcasting and output allocation.
+
+
+def _cases(size, dtype):
+    a = cupy.ones(size, dtype=dtype)
+    b = cupy.ones(size, dtype=dtype)
+    a2d = a.reshape(1, size)
+    out = cupy.empty_like(a)
+    return [
+        ('add(a, b)', cupy.add, (a, b), {}),
+        ('add(a, b, out=out)', cupy.add, (a, b), {'out': out}),
+        ('add(a, 1)', cupy.add, (a, 1), {}),
+        ('multiply(a, 2.0)', cupy.multiply, (a, 2.0), {}),
+        ('subtract(a2d, b) [broadcast]', cupy.subtract, (a2d, b), {}),
+        ('negative(a)', cupy.negative, (a,), {}),
+        ('exp(a)', cupy.exp, (a,), {}),
+        ('sqrt(a)', cupy.sqrt, (a,), {}),
+        ('less(a, b)', cupy.less, (a, b), {}),
+        ('a + b', lambda x, y: x + y, (a, b), {}),
+        ('a * 3', lambda x: x * 3, (a,), {}),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=16,
+                        help='number of elements of the operands')
+    parser.add_argument('--dtype', type=str, default='float32')
+    parser.add_argument('--n-repeat', type=int, default=10000)
+    args = parser.parse_args()
+
+    print('size={} dtype={} n_repeat={}'.format(
+        args.size, args.dtype, args.n_repeat))
+    print('{:<32} {:>12} {:>12}'.format('case', 'CPU (us)', 'GPU (us)'))
+    for name, func, func_args, func_kwargs in _cases(args.size, args.dtype):
+        perf = benchmark(
+            func, func_args, func_kwargs, n_repeat=args.n_repeat, name=name)
+        print('{:<32} {:>12.2f} {:>12.2f}'.format(
+            name,
+            perf.cpu_times.mean() * 1e6,
+            perf.gpu_times[0].mean() * 1e6))
+
+
+if __name__ == '__main__':
+    main()
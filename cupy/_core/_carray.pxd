@@ -36,7 +36,8 @@ cdef class CArray(function.CPointer):
         const shape_t& shape, const strides_t& strides) except*
 
 
-# This is now excluding shape/strides only for getting the compiler-time size
+# This is now excluding shape/index/divisors only for getting the
+# compiler-time size
 cdef struct _CIndexer:
     Py_ssize_t size
 
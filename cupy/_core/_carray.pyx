@@ -1,3 +1,4 @@
+from libc.stdint cimport uint32_t, uint64_t
 from libc.string cimport memcpy
 from cpython.mem cimport PyMem_Malloc, PyMem_Free
 
@@ -129,14 +130,45 @@ cdef class CArray(function.CPointer):
             self.ptr = 0
 
 
+cdef inline void _init_divisor(
+        Py_ssize_t d, uint32_t* mul, uint32_t* shift) noexcept:
+    # Computes the magic numbers to replace the division of an unsigned
+    # integer n < 2**31 by d (1 <= d <= 2**31) with a multiplication and a
+    # shift, i.e., n // d == (((n * mul) >> 32) + n) >> shift.
+    # This is the round-up method of Granlund and Montgomery, "Division by
+    # Invariant Integers using Multiplication" (1994), where the 33-bit
+    # multiplier 2**32 + mul is split so that mul fits in 32 bits.
+    cdef uint64_t s = 0
+    if d <= 0 or d > (<Py_ssize_t>1 << 31):
+        # Not used for division by the 32-bit indexing path.
+        mul[0] = 0
+        shift[0] = 0
+        return
+    while (<uint64_t>1 << s) < <uint64_t>d:
+        s += 1
+    mul[0] = <uint32_t>(
+        (((<uint64_t>1 << s) - <uint64_t>d) << 32) // <uint64_t>d + 1)
+    shift[0] = <uint32_t>s
+
+
+def _get_divisor(Py_ssize_t d):
+    # Returns the magic numbers (mul, shift) for divisor d.
+    # This is only for testing purposes.
+    cdef uint32_t mul, shift
+    _init_divisor(d, &mul, &shift)
+    return mul, shift
+
+
 cdef class CIndexer(function.CPointer):
 
     cdef void init(self, Py_ssize_t size, const shape_t &shape) except*:
         cdef size_t ndim = shape.size()
+        cdef size_t i
         assert ndim <= MAX_NDIM
 
-        cdef size_t total_size = \
+        cdef size_t total_size = (
             sizeof(_CIndexer) + ndim * 2 * sizeof(Py_ssize_t)
+            + ndim * 2 * sizeof(uint32_t))
         cdef void* data = PyMem_Malloc(total_size)
         if data == NULL:
             raise MemoryError
@@ -150,7 +182,15 @@ cdef class CIndexer(function.CPointer):
                    shape.data(),
                    sizeof(Py_ssize_t) * ndim)
             offset += sizeof(Py_ssize_t) * ndim
-        assert offset + sizeof(Py_ssize_t) * ndim == total_size
+            # index (scratch area for the device)
+            offset += sizeof(Py_ssize_t) * ndim
+            for i in range(ndim):
+                _init_divisor(
+                    shape[i],
+                    <uint32_t*>(<char*>(data) + offset) + i,
+                    <uint32_t*>(<char*>(data) + offset) + ndim + i)
+            offset += sizeof(uint32_t) * ndim * 2
+        assert offset == total_size
 
     def __cinit__(self):
         self.ptr = 0
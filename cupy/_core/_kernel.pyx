@@ -124,6 +124,98 @@ cdef function.Function _get_simple_elementwise_kernel(
     return _get_simple_elementwise_kernel_from_code(name, code, options)
 
 
+cdef str _get_vectorized_elementwise_kernel_code(
+        tuple params_, tuple arginfos, str vec_load, str vec_operation,
+        str vec_store, str operation, int vec, str name, _TypeMap type_map,
+        str preamble, str loop_prep=''):
+    # Each thread processes `vec` consecutive elements loaded and stored with
+    # single vector memory transactions, followed by a scalar tail loop.
+    # All ndarray operands must be 1-dim, C-contiguous and aligned.
+    type_decls = set()
+    params = _get_kernel_params(params_, arginfos, type_decls)
+    typedef_preamble = type_map.get_typedef_code(type_decls)
+
+    module_code = string.Template('''
+    ${type_decls}${typedef_preamble}
+    ${preamble}
+    extern "C" __global__ void ${name}(${params}) {
+      ${loop_prep};
+      const ptrdiff_t _n_vec = _ind.size() / ${vec};
+      #pragma unroll 1
+      CUPY_FOR(_j, _n_vec) {
+        ${vec_load}
+        #pragma unroll
+        for (int _k = 0; _k < ${vec}; ++_k) {
+          const ptrdiff_t i = _j * ${vec} + _k;
+          _ind.set(i);
+          ${vec_operation};
+        }
+        ${vec_store}
+      }
+      #pragma unroll 1
+      CUPY_FOR(_t, _ind.size() - _n_vec * ${vec}) {
+        const ptrdiff_t i = _n_vec * ${vec} + _t;
+        _ind.set(i);
+        ${operation};
+      }
+    }
+    ''').substitute(
+        typedef_preamble=typedef_preamble,
+        params=params,
+        type_decls=_scalar.format_type_decls(type_decls),
+        vec_load=vec_load,
+        vec_operation=vec_operation,
+        vec_store=vec_store,
+        operation=operation,
+        vec=vec,
+        name=name,
+        preamble=preamble,
+        loop_prep=loop_prep)
+    return module_code
+
+
+# Arrays with at least this many elements are processed with vectorized
+# loads and stores when possible.
+cdef Py_ssize_t _VECTORIZE_MIN_SIZE = 1 << 16
+# Size in bytes of the widest vector memory access (e.g., float4).
+cdef Py_ssize_t _VECTOR_BYTES = 16
+
+
+cdef int _get_vector_width(list args, Py_ssize_t size) except -1:
+    # Returns the number of consecutive elements each thread loads and stores
+    # at once, or 1 if vectorized access is not applicable, i.e., unless all
+    # the ndarray arguments are 1-dim, C-contiguous and aligned to the
+    # vector size.
+    cdef _ndarray_base arr
+    cdef Py_ssize_t itemsize, max_itemsize = 0
+    cdef Py_ssize_t vec
+
+    if size < _VECTORIZE_MIN_SIZE:
+        return 1
+    for a in args:
+        if not isinstance(a, _ndarray_base):
+            continue
+        arr = a
+        if arr._shape.size() != 1 or not arr._c_contiguous:
+            return 1
+        if arr.dtype.kind not in 'biufc':
+            return 1
+        itemsize = arr.dtype.itemsize
+        if itemsize & (itemsize - 1):
+            return 1
+        max_itemsize = max(max_itemsize, itemsize)
+    if max_itemsize == 0 or max_itemsize * 2 > _VECTOR_BYTES:
+        return 1
+
+    vec = _VECTOR_BYTES // max_itemsize
+    for a in args:
+        if isinstance(a, _ndarray_base):
+            arr = a
+            if arr.data.ptr % (vec * arr.dtype.itemsize) != 0:
+                return 1
+    return <int>vec
+
+
 @cython.profile(False)
 cpdef inline _check_peer_access(_ndarray_base arr, int device_id):
     if arr.data.device_id == device_id:
@@ -1024,9 +1116,9 @@ cdef str fix_cast_expr(src_type, dst_type, str expr):
 cdef function.Function _get_ufunc_kernel(
         tuple in_types, tuple out_types, routine, tuple arginfos,
         bint has_where, params,
-        name, preamble, loop_prep):
+        name, preamble, loop_prep, int vec=1):
     cdef _ArgInfo arginfo
-    cdef str str_type, str_var
+    cdef str str_type, str_var, vec_type
 
     offset_where = len(in_types)
     offset_out = offset_where
@@ -1035,6 +1127,9 @@ cdef function.Function _get_ufunc_kernel(
 
     types = []
     op = []
+    vec_op = []
+    vec_load = []
+    vec_store = []
     if has_where:
         arginfo = arginfos[offset_where]
         if arginfo.is_ndarray():
@@ -1052,8 +1147,22 @@ cdef function.Function _get_ufunc_kernel(
                 str_var,
                 fix_cast_expr(arginfo.dtype, x, f'_raw_{str_var}[_ind.get()]')
             ))
+            if vec > 1:
+                vec_type = 'cupy::aligned_vector<{}, {}>'.format(
+                    _get_typename(arginfo.dtype), vec)
+                vec_load.append(
+                    f'const {vec_type} _vec_{str_var} = '
+                    f'reinterpret_cast<const {vec_type}*>'
+                    f'(&_raw_{str_var}[0])[_j];')
+                vec_op.append('const {} {}({});'.format(
+                    str_type,
+                    str_var,
+                    fix_cast_expr(
+                        arginfo.dtype, x, f'_vec_{str_var}.val[_k]')
+                ))
 
     out_op = []
+    vec_out_op = []
     for i, x in enumerate(out_types):
         str_var = 'out%d' % i
         str_type = str_var + '_type'
@@ -1064,6 +1173,18 @@ cdef function.Function _get_ufunc_kernel(
             f'_raw_{str_var}[_ind.get()]',
             fix_cast_expr(x, arginfo.dtype, str_var)
         ))
+        if vec > 1:
+            vec_type = 'cupy::aligned_vector<{}, {}>'.format(
+                _get_typename(arginfo.dtype), vec)
+            vec_load.append(f'{vec_type} _vec_{str_var};')
+            vec_store.append(
+                f'reinterpret_cast<{vec_type}*>(&_raw_{str_var}[0])[_j] = '
+                f'_vec_{str_var};')
+            vec_op.append(f'{str_type} {str_var};')
+            vec_out_op.append('{} = {};'.format(
+                f'_vec_{str_var}.val[_k]',
+                fix_cast_expr(x, arginfo.dtype, str_var)
+            ))
 
     type_map = _TypeMap(tuple(types))
 
@@ -1091,6 +1212,16 @@ cdef function.Function _get_ufunc_kernel(
             return a;
         }
         """
+    if vec > 1:
+        vec_op.append(routine)
+        vec_op.append(';')
+        vec_op.extend(vec_out_op)
+        code = _get_vectorized_elementwise_kernel_code(
+            params, arginfos, '\n'.join(vec_load), '\n'.join(vec_op),
+            '\n'.join(vec_store), operation, vec, name, type_map, preamble,
+            loop_prep)
+        return _get_simple_elementwise_kernel_from_code(
+            name, code, ("--std=c++17",))
     # Use C++17 for xsf special function library.
     # Note: Cython only allows omitting trailing keyword arguments
     # so after_loop must be included here even though it is taking
@@ -1100,6 +1231,12 @@ cdef function.Function _get_ufunc_kernel(
         loop_prep=loop_prep, after_loop='', options=("--std=c++17",))
 
 
+cdef inline bint _is_vectorizable_routine(_Op op) except? -1:
+    # Routines skipping elements (e.g., with `continue`) cannot be
+    # vectorized as whole vectors are stored back.
+    return isinstance(op.routine, str) and 'continue' not in op.routine
+
+
 cdef inline int _get_kind_score(kind) except -1:
     if issubclass(kind, numpy.bool_):
         return 0
@@ -1144,6 +1281,22 @@ cdef inline bint _check_should_use_weak_scalar(
     return not all_scalars_or_arrays and max_array_kind >= max_scalar_kind
 
 
+# Arrays eligible for the ufunc fast path are small enough that every
+# operand (at most 16 bytes per element) and the indexer use 32-bit indexing,
+# so that the kernel argument types do not depend on the array size.
+cdef Py_ssize_t _FAST_PATH_MAX_ITEMSIZE = 16
+cdef Py_ssize_t _FAST_PATH_MAX_SIZE = (
+    (<Py_ssize_t>1 << 31) // _FAST_PATH_MAX_ITEMSIZE)
+cdef tuple _fast_path_scalar_types = (bool, int, float, complex)
+
+
+cdef inline bint _fits_fast_path(tuple out_dtypes) except? -1:
+    for t in out_dtypes:
+        if get_dtype(t).itemsize > _FAST_PATH_MAX_ITEMSIZE:
+            return False
+    return True
+
+
 cdef class ufunc:
 
     """Universal function.
@@ -1175,6 +1328,7 @@ cdef class ufunc:
         readonly tuple _params_with_where
         readonly dict _routine_cache
         readonly dict _kernel_memo
+        readonly dict _fast_path_cache
         readonly object _doc
         public object __doc__
         readonly object __name__
@@ -1219,6 +1373,7 @@ cdef class ufunc:
             + _out_params + _other_params)
         self._routine_cache = {}
         self._kernel_memo = {}
+        self._fast_path_cache = {}
 
     def __repr__(self):
         return '<ufunc \'%s\'>' % self.name
@@ -1263,7 +1418,20 @@ cdef class ufunc:
 
         cdef function.Function kern
         cdef list inout_args
+        cdef list fast_in_args
         cdef shape_t shape
+        cdef tuple fast_key = None
+        cdef int vec
+
+        if not kwargs and len(args) == self.nin:
+            # Fast path for the common case of contiguous, non-broadcast
+            # operands: everything but the launch itself is memoized.
+            fast_in_args = []
+            fast_key = self._get_fast_path_key(args, fast_in_args, shape)
+            if fast_key is not None:
+                entry = self._fast_path_cache.get(fast_key)
+                if entry is not None:
+                    return self._launch_fast_path(entry, fast_in_args, shape)
 
         out = kwargs.pop('out', None)
         where = kwargs.pop('_where', None)
@@ -1397,9 +1565,106 @@ cdef class ufunc:
         kern = self._get_ufunc_kernel(
             core_in_dtypes, core_out_dtypes, dev_id, op, arginfos, has_where)
 
-        kern.linear_launch(indexer.size, inout_args)
+        if fast_key is not None and _fits_fast_path(core_out_dtypes):
+            self._fast_path_cache[fast_key] = (
+                core_in_dtypes, core_out_dtypes, kern, op, arginfos)
+
+        vec = 1
+        if not has_where and _is_vectorizable_routine(op):
+            vec = _get_vector_width(inout_args, indexer.size)
+        if vec > 1:
+            kern = self._get_ufunc_kernel(
+                core_in_dtypes, core_out_dtypes, dev_id, op, arginfos,
+                has_where, vec)
+
+        kern.linear_launch((indexer.size + vec - 1) // vec, inout_args)
         return ret
 
+    cdef tuple _get_fast_path_key(
+            self, tuple args, list in_args, shape_t& shape):
+        # Returns the fast path cache key of the given input arguments, or
+        # None if the call is not eligible for the fast path.
+        # Eligible calls have no output, `where` or `dtype` arguments, and
+        # all ndarray inputs are plain, C-contiguous, non-empty arrays of the
+        # same shape on the current device, so that no broadcasting, copying
+        # or subclass handling is needed and the kernel argument layout is
+        # fully determined by the key.
+        # `in_args` and `shape` are output arguments.
+        cdef _ndarray_base arr
+        cdef _scalar.CScalar s
+        cdef bint has_array = False
+        cdef int dev_id
+
+        if (self._cutensor_op is not None
+                and _accelerator.ACCELERATOR_CUTENSOR in
+                _accelerator._elementwise_accelerators):
+            return None
+
+        dev_id = device.get_device_id()
+        key = [dev_id]
+        for a in args:
+            typ = type(a)
+            if typ is cupy.ndarray:
+                arr = a
+                if not arr._c_contiguous or arr.data.device_id != dev_id:
+                    return None
+                if not has_array:
+                    if (arr.size == 0
+                            or arr.size > _FAST_PATH_MAX_SIZE
+                            or arr.dtype.itemsize > _FAST_PATH_MAX_ITEMSIZE):
+                        return None
+                    shape = arr._shape
+                    has_array = True
+                elif (not internal.vector_equal(arr._shape, shape)
+                        or arr.dtype.itemsize > _FAST_PATH_MAX_ITEMSIZE):
+                    return None
+                key.append((arr.dtype, arr._index_32_bits))
+            elif (typ in _fast_path_scalar_types
+                    or isinstance(a, numpy.generic)):
+                s = _scalar.CScalar(a)
+                key.append((s.descr, s.weak_t))
+                a = s
+            else:
+                return None
+            in_args.append(a)
+
+        if not has_array:
+            return None
+        key.append(shape.size())
+        return tuple(key)
+
+    cdef object _launch_fast_path(
+            self, tuple entry, list in_args, const shape_t& shape):
+        cdef list inout_args
+        cdef tuple in_dtypes, out_dtypes, arginfos
+        cdef function.Function kern
+        cdef shape_t reduced_shape
+        cdef int vec
+
+        in_dtypes, out_dtypes, kern, op, arginfos = entry
+        for i, t in enumerate(in_dtypes):
+            if type(in_args[i]) is _scalar.CScalar:
+                (<_scalar.CScalar>in_args[i]).apply_dtype(t)
+
+        out_args = [
+            _ndarray_init(cupy.ndarray, shape, t, None) for t in out_dtypes]
+        inout_args = in_args + out_args
+        reduced_shape = _reduce_dims(inout_args, self._params, shape)
+        indexer = _carray._indexer_init(reduced_shape)
+        inout_args.append(indexer)
+        vec = 1
+        if _is_vectorizable_routine(op):
+            vec = _get_vector_width(inout_args, indexer.size)
+        if vec > 1:
+            kern = self._get_ufunc_kernel(
+                in_dtypes, out_dtypes, device.get_device_id(), op, arginfos,
+                False, vec)
+        kern.linear_launch((indexer.size + vec - 1) // vec, inout_args)
+
+        if self.nout == 1:
+            return out_args[0]
+        return tuple(out_args)
+
     cdef str _get_name_with_type(self, tuple arginfos, bint has_where):
         cdef str name = self.name
         if has_where:
@@ -1416,16 +1681,18 @@ cdef class ufunc:
 
     cdef function.Function _get_ufunc_kernel(
             self, tuple in_dtypes, tuple out_dtypes,
-            int dev_id, _Op op, tuple arginfos, bint has_where):
+            int dev_id, _Op op, tuple arginfos, bint has_where, int vec=1):
         cdef function.Function kern
-        key = (dev_id, op, arginfos, has_where)
+        key = (dev_id, op, arginfos, has_where, vec)
         kern = self._kernel_memo.get(key, None)
         if kern is None:
             name = self._get_name_with_type(arginfos, has_where)
+            if vec > 1:
+                name += '_vec%d' % vec
             params = self._params_with_where if has_where else self._params
             kern = _get_ufunc_kernel(
                 in_dtypes, out_dtypes, op.routine, arginfos, has_where,
-                params, name, self._preamble, self._loop_prep)
+                params, name, self._preamble, self._loop_prep, vec)
             kern = self._kernel_memo.setdefault(key, kern)
         return kern
 
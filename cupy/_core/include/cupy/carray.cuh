@@ -71,6 +71,18 @@ class float16;
          i < (n); \
          i += static_cast<ptrdiff_t>(blockDim.x) * gridDim.x)
 
+#if __cplusplus >= 201103 || (defined(_MSC_VER) && _MSC_VER >= 1900)
+namespace cupy {
+// N consecutive elements accessed with a single memory transaction (e.g.,
+// 16 bytes like float4) by vectorized elementwise kernels. The pointer
+// reinterpreted as this type must be aligned to sizeof(T) * N.
+template <typename T, int N>
+struct alignas(sizeof(T) * N) aligned_vector {
+  T val[N];
+};
+}  // namespace cupy
+#endif
+
 #ifdef CUPY_JIT_MODE
 #ifdef CUPY_JIT_NVCC
 #include <thrust/swap.h>
@@ -523,6 +535,11 @@ private:
   ptrdiff_t size_;
   ptrdiff_t shape_[ndim];
   ptrdiff_t index_[ndim];
+  // Magic numbers to divide 32-bit indices by shape_[i] without a division
+  // instruction: i / shape_[i] == (__umulhi(i, mul) + i) >> shift.
+  // Populated by the host (see cupy/_core/_carray.pyx) or the constructors.
+  unsigned int divmul_[ndim];
+  unsigned int divshift_[ndim];
 
   typedef ptrdiff_t index_t[ndim];
 
@@ -540,6 +557,7 @@ public:
       this->size_ *= shape[i];
       this->shape_[i] = shape[i];
       this->index_[i] = 0;
+      _init_divisor(shape[i], this->divmul_[i], this->divshift_[i]);
     }
   }
 
@@ -550,6 +568,7 @@ public:
       this->size_ *= shape[i];
       this->shape_[i] = shape[i];
       this->index_[i] = index[i];
+      _init_divisor(shape[i], this->divmul_[i], this->divshift_[i]);
     }
   }
 
@@ -575,6 +594,8 @@ public:
   {
     memset(this->shape_, 0, sizeof(this->shape_));
     memset(this->index_, 0, sizeof(this->index_));
+    memset(this->divmul_, 0, sizeof(this->divmul_));
+    memset(this->divshift_, 0, sizeof(this->divshift_));
   }
 
   __device__ ptrdiff_t size() const {
@@ -593,11 +614,21 @@ public:
       // 64-bit division is very slow on GPU
       this->_set(static_cast<unsigned long long int>(i));
     } else {
-      this->_set(static_cast<unsigned int>(i));
+      this->_set32(static_cast<unsigned int>(i));
     }
   }
 
 private:
+  __device__ void _set32(unsigned int i) {
+      // i < 2**31 here, so that the addition below does not overflow.
+      for (int dim = ndim; --dim > 0; ) {
+        unsigned int t = (__umulhi(i, divmul_[dim]) + i) >> divshift_[dim];
+        index_[dim] = i - t * static_cast<unsigned int>(shape_[dim]);
+        i = t;
+      }
+      index_[0] = i;
+  }
+
   template<typename index_t>
   __device__ void _set(index_t i) {
       for (int dim = ndim; --dim > 0; ) {
@@ -614,6 +645,25 @@ private:
       index_[0] = i;
   }
 
+  template <typename Int>
+  static __device__ void _init_divisor(Int d, unsigned int& mul,
+                                       unsigned int& shift) {
+    // Same as _init_divisor in cupy/_core/_carray.pyx.
+    unsigned long long int s = 0;
+    if (d <= 0 || static_cast<unsigned long long int>(d) > 1ULL << 31) {
+      // Never used for division by the 32-bit path.
+      mul = 0;
+      shift = 0;
+      return;
+    }
+    while ((1ULL << s) < static_cast<unsigned long long int>(d)) {
+      s++;
+    }
+    mul = static_cast<unsigned int>(
+        (((1ULL << s) - d) << 32) / d + 1);
+    shift = static_cast<unsigned int>(s);
+  }
+
   // can also be implemented as __ffs(x)-1 or 31-__clz(x)
   static unsigned int __device__ _log2(unsigned int x) { return __popc(x-1); }
   static unsigned long long int __device__ _log2(unsigned long long int x) { return __popcll(x-1); }
@@ -53,6 +53,7 @@ cdef class Plan1d:
     cdef:
         readonly intptr_t handle
         readonly object work_area  # can be MemoryPointer or a list of it
+        readonly size_t work_size  # 0 for multi-GPU plans
         readonly int nx
         readonly int batch
         readonly Type fft_type
@@ -67,7 +68,8 @@ cdef class Plan1d:
         list xtArr_buffer
 
         void _single_gpu_get_plan(
-            self, Handle plan, int nx, int fft_type, int batch) except*
+            self, Handle plan, int nx, int fft_type, int batch,
+            bint share_work_area) except*
         void _multi_gpu_get_plan(
             self, Handle plan, int nx, int fft_type, int batch,
             devices, out) except*
@@ -76,7 +78,8 @@ cdef class Plan1d:
 cdef class PlanNd:
     cdef:
         readonly intptr_t handle
-        readonly object work_area  # memory.MemoryPointer
+        readonly object work_area  # memory.MemoryPointer or None if shared
+        readonly size_t work_size
         readonly tuple shape
         readonly Type fft_type
         readonly str order
@@ -6,6 +6,7 @@ from libcpp cimport vector
 from cupy_backends.cuda._softlink cimport SoftLink
 
 import threading
+import weakref
 
 import numpy
 
@@ -335,9 +336,70 @@ cdef _XtFree(intptr_t ptr):
     PyMem_Free(xtArr)
 
 
+# Work areas shared by the plans created with share_work_area=True, one for
+# each pair of stream and device. Plans executed on the same stream never run
+# concurrently, so they can use the same work area, which is grown to the
+# largest size requested. The work areas are released with the streams.
+cdef object _shared_work_areas = weakref.WeakKeyDictionary()
+
+# The per-thread default stream is a different stream in each thread, so its
+# work areas are kept for each thread instead, and released with the thread.
+cdef object _per_thread_work_areas = weakref.WeakKeyDictionary()
+
+
+cdef object _get_shared_work_area(size_t work_size):
+    s = stream.get_current_stream()
+    cdef int dev = runtime.getDevice()
+    if s.ptr == runtime.streamPerThread:
+        key = threading.current_thread()
+        work_areas = _per_thread_work_areas
+    else:
+        key = s
+        work_areas = _shared_work_areas
+    areas = work_areas.get(key)
+    if areas is None:
+        areas = {}
+        work_areas[key] = areas
+    work_area = areas.get(dev)
+    if work_area is None or work_area.mem.size < work_size:
+        # The previous work area may still be in use by the plans enqueued
+        # on this stream, which is safe as the memory pool is stream-ordered
+        work_area = memory.alloc(work_size)
+        areas[dev] = work_area
+    return work_area
+
+
+cdef inline int _set_shared_work_area(Handle plan, size_t work_size,
+                                      list keep) except -1:
+    # Set the shared work area of the current stream to the plan, and keep
+    # a reference to it until the execution is enqueued
+    cdef int result
+    cdef intptr_t ptr
+    if work_size == 0:
+        return 0
+    work_area = _get_shared_work_area(work_size)
+    keep.append(work_area)
+    ptr = <intptr_t>(work_area.ptr)
+    with nogil:
+        result = cufftSetWorkArea(plan, <void*>(ptr))
+    check_result(result)
+    return 0
+
+
+cpdef free_shared_work_areas():
+    """Releases the work areas shared by cuFFT plans.
+
+    The work areas are allocated again when the plans created with
+    ``share_work_area=True`` are executed.
+    """
+    _shared_work_areas.clear()
+    _per_thread_work_areas.clear()
+
+
 cdef class Plan1d:
     def __init__(self, int nx, int fft_type, int batch, *,
-                 devices=None, out=None, intptr_t prealloc_plan=0):
+                 devices=None, out=None, intptr_t prealloc_plan=0,
+                 bint share_work_area=False):
         cdef Handle plan
         cdef bint use_multi_gpus = 0 if devices is None else 1
         cdef int result
@@ -357,6 +419,7 @@ cdef class Plan1d:
 
         self.handle = <intptr_t>plan
         self.work_area = None
+        self.work_size = 0
         self.gpus = None
 
         self.gather_streams = None
@@ -367,7 +430,8 @@ cdef class Plan1d:
         if batch != 0:
             # set plan, work_area, gpus, streams, and events
             if not use_multi_gpus:
-                self._single_gpu_get_plan(plan, nx, fft_type, batch)
+                self._single_gpu_get_plan(
+                    plan, nx, fft_type, batch, share_work_area)
             else:
                 self._multi_gpu_get_plan(
                     plan, nx, fft_type, batch, devices, out)
@@ -389,7 +453,7 @@ cdef class Plan1d:
         self.batch_share = None
 
     cdef void _single_gpu_get_plan(self, Handle plan, int nx, int fft_type,
-                                   int batch) except*:
+                                   int batch, bint share_work_area) except*:
         cdef int result
         cdef size_t work_size
         cdef intptr_t ptr
@@ -407,6 +471,11 @@ cdef class Plan1d:
                                          &work_size)
         check_result(result)
 
+        self.work_size = work_size
+        if share_work_area:
+            # the work area is set at each execution
+            return
+
         work_area = memory.alloc(work_size)
         ptr = <intptr_t>(work_area.ptr)
         with nogil:
@@ -569,10 +638,13 @@ cdef class Plan1d:
         cdef intptr_t plan = self.handle
         cdef intptr_t s = stream.get_current_stream().ptr
         cdef int result
+        cdef list keep = []
 
         with nogil:
             result = cufftSetStream(<Handle>plan, <Stream>s)
         check_result(result)
+        if self.work_area is None:
+            _set_shared_work_area(<Handle>plan, self.work_size, keep)
 
         if self.fft_type == CUFFT_C2C:
             execC2C(plan, a.data.ptr, out.data.ptr, direction)
@@ -809,7 +881,7 @@ cdef class PlanNd:
     def __init__(self, object shape, object inembed, int istride,
                  int idist, object onembed, int ostride, int odist,
                  int fft_type, int batch, str order, int last_axis, last_size,
-                 *, intptr_t prealloc_plan=0):
+                 *, intptr_t prealloc_plan=0, bint share_work_area=False):
         cdef Handle plan
         cdef size_t work_size
         cdef int ndim, result
@@ -872,15 +944,20 @@ cdef class PlanNd:
         # TODO: for CUDA>=9.2 could also allow setting a work area policy
         # result = cufftXtSetWorkAreaPolicy(plan, policy, &work_size)
 
-        work_area = memory.alloc(work_size)
-        ptr = <intptr_t>(work_area.ptr)
-        with nogil:
-            result = cufftSetWorkArea(plan, <void*>(ptr))
-        check_result(result)
+        if share_work_area:
+            # the work area is set at each execution
+            work_area = None
+        else:
+            work_area = memory.alloc(work_size)
+            ptr = <intptr_t>(work_area.ptr)
+            with nogil:
+                result = cufftSetWorkArea(plan, <void*>(ptr))
+            check_result(result)
 
         self.shape = tuple(shape)
         self.fft_type = <Type>fft_type
         self.work_area = work_area
+        self.work_size = work_size
         self.order = order  # either 'C' or 'F'
         self.last_axis = last_axis  # ignored for C2C
         self.last_size = last_size  # = None (and ignored) for C2C
@@ -906,10 +983,13 @@ cdef class PlanNd:
         cdef intptr_t plan = self.handle
         cdef intptr_t s = stream.get_current_stream().ptr
         cdef int result
+        cdef list keep = []
 
         with nogil:
             result = cufftSetStream(<Handle>plan, <Stream>s)
         check_result(result)
+        if self.work_area is None:
+            _set_shared_work_area(<Handle>plan, self.work_size, keep)
 
         if self.fft_type == CUFFT_C2C:
             execC2C(plan, a.data.ptr, out.data.ptr, direction)
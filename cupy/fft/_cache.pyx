@@ -1,6 +1,7 @@
 # distutils: language = c++
 
 import gc
+import json
 import weakref
 
 from cupy_backends.cuda.api cimport runtime
@@ -16,6 +17,15 @@ from cupy import _util
 
 cdef object _thread_local = threading.local()
 
+# Keys of the plans used by any thread while recording, see
+# start_plan_key_recording(). The dict is used as an ordered set.
+cdef bint _recording = False
+cdef dict _recorded_keys = {}
+cdef object _recorded_keys_lock = threading.Lock()
+
+# Version of the file format written by save_plan_keys()
+cdef int _PLAN_KEYS_VERSION = 1
+
 
 cdef class _ThreadLocal:
 
@@ -61,6 +71,46 @@ cdef inline Py_ssize_t _get_plan_memsize(plan, int curr_dev=-1) except -1:
     return memsize
 
 
+# Lengths of the keys of the plans built without callbacks, as in
+# cupy.fft._fft. The keys of the plans with callbacks carry more fields,
+# which refer to modules and pointers of the current process.
+cdef dict _plain_key_lengths = {'Plan1d': 4, 'PlanNd': 12}
+
+
+cdef inline _record_key(tuple key, plan):
+    # Only plans without callbacks can be recreated from their keys; plans
+    # with callbacks are built from external modules, or are JIT plans whose
+    # keys cannot be replayed in another process.
+    cdef str plan_type = type(plan).__name__
+    if (type(plan).__module__ != 'cupy.cuda.cufft'
+            or _plain_key_lengths.get(plan_type) != len(key)):
+        return
+    with _recorded_keys_lock:
+        if _recording:
+            _recorded_keys[(plan_type, key)] = None
+
+
+cdef _make_plan(str plan_type, tuple key):
+    from cupy.cuda import cufft
+    from cupy.fft._config import config
+
+    if plan_type == 'Plan1d':
+        # the same arguments as in cupy.fft._fft._exec_fft()
+        out_size, fft_type, batch, devices = key
+        return cufft.Plan1d(out_size, fft_type, batch, devices=devices,
+                            share_work_area=config.share_work_area)
+    elif plan_type == 'PlanNd':
+        return cufft.PlanNd(*key, share_work_area=config.share_work_area)
+    raise ValueError('unrecognized plan type: {}'.format(plan_type))
+
+
+cdef _to_tuple(obj):
+    # JSON turns the tuples in the keys into lists
+    if isinstance(obj, list):
+        return tuple([_to_tuple(x) for x in obj])
+    return obj
+
+
 cdef class _Node:
     # Unfortunately cython cdef class cannot be nested, so the node class
     # has to live outside of the linked list...
@@ -289,12 +339,17 @@ cdef class PlanCache:
             else:
                 _remove_append_multi_gpu_plan(gpus, key)
             self.hits += 1
+            if _recording:
+                _record_key(key, node.plan)
             return node.plan
         else:
             self.misses += 1
             raise KeyError('plan not found for key: {}'.format(key))
 
     def __setitem__(self, tuple key, plan):
+        if _recording:
+            _record_key(key, plan)
+
         # no-op if cache is disabled
         if not self.is_enabled:
             assert (self.size == 0 or self.memsize == 0)
@@ -518,6 +573,35 @@ cdef class PlanCache:
     cpdef show_info(self):
         print(self)
 
+    cpdef Py_ssize_t prewarm(self, keys) except -1:
+        """Create and cache the plans for the given keys in advance.
+
+        Args:
+            keys (list): The plan keys as returned by
+                :func:`~cupy.fft.config.stop_plan_key_recording` or
+                :func:`~cupy.fft.config.load_plan_keys`.
+
+        Returns:
+            int: The number of plans created. Plans already in the cache are
+            not created again.
+
+        .. note::
+            Plans are inserted in the given order, so when there are more
+            keys than the cache can hold, the last ones are kept.
+        """
+        cdef str plan_type
+        cdef tuple key
+        cdef Py_ssize_t count = 0
+
+        if not self.is_enabled:
+            return 0
+        for plan_type, key in keys:
+            if key in self.cache:
+                continue
+            self[key] = _make_plan(plan_type, key)
+            count += 1
+        return count
+
 
 # The three functions below are used to collectively add, remove, or move a
 # a multi-GPU plan in all devices' caches (per thread). Therefore, they're
@@ -654,6 +738,105 @@ cpdef clear_plan_cache():
     cache.clear()
 
 
+cpdef start_plan_key_recording():
+    """Start recording the keys of the cuFFT plans used on all threads.
+
+    The recorded keys can be persisted with
+    :func:`~cupy.fft.config.save_plan_keys`, and the plans can be created
+    in advance with :func:`~cupy.fft.config.prewarm_plan_cache` when the
+    workload starts again, so that the first FFTs of each thread do not pay
+    for the plan creation. Plans with cuFFT callbacks are not recorded.
+
+    .. seealso::
+        :func:`~cupy.fft.config.stop_plan_key_recording`
+
+    """
+    global _recording
+    with _recorded_keys_lock:
+        _recorded_keys.clear()
+        _recording = True
+
+
+cpdef list stop_plan_key_recording():
+    """Stop recording the keys of the cuFFT plans.
+
+    Returns:
+        list: The keys of the plans used since
+        :func:`~cupy.fft.config.start_plan_key_recording` was called, in
+        the order of first use.
+
+    """
+    global _recording
+    with _recorded_keys_lock:
+        _recording = False
+        keys = list(_recorded_keys)
+        _recorded_keys.clear()
+    return keys
+
+
+cpdef save_plan_keys(keys, path):
+    """Save the keys of cuFFT plans to a JSON file.
+
+    Args:
+        keys (list): The keys returned by
+            :func:`~cupy.fft.config.stop_plan_key_recording`.
+        path (str): The path of the file.
+
+    """
+    with open(path, 'w') as f:
+        json.dump({'version': _PLAN_KEYS_VERSION,
+                   'plans': [{'type': plan_type, 'key': key}
+                             for plan_type, key in keys]}, f)
+
+
+cpdef list load_plan_keys(path):
+    """Load the keys of cuFFT plans saved by
+    :func:`~cupy.fft.config.save_plan_keys`.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        list: The keys, which can be passed to
+        :func:`~cupy.fft.config.prewarm_plan_cache`.
+
+    """
+    with open(path) as f:
+        data = json.load(f)
+    if data.get('version') != _PLAN_KEYS_VERSION:
+        raise ValueError(
+            'unsupported plan keys version: {}'.format(data.get('version')))
+    return [(entry['type'], _to_tuple(entry['key']))
+            for entry in data['plans']]
+
+
+cpdef Py_ssize_t prewarm_plan_cache(keys) except -1:
+    """Create the cuFFT plans for the given keys in the plan cache of the
+    current thread and device.
+
+    As the plan cache is per thread, this should be called by every thread
+    performing FFTs, e.g., in the ``initializer`` of
+    :class:`concurrent.futures.ThreadPoolExecutor`. Multi-GPU plans are
+    added to the caches of all the participating devices. The plans follow
+    the :attr:`~cupy.fft.config.share_work_area` setting of the calling
+    thread, which must then be set in that thread beforehand.
+
+    Args:
+        keys (list): The keys returned by
+            :func:`~cupy.fft.config.stop_plan_key_recording` or
+            :func:`~cupy.fft.config.load_plan_keys`.
+
+    Returns:
+        int: The number of plans created.
+
+    .. seealso::
+        :meth:`~cupy.fft._cache.PlanCache.prewarm`
+
+    """
+    cdef PlanCache cache = get_plan_cache()
+    return cache.prewarm(keys)
+
+
 cpdef show_plan_cache_info():
     """Show all of the plan caches' info on this thread.
 
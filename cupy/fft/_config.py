@@ -13,7 +13,12 @@ from cupy.fft._cache import (get_plan_cache,
                              set_plan_cache_size,
                              get_plan_cache_max_memsize,
                              set_plan_cache_max_memsize,
-                             show_plan_cache_info)
+                             show_plan_cache_info,
+                             start_plan_key_recording,
+                             stop_plan_key_recording,
+                             save_plan_keys,
+                             load_plan_keys,
+                             prewarm_plan_cache)
 # expose callback handles via `config` object (CUDA only)
 if not runtime.is_hip:
     from cupy.fft._callback import (
@@ -34,6 +39,11 @@ class _FFTConfig:
     get_plan_cache_max_memsize = get_plan_cache_max_memsize
     set_plan_cache_max_memsize = set_plan_cache_max_memsize
     show_plan_cache_info = show_plan_cache_info
+    start_plan_key_recording = start_plan_key_recording
+    stop_plan_key_recording = stop_plan_key_recording
+    save_plan_keys = save_plan_keys
+    load_plan_keys = load_plan_keys
+    prewarm_plan_cache = prewarm_plan_cache
     get_current_callback_manager = get_current_callback_manager
     set_cufft_callbacks = set_cufft_callbacks
 
@@ -43,6 +53,8 @@ class _FFTConfig:
         'cupy.fft.config.use_multi_gpus', default=False)
     _devices = contextvars.ContextVar(
         'cupy.fft.config.devices', default=None)
+    _share_work_area = contextvars.ContextVar(
+        'cupy.fft.config.share_work_area', default=False)
 
     def set_cufft_gpus(self, gpus):
         '''Set the GPUs to be used in multi-GPU FFT.
@@ -75,6 +87,16 @@ class _FFTConfig:
         # make it hashable
         self._devices.set(tuple(devs))
 
+    def free_shared_work_areas(self):
+        '''Release the work areas shared by the cached cuFFT plans.
+
+        They are allocated again when the plans are executed.
+
+        .. seealso:: :attr:`share_work_area`
+        '''
+        from cupy.cuda import cufft
+        cufft.free_shared_work_areas()
+
     @property
     def enable_nd_planning(self):
         warnings.warn(
@@ -97,6 +119,33 @@ class _FFTConfig:
     def use_multi_gpus(self, value):
         self._use_multi_gpus.set(bool(value))
 
+    @property
+    def share_work_area(self):
+        """Whether the cached cuFFT plans share their work areas.
+
+        When ``True``, the plans newly created for the plan cache do not own
+        a work area. Instead, a work area shared by all such plans is set at
+        each execution, one for each stream and device (and for each thread
+        on the per-thread default stream), which is as large as the largest
+        plan executed on it. This decouples the memory footprint from the
+        number of cached plans, which then use no memory as seen by
+        :meth:`~cupy.fft._cache.PlanCache.get_curr_memsize`. Plans created
+        before changing this setting are not affected. Default is ``False``.
+
+        This setting is held in a context variable, so it only applies to the
+        current thread (or context); new threads start with the default. It
+        must be set in every thread creating plans, e.g., in the
+        ``initializer`` of :class:`concurrent.futures.ThreadPoolExecutor`
+        before calling :func:`~cupy.fft.config.prewarm_plan_cache`.
+
+        .. seealso:: :meth:`free_shared_work_areas`
+        """
+        return self._share_work_area.get()
+
+    @share_work_area.setter
+    def share_work_area(self, value):
+        self._share_work_area.set(bool(value))
+
     @property
     def devices(self):
         return self._devices.get() if self._use_multi_gpus.get() else None
@@ -157,7 +157,9 @@ def _exec_fft(a, direction, value_type, norm, axis, overwrite_x,
         if cached_plan is not None:
             plan = cached_plan
         elif mgr is None:
-            plan = cufft.Plan1d(out_size, fft_type, batch, devices=devices)
+            plan = cufft.Plan1d(
+                out_size, fft_type, batch, devices=devices,
+                share_work_area=config.share_work_area)
             cache[keys] = plan
         else:  # has callback
             # TODO(leofang): support multi-GPU callback (devices is ignored)
@@ -465,7 +467,8 @@ def _get_cufft_plan_nd(
     if cached_plan is not None:
         plan = cached_plan
     elif mgr is None:
-        plan = cufft.PlanNd(*keys)
+        plan = cufft.PlanNd(
+            *keys, share_work_area=to_cache and config.share_work_area)
         if to_cache:
             cache[keys] = plan
     else:  # has callback
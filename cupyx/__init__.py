@@ -25,6 +25,9 @@ from cupyx._pinned_array import zeros_like_pinned  # NOQA
 
 from cupyx._gufunc import GeneralizedUFunc  # NOQA
 
+from cupyx._lazy import lazy  # NOQA
+from cupyx._lazy import LazyArray  # NOQA
+
 
 def __getattr__(key):
     if key == 'lapack':
@@ -0,0 +1,416 @@
+from __future__ import annotations
+
+import collections
+
+import numpy
+
+import cupy
+from cupy._core import _kernel
+from cupy._core import new_fusion
+from cupy.cuda import compiler
+
+
+_scalar_types = (bool, int, float, complex, numpy.generic)
+
+# Fused functions keyed on the structure of the recorded expression, i.e., a
+# tuple of ``(ufunc, operand_indices)`` in topological order, each with the
+# set of operand types for which the expression failed to fuse. The least
+# recently used ones are dropped beyond ``_fusion_cache_size`` entries.
+_fusion_cache: collections.OrderedDict = collections.OrderedDict()
+_fusion_cache_size = 256
+
+
+def lazy(a):
+    """Wraps an array to evaluate elementwise operations on it lazily.
+
+    Universal functions and arithmetic operators applied to the returned
+    object are not executed immediately. Instead, they are recorded into an
+    expression graph, which is compiled into a single fused kernel and
+    executed when the value is actually needed (e.g., reductions,
+    indexing, :meth:`~LazyArray.get` or :meth:`~LazyArray.compute`).
+    This eliminates the kernel launches and temporary arrays of the
+    intermediate results without rewriting the code into a
+    :func:`cupy.fuse` function.
+
+    .. code-block:: py
+
+        x = cupyx.lazy(cupy.arange(10, dtype=cupy.float32))
+        y = cupy.sqrt(x * x + 1) - x  # nothing is computed yet
+        y.sum()  # computes ``y`` with one fused kernel, then sums it
+
+    Args:
+        a (cupy.ndarray or LazyArray): The array to wrap.
+
+    Returns:
+        LazyArray: The lazy array wrapping ``a``. If ``a`` is already a
+        :class:`LazyArray`, it is returned as is.
+
+    .. note::
+        Only universal functions with a single output called without
+        ``out``, ``dtype`` or ``casting`` arguments are recorded. Other
+        operations evaluate the pending expression first and then run
+        eagerly.
+
+    .. warning::
+        This feature is experimental and may be changed in the future.
+
+    """
+    if isinstance(a, LazyArray):
+        return a
+    if not isinstance(a, cupy.ndarray):
+        raise TypeError(
+            'Expected cupy.ndarray, got {}'.format(type(a).__name__))
+    return LazyArray(a, None, None, a.shape)
+
+
+class LazyArray:
+    """An array whose elementwise operations are evaluated lazily.
+
+    Instances are created by :func:`cupyx.lazy` or by applying universal
+    functions to other lazy arrays. Attributes not defined in this class are
+    looked up in the evaluated :class:`cupy.ndarray`.
+
+    .. seealso:: :func:`cupyx.lazy`
+
+    """
+
+    __slots__ = ('_value', '_kernel', '_args', '_shape', '_dtype')
+
+    # Defer binary operators with cupy.ndarray and numpy.ndarray to this
+    # class so that they are recorded as well.
+    __array_ufunc__ = None
+
+    def __init__(self, value, kernel, args, shape):
+        # Either `value` (evaluated) or `kernel` and `args` (pending) is set.
+        self._value = value
+        self._kernel = kernel
+        self._args = args
+        self._shape = shape
+        self._dtype = None if value is None else value.dtype
+
+    def __repr__(self):
+        state = 'pending' if self._value is None else 'evaluated'
+        return '<LazyArray shape={} dtype={} ({})>'.format(
+            self._shape, self.dtype, state)
+
+    @property
+    def shape(self):
+        return self._shape
+
+    @property
+    def ndim(self):
+        return len(self._shape)
+
+    @property
+    def size(self):
+        return cupy._core.internal.prod(self._shape)
+
+    @property
+    def dtype(self):
+        if self._dtype is None:
+            # Let the ufuncs resolve the output dtypes on zero-size operands,
+            # which does not launch any kernel.
+            for node in _topological_order(
+                    self, lambda node: node._dtype is None):
+                node._dtype = node._kernel(*[
+                    cupy.empty((0,), a.dtype)
+                    if isinstance(a, (LazyArray, cupy.ndarray)) else a
+                    for a in node._args]).dtype
+        return self._dtype
+
+    @property
+    def is_evaluated(self):
+        """Whether the value of this array has been computed."""
+        return self._value is not None
+
+    def __len__(self):
+        if not self._shape:
+            raise TypeError('len() of unsized object')
+        return self._shape[0]
+
+    def compute(self):
+        """Evaluates the pending expression.
+
+        The result is memoized, so the expression is evaluated at most once.
+
+        Returns:
+            cupy.ndarray: The value of this array.
+
+        """
+        if self._value is None:
+            self._value = _evaluate(self)
+            # Release the expression graph.
+            self._kernel = None
+            self._args = None
+        return self._value
+
+    def get(self, *args, **kwargs):
+        """Evaluates the array and copies it to the host.
+
+        .. seealso:: :meth:`cupy.ndarray.get`
+
+        """
+        return self.compute().get(*args, **kwargs)
+
+    def __cupy_get_ndarray__(self):
+        return self.compute()
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(
+                "'LazyArray' object has no attribute '{}'".format(name))
+        return getattr(self.compute(), name)
+
+    def __getitem__(self, key):
+        return self.compute()[key]
+
+    def __setitem__(self, key, value):
+        if isinstance(value, LazyArray):
+            value = value.compute()
+        self.compute()[key] = value
+
+    def __array__(self, dtype=None, copy=None):
+        # Same as cupy.ndarray, implicit conversion to NumPy is not allowed.
+        return self.compute().__array__(dtype, copy=copy)
+
+    def __bool__(self):
+        return bool(self.compute())
+
+    def __int__(self):
+        return int(self.compute())
+
+    def __float__(self):
+        return float(self.compute())
+
+    def __complex__(self):
+        return complex(self.compute())
+
+    def __cupy_override_elementwise_kernel__(self, kernel, *args, **kwargs):
+        # This method is called from cupy.ufunc and cupy.ElementwiseKernel
+        # to dispatch elementwise operations.
+        if (isinstance(kernel, _kernel.ufunc) and kernel.nout == 1
+                and not kwargs and len(args) == kernel.nin
+                and all([isinstance(a, (LazyArray, cupy.ndarray))
+                         or isinstance(a, _scalar_types) for a in args])):
+            shape = numpy.broadcast_shapes(*[
+                a.shape if isinstance(a, (LazyArray, cupy.ndarray)) else ()
+                for a in args])
+            return LazyArray(None, kernel, args, shape)
+
+        # Not recordable; evaluate the operands and run eagerly.
+        out = kwargs.get('out')
+        if isinstance(out, LazyArray) or (
+                isinstance(out, tuple)
+                and any([isinstance(o, LazyArray) for o in out])):
+            raise TypeError('LazyArray cannot be used as an output argument')
+        args = [a.compute() if isinstance(a, LazyArray) else a for a in args]
+        return kernel(*args, **kwargs)
+
+    def __cupy_override_reduction_kernel__(
+            self, kernel, axis, dtype, out, keepdims):
+        # This method is called from _SimpleReductionKernel and elementary
+        # reduction methods of ndarray to dispatch reduction operations.
+        return kernel(self.compute(), axis, dtype, out, keepdims)
+
+    # Arithmetic operators
+
+    def __neg__(self):
+        return cupy.negative(self)
+
+    def __pos__(self):
+        return cupy.positive(self)
+
+    def __abs__(self):
+        return cupy.absolute(self)
+
+    def __invert__(self):
+        return cupy.invert(self)
+
+    def __add__(self, other):
+        return cupy.add(self, other)
+
+    def __radd__(self, other):
+        return cupy.add(other, self)
+
+    def __sub__(self, other):
+        return cupy.subtract(self, other)
+
+    def __rsub__(self, other):
+        return cupy.subtract(other, self)
+
+    def __mul__(self, other):
+        return cupy.multiply(self, other)
+
+    def __rmul__(self, other):
+        return cupy.multiply(other, self)
+
+    def __truediv__(self, other):
+        return cupy.true_divide(self, other)
+
+    def __rtruediv__(self, other):
+        return cupy.true_divide(other, self)
+
+    def __floordiv__(self, other):
+        return cupy.floor_divide(self, other)
+
+    def __rfloordiv__(self, other):
+        return cupy.floor_divide(other, self)
+
+    def __mod__(self, other):
+        return cupy.remainder(self, other)
+
+    def __rmod__(self, other):
+        return cupy.remainder(other, self)
+
+    def __pow__(self, other):
+        return cupy.power(self, other)
+
+    def __rpow__(self, other):
+        return cupy.power(other, self)
+
+    def __lshift__(self, other):
+        return cupy.left_shift(self, other)
+
+    def __rlshift__(self, other):
+        return cupy.left_shift(other, self)
+
+    def __rshift__(self, other):
+        return cupy.right_shift(self, other)
+
+    def __rrshift__(self, other):
+        return cupy.right_shift(other, self)
+
+    def __and__(self, other):
+        return cupy.bitwise_and(self, other)
+
+    def __rand__(self, other):
+        return cupy.bitwise_and(other, self)
+
+    def __or__(self, other):
+        return cupy.bitwise_or(self, other)
+
+    def __ror__(self, other):
+        return cupy.bitwise_or(other, self)
+
+    def __xor__(self, other):
+        return cupy.bitwise_xor(self, other)
+
+    def __rxor__(self, other):
+        return cupy.bitwise_xor(other, self)
+
+    # Comparison operators
+
+    def __lt__(self, other):
+        return cupy.less(self, other)
+
+    def __le__(self, other):
+        return cupy.less_equal(self, other)
+
+    def __gt__(self, other):
+        return cupy.greater(self, other)
+
+    def __ge__(self, other):
+        return cupy.greater_equal(self, other)
+
+    def __eq__(self, other):
+        return cupy.equal(self, other)
+
+    def __ne__(self, other):
+        return cupy.not_equal(self, other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+def _topological_order(root, cond):
+    # Returns the pending nodes reachable from `root` through nodes
+    # satisfying `cond`, in topological order.
+    order = []
+    visited = set()
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in visited:
+            continue
+        if not expanded:
+            stack.append((node, True))
+            for a in node._args:
+                if (isinstance(a, LazyArray) and a._value is None
+                        and cond(a)):
+                    stack.append((a, False))
+            continue
+        visited.add(id(node))
+        order.append(node)
+    return order
+
+
+def _linearize(root):
+    # Returns the operands (leaves) and the pending operations of the
+    # expression graph of `root` in topological order. Each operation is
+    # represented as ``(kernel, operand_indices)`` where indices point into
+    # the concatenation of the leaves and the results of the operations.
+    leaves = []
+    leaf_index = {}  # id(leaf) -> index in leaves
+    program = _topological_order(root, lambda node: True)
+    node_index = {id(node): i for i, node in enumerate(program)}
+
+    operands = []
+    for node in program:
+        refs = []
+        for a in node._args:
+            if isinstance(a, LazyArray):
+                if a._value is None:
+                    refs.append(-1 - node_index[id(a)])
+                    continue
+                a = a._value
+            i = leaf_index.get(id(a))
+            if i is None:
+                i = leaf_index[id(a)] = len(leaves)
+                leaves.append(a)
+            refs.append(i)
+        operands.append(refs)
+
+    # Operation results are stored after the leaves.
+    n_leaves = len(leaves)
+    program = tuple([
+        (node._kernel,
+         tuple([n_leaves - 1 - r if r < 0 else r for r in refs]))
+        for node, refs in zip(program, operands)])
+    return leaves, program
+
+
+def _make_func(program):
+    def lazy_fused(*leaves):
+        values = list(leaves)
+        for kernel, refs in program:
+            values.append(kernel(*[values[i] for i in refs]))
+        return values[-1]
+    return lazy_fused
+
+
+def _evaluate(root):
+    leaves, program = _linearize(root)
+    if len(program) == 1:
+        kernel, refs = program[0]
+        return kernel(*[leaves[i] for i in refs])
+
+    entry = _fusion_cache.get(program)
+    if entry is None:
+        entry = (new_fusion.Fusion(_make_func(program), 'lazy_fused'), set())
+        _fusion_cache[program] = entry
+        if len(_fusion_cache) > _fusion_cache_size:
+            _fusion_cache.popitem(last=False)
+    else:
+        _fusion_cache.move_to_end(program)
+    func, unfusable = entry
+    key = tuple([
+        a.dtype if isinstance(a, cupy.ndarray) else type(a) for a in leaves])
+    if key not in unfusable:
+        try:
+            return func(*leaves)
+        except (TypeError, ValueError, IndexError, NotImplementedError,
+                compiler.CompileException):
+            # Some operations are not supported by fusion; evaluate this
+            # expression eagerly from now on. Other errors, e.g., running
+            # out of memory, are not specific to fusion and propagate.
+            unfusable.add(key)
+    return func.func(*leaves)
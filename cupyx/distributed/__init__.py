@@ -1,2 +1,5 @@
 from cupyx.distributed._init import init_process_group  # NOQA
 from cupyx.distributed._nccl_comm import NCCLBackend  # NOQA
+from cupyx.distributed._socket_comm import SocketBackend  # NOQA
+from cupyx.distributed._trace import CollectiveTracer  # NOQA
+from cupyx.distributed._trace import merge_traces  # NOQA
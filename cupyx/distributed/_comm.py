@@ -1,17 +1,26 @@
 from __future__ import annotations
 
 import abc
+import contextlib
 
 from cupyx.distributed import _store
+from cupyx.distributed import _store_tree
+from cupyx.distributed import _trace
 
 
 class _Backend(abc.ABC):
 
+    # Whether the communications are measured on the device by default
+    _device_timing = True
+
     def __init__(self, n_devices, rank,
                  host=_store._DEFAULT_HOST, port=_store._DEFAULT_PORT):
         self._n_devices = n_devices
         self.rank = rank
+        self._tracer = None
         self._store_proxy = _store.TCPStoreProxy(host, port)
+        # Barrier and broadcast of the host through the stores of the ranks
+        self._store_tree = None
         if rank == 0:
             self._store = _store.TCPStore(n_devices)
 
@@ -64,6 +73,50 @@ class _Backend(abc.ABC):
     def barrier(self):
         pass
 
+    def _init_store_tree(self):
+        self._store_tree = _store_tree.StoreTree(
+            self._store_proxy, self.rank, self._n_devices)
+
     def stop(self):
+        if self._store_tree is not None:
+            self._store_tree.close()
+            self._store_tree = None
         if self.rank == 0:
             self._store.stop()
+
+    def start_tracing(self, *, device_timing=None):
+        """Starts recording the communications called on this communicator.
+
+        Args:
+            device_timing (bool, optional): if ``True``, the times are
+                measured with CUDA events on the streams of the operations.
+                Defaults to ``True`` for the backends communicating device
+                memory.
+
+        Returns:
+            ~cupyx.distributed.CollectiveTracer: The tracer, which keeps
+            recording until :meth:`stop_tracing` is called.
+        """
+        if device_timing is None:
+            device_timing = self._device_timing
+        self._tracer = _trace.CollectiveTracer(
+            self.rank, self._n_devices, device_timing=device_timing)
+        return self._tracer
+
+    def stop_tracing(self):
+        """Stops recording the communications.
+
+        Returns:
+            ~cupyx.distributed.CollectiveTracer: The tracer that was
+            recording, or ``None``.
+        """
+        tracer, self._tracer = self._tracer, None
+        return tracer
+
+    def _traced(self, function, args, stream=None):
+        # Context manager recording the call of `function` with `args` while
+        # tracing
+        if self._tracer is None:
+            return contextlib.nullcontext()
+        nbytes, peers = _trace._describe(function, args, self._n_devices)
+        return self._tracer._trace(function, nbytes, peers, stream)
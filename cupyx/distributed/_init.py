@@ -6,9 +6,10 @@ from cupy.cuda import nccl
 
 from cupyx.distributed import _store
 from cupyx.distributed._nccl_comm import NCCLBackend
+from cupyx.distributed._socket_comm import SocketBackend
 
 
-_backends = {'nccl': NCCLBackend}
+_backends = {'nccl': NCCLBackend, 'socket': SocketBackend}
 
 
 def init_process_group(
@@ -60,8 +61,10 @@ def init_process_group(
             distributed execution.
         rank (int): Unique id of the GPU that the communicator is associated to
             its value needs to be `0 <= rank < n_devices`.
-        backend (str): Backend to use for the communications. Optional,
-            defaults to `"nccl"`.
+        backend (str): Backend to use for the communications, either
+            `"nccl"` or `"socket"`, which exchanges host buffers over TCP
+            sockets and does not require GPUs. Optional, defaults to
+            `"nccl"`.
         host (str): host address for the process rendezvous on initialization
             defaults to `None`.
         port (int): port for the process rendezvous on initialization
@@ -1,42 +1,30 @@
 from __future__ import annotations
 
-from ctypes import Structure, c_int, c_byte
+from ctypes import Structure, c_int, c_int64
 
 
-_VALUE_BUFFER_SIZE = 256
-
+# Messages are sent as a fixed-size header followed by `length` bytes of
+# value, so that values of any size can be exchanged.
 
 class action_t(Structure):
     _fields_ = [
         ('action', c_int),
-        ('length', c_int),
-        ('value', c_byte * _VALUE_BUFFER_SIZE)]
+        ('length', c_int64)]
 
 
 class result_action_t(Structure):
     _fields_ = [
         # If error value contains a message
         ('status', c_int),  # 0 OK, 1 Error
-        ('length', c_int),
-        ('value', c_byte * _VALUE_BUFFER_SIZE)]
+        ('length', c_int64)]
 
 
 def get_action_t(action, value):
-    l_v = len(value)
-    value = bytearray(value) + bytearray(
-        b'\x00' * (_VALUE_BUFFER_SIZE - len(value)))
-    value = (c_byte * _VALUE_BUFFER_SIZE).from_buffer(value)
-    assert (_VALUE_BUFFER_SIZE - len(value)) >= 0
-    return action_t(action, l_v, value)
+    return bytes(action_t(action, len(value))) + bytes(value)
 
 
 def get_result_action_t(status, value):
-    l_v = len(value)
-    value = bytearray(value) + bytearray(
-        b'\x00' * (_VALUE_BUFFER_SIZE - len(value)))
-    value = (c_byte * _VALUE_BUFFER_SIZE).from_buffer(value)
-    assert (_VALUE_BUFFER_SIZE - len(value)) >= 0
-    return result_action_t(status, l_v, value)
+    return bytes(result_action_t(status, len(value))) + bytes(value)
 
 
 def create_value_bytes(value):
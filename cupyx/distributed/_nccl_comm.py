@@ -57,6 +57,59 @@ def _get_nccl_dtype_and_count(array, count=None):
     return nccl_dtype, count
 
 
+# Default upper bound of the size of the buffers into which
+# NCCLBackend.all_reduce_bucketed packs the arrays
+_DEFAULT_BUCKET_SIZE = 25 * 1024 * 1024
+
+
+def _make_buckets(arrays_info, bucket_size):
+    # Group the arrays given as a list of (dtype char, nbytes) into buckets
+    # of the same dtype whose total size does not exceed `bucket_size`,
+    # keeping their order. Arrays larger than `bucket_size` are put in
+    # buckets of their own. Returns a list of lists of indices.
+    buckets = []
+    open_buckets = {}
+    for i, (dtype, nbytes) in enumerate(arrays_info):
+        current = open_buckets.get(dtype)
+        if current is not None and current[1] + nbytes <= bucket_size:
+            current[0].append(i)
+            current[1] += nbytes
+        else:
+            bucket = [i]
+            buckets.append(bucket)
+            open_buckets[dtype] = [bucket, nbytes]
+    return buckets
+
+
+class _AllReduceHandle:
+    """Handle of an all reduce operation running asynchronously.
+
+    Returned by :meth:`NCCLBackend.all_reduce_bucketed`.
+    """
+
+    def __init__(self, event):
+        self.event = event
+
+    def done(self):
+        """Returns ``True`` if the operation has completed."""
+        return self.event.done
+
+    def wait(self, stream=None):
+        """Makes a stream wait for the operation to complete.
+
+        Args:
+            stream (cupy.cuda.Stream, optional): stream that waits. Defaults
+                to the current stream.
+        """
+        if stream is None:
+            stream = cupy.cuda.stream.get_current_stream()
+        stream.wait_event(self.event)
+
+    def synchronize(self):
+        """Blocks the host until the operation completes."""
+        self.event.synchronize()
+
+
 class NCCLBackend(_Backend):
     """Interface that uses NVIDIA's NCCL to perform communications.
 
@@ -78,6 +131,8 @@ class NCCLBackend(_Backend):
                  use_mpi=False):
         super().__init__(n_devices, rank, host, port)
         self._use_mpi = _mpi_available and use_mpi
+        # Stream dedicated to the asynchronous collectives, created on demand
+        self._async_stream = None
         if self._use_mpi:
             self._init_with_mpi(n_devices, rank)
         else:
@@ -101,11 +156,8 @@ class NCCLBackend(_Backend):
         if rank == 0:
             self._store.run(host, port)
             nccl_id = nccl.get_unique_id()
-            self._store_proxy['nccl_id'] = nccl_id
-            self._store_proxy.barrier()
-        else:
-            self._store_proxy.barrier()
-            nccl_id = self._store_proxy['nccl_id']
+        self._init_store_tree()
+        nccl_id = self._store_tree.broadcast('nccl_id', nccl_id)
         self._comm = nccl.NcclCommunicator(n_devices, nccl_id, rank)
 
     def _check_contiguous(self, array):
@@ -134,7 +186,9 @@ class NCCLBackend(_Backend):
             or sparse.issparse(args[0])
         ):
             comm_class = _SparseNCCLCommunicator
-        getattr(comm_class, function)(self, *args)
+        # The stream is the last argument of all the operations
+        with self._traced(function, args, args[-1]):
+            getattr(comm_class, function)(self, *args)
 
     def all_reduce(self, in_array, out_array, op='sum', stream=None):
         """Performs an all reduce operation.
@@ -147,10 +201,109 @@ class NCCLBackend(_Backend):
                 support `'sum'`. Defaults to `'sum'`.
             stream (cupy.cuda.Stream, optional): if supported, stream to
                 perform the communication.
+
+        .. note::
+            When summing sparse matrices that have the same sparsity
+            structure in all the ranks, only their values are reduced. The
+            structures are compared through small headers gathered from all
+            the ranks, which replace the exchange of the shapes and sizes.
         """
         self._dispatch_arg_type(
             'all_reduce', (in_array, out_array, op, stream))
 
+    def all_reduce_bucketed(
+            self, arrays, op='sum', bucket_size=None, stream=None):
+        """Performs an all reduce operation on many arrays asynchronously.
+
+        Reducing many small arrays one by one pays the launch latency of
+        NCCL for each of them. Instead, this method packs the arrays into
+        flat buffers of up to ``bucket_size`` bytes for each dtype, reduces
+        the buffers with a single group of NCCL calls, and writes the
+        results back into the arrays in place.
+
+        The operation is enqueued on ``stream`` after the work already
+        enqueued on the current stream, and this method returns without
+        waiting for it, so that the caller can run independent work in the
+        meantime. Call :meth:`wait` of the returned handle before using the
+        results on other streams. The arrays must not be modified until the
+        operation completes, and other collectives of this communicator
+        must be issued in the same order on all the ranks as usual.
+
+        Args:
+            arrays (list of cupy.ndarray): contiguous arrays to be reduced
+                in place.
+            op (str): reduction operation, can be one of
+                ('sum', 'prod', 'min' 'max'), arrays of complex type only
+                support `'sum'`. Defaults to `'sum'`.
+            bucket_size (int, optional): upper bound of the size in bytes of
+                a packed buffer. Arrays larger than this are reduced on their
+                own. Defaults to 25 MiB.
+            stream (cupy.cuda.Stream, optional): stream to perform the
+                communication. Defaults to a stream dedicated to this
+                communicator.
+
+        Returns:
+            A handle with ``wait(stream=None)``, ``synchronize()`` and
+            ``done()`` methods to wait for the completion.
+        """
+        if bucket_size is None:
+            bucket_size = _DEFAULT_BUCKET_SIZE
+        nccl_ops = []
+        for array in arrays:
+            self._check_contiguous(array)
+            nccl_ops.append(self._get_op(op, array.dtype.char))
+        if stream is None:
+            if self._async_stream is None:
+                self._async_stream = cupy.cuda.Stream(non_blocking=True)
+            stream = self._async_stream
+
+        prev_stream = cupy.cuda.stream.get_current_stream()
+        stream.wait_event(prev_stream.record())
+        with self._traced(
+                'all_reduce_bucketed', (arrays, op, bucket_size, stream),
+                stream):
+            event = self._all_reduce_bucketed(
+                arrays, nccl_ops, bucket_size, stream, prev_stream)
+        return _AllReduceHandle(event)
+
+    def _all_reduce_bucketed(
+            self, arrays, nccl_ops, bucket_size, stream, prev_stream):
+        buckets = _make_buckets(
+            [(a.dtype.char, a.nbytes) for a in arrays], bucket_size)
+        try:
+            stream.use()
+            # `ravel('K')` returns views of both C- and F-contiguous arrays
+            flats = []
+            for bucket in buckets:
+                if len(bucket) == 1:
+                    flats.append(arrays[bucket[0]].ravel('K'))
+                else:
+                    flats.append(cupy.concatenate(
+                        [arrays[i].ravel('K') for i in bucket]))
+
+            nccl.groupStart()
+            try:
+                for bucket, flat in zip(buckets, flats):
+                    dtype, count = _get_nccl_dtype_and_count(flat)
+                    self._comm.allReduce(
+                        flat.data.ptr, flat.data.ptr, count, dtype,
+                        nccl_ops[bucket[0]], stream.ptr)
+            finally:
+                nccl.groupEnd()
+
+            for bucket, flat in zip(buckets, flats):
+                if len(bucket) == 1:
+                    continue
+                offset = 0
+                for i in bucket:
+                    size = arrays[i].size
+                    arrays[i].ravel('K')[...] = flat[offset:offset + size]
+                    offset += size
+            event = stream.record()
+        finally:
+            prev_stream.use()
+        return event
+
     def reduce(self, in_array, out_array, root=0, op='sum', stream=None):
         """Performs a reduce operation.
 
@@ -299,11 +452,10 @@ class NCCLBackend(_Backend):
         mechanism that halts the thread progression.
         """
         # implements a barrier CPU side
-        # TODO allow multiple barriers to be executed
         if self._use_mpi:
             self._mpi_comm.Barrier()
         else:
-            self._store_proxy.barrier()
+            self._store_tree.barrier()
 
 
 class _DenseNCCLCommunicator:
@@ -483,6 +635,63 @@ def _get_sparse_type(matrix):
             'NCCL is not supported for this type of sparse matrix')
 
 
+# Alignment of the arrays packed in a single buffer to be transferred
+_PACK_ALIGNMENT = 16
+
+_SPARSE_TYPES = ('coo', 'csr', 'csc')
+
+
+def _packed_layout(sizes, dtypes):
+    # Returns the byte offsets of arrays of the given sizes and dtypes packed
+    # in a single buffer, and the size of the buffer. Both the sender and the
+    # receiver compute the layout from the exchanged sizes, so that the
+    # buffer does not need to carry a header.
+    offsets = []
+    total = 0
+    for size, dtype in zip(sizes, dtypes):
+        total = -(-total // _PACK_ALIGNMENT) * _PACK_ALIGNMENT
+        offsets.append(total)
+        total += int(size) * numpy.dtype(dtype).itemsize
+    return offsets, total
+
+
+def _pack_arrays(arrays):
+    offsets, total = _packed_layout(
+        [a.size for a in arrays], [a.dtype for a in arrays])
+    buf = cupy.empty(total, 'B')
+    for a, offset in zip(arrays, offsets):
+        buf[offset:offset + a.nbytes].view(a.dtype)[...] = a
+    return buf
+
+
+def _unpack_arrays(buf, sizes, dtypes):
+    # Returns views of the arrays packed in the buffer
+    offsets, _ = _packed_layout(sizes, dtypes)
+    return [
+        buf[offset:offset + int(size) * numpy.dtype(dtype).itemsize].view(
+            dtype)
+        for offset, size, dtype in zip(offsets, sizes, dtypes)]
+
+
+def _structure_header(sparse_type, shape, arrays):
+    # Returns an uint64 device array describing a sparse matrix: the format,
+    # the shape, the sizes of its arrays and two position-dependent checksums
+    # of each index array. Matrices with the same header are assumed to have
+    # the same sparsity structure.
+    head = [_SPARSE_TYPES.index(sparse_type), shape[0], shape[1]]
+    head += [a.size for a in arrays]
+    parts = [cupy.array(head, dtype='Q')]
+    for a in arrays[1:]:
+        a = a.astype('Q')
+        pos = cupy.arange(a.size, dtype='Q')
+        # Arithmetic wraps around on overflow
+        h1 = ((a + 1) * (pos * numpy.uint64(0x9E3779B97F4A7C15) + 1)).sum()
+        h2 = (((a * numpy.uint64(0xBF58476D1CE4E5B9)) ^ pos)
+              * numpy.uint64(0x94D049BB133111EB)).sum()
+        parts.append(cupy.stack([h1, h2]).astype('Q'))
+    return cupy.concatenate(parts)
+
+
 class _SparseNCCLCommunicator:
 
     @classmethod
@@ -578,6 +787,38 @@ class _SparseNCCLCommunicator:
             else:
                 raise RuntimeError('Unsupported method')
 
+    @classmethod
+    def _send_packed(cls, comm, arrays, peer, stream):
+        buf = _pack_arrays(arrays)
+        cls._send(comm, buf, peer, buf.dtype, buf.size, stream)
+
+    @classmethod
+    def _recv_packed(cls, comm, sizes, dtypes, peer, stream):
+        # Receives the arrays sent by `_send_packed` in a single transfer
+        _, nbytes = _packed_layout(sizes, dtypes)
+        buf = cupy.empty(nbytes, 'B')
+        cls._recv(comm, buf, peer, buf.dtype, buf.size, stream)
+        return _unpack_arrays(buf, sizes, dtypes)
+
+    @classmethod
+    def _all_gather_headers(cls, comm, matrix, arrays, stream):
+        # Returns the headers of the matrices of all the ranks, which give
+        # both whether their structures match and the shapes and sizes
+        # needed otherwise, with a single collective. The fingerprints are
+        # computed for every call, on the device.
+        header = _structure_header(
+            _get_sparse_type(matrix), matrix.shape, arrays)
+        if comm._use_mpi:
+            header = cupy.asnumpy(header)
+            headers = numpy.empty((comm._n_devices, header.size), 'Q')
+            comm._mpi_comm.Allgather(header, headers)
+        else:
+            headers = cupy.empty((comm._n_devices, header.size), 'Q')
+            _DenseNCCLCommunicator.all_gather(
+                comm, header, headers, header.size, stream)
+            headers = cupy.asnumpy(headers)
+        return headers
+
     def _assign_arrays(matrix, arrays, shape):
         if sparse.isspmatrix_coo(matrix):
             matrix.data = arrays[0]
@@ -595,10 +836,30 @@ class _SparseNCCLCommunicator:
 
     @classmethod
     def all_reduce(cls, comm, in_array, out_array, op='sum', stream=None):
+        arrays = cls._get_internal_arrays(in_array)
+        headers = cls._all_gather_headers(comm, in_array, arrays, stream)
+        if op == 'sum' and (headers == headers[0]).all():
+            # Only the values need to be reduced when all the matrices have
+            # the same structure, which is the usual case in iterative
+            # solvers.
+            if _get_sparse_type(in_array) != _get_sparse_type(out_array):
+                raise ValueError(
+                    'in_array and out_array must be the same format')
+            data = cupy.empty_like(arrays[0])
+            _DenseNCCLCommunicator.all_reduce(
+                comm, arrays[0], data, op, stream)
+            index_arrays = arrays[1:]
+            if out_array is not in_array:
+                index_arrays = [a.copy() for a in index_arrays]
+            cls._assign_arrays(
+                out_array, [data] + list(index_arrays), in_array.shape)
+            return
         # TODO(ecastill) find a way to better determine the root, maybe random?
         # super naive algorithm
         root = 0
-        cls.reduce(comm, in_array, out_array, root, op, stream)
+        # The shapes and sizes are already known from the headers
+        cls._reduce(comm, in_array, out_array, root, op, stream,
+                    headers[:, 1:6].astype('q'))
         cls.broadcast(comm, out_array, root, stream)
 
     @classmethod
@@ -608,6 +869,13 @@ class _SparseNCCLCommunicator:
         shape_and_sizes = cls._get_shape_and_sizes(arrays, in_array.shape)
         shape_and_sizes = cls._exchange_shape_and_sizes(
             comm, root, shape_and_sizes, 'gather', stream)
+        cls._reduce(
+            comm, in_array, out_array, root, op, stream, shape_and_sizes)
+
+    @classmethod
+    def _reduce(cls, comm, in_array, out_array, root, op, stream,
+                shape_and_sizes):
+        arrays = cls._get_internal_arrays(in_array)
         if comm.rank == root:
             if _get_sparse_type(in_array) != _get_sparse_type(out_array):
                 raise ValueError(
@@ -616,18 +884,14 @@ class _SparseNCCLCommunicator:
             partial = _make_sparse_empty(
                 in_array.dtype, _get_sparse_type(in_array))
             # each device will send and array with a different size
+            dtypes = [a.dtype for a in arrays]
             for peer, ss in enumerate(shape_and_sizes):
                 shape = tuple(ss[0:2])
                 sizes = ss[2:]
-                arrays = [
-                    cupy.empty(s, dtype=a.dtype) for s, a in zip(sizes, arrays)
-                ]
                 if peer != root:
-                    nccl.groupStart()
-                    for a in arrays:
-                        cls._recv(comm, a, peer, a.dtype, a.size, stream)
-                    nccl.groupEnd()
-                    cls._assign_arrays(partial, arrays, shape)
+                    recv_arrays = cls._recv_packed(
+                        comm, sizes, dtypes, peer, stream)
+                    cls._assign_arrays(partial, recv_arrays, shape)
                     if op == 'sum':
                         result = result + partial
                     elif op == 'prod':
@@ -641,11 +905,7 @@ class _SparseNCCLCommunicator:
             cls._assign_arrays(
                 out_array, cls._get_internal_arrays(result), result.shape)
         else:
-            nccl.groupStart()
-            for a in arrays:
-                cls._send(
-                    comm, a, root, a.dtype, a.size, stream)
-            nccl.groupEnd()
+            cls._send_packed(comm, arrays, root, stream)
 
     @classmethod
     def broadcast(cls, comm, in_out_array, root=0, stream=None):
@@ -660,16 +920,15 @@ class _SparseNCCLCommunicator:
             comm, root, shape_and_sizes, 'bcast', stream)
         shape = tuple(shape_and_sizes[0:2])
         sizes = shape_and_sizes[2:]
-        # Naive approach, we send each of the subarrays one by one
+        dtypes = [a.dtype for a in arrays]
+        # The arrays are packed in a single buffer to be broadcast at once
+        if comm.rank == root:
+            buf = _pack_arrays(arrays)
+        else:
+            buf = cupy.empty(_packed_layout(sizes, dtypes)[1], 'B')
+        _DenseNCCLCommunicator.broadcast(comm, buf, root, stream)
         if comm.rank != root:
-            arrays = [
-                cupy.empty(s, dtype=a.dtype) for s, a in zip(sizes, arrays)]
-        # TODO(ecastill): measure if its faster to just concatenate
-        # the arrays in a single one and send it
-        nccl.groupStart()
-        for a in arrays:
-            _DenseNCCLCommunicator.broadcast(comm, a, root, stream)
-        nccl.groupEnd()
+            arrays = _unpack_arrays(buf, sizes, dtypes)
         cls._assign_arrays(in_out_array, arrays, shape)
 
     @classmethod
@@ -715,11 +974,7 @@ class _SparseNCCLCommunicator:
         shape_and_sizes = cls._get_shape_and_sizes(arrays, array.shape)
         cls._exchange_shape_and_sizes(
             comm, peer, shape_and_sizes, 'send', stream)
-        # Naive approach, we send each of the subarrays one by one
-        nccl.groupStart()
-        for a in arrays:
-            cls._send(comm, a, peer, a.dtype, a.size, stream)
-        nccl.groupEnd()
+        cls._send_packed(comm, arrays, peer, stream)
 
     @classmethod
     def _send(cls, comm, array, peer, dtype, count, stream=None):
@@ -741,12 +996,8 @@ class _SparseNCCLCommunicator:
         arrays = cls._get_internal_arrays(out_array)
         shape = tuple(shape_and_sizes[0:2])
         sizes = shape_and_sizes[2:]
-        # TODO(use the out_array datatypes)
-        arrs = [cupy.empty(s, dtype=a.dtype) for s, a in zip(sizes, arrays)]
-        nccl.groupStart()
-        for a in arrs:
-            cls._recv(comm, a, peer, a.dtype, a.size, stream)
-        nccl.groupEnd()
+        arrs = cls._recv_packed(
+            comm, sizes, [a.dtype for a in arrays], peer, stream)
         # Create a sparse matrix from the received arrays
         cls._assign_arrays(out_array, arrs, shape)
 
@@ -824,14 +1075,15 @@ class _SparseNCCLCommunicator:
             sizes = recv_shape_and_sizes[i][2:]
             s_arrays = cls._get_internal_arrays(in_array[i])
             # TODO(use the out_array datatypes)
-            r_arrays = [
-                cupy.empty(s, dtype=a.dtype) for s, a in zip(sizes, s_arrays)]
+            dtypes = [a.dtype for a in s_arrays]
+            _, nbytes = _packed_layout(sizes, dtypes)
+            s_buf = _pack_arrays(s_arrays)
+            r_buf = cupy.empty(nbytes, 'B')
             nccl.groupStart()
-            for a in s_arrays:
-                cls._send(comm, a, i, a.dtype, a.size, stream)
-            for a in r_arrays:
-                cls._recv(comm, a, i, a.dtype, a.size, stream)
+            cls._send(comm, s_buf, i, s_buf.dtype, s_buf.size, stream)
+            cls._recv(comm, r_buf, i, r_buf.dtype, r_buf.size, stream)
             nccl.groupEnd()
+            r_arrays = _unpack_arrays(r_buf, sizes, dtypes)
             out_array.append(_make_sparse_empty(
                 in_array[i].dtype,
                 _get_sparse_type(in_array[i])))
@@ -0,0 +1,546 @@
+from __future__ import annotations
+
+import collections
+import selectors
+import socket
+import struct
+
+import numpy
+
+import cupy
+from cupyx.distributed import _store
+from cupyx.distributed._comm import _Backend
+
+
+_ops = {'sum': numpy.add,
+        'prod': numpy.multiply,
+        'max': numpy.maximum,
+        'min': numpy.minimum}
+
+# Size of the pieces in which `broadcast` pipelines the data along the ring
+_BROADCAST_CHUNK_BYTES = 1 << 20
+
+_RANK_FORMAT = '<q'
+
+
+def _segment_bounds(size, n):
+    # Splits `size` elements into `n` almost equal segments
+    return [size * k // n for k in range(n + 1)]
+
+
+def _bytes_view(array):
+    return memoryview(array.view(numpy.uint8))
+
+
+def _c_contiguous(array):
+    # Arrays split along the first dimension must be in the C order
+    if array.flags.c_contiguous:
+        return array
+    return array.copy(order='C')
+
+
+def _recv_exactly_into(sock, view):
+    while view.nbytes:
+        received = sock.recv_into(view)
+        if received == 0:
+            raise ConnectionResetError('The peer closed the connection')
+        view = view[received:]
+
+
+class SocketBackend(_Backend):
+    """Interface that uses TCP sockets to perform communications on the host.
+
+    The data is exchanged between the processes over TCP connections, and
+    the reductions are computed with NumPy. It is intended for developing and
+    testing distributed programs on machines without GPUs or NCCL, and for
+    communicating data that resides in host memory. Both
+    :class:`numpy.ndarray` and :class:`cupy.ndarray` are accepted; device
+    arrays are copied to the host and back around the communication.
+
+    The collectives use ring algorithms, so every process only talks to its
+    neighbors and moves about twice the size of the data for an all reduce
+    regardless of the number of processes. Every operation blocks until the
+    data of the calling process has been transferred.
+
+    Args:
+        n_devices (int): Total number of processes that will be used in
+            the distributed execution.
+        rank (int): Unique id of the process that the communicator is
+            associated to, its value needs to be `0 <= rank < n_devices`.
+        host (str, optional): host address for the process rendezvous on
+            initialization. Defaults to `"127.0.0.1"`.
+        port (int, optional): port used for the process rendezvous on
+            initialization. Defaults to `13333`.
+        use_mpi (bool, optional): ignored, only accepted for compatibility
+            with :class:`NCCLBackend`.
+    """
+
+    _device_timing = False
+
+    def __init__(self, n_devices=2, rank=0,
+                 host=_store._DEFAULT_HOST, port=_store._DEFAULT_PORT,
+                 use_mpi=False):
+        super().__init__(n_devices, rank, host, port)
+        if rank == 0:
+            self._store.run(host, port)
+        self._init_store_tree()
+        # rank -> socket connected to the process of that rank
+        self._peers = {}
+        self._listener = None
+        self._connect_peers()
+
+    def _connect_peers(self):
+        # Every process listens on an ephemeral port published through the
+        # store, connects to the processes of lower ranks and accepts the
+        # connections of the higher ones.
+        host = self._store_proxy._connect().getsockname()[0]
+        self._listener = socket.create_server((host, 0))
+        port = self._listener.getsockname()[1]
+        self._store_proxy[f'socket/addr/{self.rank}'] = (
+            f'{host}:{port}'.encode())
+
+        lower = list(range(self.rank))
+        addrs = self._store_proxy.multi_get(
+            [f'socket/addr/{r}' for r in lower], wait=True) if lower else []
+        for peer, addr in zip(lower, addrs):
+            peer_host, peer_port = addr.decode().rsplit(':', 1)
+            sock = socket.create_connection((peer_host, int(peer_port)))
+            sock.sendall(struct.pack(_RANK_FORMAT, self.rank))
+            self._peers[peer] = sock
+        for _ in range(self.rank + 1, self._n_devices):
+            sock, _ = self._listener.accept()
+            buf = bytearray(struct.calcsize(_RANK_FORMAT))
+            _recv_exactly_into(sock, memoryview(buf))
+            peer, = struct.unpack(_RANK_FORMAT, buf)
+            self._peers[peer] = sock
+        for sock in self._peers.values():
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setblocking(False)
+
+    def stop(self):
+        for sock in self._peers.values():
+            sock.close()
+        self._peers = {}
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        super().stop()
+
+    def _check_array(self, array):
+        if not isinstance(array, (numpy.ndarray, cupy.ndarray)):
+            raise TypeError(
+                f'Unsupported type {type(array)} for the socket backend')
+        if not array.flags.c_contiguous and not array.flags.f_contiguous:
+            raise RuntimeError(
+                'The socket backend requires arrays to be either c- or '
+                'f-contiguous')
+
+    def _get_op(self, op, dtype):
+        if op not in _ops:
+            raise RuntimeError(f'Unknown op {op} for the socket backend')
+        if dtype in 'FD' and op != 'sum':
+            raise ValueError(
+                'Only sum is supported for complex arrays')
+        return _ops[op]
+
+    def _to_host(self, array, stream):
+        # Returns a flat host array with the contents of `array`, which is a
+        # view for NumPy arrays
+        self._check_array(array)
+        flat = array.ravel('K')
+        if isinstance(flat, cupy.ndarray):
+            return flat.get(stream=stream)
+        return flat
+
+    def _host_buffer(self, array, order='K'):
+        # Returns a flat host array whose contents are written to `array` by
+        # `_from_host`, in the memory order of `array` or in the C order if
+        # `order` is 'C'. It is a view if `array` is a NumPy array in that
+        # order.
+        self._check_array(array)
+        if isinstance(array, numpy.ndarray) and (
+                order == 'K' or array.flags.c_contiguous):
+            return array.ravel('K')
+        return numpy.empty(array.size, array.dtype)
+
+    def _from_host(self, array, flat, stream, order='K'):
+        if order == 'C' and not array.flags.c_contiguous:
+            # `array` is F-contiguous
+            flat = flat.reshape(array.shape).ravel('F')
+            if isinstance(array, numpy.ndarray):
+                array.ravel('K')[...] = flat
+        if isinstance(array, cupy.ndarray):
+            array.ravel('K').set(flat, stream=stream)
+
+    def _exchange(self, sends=(), recvs=()):
+        # Sends and receives the given (peer, flat host array) pairs at the
+        # same time, so that processes exchanging data with each other do
+        # not block on full socket buffers. Messages from and to the same
+        # peer are transferred in order.
+        out = collections.defaultdict(collections.deque)
+        inc = collections.defaultdict(collections.deque)
+        local_sends = []
+        local_recvs = []
+        for peer, array in sends:
+            if peer == self.rank:
+                local_sends.append(array)
+            elif array.nbytes:
+                out[self._peers[peer]].append(_bytes_view(array))
+        for peer, array in recvs:
+            if peer == self.rank:
+                local_recvs.append(array)
+            elif array.nbytes:
+                inc[self._peers[peer]].append(_bytes_view(array))
+        if len(local_sends) != len(local_recvs):
+            raise RuntimeError('Unmatched communication with the same rank')
+        for src, dst in zip(local_sends, local_recvs):
+            dst[...] = src
+
+        with selectors.DefaultSelector() as sel:
+            pending = {}
+            for sock in set(out) | set(inc):
+                events = ((selectors.EVENT_WRITE if out[sock] else 0)
+                          | (selectors.EVENT_READ if inc[sock] else 0))
+                sel.register(sock, events)
+                pending[sock] = events
+            while pending:
+                for key, mask in sel.select():
+                    sock = key.fileobj
+                    try:
+                        if mask & selectors.EVENT_WRITE:
+                            view = out[sock][0]
+                            view = view[sock.send(view):]
+                            if view.nbytes:
+                                out[sock][0] = view
+                            else:
+                                out[sock].popleft()
+                        if mask & selectors.EVENT_READ:
+                            view = inc[sock][0]
+                            received = sock.recv_into(view)
+                            if received == 0:
+                                raise ConnectionResetError(
+                                    'The peer closed the connection')
+                            view = view[received:]
+                            if view.nbytes:
+                                inc[sock][0] = view
+                            else:
+                                inc[sock].popleft()
+                    except BlockingIOError:
+                        pass
+                    events = ((selectors.EVENT_WRITE if out[sock] else 0)
+                              | (selectors.EVENT_READ if inc[sock] else 0))
+                    if events == 0:
+                        sel.unregister(sock)
+                        del pending[sock]
+                    elif events != pending[sock]:
+                        sel.modify(sock, events)
+                        pending[sock] = events
+
+    def _ring_reduce_scatter(self, data, bounds, op):
+        # Reduces `data` of all the ranks so that each rank `r` holds the
+        # result of the segment `bounds[r]:bounds[r + 1]`. In each of the
+        # n - 1 steps, every rank sends a segment to its right neighbor and
+        # reduces the one received from its left neighbor.
+        n = self._n_devices
+        r = self.rank
+        right = (r + 1) % n
+        left = (r - 1) % n
+        tmp = numpy.empty(max(
+            [bounds[k + 1] - bounds[k] for k in range(n)]), data.dtype)
+        for s in range(n - 1):
+            k_send = (r - s - 1) % n
+            k_recv = (r - s - 2) % n
+            recv_seg = data[bounds[k_recv]:bounds[k_recv + 1]]
+            recv_buf = tmp[:recv_seg.size]
+            self._exchange(
+                [(right, data[bounds[k_send]:bounds[k_send + 1]])],
+                [(left, recv_buf)])
+            op(recv_seg, recv_buf, out=recv_seg)
+
+    def _ring_all_gather(self, data, bounds):
+        # Passes the segments around the ring so that every rank holds all
+        # of them, starting with the segment `bounds[r]:bounds[r + 1]` held
+        # by each rank `r`.
+        n = self._n_devices
+        r = self.rank
+        right = (r + 1) % n
+        left = (r - 1) % n
+        for s in range(n - 1):
+            k_send = (r - s) % n
+            k_recv = (r - s - 1) % n
+            self._exchange(
+                [(right, data[bounds[k_send]:bounds[k_send + 1]])],
+                [(left, data[bounds[k_recv]:bounds[k_recv + 1]])])
+
+    def all_reduce(self, in_array, out_array, op='sum', stream=None):
+        """Performs an all reduce operation.
+
+        Args:
+            in_array (numpy.ndarray or cupy.ndarray): array to be sent.
+            out_array (numpy.ndarray or cupy.ndarray): array where the result
+                with be stored.
+            op (str): reduction operation, can be one of
+                ('sum', 'prod', 'min' 'max'), arrays of complex type only
+                support `'sum'`. Defaults to `'sum'`.
+            stream (cupy.cuda.Stream, optional): stream used to copy device
+                arrays.
+        """
+        with self._traced('all_reduce', (in_array, out_array, op, stream)):
+            op = self._get_op(op, in_array.dtype.char)
+            data = self._host_buffer(out_array)
+            data[...] = self._to_host(in_array, stream)
+            bounds = _segment_bounds(data.size, self._n_devices)
+            self._ring_reduce_scatter(data, bounds, op)
+            self._ring_all_gather(data, bounds)
+            self._from_host(out_array, data, stream)
+
+    def reduce(self, in_array, out_array, root=0, op='sum', stream=None):
+        """Performs a reduce operation.
+
+        Args:
+            in_array (numpy.ndarray or cupy.ndarray): array to be sent.
+            out_array (numpy.ndarray or cupy.ndarray): array where the result
+                with be stored, only used in the rank ``root``.
+            root (int): rank of the process that will perform the reduction.
+            op (str): reduction operation, can be one of
+                ('sum', 'prod', 'min' 'max'), arrays of complex type only
+                support `'sum'`. Defaults to `'sum'`.
+            stream (cupy.cuda.Stream, optional): stream used to copy device
+                arrays.
+        """
+        with self._traced('reduce', (in_array, out_array, root, op, stream)):
+            op = self._get_op(op, in_array.dtype.char)
+            # Each rank reduces a segment in the ring, which is then gathered
+            data = numpy.array(self._to_host(in_array, stream))
+            bounds = _segment_bounds(data.size, self._n_devices)
+            self._ring_reduce_scatter(data, bounds, op)
+            if self.rank == root:
+                self._exchange(recvs=[
+                    (peer, data[bounds[peer]:bounds[peer + 1]])
+                    for peer in range(self._n_devices) if peer != root])
+                out = self._host_buffer(out_array)
+                out[...] = data
+                self._from_host(out_array, out, stream)
+            else:
+                self._exchange(sends=[
+                    (root, data[bounds[self.rank]:bounds[self.rank + 1]])])
+
+    def broadcast(self, in_out_array, root=0, stream=None):
+        """Performs a broadcast operation.
+
+        Args:
+            in_out_array (numpy.ndarray or cupy.ndarray): array to be sent
+                for the rank ``root``, and where the data is received for the
+                other ranks.
+            root (int): rank of the process that will send the broadcast.
+            stream (cupy.cuda.Stream, optional): stream used to copy device
+                arrays.
+        """
+        with self._traced('broadcast', (in_out_array, root, stream)):
+            n = self._n_devices
+            if self.rank == root:
+                data = self._to_host(in_out_array, stream)
+            else:
+                data = self._host_buffer(in_out_array)
+            # The data is split into pieces that are passed along the ring
+            # starting at the root, so that all the links are used at once.
+            right = (self.rank + 1) % n
+            left = (self.rank - 1) % n
+            step = max(_BROADCAST_CHUNK_BYTES // max(data.itemsize, 1), 1)
+            pieces = [data[i:i + step] for i in range(0, data.size, step)]
+            sends = right != root and n > 1
+            recvs = self.rank != root
+            for i in range(len(pieces) + 1):
+                self._exchange(
+                    [(right, pieces[i - 1])] if sends and i > 0 else [],
+                    [(left, pieces[i])] if recvs and i < len(pieces) else [])
+            if self.rank != root:
+                self._from_host(in_out_array, data, stream)
+
+    def reduce_scatter(
+            self, in_array, out_array, count, op='sum', stream=None):
+        """Performs a reduce scatter operation.
+
+        Args:
+            in_array (numpy.ndarray or cupy.ndarray): array to be sent.
+            out_array (numpy.ndarray or cupy.ndarray): array where the result
+                with be stored.
+            count (int): Number of elements to send to each rank.
+            op (str): reduction operation, can be one of
+                ('sum', 'prod', 'min' 'max'), arrays of complex type only
+                support `'sum'`. Defaults to `'sum'`.
+            stream (cupy.cuda.Stream, optional): stream used to copy device
+                arrays.
+        """
+        with self._traced(
+                'reduce_scatter', (in_array, out_array, count, op, stream)):
+            op = self._get_op(op, in_array.dtype.char)
+            data = numpy.array(
+                self._to_host(in_array, stream)[:count * self._n_devices])
+            bounds = [count * k for k in range(self._n_devices + 1)]
+            self._ring_reduce_scatter(data, bounds, op)
+            out = self._host_buffer(out_array)
+            out[:count] = data[bounds[self.rank]:bounds[self.rank + 1]]
+            self._from_host(out_array, out, stream)
+
+    def all_gather(self, in_array, out_array, count, stream=None):
+        """Performs an all gather operation.
+
+        Args:
+            in_array (numpy.ndarray or cupy.ndarray): array to be sent.
+            out_array (numpy.ndarray or cupy.ndarray): array where the result
+                with be stored.
+            count (int): Number of elements to send to each rank.
+            stream (cupy.cuda.Stream, optional): stream used to copy device
+                arrays.
+        """
+        with self._traced('all_gather', (in_array, out_array, count, stream)):
+            data = self._host_buffer(out_array)
+            bounds = [count * k for k in range(self._n_devices + 1)]
+            data[bounds[self.rank]:bounds[self.rank + 1]] = self._to_host(
+                in_array, stream)[:count]
+            self._ring_all_gather(data, bounds)
+            self._from_host(out_array, data, stream)
+
+    def send(self, array, peer, stream=None):
+        """Performs a send operation.
+
+        Args:
+            array (numpy.ndarray or cupy.ndarray): array to be sent.
+            peer (int): rank of the process `array` will be sent to.
+            stream (cupy.cuda.Stream, optional): stream used to copy device
+                arrays.
+        """
+        with self._traced('send', (array, peer, stream)):
+            self._exchange(sends=[(peer, self._to_host(array, stream))])
+
+    def recv(self, out_array, peer, stream=None):
+        """Performs a receive operation.
+
+        Args:
+            out_array (numpy.ndarray or cupy.ndarray): array used to receive
+                the data.
+            peer (int): rank of the process `array` will be received from.
+            stream (cupy.cuda.Stream, optional): stream used to copy device
+                arrays.
+        """
+        with self._traced('recv', (out_array, peer, stream)):
+            data = self._host_buffer(out_array)
+            self._exchange(recvs=[(peer, data)])
+            self._from_host(out_array, data, stream)
+
+    def send_recv(self, in_array, out_array, peer, stream=None):
+        """Performs a send and receive operation.
+
+        Args:
+            in_array (numpy.ndarray or cupy.ndarray): array to be sent.
+            out_array (numpy.ndarray or cupy.ndarray): array used to receive
+                data.
+            peer (int): rank of the process to send `in_array` and receive
+                `out_array`.
+            stream (cupy.cuda.Stream, optional): stream used to copy device
+                arrays.
+        """
+        with self._traced('send_recv', (in_array, out_array, peer, stream)):
+            data = self._host_buffer(out_array)
+            self._exchange(
+                [(peer, self._to_host(in_array, stream))], [(peer, data)])
+            self._from_host(out_array, data, stream)
+
+    def scatter(self, in_array, out_array, root=0, stream=None):
+        """Performs a scatter operation.
+
+        Args:
+            in_array (numpy.ndarray or cupy.ndarray): array to be sent. Its
+                shape must be `(total_ranks, ...)`.
+            out_array (numpy.ndarray or cupy.ndarray): array where the result
+                with be stored.
+            root (int): rank that will send the `in_array` to other ranks.
+            stream (cupy.cuda.Stream, optional): stream used to copy device
+                arrays.
+        """
+        with self._traced('scatter', (in_array, out_array, root, stream)):
+            data = self._host_buffer(out_array, 'C')
+            sends = []
+            if self.rank == root:
+                if in_array.shape[0] != self._n_devices:
+                    raise RuntimeError(
+                        f'scatter requires in_array to have {self._n_devices}'
+                        f'elements in its first dimension, found '
+                        f'{in_array.shape}')
+                src = numpy.split(
+                    self._to_host(_c_contiguous(in_array), stream),
+                    self._n_devices)
+                sends = list(enumerate(src))
+            self._exchange(sends, [(root, data)])
+            self._from_host(out_array, data, stream, 'C')
+
+    def gather(self, in_array, out_array, root=0, stream=None):
+        """Performs a gather operation.
+
+        Args:
+            in_array (numpy.ndarray or cupy.ndarray): array to be sent.
+            out_array (numpy.ndarray or cupy.ndarray): array where the result
+                with be stored. Its shape must be `(total_ranks, ...)`.
+            root (int): rank that will receive `in_array` from other ranks.
+            stream (cupy.cuda.Stream, optional): stream used to copy device
+                arrays.
+        """
+        with self._traced('gather', (in_array, out_array, root, stream)):
+            recvs = []
+            if self.rank == root:
+                if out_array.shape[0] != self._n_devices:
+                    raise RuntimeError(
+                        f'gather requires out_array to have {self._n_devices}'
+                        f'elements in its first dimension, found '
+                        f'{out_array.shape}')
+                data = self._host_buffer(out_array, 'C')
+                recvs = list(enumerate(numpy.split(data, self._n_devices)))
+            self._exchange(
+                [(root, self._to_host(_c_contiguous(in_array), stream))],
+                recvs)
+            if self.rank == root:
+                self._from_host(out_array, data, stream, 'C')
+
+    def all_to_all(self, in_array, out_array, stream=None):
+        """Performs an all to all operation.
+
+        Args:
+            in_array (numpy.ndarray or cupy.ndarray): array to be sent. Its
+                shape must be `(total_ranks, ...)`.
+            out_array (numpy.ndarray or cupy.ndarray): array where the result
+                with be stored. Its shape must be `(total_ranks, ...)`.
+            stream (cupy.cuda.Stream, optional): stream used to copy device
+                arrays.
+        """
+        with self._traced('all_to_all', (in_array, out_array, stream)):
+            n = self._n_devices
+            if in_array.shape[0] != n:
+                raise RuntimeError(
+                    f'all_to_all requires in_array to have {n}'
+                    f'elements in its first dimension, found '
+                    f'{in_array.shape}')
+            if out_array.shape[0] != n:
+                raise RuntimeError(
+                    f'all_to_all requires out_array to have {n}'
+                    f'elements in its first dimension, found '
+                    f'{out_array.shape}')
+            src = numpy.split(
+                self._to_host(_c_contiguous(in_array), stream), n)
+            data = self._host_buffer(out_array, 'C')
+            dst = numpy.split(data, n)
+            # In step s, each rank sends to the rank s after it and receives
+            # from the rank s before it, so that every pair is exchanged once
+            for s in range(n):
+                self._exchange(
+                    [((self.rank + s) % n, src[(self.rank + s) % n])],
+                    [((self.rank - s) % n, dst[(self.rank - s) % n])])
+            self._from_host(out_array, data, stream, 'C')
+
+    def barrier(self):
+        """Performs a barrier operation.
+
+        The barrier is done in the cpu and is a explicit synchronization
+        mechanism that halts the thread progression.
+        """
+        self._store_tree.barrier()
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import atexit
+import collections
 from ctypes import sizeof
 import multiprocessing
-import threading
+import os
+import selectors
 import socket
+import threading
 import time
 
 from cupyx.distributed import _klv_utils
@@ -14,6 +17,8 @@ from cupyx.distributed import _store_actions
 _DEFAULT_HOST = '127.0.0.1'
 _DEFAULT_PORT = 13333
 
+_RECV_SIZE = 1 << 20
+
 _exit_mode = False
 
 
@@ -44,17 +49,50 @@ class ExceptionAwareProcess(multiprocessing.Process):
                 raise exception
 
 
+class _Connection:
+    # State of a client connection in the store server.
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.events = selectors.EVENT_READ
+        self.closed = False
+        self.in_buf = bytearray()
+        self.out_buf = bytearray()
+        self.out_pos = 0
+        # Replies in the order of the requests; either results or
+        # `Deferred` objects that have not been completed yet.
+        self.replies = collections.deque()
+
+    def flush_replies(self):
+        while self.replies:
+            r = self.replies[0]
+            if isinstance(r, _store_actions.Deferred):
+                if not r.done():
+                    break
+                r = r.result
+            self.replies.popleft()
+            self.out_buf += r.klv()
+
+
+def _is_done(r):
+    return not isinstance(r, _store_actions.Deferred) or r.done()
+
+
 class TCPStore:
-    # This is only used for initialization of nccl so we don't care
-    # too much about performance
+    # This is only used for initialization of nccl. The server handles all
+    # the clients in a single thread with an event loop, each client keeping
+    # a connection open over which requests can be pipelined.
     def __init__(self, world_size):
         self.storage = {}
         self._process = None
         self._world_size = world_size
         self._run = multiprocessing.Value('b', 1)
         # For implementing a barrier
-        self._lock = threading.Lock()
-        self._current_barrier = None
+        self._barrier_waiters = []
+        # key -> list of (missing keys, Deferred) of the pending waits
+        self._key_waiters = {}
+        # Connections that have replies to be sent
+        self._dirty = set()
 
     def __del__(self):
         if not _exit_mode:
@@ -63,37 +101,126 @@ class TCPStore:
     def _set_process(self, process):
         self._process = process
 
-    def _process_request(self, c_socket):
-        with c_socket:
-            # Receive in KLV format
-            action_bytes = c_socket.recv(sizeof(_klv_utils.action_t))
-            if len(action_bytes) > 0:
-                action_m = _klv_utils.action_t.from_buffer_copy(action_bytes)
-                if action_m.length > 256:
-                    raise ValueError('Invalid length for message')
-                value = bytearray(action_m.value)[:action_m.length]
-                r = _store_actions.execute_action(action_m.action, value, self)
-                if r is not None:
-                    c_socket.sendall(r.klv())
-
-    def _server_loop(self, host, port):
-        # This is for minimum info exchange during initialization
-        # a single connection allows to implement locking mechanics easily
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+    def _process_requests(self, conn):
+        # Executes the requests completely received so far, in KLV format.
+        # Requests of a connection are executed in order; the ones after a
+        # deferred action wait for it to be completed.
+        header_size = sizeof(_klv_utils.action_t)
+        buf = conn.in_buf
+        pos = 0
+        while len(buf) - pos >= header_size:
+            if conn.replies and not _is_done(conn.replies[-1]):
+                break
+            action_m = _klv_utils.action_t.from_buffer_copy(buf, pos)
+            if action_m.length < 0:
+                raise ValueError('Invalid length for message')
+            end = pos + header_size + action_m.length
+            if len(buf) < end:
+                break
+            value = buf[pos + header_size:end]
+            r = _store_actions.execute_action(action_m.action, value, self)
+            if isinstance(r, _store_actions.Deferred):
+                r.add_done_callback(lambda: self._dirty.add(conn))
+            else:
+                self._dirty.add(conn)
+            conn.replies.append(r)
+            pos = end
+        del buf[:pos]
+
+    def _accept(self, sel, s):
+        try:
+            c_socket, addr = s.accept()
+        except BlockingIOError:
+            return
+        c_socket.setblocking(False)
+        c_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = _Connection(c_socket)
+        sel.register(c_socket, conn.events, conn)
+
+    def _read(self, conn):
+        try:
+            data = conn.sock.recv(_RECV_SIZE)
+        except BlockingIOError:
+            return True
+        if not data:
+            return False
+        conn.in_buf += data
+        self._process_requests(conn)
+        return True
+
+    def _write(self, sel, conn):
+        conn.flush_replies()
+        if conn.out_pos < len(conn.out_buf):
+            try:
+                conn.out_pos += conn.sock.send(
+                    memoryview(conn.out_buf)[conn.out_pos:])
+            except BlockingIOError:
+                pass
+        if conn.out_pos == len(conn.out_buf):
+            conn.out_buf = bytearray()
+            conn.out_pos = 0
+            events = selectors.EVENT_READ
+        else:
+            # Wait until the client consumes the pending data
+            events = selectors.EVENT_READ | selectors.EVENT_WRITE
+        if events != conn.events:
+            conn.events = events
+            sel.modify(conn.sock, events, conn)
+
+    def _close(self, sel, conn):
+        conn.closed = True
+        sel.unregister(conn.sock)
+        conn.sock.close()
+
+    def _listen(self, host, port):
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
             s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             s.bind((host, port))
-            s.listen()
-            s.settimeout(0.5)
-            while self._run.value == 1:
-                try:
-                    c_socket, addr = s.accept()
-                except TimeoutError:
-                    continue
-
-                t = threading.Thread(
-                    target=self._process_request,
-                    args=(c_socket,), daemon=True)
-                t.start()
+            s.listen(socket.SOMAXCONN)
+            s.setblocking(False)
+        except Exception:
+            s.close()
+            raise
+        return s
+
+    def _server_loop(self, host, port, s=None):
+        sel = selectors.DefaultSelector()
+        if s is None:
+            s = self._listen(host, port)
+        with s:
+            sel.register(s, selectors.EVENT_READ)
+            try:
+                while self._run.value == 1:
+                    for key, mask in sel.select(timeout=0.5):
+                        if key.data is None:
+                            self._accept(sel, s)
+                            continue
+                        conn = key.data
+                        if mask & selectors.EVENT_WRITE:
+                            self._dirty.add(conn)
+                        if mask & selectors.EVENT_READ:
+                            try:
+                                alive = self._read(conn)
+                            except (OSError, ValueError):
+                                alive = False
+                            if not alive:
+                                self._close(sel, conn)
+                    dirty, self._dirty = self._dirty, set()
+                    for conn in dirty:
+                        if conn.closed:
+                            continue
+                        try:
+                            # Resume the requests held by a deferred action
+                            self._process_requests(conn)
+                            self._write(sel, conn)
+                        except (OSError, ValueError):
+                            self._close(sel, conn)
+            finally:
+                for key in list(sel.get_map().values()):
+                    if key.data is not None:
+                        key.fileobj.close()
+                sel.close()
 
     def run(self, host=_DEFAULT_HOST, port=_DEFAULT_PORT):
         # Run the TCP store in a different process
@@ -102,6 +229,17 @@ class TCPStore:
         p.start()
         self._process = p
 
+    def run_in_thread(self, host=_DEFAULT_HOST, port=0):
+        # Run the TCP store in a daemon thread of this process, and return
+        # the port it listens on (an ephemeral port if `port` is 0)
+        s = self._listen(host, port)
+        port = s.getsockname()[1]
+        t = threading.Thread(
+            target=self._server_loop, args=(host, port, s), daemon=True)
+        t.start()
+        self._process = t
+        return port
+
     def stop(self):
         if _exit_mode:
             return  # Prevent shutdown errors
@@ -112,6 +250,18 @@ class TCPStore:
                 self._process.join()
 
 
+def _recv_exactly(sock, n):
+    buf = bytearray(n)
+    view = memoryview(buf)
+    pos = 0
+    while pos < n:
+        received = sock.recv_into(view[pos:])
+        if received == 0:
+            raise ConnectionResetError('TCPStore closed the connection')
+        pos += received
+    return buf
+
+
 class TCPStoreProxy:
 
     MAX_NUM_RETRIES = 50
@@ -120,29 +270,72 @@ class TCPStoreProxy:
     def __init__(self, host=_DEFAULT_HOST, port=_DEFAULT_PORT):
         self.host = host
         self.port = port
+        # A connection is kept open and reused for all the requests
+        self._socket = None
+        self._pid = None
+        self._lock = threading.Lock()
 
-    def _send_recv(self, action):
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def _connect(self):
+        if self._socket is not None and self._pid == os.getpid():
+            return self._socket
+        # Do not share the connection with the parent process after fork
+        self._socket = None
         # Retry several times in case the rank 0 has not established the
         # main store yet
-        for i in range(TCPStoreProxy.MAX_NUM_RETRIES):
+        delay = 0.01
+        deadline = time.monotonic() + (
+            TCPStoreProxy.MAX_NUM_RETRIES * TCPStoreProxy.DELAY_FOR_RETRY)
+        while True:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             try:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    # TODO retry connects
-                    s.connect((self.host, self.port))
-                    s.sendall(action.klv())
-                    result_bytes = s.recv(sizeof(
-                        _klv_utils.result_action_t))
-                    if len(result_bytes) > 0:
-                        result = _klv_utils.result_action_t.from_buffer_copy(
-                            result_bytes)
-                        value = bytearray(result.value)[:result.length]
-                        if result.status == 0:
-                            return action.decode_result(value)
-                        else:
-                            raise RuntimeError(value.decode('utf-8'))
+                s.connect((self.host, self.port))
             except ConnectionRefusedError:
-                time.sleep(TCPStoreProxy.DELAY_FOR_RETRY)
-        raise RuntimeError('TCPStore is not available')
+                s.close()
+                if time.monotonic() > deadline:
+                    raise RuntimeError('TCPStore is not available')
+                time.sleep(delay)
+                delay = min(delay * 2, TCPStoreProxy.DELAY_FOR_RETRY)
+                continue
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._socket = s
+            self._pid = os.getpid()
+            return s
+
+    def _send_recv(self, action):
+        return self._send_recv_many([action])[0]
+
+    def _send_recv_many(self, actions):
+        # All the requests are sent at once, and the replies are received
+        # in the same order.
+        header_size = sizeof(_klv_utils.result_action_t)
+        results = []
+        with self._lock:
+            s = self._connect()
+            try:
+                s.sendall(b''.join([action.klv() for action in actions]))
+                for _ in actions:
+                    result = _klv_utils.result_action_t.from_buffer_copy(
+                        _recv_exactly(s, header_size))
+                    results.append(
+                        (result.status, _recv_exactly(s, result.length)))
+            except OSError as e:
+                # The replies cannot be matched with the requests anymore
+                self.close()
+                raise RuntimeError('Lost the connection to TCPStore') from e
+        values = []
+        for action, (status, value) in zip(actions, results):
+            if status != 0:
+                raise RuntimeError(value.decode('utf-8'))
+            values.append(action.decode_result(value))
+        return values
 
     def __getitem__(self, key):
         return self._send_recv(_store_actions.Get(key))
@@ -150,6 +343,38 @@ class TCPStoreProxy:
     def __setitem__(self, key, value):
         self._send_recv(_store_actions.Set(key, value))
 
+    def multi_get(self, keys, wait=False, delete=False):
+        # Gets the values of several keys in a single round trip. If `wait`
+        # is True, blocks until all the keys are set instead of failing. If
+        # `delete` is True, the keys are also removed from the store.
+        keys = list(keys)
+        actions = [_store_actions.Get(k) for k in keys]
+        if wait:
+            actions.insert(0, _store_actions.Wait(keys))
+        if delete:
+            actions.append(_store_actions.Delete(keys))
+        values = self._send_recv_many(actions)
+        return values[int(wait):int(wait) + len(keys)]
+
+    def multi_set(self, items):
+        # Sets several key-value pairs in a single round trip
+        if isinstance(items, dict):
+            items = items.items()
+        self._send_recv_many(
+            [_store_actions.Set(k, v) for k, v in items])
+
+    def multi_del(self, keys):
+        # Removes several keys in a single round trip
+        self._send_recv(_store_actions.Delete(keys))
+
+    def wait(self, keys, delete=False):
+        # Blocks until all the keys are set. If `delete` is True, the keys
+        # are then removed from the store in the same round trip.
+        actions = [_store_actions.Wait(keys)]
+        if delete:
+            actions.append(_store_actions.Delete(keys))
+        self._send_recv_many(actions)
+
     def barrier(self):
         # Barrier has special semantics
         self._send_recv(_store_actions.Barrier())
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import enum
-import threading
 
 from cupyx.distributed import _klv_utils
 
@@ -10,6 +9,8 @@ class Actions(enum.IntEnum):
     Set = 1
     Get = 2
     Barrier = 3
+    Wait = 4
+    Delete = 5
 
 
 class ActionError:
@@ -18,7 +19,7 @@ class ActionError:
 
     def klv(self):
         e = self._exception
-        return _klv_utils.get_result_action_t(1, str(e).encode('ascii'))
+        return _klv_utils.get_result_action_t(1, str(e).encode('utf-8'))
 
     @staticmethod
     def from_klv(klv):
@@ -28,6 +29,31 @@ class ActionError:
         ActionError.from_klv(data)
 
 
+class Deferred:
+    # Result of an action that is completed later on by the actions of
+    # other clients. The store server holds the reply to the client until
+    # `set_result` is called.
+
+    def __init__(self):
+        self.result = None
+        self._callbacks = []
+
+    def done(self):
+        return self.result is not None
+
+    def add_done_callback(self, callback):
+        if self.done():
+            callback()
+        else:
+            self._callbacks.append(callback)
+
+    def set_result(self, result):
+        self.result = result
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+
 def execute_action(action, value, store):
     # receive the remaining amount of bytes that L field specifies
     try:
@@ -37,6 +63,10 @@ def execute_action(action, value, store):
             action_obj = Get.from_klv(value)
         elif action == Actions.Barrier:
             action_obj = Barrier.from_klv(value)
+        elif action == Actions.Wait:
+            action_obj = Wait.from_klv(value)
+        elif action == Actions.Delete:
+            action_obj = Delete.from_klv(value)
         else:
             raise ValueError(f'unknown action {action}')
         return action_obj(store)
@@ -87,6 +117,11 @@ class Set:
 
     def __call__(self, store):
         store.storage[self.key] = self.value
+        # Notify the clients waiting for the key
+        for missing, deferred in store._key_waiters.pop(self.key, ()):
+            missing.discard(self.key)
+            if not missing:
+                deferred.set_result(Wait.WaitResult())
         return Set.SetResult()
 
     def decode_result(self, data):
@@ -130,21 +165,6 @@ class Get:
         return Get.GetResult.from_klv(data)
 
 
-class _BarrierImpl:
-    def __init__(self, world_size):
-        self._world_size = world_size
-        self._cvar = threading.Condition()
-
-    def __call__(self):
-        # Superlame implementation, should be improved
-        with self._cvar:
-            self._world_size -= 1
-            if self._world_size == 0:
-                self._cvar.notifyAll()
-            elif self._world_size > 0:
-                self._cvar.wait()
-
-
 class Barrier:
     class BarrierResult:
         def klv(self):
@@ -166,14 +186,100 @@ class Barrier:
         return Barrier()
 
     def __call__(self, store):
-        with store._lock:
-            if store._current_barrier is None:
-                store._current_barrier = _BarrierImpl(store._world_size)
-        store._current_barrier()
-        # Once the barrier has been completed, just clean it
-        with store._lock:
-            store._current_barrier = None
-        return Barrier.BarrierResult()
+        # The reply is held until all the ranks have arrived, so that the
+        # clients block on the barrier without polling the store.
+        deferred = Deferred()
+        store._barrier_waiters.append(deferred)
+        if len(store._barrier_waiters) == store._world_size:
+            # Once the barrier has been completed, just clean it
+            waiters, store._barrier_waiters = store._barrier_waiters, []
+            for waiter in waiters:
+                waiter.set_result(Barrier.BarrierResult())
+        return deferred
 
     def decode_result(self, data):
         return Barrier.BarrierResult.from_klv(data)
+
+
+class Wait:
+    class WaitResult:
+        def klv(self):
+            v = bytearray(bytes(True))
+            action = _klv_utils.get_result_action_t(0, v)
+            return bytes(action)
+
+        @staticmethod
+        def from_klv(klv):
+            return True
+
+    def __init__(self, keys):
+        self.keys = list(keys)
+        for key in self.keys:
+            if not isinstance(key, str):
+                raise ValueError('Invalid type for key, only str allowed')
+
+    @staticmethod
+    def from_klv(value):
+        value = bytes(value)
+        if len(value) == 0:
+            return Wait([])
+        return Wait(value.decode('utf-8').split('\x00'))
+
+    def klv(self):
+        v = bytearray(b'\x00'.join([k.encode('ascii') for k in self.keys]))
+        action = _klv_utils.get_action_t(Actions.Wait, v)
+        return bytes(action)
+
+    def __call__(self, store):
+        # The reply is held until all the keys are set, so that the client
+        # is notified without polling the store.
+        missing = set([k for k in self.keys if k not in store.storage])
+        if not missing:
+            return Wait.WaitResult()
+        deferred = Deferred()
+        for key in missing:
+            store._key_waiters.setdefault(key, []).append(
+                (missing, deferred))
+        return deferred
+
+    def decode_result(self, data):
+        return Wait.WaitResult.from_klv(data)
+
+
+class Delete:
+    class DeleteResult:
+        def klv(self):
+            v = bytearray(bytes(True))
+            action = _klv_utils.get_result_action_t(0, v)
+            return bytes(action)
+
+        @staticmethod
+        def from_klv(klv):
+            return True
+
+    def __init__(self, keys):
+        self.keys = list(keys)
+        for key in self.keys:
+            if not isinstance(key, str):
+                raise ValueError('Invalid type for key, only str allowed')
+
+    @staticmethod
+    def from_klv(value):
+        value = bytes(value)
+        if len(value) == 0:
+            return Delete([])
+        return Delete(value.decode('utf-8').split('\x00'))
+
+    def klv(self):
+        v = bytearray(b'\x00'.join([k.encode('ascii') for k in self.keys]))
+        action = _klv_utils.get_action_t(Actions.Delete, v)
+        return bytes(action)
+
+    def __call__(self, store):
+        # Keys that are not set are ignored
+        for key in self.keys:
+            store.storage.pop(key, None)
+        return Delete.DeleteResult()
+
+    def decode_result(self, data):
+        return Delete.DeleteResult.from_klv(data)
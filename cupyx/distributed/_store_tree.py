@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from cupyx.distributed import _store
+
+
+_ALGORITHMS = ('dissemination', 'tree')
+
+
+class StoreTree:
+    # Barrier and broadcast that fan out through the ranks, instead of
+    # making every rank contact the store of rank 0.
+    #
+    # Every rank serves a small TCPStore in a thread of its own process,
+    # whose address is published through the main store. Ranks then signal
+    # each other by setting keys in the stores of their peers, and block on
+    # their own store until the expected keys are set (no polling). The main
+    # store is only used to look up the addresses of the peers, once.
+    #
+    # Every key set in the store of a rank is read only by that rank, which
+    # deletes it in the same round trip, so that the stores do not grow with
+    # the number of operations.
+
+    def __init__(self, store_proxy, rank, world_size, *, fanout=2,
+                 host=None, prefix='tree'):
+        if not (0 <= rank < world_size):
+            raise ValueError(f'Invalid rank {rank} for {world_size} ranks')
+        if fanout < 1:
+            raise ValueError(f'Invalid fanout {fanout}')
+        self.rank = rank
+        self.world_size = world_size
+        self.fanout = fanout
+        self._proxy = store_proxy
+        self._prefix = prefix
+        if host is None:
+            # Use the address through which this process reaches the main
+            # store, which is also reachable from the other ranks.
+            host = store_proxy._connect().getsockname()[0]
+        self._store = _store.TCPStore(1)
+        port = self._store.run_in_thread(host, 0)
+        self._local = _store.TCPStoreProxy(host, port)
+        self._peers = {}
+        # Keys of every operation are unique as all the ranks call the
+        # collectives in the same order.
+        self._n_barriers = 0
+        self._n_broadcasts = 0
+        store_proxy[f'{prefix}/addr/{rank}'] = f'{host}:{port}'.encode()
+
+    def close(self):
+        for proxy in self._peers.values():
+            proxy.close()
+        self._peers = {}
+        self._local.close()
+        self._store.stop()
+
+    def _peer(self, rank):
+        # Returns a proxy to the store of the given rank
+        proxy = self._peers.get(rank)
+        if proxy is None:
+            addr, = self._proxy.multi_get(
+                [f'{self._prefix}/addr/{rank}'], wait=True)
+            host, port = addr.decode().rsplit(':', 1)
+            proxy = _store.TCPStoreProxy(host, int(port))
+            self._peers[rank] = proxy
+        return proxy
+
+    def _children(self, root):
+        # Children of this rank in the `fanout`-ary tree rooted at `root`
+        n = self.world_size
+        v = (self.rank - root) % n
+        first = v * self.fanout + 1
+        last = min(first + self.fanout, n)
+        return [(c + root) % n for c in range(first, last)]
+
+    def _parent(self, root):
+        n = self.world_size
+        v = (self.rank - root) % n
+        return ((v - 1) // self.fanout + root) % n
+
+    def barrier(self, algorithm='dissemination'):
+        # Blocks until all the ranks have called the barrier.
+        #
+        # `dissemination` takes ceil(log2(world_size)) rounds in which every
+        # rank signals one peer, so that no rank handles more than one
+        # message per round. `tree` gathers the arrivals to rank 0 and
+        # releases the ranks through a `fanout`-ary tree.
+        if algorithm not in _ALGORITHMS:
+            raise ValueError(f'Unknown barrier algorithm {algorithm}')
+        gen = self._n_barriers
+        self._n_barriers += 1
+        if algorithm == 'dissemination':
+            self._dissemination_barrier(f'barrier/{gen}')
+        else:
+            self._tree_barrier(f'barrier/{gen}')
+
+    def _dissemination_barrier(self, name):
+        n = self.world_size
+        distance = 1
+        step = 0
+        while distance < n:
+            key = f'{name}/{step}'
+            self._peer((self.rank + distance) % n)[key] = 1
+            self._local.wait([key], delete=True)
+            distance *= 2
+            step += 1
+
+    def _tree_barrier(self, name):
+        children = self._children(0)
+        self._local.wait(
+            [f'{name}/arrive/{c}' for c in children], delete=True)
+        if self.rank != 0:
+            self._peer(self._parent(0))[f'{name}/arrive/{self.rank}'] = 1
+            self._local.wait([f'{name}/release'], delete=True)
+        for c in children:
+            self._peer(c)[f'{name}/release'] = 1
+
+    def broadcast(self, key, value=None, root=0):
+        # Broadcasts the value (int or bytes) of `key` given by the rank
+        # `root` to all the ranks through a `fanout`-ary tree, and returns
+        # it. The value is ignored in the other ranks.
+        if not (0 <= root < self.world_size):
+            raise ValueError(f'Invalid root {root}')
+        name = f'bcast/{self._n_broadcasts}/{key}'
+        self._n_broadcasts += 1
+        if self.rank != root:
+            value, = self._local.multi_get([name], wait=True, delete=True)
+        elif value is None:
+            raise ValueError('The root rank must give a value')
+        for c in self._children(root):
+            self._peer(c)[name] = value
+        return value
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import statistics
+import time
+
+import cupy
+
+
+# Ratio of the bus bandwidth to the algorithm bandwidth of the collectives,
+# i.e., the fraction of the data that goes through the slowest link with the
+# optimal algorithms, as reported by nccl-tests.
+_BUS_FACTORS = {
+    'all_reduce': lambda n: 2 * (n - 1) / n,
+    'all_reduce_bucketed': lambda n: 2 * (n - 1) / n,
+    'reduce_scatter': lambda n: (n - 1) / n,
+    'all_gather': lambda n: (n - 1) / n,
+    'all_to_all': lambda n: (n - 1) / n,
+}
+
+# Operations in which all the ranks take part, used to align the traces
+_COLLECTIVES = (
+    'all_reduce', 'all_reduce_bucketed', 'reduce', 'broadcast',
+    'reduce_scatter', 'all_gather', 'scatter', 'gather', 'all_to_all')
+
+
+def _nbytes(x):
+    if x is None:
+        return 0
+    if isinstance(x, (list, tuple)):
+        return sum([_nbytes(y) for y in x])
+    if hasattr(x, 'nbytes'):
+        return int(x.nbytes)
+    # Sparse matrices
+    return sum([int(a.nbytes) for a in (
+        getattr(x, name, None) for name in (
+            'data', 'indices', 'indptr', 'row', 'col')) if a is not None])
+
+
+def _describe(function, args, n_ranks):
+    # Returns the number of bytes and the peers of a call of the backend
+    # methods, following the conventions of nccl-tests for the sizes.
+    if function in ('all_reduce', 'reduce', 'broadcast', 'reduce_scatter',
+                    'send', 'send_recv', 'all_to_all',
+                    'all_reduce_bucketed'):
+        nbytes = _nbytes(args[0])
+    elif function in ('all_gather', 'gather', 'recv'):
+        nbytes = _nbytes(args[1] if function != 'recv' else args[0])
+    elif function == 'scatter':
+        nbytes = _nbytes(args[1]) * n_ranks
+    else:
+        nbytes = 0
+    if function in ('reduce', 'scatter', 'gather'):
+        peers = [args[2]]
+    elif function == 'broadcast':
+        peers = [args[1]]
+    elif function in ('send', 'recv', 'send_recv'):
+        peers = [args[-2]]
+    else:
+        peers = list(range(n_ranks))
+    return nbytes, peers
+
+
+class _Record:
+
+    def __init__(self, op, nbytes, peers, stream, seq):
+        self.op = op
+        self.nbytes = nbytes
+        self.peers = peers
+        self.stream = stream
+        self.seq = seq
+        self.host_start = None
+        self.host_end = None
+        self.start_event = None
+        self.end_event = None
+
+
+class CollectiveTracer:
+    """Records the communications called on a communicator.
+
+    Tracers are created by :meth:`NCCLBackend.start_tracing` and
+    :meth:`SocketBackend.start_tracing`. For every call, the operation, the
+    number of bytes, the peers and the stream are recorded together with
+    its start and end times. When ``device_timing`` is ``True``, the times
+    are measured with CUDA events recorded on the stream of the operation,
+    so that they cover the execution on the device instead of the enqueue on
+    the host.
+
+    The algorithm bandwidth is the number of bytes divided by the time, and
+    the bus bandwidth scales it by the fraction of the data that each rank
+    sends in the optimal algorithm (e.g., ``2 * (n - 1) / n`` for all
+    reduce), as reported by nccl-tests, so that it can be compared with the
+    bandwidth of the links.
+
+    Args:
+        rank (int): rank of the communicator.
+        n_ranks (int): number of ranks of the communicator.
+        device_timing (bool): measure the times with CUDA events.
+
+    .. seealso:: :func:`cupyx.distributed.merge_traces`
+    """
+
+    def __init__(self, rank, n_ranks, *, device_timing=True):
+        self.rank = rank
+        self.n_ranks = n_ranks
+        self.device_timing = device_timing
+        self._records = []
+        self._counts = {}
+        # Host clock of the start of the trace, shared by all the records
+        self._wall_origin = time.time()
+        self._host_origin = time.perf_counter()
+        self._ref_event = None
+        if device_timing:
+            self._ref_event = cupy.cuda.Event()
+            self._ref_event.record(cupy.cuda.Stream.null)
+            self._ref_event.synchronize()
+            self._host_origin = time.perf_counter()
+            self._wall_origin = time.time()
+
+    @contextlib.contextmanager
+    def _trace(self, op, nbytes, peers, stream=None):
+        seq = self._counts.get(op, 0)
+        self._counts[op] = seq + 1
+        if stream is None and self.device_timing:
+            stream = cupy.cuda.get_current_stream()
+        record = _Record(
+            op, nbytes, peers, 0 if stream is None else stream.ptr, seq)
+        if self.device_timing:
+            record.start_event = stream.record()
+        record.host_start = time.perf_counter()
+        yield record
+        record.host_end = time.perf_counter()
+        if self.device_timing:
+            record.end_event = stream.record()
+        self._records.append(record)
+
+    def _times(self, record):
+        # Returns the start and end times of a record in seconds from the
+        # start of the trace
+        if self.device_timing:
+            record.end_event.synchronize()
+            return (
+                cupy.cuda.get_elapsed_time(
+                    self._ref_event, record.start_event) / 1e3,
+                cupy.cuda.get_elapsed_time(
+                    self._ref_event, record.end_event) / 1e3)
+        return (record.host_start - self._host_origin,
+                record.host_end - self._host_origin)
+
+    def records(self):
+        """Returns the recorded calls.
+
+        It waits for the completion of the operations if ``device_timing`` is
+        ``True``.
+
+        Returns:
+            list of dict: One entry per call with the keys ``op``,
+            ``bytes``, ``peers``, ``stream``, ``seq`` (index of the call
+            among the ones of the same operation), ``start`` and ``end`` (in
+            seconds since the tracer was created), ``algbw`` and ``busbw``
+            (in bytes per second).
+        """
+        result = []
+        for r in self._records:
+            start, end = self._times(r)
+            elapsed = end - start
+            algbw = r.nbytes / elapsed if elapsed > 0 else 0.0
+            factor = _BUS_FACTORS.get(r.op, lambda n: 1.0)(self.n_ranks)
+            result.append({
+                'op': r.op, 'bytes': r.nbytes, 'peers': r.peers,
+                'stream': r.stream, 'seq': r.seq,
+                'start': start, 'end': end,
+                'algbw': algbw, 'busbw': algbw * factor,
+            })
+        return result
+
+    def summary(self):
+        """Returns statistics of the recorded calls for each operation.
+
+        Returns:
+            dict: Maps the name of each operation to a dict with the keys
+            ``calls``, ``bytes``, ``time`` (total seconds), ``algbw`` and
+            ``busbw`` (bytes per second over all the calls).
+        """
+        result = {}
+        for r in self.records():
+            s = result.setdefault(
+                r['op'], {'calls': 0, 'bytes': 0, 'time': 0.0})
+            s['calls'] += 1
+            s['bytes'] += r['bytes']
+            s['time'] += r['end'] - r['start']
+        for op, s in result.items():
+            factor = _BUS_FACTORS.get(op, lambda n: 1.0)(self.n_ranks)
+            s['algbw'] = s['bytes'] / s['time'] if s['time'] > 0 else 0.0
+            s['busbw'] = s['algbw'] * factor
+        return result
+
+    def to_chrome_trace(self):
+        """Returns the trace in the Chrome trace event format.
+
+        Each call is a complete event whose process is the rank and whose
+        thread is the stream. The timestamps are in microseconds of the
+        wall clock of this host.
+
+        Returns:
+            dict: The trace, which can be dumped as JSON and opened with
+            ``chrome://tracing`` or Perfetto, or merged with the traces of
+            the other ranks by :func:`cupyx.distributed.merge_traces`.
+        """
+        origin = self._wall_origin * 1e6
+        events = [{
+            'name': 'process_name', 'ph': 'M', 'pid': self.rank,
+            'args': {'name': f'rank {self.rank}'}}]
+        for r in self.records():
+            events.append({
+                'name': r['op'], 'cat': 'collective', 'ph': 'X',
+                'pid': self.rank, 'tid': r['stream'],
+                'ts': origin + r['start'] * 1e6,
+                'dur': (r['end'] - r['start']) * 1e6,
+                'args': {
+                    'bytes': r['bytes'], 'peers': r['peers'],
+                    'seq': r['seq'], 'algbw_GBps': r['algbw'] / 1e9,
+                    'busbw_GBps': r['busbw'] / 1e9},
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms',
+                'metadata': {'rank': self.rank, 'n_ranks': self.n_ranks}}
+
+    def save(self, path):
+        """Writes the trace given by :meth:`to_chrome_trace` to a file."""
+        with open(path, 'w') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+def merge_traces(traces, path=None):
+    """Merges the traces of the ranks into a single timeline.
+
+    The clocks of the hosts are not synchronized precisely enough to compare
+    the traces of the ranks directly. As all the ranks leave a collective
+    at about the same time, the traces are aligned by shifting each of them
+    by the median difference of the end times of the collectives with those
+    of the first trace. The rank that starts a collective the last is the
+    straggler that the others wait for; it is recorded in the arguments of
+    the events of the collective together with the delay, and the number of
+    collectives each rank delayed is reported in the metadata in the order
+    of ``ranks``.
+
+    Args:
+        traces (list): Traces given by
+            :meth:`CollectiveTracer.to_chrome_trace`, or paths of the files
+            written by :meth:`CollectiveTracer.save`.
+        path (str, optional): Path of the file to write the merged trace.
+
+    Returns:
+        dict: The merged trace in the Chrome trace event format.
+    """
+    loaded = []
+    for t in traces:
+        if isinstance(t, str):
+            with open(t) as f:
+                t = json.load(f)
+        loaded.append(t)
+    if not loaded:
+        raise ValueError('No trace to merge')
+
+    # (op, seq) -> event, for the collectives of each trace
+    keyed = []
+    for t in loaded:
+        keyed.append({
+            (e['name'], e['args']['seq']): e for e in t['traceEvents']
+            if e['ph'] == 'X' and e['name'] in _COLLECTIVES})
+
+    ref = keyed[0]
+    offsets = []
+    for events in keyed:
+        diffs = [ref[k]['ts'] + ref[k]['dur'] - e['ts'] - e['dur']
+                 for k, e in events.items() if k in ref]
+        offsets.append(statistics.median(diffs) if diffs else 0.0)
+
+    merged = []
+    for t, offset in zip(loaded, offsets):
+        for e in t['traceEvents']:
+            e = dict(e)
+            if 'ts' in e:
+                e['ts'] = e['ts'] + offset
+            merged.append(e)
+
+    # Find the straggler of each collective called by all the ranks
+    ranks = [t['metadata']['rank'] for t in loaded]
+    stragglers = [0] * len(loaded)
+    groups = {}
+    for e in merged:
+        if e['ph'] == 'X' and e['name'] in _COLLECTIVES:
+            groups.setdefault((e['name'], e['args']['seq']), []).append(e)
+    for events in groups.values():
+        if len(events) != len(loaded):
+            continue
+        last = max(events, key=lambda e: e['ts'])
+        delay = last['ts'] - min([e['ts'] for e in events])
+        for e in events:
+            e['args'] = dict(e['args'], straggler=last['pid'],
+                             straggler_delay_us=delay)
+        stragglers[ranks.index(last['pid'])] += 1
+
+    result = {
+        'traceEvents': merged, 'displayTimeUnit': 'ms',
+        'metadata': {
+            'ranks': ranks,
+            'offsets_us': offsets,
+            'stragglers': stragglers,
+        }}
+    if path is not None:
+        with open(path, 'w') as f:
+            json.dump(result, f)
+    return result
@@ -26,6 +26,7 @@ from cupyx.distributed.array import _index_arith
 from cupyx.distributed.array import _modes
 from cupyx.distributed.array import _reduction
 from cupyx.distributed.array import _linalg
+from cupyx.distributed.array import _transfer_plan
 
 
 class _MultiDeviceDummyMemory(cupy.cuda.memory.Memory):
@@ -319,12 +320,48 @@ class DistributedArray(ndarray):
         """
         return self._to_op_mode(mode)
 
+    def _plan_reshard(
+        self, new_index_map: dict[int, list[tuple[slice, ...]]],
+    ) -> _transfer_plan._TransferPlan:
+        # In the replica mode, each element is taken from only one of the
+        # chunks holding it, preferring ones on the same device, then ones
+        # reachable with peer access, balancing the load of the links
+        return _transfer_plan._plan_transfers(
+            self.shape, self.itemsize, self.index_map, new_index_map,
+            replica=self._mode is _modes.REPLICA,
+            can_access_peer=_data_transfer._can_access_peer)
+
+    def reshard_nbytes(self, index_map: dict[int, Any]) -> int:
+        """Return the number of bytes :meth:`reshard` moves across devices.
+
+        The data movement is planned in the same way as :meth:`reshard`
+        without executing it, so this can be used to estimate the cost of
+        resharding beforehand.
+
+        Args:
+            index_map (dict from int to array indices): Indices for the chunks
+                that devices with designated IDs own.
+        """
+        new_index_map = _index_arith._normalize_index_map(
+            self.shape, index_map)
+        if new_index_map == self.index_map:
+            return 0
+        return self._plan_reshard(new_index_map).nbytes
+
     def reshard(self, index_map: dict[int, Any]) -> DistributedArray:
         """Return a view or a copy having the given index_map.
 
         Data transfers across devices are done on separate streams created
-        internally. To make them asynchronous, transferred data is buffered and
-        reflected to the chunks when necessary.
+        internally. The whole data movement is planned beforehand, and the
+        transfers between each pair of devices are batched into grouped
+        communication calls while bounding the size of staging buffers. The
+        transfers are asynchronous with respect to the current streams, so
+        independent work can overlap with them.
+
+        In the replica mode, data held by multiple chunks are transferred
+        only once, from a chunk on the same device if any.
+        :meth:`reshard_nbytes` tells the amount of the data transferred
+        across devices.
 
         Args:
             index_map (dict from int to array indices): Indices for the chunks
@@ -354,24 +391,19 @@ class DistributedArray(ndarray):
 
         self._prepare_comms_and_streams(index_map.keys())
 
-        # Data transfer from old chunks to new chunks
-        # TODO: Reorder transfers to minimize latency
-
-        # The current implementation transfers the same data multiple times
-        # where chunks overlap. This is particularly problematic when matrix
-        # multiplication is involved, where one block tends to be shared
-        # between multiple devices
-        # TODO: Avoid duplicate data transfers
-        for src_chunk in chain.from_iterable(old_chunks_map.values()):
-            src_chunk.flush(self._mode)
-
+        src_chunks_map: dict[int, list[_Chunk]] = {}
+        for dev, chunks in old_chunks_map.items():
+            for chunk in chunks:
+                chunk.flush(self._mode)
             if self._mode is not _modes.REPLICA:
-                src_chunk = src_chunk.copy()
-
-            for dst_chunk in chain.from_iterable(new_chunks_map.values()):
-                src_chunk.apply_to(
-                    dst_chunk, self._mode, self.shape,
-                    self._comms, self._streams)
+                # Sources are overwritten while transferring
+                chunks = [chunk.copy() for chunk in chunks]
+            src_chunks_map[dev] = chunks
+
+        plan = self._plan_reshard(new_index_map)
+        _chunk._execute_transfer_plan(
+            plan, self._mode, src_chunks_map, new_chunks_map,
+            self._comms, self._streams)
 
         return DistributedArray(
             self.shape, self.dtype, new_chunks_map, self._mode, self._comms)
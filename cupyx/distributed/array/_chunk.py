@@ -9,6 +9,7 @@ import numpy
 
 from cupy._core.core import ndarray
 import cupy._creation.basic as _creation_basic
+import cupy._creation.from_data as _creation_from_data
 import cupy._manipulation.dims as _manipulation_dims
 from cupy.cuda.device import Device
 from cupy.cuda.stream import Event
@@ -19,6 +20,7 @@ from cupyx.distributed.array import _modes
 from cupyx.distributed.array import _index_arith
 from cupyx.distributed.array import _data_transfer
 from cupyx.distributed.array._data_transfer import _Communicator
+from cupyx.distributed.array import _transfer_plan
 
 
 class _ArrayPlaceholder:
@@ -133,6 +135,23 @@ class _Chunk:
             self.prevent_gc = (self.prevent_gc, self.updates)
             self.updates = []
 
+    def _apply_on_stream(
+        self, stream: Stream, data: ndarray, idx: tuple[slice, ...],
+        mode: _modes.Mode,
+    ) -> None:
+        # Apply data to self.array[idx] right away on the given stream,
+        # which must be the current stream of the device.
+        if isinstance(self.array, _ArrayPlaceholder):
+            self.array = self.array.to_ndarray(mode, data.dtype)
+        else:
+            stream.wait_event(self.ready)
+
+        if mode is _modes.REPLICA:
+            self.array[idx] = data
+        else:
+            self.array[idx] = mode.func(self.array[idx], data)
+        stream.record(self.ready)
+
     def apply_to(
         self, target: _Chunk, mode: _modes.Mode,
         shape: tuple[int, ...],
@@ -205,13 +224,164 @@ class _Chunk:
             stream.record(self.ready)
 
 
+# Chunks smaller than this are all-reduced with a tree, which takes fewer
+# steps, and larger ones with a ring, which moves less data per device
+_TREE_ALL_REDUCE_MAX_BYTES = 1 << 18
+
+
+_nccl_op_names = {
+    _modes.SUM: 'sum',
+    _modes.PROD: 'prod',
+    _modes.MAX: 'max',
+    _modes.MIN: 'min',
+}
+
+
+def _group_identical_chunks(
+    chunks_list: list[_Chunk], shape: tuple[int, ...],
+) -> list[list[_Chunk]] | None:
+    # Group the chunks having the same index, as happens after reducing an
+    # array along a distributed axis. Returns None unless each group spans
+    # distinct devices and chunks of different groups are disjoint.
+    groups: dict[tuple[slice, ...], list[_Chunk]] = {}
+    for chunk in chunks_list:
+        if isinstance(chunk.array, _ArrayPlaceholder):
+            return None
+        groups.setdefault(chunk.index, []).append(chunk)
+
+    group_list = list(groups.values())
+    for i, group in enumerate(group_list):
+        devices = {chunk.array.device.id for chunk in group}
+        if len(devices) != len(group):
+            return None
+        for other in group_list[i + 1:]:
+            if _index_arith._index_intersection(
+                    group[0].index, other[0].index, shape) is not None:
+                return None
+    return group_list
+
+
+def _all_reduce_groups(
+    op_mode: _modes._OpMode, groups: list[list[_Chunk]],
+    comms: dict[int, _Communicator], streams: dict[int, Stream],
+    algorithm: str | None = None,
+) -> None:
+    # Reduce the chunks of each group, which share the same index, and
+    # overwrite all of them with the result. The algorithm is chosen for
+    # each group among:
+    #   'nccl': ncclAllReduce, when the group spans all the communicators
+    #   'tree': binomial tree, for small chunks
+    #   'ring': reduce-scatter and all-gather in a ring, for large chunks
+    # The steps of all the groups are executed together so that each step
+    # is a single NCCL group call.
+    group_bufs = []
+    group_steps = []
+    nccl_bufs = []
+    for group in groups:
+        bufs = []
+        for chunk in group:
+            assert isinstance(chunk.array, ndarray)
+            dev = chunk.array.device.id
+            with _data_transfer._on_stream(dev, streams[dev]) as stream:
+                stream.wait_event(chunk.ready)
+                # A view when the chunk is contiguous
+                bufs.append(_creation_from_data.ascontiguousarray(
+                    chunk.array).reshape(-1))
+        group_bufs.append(bufs)
+
+        dtype = bufs[0].dtype
+        nbytes = bufs[0].nbytes
+        devs = [buf.device.id for buf in bufs]
+        alg = algorithm
+        if alg is None:
+            if _data_transfer._can_all_reduce(
+                    comms, devs, dtype, _nccl_op_names[op_mode]):
+                alg = 'nccl'
+            elif nbytes <= _TREE_ALL_REDUCE_MAX_BYTES:
+                alg = 'tree'
+            else:
+                alg = 'ring'
+
+        if alg == 'nccl':
+            nccl_bufs.extend(bufs)
+            group_steps.append([])
+        elif alg == 'ring':
+            group_steps.append(_transfer_plan._ring_all_reduce_steps(
+                len(bufs), bufs[0].size))
+        elif alg == 'tree':
+            group_steps.append(_transfer_plan._tree_all_reduce_steps(
+                len(bufs), bufs[0].size))
+        else:
+            raise ValueError(f'Unknown all-reduce algorithm: {alg}')
+
+    if nccl_bufs:
+        _data_transfer._all_reduce_group(
+            comms, streams, nccl_bufs, _nccl_op_names[op_mode])
+
+    n_steps = max([len(steps) for steps in group_steps], default=0)
+    for i in range(n_steps):
+        sends = []
+        staged = []
+        for bufs, steps in zip(group_bufs, group_steps):
+            if i >= len(steps):
+                continue
+            for t in steps[i]:
+                src_buf = bufs[t.src]
+                src_dev = src_buf.device.id
+                with Device(src_dev):
+                    ready = streams[src_dev].record()
+                sends.append((t, src_buf, bufs[t.dst]))
+                staged.append(_data_transfer._AsyncData(
+                    src_buf[t.start:t.stop], ready))
+
+        received = _data_transfer._transfer_group(
+            comms, streams, staged,
+            [dst_buf.device.id for _, _, dst_buf in sends])
+
+        for (t, src_buf, dst_buf), update in zip(sends, received):
+            dst_dev = dst_buf.device.id
+            with _data_transfer._on_stream(
+                    dst_dev, streams[dst_dev]) as stream:
+                stream.wait_event(update.ready)
+                segment = dst_buf[t.start:t.stop]
+                if t.reduce:
+                    op_mode.func(segment, update.array, out=segment)
+                else:
+                    segment[...] = update.array
+                done = stream.record()
+            # The sent segment must not be overwritten before it is received
+            with Device(src_buf.device.id):
+                streams[src_buf.device.id].wait_event(done)
+
+    for group, bufs in zip(groups, group_bufs):
+        for chunk, buf in zip(group, bufs):
+            assert isinstance(chunk.array, ndarray)
+            dev = buf.device.id
+            with _data_transfer._on_stream(dev, streams[dev]) as stream:
+                if buf.data.ptr != chunk.array.data.ptr:
+                    chunk.array[...] = buf.reshape(chunk.array.shape)
+                stream.record(chunk.ready)
+            chunk.prevent_gc = (chunk.prevent_gc, buf)
+
+
 def _all_reduce_intersections(
     op_mode: _modes._OpMode, shape: tuple[int, ...],
     chunk_map: dict[int, list[_Chunk]],
     comms: dict[int, _Communicator], streams: dict[int, Stream],
+    algorithm: str | None = None,
 ) -> None:
     chunks_list = list(chain.from_iterable(chunk_map.values()))
 
+    for chunk in chunks_list:
+        chunk.flush(op_mode)
+    groups = _group_identical_chunks(chunks_list, shape)
+    if groups is not None:
+        _all_reduce_groups(op_mode, groups, comms, streams, algorithm)
+        return
+
+    # Chunks overlap partially. Each chunk applies to all the later ones and
+    # then the last one is broadcast back, which takes as many steps as
+    # the chunks.
     for i in range(len(chunks_list)):
         src_chunk = chunks_list[i]
         src_chunk.flush(op_mode)
@@ -229,3 +399,62 @@ def _all_reduce_intersections(
             dst_chunk = chunks_list[i]
             src_chunk.apply_to(
                 dst_chunk, _modes.REPLICA, shape, comms, streams)
+
+
+def _execute_transfer_plan(
+    plan: _transfer_plan._TransferPlan, mode: _modes.Mode,
+    src_chunks_map: dict[int, list[_Chunk]],
+    dst_chunks_map: dict[int, list[_Chunk]],
+    comms: dict[int, _Communicator], streams: dict[int, Stream],
+) -> None:
+    # Move data from the source chunks to the destination chunks along the
+    # plan. All the work is enqueued on `streams` and ordered by events, so
+    # the current streams can run independent work in the meantime.
+    # Source chunks must not have updates.
+
+    # In non-idempotent modes, each element of the sources must be applied
+    # only once, so it is replaced with the identity once sent.
+    consume = mode is not _modes.REPLICA and not mode.idempotent
+
+    def take(t: _transfer_plan._Transfer, stream: Stream) -> ndarray:
+        src_chunk = src_chunks_map[t.src_dev][t.src[1]]
+        assert isinstance(src_chunk.array, ndarray)
+        stream.wait_event(src_chunk.ready)
+        data = src_chunk.array[t.src_idx]
+        if consume:
+            data = data.copy()
+            src_chunk.array[t.src_idx] = mode.identity_of(data.dtype)
+            stream.record(src_chunk.ready)
+        return data
+
+    for t in plan.local:
+        dst_chunk = dst_chunks_map[t.dst_dev][t.dst[1]]
+        with _data_transfer._on_stream(
+                t.dst_dev, streams[t.dst_dev]) as stream:
+            dst_chunk._apply_on_stream(
+                stream, take(t, stream), t.dst_idx, mode)
+
+    for batch in plan.batches:
+        staged = []
+        for t in batch:
+            with _data_transfer._on_stream(
+                    t.src_dev, streams[t.src_dev]) as stream:
+                data = _creation_from_data.ascontiguousarray(take(t, stream))
+                staged.append(_data_transfer._AsyncData(data, stream.record()))
+
+        received = _data_transfer._transfer_group(
+            comms, streams, staged, [t.dst_dev for t in batch])
+
+        for t, update in zip(batch, received):
+            dst_chunk = dst_chunks_map[t.dst_dev][t.dst[1]]
+            with _data_transfer._on_stream(
+                    t.dst_dev, streams[t.dst_dev]) as stream:
+                stream.wait_event(update.ready)
+                dst_chunk._apply_on_stream(
+                    stream, update.array, t.dst_idx, mode)
+                done = stream.record()
+            # The staging buffers are released after this iteration, so
+            # that the memory is reused by the next batches. Their memory
+            # must not be reused on the source device before it is consumed.
+            with Device(t.src_dev):
+                streams[t.src_dev].wait_event(done)
@@ -2,12 +2,16 @@ from __future__ import annotations
 
 import contextlib
 import dataclasses
+import functools
 from typing import Any
 from collections.abc import Iterable, Iterator
 
+import numpy
+
 from cupy._core.core import ndarray
 import cupy._creation.from_data as _creation_from_data
 import cupy._creation.basic as _creation_basic
+from cupy.cuda import runtime
 from cupy.cuda.device import Device
 from cupy.cuda.stream import Event
 from cupy.cuda.stream import Stream
@@ -15,6 +19,8 @@ from cupy.cuda.stream import get_current_stream
 
 from cupy.cuda import nccl
 from cupyx.distributed._nccl_comm import _get_nccl_dtype_and_count
+from cupyx.distributed._nccl_comm import _nccl_dtypes
+from cupyx.distributed._nccl_comm import _nccl_ops
 
 if nccl.available:
     from cupy.cuda.nccl import NcclCommunicator as _Communicator
@@ -50,6 +56,23 @@ class _AsyncData:
 _PartialUpdate = tuple[_AsyncData, tuple[slice, ...]]
 
 
+@functools.lru_cache
+def _can_access_peer(src_dev: int, dst_dev: int) -> bool:
+    return runtime.deviceCanAccessPeer(dst_dev, src_dev) == 1
+
+
+@contextlib.contextmanager
+def _on_stream(dev: int, stream: Stream) -> Iterator[Stream]:
+    # Make `stream` the current stream of device `dev` within the context
+    with Device(dev):
+        prev_stream = get_current_stream()
+        try:
+            stream.use()
+            yield stream
+        finally:
+            prev_stream.use()
+
+
 if nccl.available:
     def _create_communicators(
         devices: Iterable[int],
@@ -98,6 +121,73 @@ if nccl.available:
                 prev_src_stream.use()
             with Device(dst_dev):
                 prev_dst_stream.use()
+
+    def _transfer_group(
+        comms: dict[int, _Communicator], streams: dict[int, Stream],
+        src_data_list: list[_AsyncData], dst_devs: list[int],
+    ) -> list[_AsyncData]:
+        # Transfer all the data across devices in a single NCCL group call.
+        # Source arrays must be contiguous.
+        dst_bufs = []
+        for src_data, dst_dev in zip(src_data_list, dst_devs):
+            src_dev = src_data.array.device.id
+            with Device(src_dev):
+                streams[src_dev].wait_event(src_data.ready)
+            with _on_stream(dst_dev, streams[dst_dev]):
+                dst_bufs.append(_creation_basic.empty(
+                    src_data.array.shape, src_data.array.dtype))
+
+        nccl.groupStart()
+        try:
+            for src_data, dst_dev, dst_buf in zip(
+                    src_data_list, dst_devs, dst_bufs):
+                src_dev = src_data.array.device.id
+                dtype, count = _get_nccl_dtype_and_count(src_data.array)
+                with Device(src_dev):
+                    comms[src_dev].send(
+                        src_data.array.data.ptr, count, dtype,
+                        comms[dst_dev].rank_id(), streams[src_dev].ptr)
+                with Device(dst_dev):
+                    comms[dst_dev].recv(
+                        dst_buf.data.ptr, count, dtype,
+                        comms[src_dev].rank_id(), streams[dst_dev].ptr)
+        finally:
+            nccl.groupEnd()
+
+        result = []
+        for dst_dev, dst_buf in zip(dst_devs, dst_bufs):
+            with Device(dst_dev):
+                result.append(
+                    _AsyncData(dst_buf, streams[dst_dev].record()))
+        return result
+
+    def _can_all_reduce(
+        comms: dict[int, _Communicator], devs: Iterable[int],
+        dtype: numpy.dtype, op: str,
+    ) -> bool:
+        # NCCL collectives need all the devices of the communicators
+        return (comms.keys() == set(devs)
+                and dtype.char in _nccl_dtypes
+                and (dtype.char not in 'FD' or op == 'sum'))
+
+    def _all_reduce_group(
+        comms: dict[int, _Communicator], streams: dict[int, Stream],
+        arrays: list[ndarray], op: str,
+    ) -> None:
+        # Reduce the contiguous arrays, one on each device of `comms`, in
+        # place in a single NCCL group call. Arrays must be ready on
+        # `streams`.
+        nccl.groupStart()
+        try:
+            for array in arrays:
+                dev = array.device.id
+                dtype, count = _get_nccl_dtype_and_count(array)
+                with Device(dev):
+                    comms[dev].allReduce(
+                        array.data.ptr, array.data.ptr, count, dtype,
+                        _nccl_ops[op], streams[dev].ptr)
+        finally:
+            nccl.groupEnd()
 else:
     def _create_communicators(
         devices: Iterable[int],
@@ -123,3 +213,28 @@ else:
                     dst_array, dst_stream.record(), prevent_gc=src_data.array)
             finally:
                 prev_stream.use()
+
+    def _transfer_group(
+        comms: dict[int, _Communicator], streams: dict[int, Stream],
+        src_data_list: list[_AsyncData], dst_devs: list[int],
+    ) -> list[_AsyncData]:
+        result = []
+        for src_data, dst_dev in zip(src_data_list, dst_devs):
+            with _on_stream(dst_dev, streams[dst_dev]) as stream:
+                stream.wait_event(src_data.ready)
+                dst_array = src_data.array.copy()
+                result.append(_AsyncData(
+                    dst_array, stream.record(), prevent_gc=src_data.array))
+        return result
+
+    def _can_all_reduce(
+        comms: dict[int, _Communicator], devs: Iterable[int],
+        dtype: numpy.dtype, op: str,
+    ) -> bool:
+        return False
+
+    def _all_reduce_group(
+        comms: dict[int, _Communicator], streams: dict[int, Stream],
+        arrays: list[ndarray], op: str,
+    ) -> None:
+        raise RuntimeError('NCCL is not available')
@@ -94,6 +94,40 @@ def _index_intersection(
         return typing.cast(tuple[slice, ...], result)
 
 
+def _index_difference(
+    a_idx: tuple[slice, ...], b_idx: tuple[slice, ...],
+    shape: tuple[int, ...],
+) -> list[tuple[slice, ...]] | None:
+    # Return disjoint indices whose union is a minus b. Return None if the
+    # difference cannot be expressed with slices, i.e., b does not cover a
+    # contiguous run of the elements of a along some axis.
+    intersection = _index_intersection(a_idx, b_idx, shape)
+    if intersection is None:
+        return [a_idx]
+
+    result = []
+    rest = list(a_idx)
+    for i in range(len(shape)):
+        a_start, a_stop, a_step = rest[i].indices(shape[i])
+        c_start, c_stop, c_step = intersection[i].indices(shape[i])
+        if c_step != a_step:
+            return None
+        c_last = c_start + (c_stop - c_start - 1) // c_step * c_step
+
+        # Split a along axis i into the elements before, within and after
+        # the intersection. Only the elements within it are left for the
+        # following axes.
+        if a_start < c_start:
+            before = slice(a_start, c_start, a_step)
+            result.append(tuple(rest[:i] + [before] + rest[i + 1:]))
+        if c_last + a_step < a_stop:
+            after = slice(c_last + a_step, a_stop, a_step)
+            result.append(tuple(rest[:i] + [after] + rest[i + 1:]))
+        rest[i] = slice(c_start, c_last + 1, a_step)
+
+    return result
+
+
 def _index_for_subindex(
     a_idx: tuple[slice, ...], sub_idx: tuple[slice, ...],
     shape: tuple[int, ...],
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+import bisect
 from collections.abc import Callable
 import dataclasses
+from itertools import chain
 import typing
+from typing import Any
 
 import cupy
+import cupy._creation.from_data as _creation_from_data
+from cupy.cuda.device import Device
+from cupy.cuda.stream import Event
+from cupy.cuda.stream import Stream
+from cupy.cuda.stream import get_current_stream
 from cupyx.distributed.array import _array
 from cupyx.distributed.array import _chunk
+from cupyx.distributed.array import _data_transfer
 from cupyx.distributed.array import _modes
 
 
@@ -81,6 +90,9 @@ def _find_blocking(
             if x != y:
                 res.append(y)
 
+        if len(res) == 1:
+            # The axis is empty, and made of a single empty block
+            res.append(res[0])
         return res
 
     i_partitions = to_unique_sorted(i_partitions)
@@ -89,7 +101,8 @@ def _find_blocking(
 
     def check_indices(indices, partitions):
         start, stop, _ = indices
-        if partitions.index(start) + 1 != partitions.index(stop):
+        p = partitions.index(start)
+        if p + 1 == len(partitions) or partitions[p + 1] != stop:
             raise RuntimeError('Inconsistent index mapping')
 
     for i_indices, k_indices in location_map_a.keys():
@@ -138,6 +151,307 @@ def _make_execution_plan(
     return plan
 
 
+# Algorithms of matmul:
+#   'local': multiply the blocks on devices holding both of them, which
+#       needs the operands to be co-located and leaves a partial sum of the
+#       output for each block on the k axis
+#   'summa': compute each output block on one device, sending it panels of
+#       the operands slice by slice on the k axis
+#   '2.5d': same as 'summa', but the panels of each output block are split
+#       into layers computed by different devices and summed up afterwards
+_ALGORITHMS = ('local', 'summa', '2.5d')
+
+
+# Width of the panels on the k axis sent in a step of SUMMA
+_DEFAULT_PANEL_SIZE = 1024
+
+
+# Number of steps of SUMMA whose panels can be in flight at a time. The
+# panels of the next steps are transferred while multiplying the current
+# ones, bounding the memory held for received panels.
+_PIPELINE_DEPTH = 2
+
+
+@dataclasses.dataclass(frozen=True)
+class _CostModel:
+    # Simple alpha-beta model of a device, used to choose the algorithm
+    latency: float = 1e-5           # Seconds per step of communication
+    bandwidth: float = 2e10         # Bytes per second sent or received
+    flops: float = 1e13             # Floating point operations per second
+
+
+_DEFAULT_COST_MODEL = _CostModel()
+
+
+@dataclasses.dataclass(frozen=True)
+class _SummaTask:
+    # Device computing a (partial) sum over `k_ranges` of an output block
+    dev: int
+    i_range: tuple[int, int]
+    j_range: tuple[int, int]
+    k_ranges: tuple[tuple[int, int], ...]   # One for each step
+
+
+@dataclasses.dataclass(frozen=True)
+class _PanelSend:
+    # Part of a block of A (matrix == 0) or B (matrix == 1) sent to a device
+    matrix: int
+    block: _BlockIdx
+    k_range: tuple[int, int]
+    src: int
+    dst: int
+
+
+@dataclasses.dataclass
+class _SummaStep:
+    sends: list[_PanelSend]
+    # (index of task, k_range, block of A, block of B) multiplied in this
+    # step, where the blocks are the ones containing the panels
+    products: list[tuple[int, tuple[int, int], _BlockIdx, _BlockIdx]]
+
+
+@dataclasses.dataclass
+class _SummaSchedule:
+    tasks: list[_SummaTask]
+    steps: list[_SummaStep]
+
+
+def _split_panels(
+    k_partitions: list[int], panel_size: int,
+) -> list[tuple[int, int]]:
+    # Split the blocks on the k axis into panels of at most `panel_size`
+    panels = []
+    for k_start, k_stop in zip(k_partitions, k_partitions[1:]):
+        for start in range(k_start, k_stop, panel_size):
+            panels.append((start, min(start + panel_size, k_stop)))
+    return panels
+
+
+def _block_of(
+    partitions: list[int], start: int, stop: int,
+) -> _SliceIndices:
+    # Block on an axis containing the range [start, stop)
+    b = bisect.bisect_right(partitions, start) - 1
+    assert stop <= partitions[b + 1]
+    return (partitions[b], partitions[b + 1], 1)
+
+
+def _make_summa_schedule(
+    blocking: _Blocking,
+    location_map_a: _BlockLocationMap,
+    location_map_b: _BlockLocationMap,
+    devices: list[int],
+    itemsize: int,
+    panel_size: int = _DEFAULT_PANEL_SIZE,
+    n_layers: int = 1,
+    cost_model: _CostModel = _DEFAULT_COST_MODEL,
+) -> _SummaSchedule:
+    i_partitions = blocking.i_partitions
+    j_partitions = blocking.j_partitions
+    k_partitions = blocking.k_partitions
+    panels = _split_panels(k_partitions, panel_size)
+
+    def blocks(i_range, j_range, k_range):
+        k_block = _block_of(k_partitions, *k_range)
+        return ((i_range + (1,), k_block), (k_block, j_range + (1,)))
+
+    # Assign the layers of each output block to the devices, balancing the
+    # estimated time to compute and to receive the panels.
+    load = {dev: 0.0 for dev in devices}
+    tasks: list[_SummaTask] = []
+    for i_range in zip(i_partitions, i_partitions[1:]):
+        for j_range in zip(j_partitions, j_partitions[1:]):
+            ni = i_range[1] - i_range[0]
+            nj = j_range[1] - j_range[0]
+            # A block is still assigned to a device, which fills it with
+            # zeros, when the inner axis is empty
+            layers = max(min(n_layers, len(panels), len(devices)), 1)
+            used: set[int] = set()
+            for layer in range(layers):
+                k_ranges = panels[len(panels) * layer // layers:
+                                  len(panels) * (layer + 1) // layers]
+                nk = sum([stop - start for start, stop in k_ranges])
+
+                def time(dev):
+                    recv = 0
+                    for k_range in k_ranges:
+                        kw = k_range[1] - k_range[0]
+                        block_a, block_b = blocks(i_range, j_range, k_range)
+                        if dev not in location_map_a[block_a]:
+                            recv += ni * kw * itemsize
+                        if dev not in location_map_b[block_b]:
+                            recv += kw * nj * itemsize
+                    return (load[dev]
+                            + 2 * ni * nj * nk / cost_model.flops
+                            + recv / cost_model.bandwidth)
+
+                dev = min([d for d in devices if d not in used], key=time)
+                load[dev] = time(dev)
+                used.add(dev)
+                tasks.append(
+                    _SummaTask(dev, i_range, j_range, tuple(k_ranges)))
+
+    # Gather the panels each task needs in each step. Panels held by the
+    # device itself are used in place; the others are sent once to each
+    # device from the holder that has sent the least so far.
+    sent = {dev: 0 for dev in devices}
+    steps: list[_SummaStep] = []
+    n_steps = max([len(task.k_ranges) for task in tasks], default=0)
+    for s in range(n_steps):
+        step = _SummaStep([], [])
+        needed = set()
+        for t, task in enumerate(tasks):
+            if s >= len(task.k_ranges):
+                continue
+            k_range = task.k_ranges[s]
+            block_a, block_b = blocks(task.i_range, task.j_range, k_range)
+            step.products.append((t, k_range, block_a, block_b))
+            kw = k_range[1] - k_range[0]
+            for matrix, block, location_map, nbytes in (
+                    (0, block_a, location_map_a,
+                     (task.i_range[1] - task.i_range[0]) * kw * itemsize),
+                    (1, block_b, location_map_b,
+                     (task.j_range[1] - task.j_range[0]) * kw * itemsize)):
+                holders = location_map[block]
+                key = (matrix, block, k_range, task.dev)
+                if task.dev in holders or key in needed:
+                    continue
+                needed.add(key)
+                src = min(sorted(holders), key=lambda d: sent[d])
+                sent[src] += nbytes
+                step.sends.append(
+                    _PanelSend(matrix, block, k_range, src, task.dev))
+        steps.append(step)
+    return _SummaSchedule(tasks, steps)
+
+
+def _estimate_summa_time(
+    schedule: _SummaSchedule, itemsize: int,
+    cost_model: _CostModel = _DEFAULT_COST_MODEL,
+) -> float:
+    # The panels of a step are transferred while the panels of the previous
+    # step are multiplied, so each device takes
+    #     comm[0] + sum(max(comm[s], compute[s - 1])) + compute[-1]
+    tasks = schedule.tasks
+    n_steps = len(schedule.steps)
+    compute: dict[int, list[float]] = {}
+    comm: dict[int, list[float]] = {}
+    for s, step in enumerate(schedule.steps):
+        for t, (k_start, k_stop), _, _ in step.products:
+            task = tasks[t]
+            flops = (2 * (task.i_range[1] - task.i_range[0])
+                     * (task.j_range[1] - task.j_range[0])
+                     * (k_stop - k_start))
+            compute.setdefault(task.dev, [0.0] * n_steps)[s] += (
+                flops / cost_model.flops)
+        for dev in {dev for send in step.sends
+                    for dev in (send.src, send.dst)}:
+            comm.setdefault(dev, [0.0] * n_steps)[s] += cost_model.latency
+        for send in step.sends:
+            # Length of the panel on the i axis for A, on the j axis for B
+            start, stop, _ = send.block[0 if send.matrix == 0 else 1]
+            nbytes = (stop - start) * (send.k_range[1] - send.k_range[0]) * (
+                itemsize)
+            for dev in (send.src, send.dst):
+                comm.setdefault(dev, [0.0] * n_steps)[s] += (
+                    nbytes / cost_model.bandwidth)
+
+    total = 0.0
+    for dev in compute.keys() | comm.keys():
+        c = compute.get(dev, [0.0] * n_steps)
+        m = comm.get(dev, [0.0] * n_steps)
+        time = m[0] + c[-1] + sum(
+            [max(m[s], c[s - 1]) for s in range(1, n_steps)])
+        total = max(total, time)
+
+    partials: dict[tuple, int] = {}
+    for task in tasks:
+        key = (task.i_range, task.j_range)
+        partials[key] = partials.get(key, 0) + 1
+    return total + _estimate_reduction_time(partials, itemsize, cost_model)
+
+
+def _estimate_local_time(
+    plan: _ExecutionPlan, itemsize: int,
+    cost_model: _CostModel = _DEFAULT_COST_MODEL,
+) -> float:
+    compute: dict[int, float] = {}
+    partials: dict[tuple, int] = {}
+    for block_a, block_b, dev in plan:
+        (i_start, i_stop, _), (k_start, k_stop, _) = block_a
+        j_start, j_stop, _ = block_b[1]
+        flops = 2 * (i_stop - i_start) * (j_stop - j_start) * (
+            k_stop - k_start)
+        compute[dev] = compute.get(dev, 0.0) + flops / cost_model.flops
+        key = ((i_start, i_stop), (j_start, j_stop))
+        partials[key] = partials.get(key, 0) + 1
+    return (max(compute.values(), default=0.0)
+            + _estimate_reduction_time(partials, itemsize, cost_model))
+
+
+def _estimate_reduction_time(
+    partials: dict[tuple, int], itemsize: int, cost_model: _CostModel,
+) -> float:
+    # Time to sum up the partial results of each output block later, with a
+    # ring all-reduce among the devices holding them
+    total = 0.0
+    for ((i_start, i_stop), (j_start, j_stop)), p in partials.items():
+        if p > 1:
+            nbytes = (i_stop - i_start) * (j_stop - j_start) * itemsize
+            total += (2 * (p - 1) * cost_model.latency
+                      + 2 * (p - 1) / p * nbytes / cost_model.bandwidth)
+    return total
+
+
+def _choose_algorithm(
+    blocking: _Blocking,
+    location_map_a: _BlockLocationMap,
+    location_map_b: _BlockLocationMap,
+    devices: list[int],
+    itemsize: int,
+    algorithm: str = 'local',
+    panel_size: int = _DEFAULT_PANEL_SIZE,
+    cost_model: _CostModel = _DEFAULT_COST_MODEL,
+) -> _ExecutionPlan | _SummaSchedule:
+    # Return the execution plan of the given algorithm, or of the one with
+    # the least estimated time if `algorithm` is 'auto'
+    if algorithm != 'auto' and algorithm not in _ALGORITHMS:
+        raise ValueError(f'Unknown matmul algorithm: {algorithm}')
+
+    candidates: list[tuple[float, _ExecutionPlan | _SummaSchedule]] = []
+    if algorithm in ('auto', 'local'):
+        try:
+            plan = _make_execution_plan(
+                blocking, location_map_a, location_map_b)
+        except RuntimeError:
+            if algorithm == 'local':
+                raise
+        else:
+            candidates.append(
+                (_estimate_local_time(plan, itemsize, cost_model), plan))
+    if algorithm in ('auto', 'summa', '2.5d'):
+        n_blocks = ((len(blocking.i_partitions) - 1)
+                    * (len(blocking.j_partitions) - 1))
+        # More layers are worth it when there are more devices than the
+        # output blocks
+        max_layers = max(2, len(devices) // max(1, n_blocks))
+        layers_list = [] if algorithm == '2.5d' else [1]
+        if algorithm != 'summa':
+            n_layers = 2
+            while n_layers <= max_layers:
+                layers_list.append(n_layers)
+                n_layers *= 2
+        for n_layers in layers_list:
+            schedule = _make_summa_schedule(
+                blocking, location_map_a, location_map_b, devices,
+                itemsize, panel_size, n_layers, cost_model)
+            candidates.append((
+                _estimate_summa_time(schedule, itemsize, cost_model),
+                schedule))
+    # Prefer the earlier candidates on a tie
+    return min(candidates, key=lambda c: c[0])[1]
+
+
 def _convert_to_tuples(
     slices: tuple[slice, ...], shape: tuple[int, ...],
 ) -> tuple[_SliceIndices, ...]:
@@ -220,9 +534,146 @@ def _pop_front_from_shape(arr) -> _array.DistributedArray:
         lambda idx: idx[1:])
 
 
+def _execute_local(
+    a: _array.DistributedArray, b: _array.DistributedArray,
+    index_prefix: tuple[slice, ...],
+    location_map_a: _BlockLocationMap, location_map_b: _BlockLocationMap,
+    plan: _ExecutionPlan, chunks_map: dict[int, list[_chunk._Chunk]],
+    kwargs: dict[str, Any],
+) -> None:
+    for block_a, block_b, dev in plan:
+        loc_a = location_map_a[block_a]
+        loc_b = location_map_b[block_b]
+        chunk_a = a._chunks_map[dev][loc_a[dev]]
+        chunk_b = b._chunks_map[dev][loc_b[dev]]
+        chunk_a.flush(_modes.REPLICA)
+        chunk_b.flush(_modes.REPLICA)
+
+        index = index_prefix + (slice(*block_a[0]), slice(*block_b[1]))
+        with chunk_a.on_ready() as stream:
+            stream.wait_event(chunk_b.ready)
+
+            chunk_ab_array = cupy.linalg._product.matmul(
+                chunk_a.array, chunk_b.array, **kwargs)
+
+            chunk_ab = _chunk._Chunk(
+                chunk_ab_array, stream.record(), index,
+                prevent_gc=(chunk_a, chunk_b))
+            chunks_map.setdefault(dev, []).append(chunk_ab)
+
+
+def _release_panels(
+    streams: dict[int, Stream], panels: list[_data_transfer._AsyncData],
+    done: dict[int, Event],
+) -> None:
+    # Let the memory of the panels be reused on the internal streams only
+    # after the multiplications reading them
+    for dev, event in done.items():
+        with Device(dev):
+            streams[dev].wait_event(event)
+    del panels[:]
+
+
+def _execute_summa(
+    a: _array.DistributedArray, b: _array.DistributedArray,
+    index_prefix: tuple[slice, ...],
+    location_map_a: _BlockLocationMap, location_map_b: _BlockLocationMap,
+    schedule: _SummaSchedule, chunks_map: dict[int, list[_chunk._Chunk]],
+    kwargs: dict[str, Any],
+) -> None:
+    # Panels are transferred on the internal streams of `a`, and multiplied
+    # on the current streams, so that the transfers of the next steps
+    # overlap with the multiplications.
+    devices = a.devices | b.devices
+    a._prepare_comms_and_streams(devices)
+    comms = a._comms
+    streams = a._streams
+    operands = ((a, location_map_a), (b, location_map_b))
+
+    def panel_of(matrix, block, k_range, dev):
+        # View of the panel in a chunk on the device
+        arr, location_map = operands[matrix]
+        chunk = arr._chunks_map[dev][location_map[block][dev]]
+        chunk.flush(_modes.REPLICA)
+        start = k_range[0] - block[1 - matrix][0]
+        stop = k_range[1] - block[1 - matrix][0]
+        if matrix == 0:
+            return chunk, chunk.array[..., start:stop]
+        return chunk, chunk.array[..., start:stop, :]
+
+    accumulators: list[Any] = [None] * len(schedule.tasks)
+    in_flight: list[tuple[list[Any], dict[int, Any]]] = []
+    for step in schedule.steps:
+        staged = []
+        for send in step.sends:
+            chunk, panel = panel_of(
+                send.matrix, send.block, send.k_range, send.src)
+            with _data_transfer._on_stream(
+                    send.src, streams[send.src]) as stream:
+                stream.wait_event(chunk.ready)
+                data = _creation_from_data.ascontiguousarray(panel)
+                staged.append(_data_transfer._AsyncData(data, stream.record()))
+        received = {}
+        if staged:
+            updates = _data_transfer._transfer_group(
+                comms, streams, staged, [send.dst for send in step.sends])
+            for send, update in zip(step.sends, updates):
+                received[(send.matrix, send.block, send.k_range,
+                          send.dst)] = update
+                # The staged panel must be kept until it is received
+                with Device(send.src):
+                    streams[send.src].wait_event(update.ready)
+
+        done = {}
+        for t, k_range, block_a, block_b in step.products:
+            task = schedule.tasks[t]
+            pieces = []
+            with Device(task.dev):
+                stream = get_current_stream()
+                for matrix, block in enumerate((block_a, block_b)):
+                    update = received.get(
+                        (matrix, block, k_range, task.dev))
+                    if update is None:
+                        chunk, piece = panel_of(
+                            matrix, block, k_range, task.dev)
+                        stream.wait_event(chunk.ready)
+                    else:
+                        piece = update.array
+                        stream.wait_event(update.ready)
+                    pieces.append(piece)
+                product = cupy.linalg._product.matmul(*pieces, **kwargs)
+                if accumulators[t] is None:
+                    accumulators[t] = product
+                else:
+                    accumulators[t] += product
+                done[task.dev] = stream.record()
+
+        # Release the panels received `_PIPELINE_DEPTH` steps before, after
+        # they are consumed. They were allocated on the internal streams.
+        in_flight.append((list(received.values()), done))
+        if len(in_flight) > _PIPELINE_DEPTH:
+            _release_panels(streams, *in_flight.pop(0))
+    for panels, done in in_flight:
+        _release_panels(streams, panels, done)
+
+    for task, acc in zip(schedule.tasks, accumulators):
+        index = index_prefix + (slice(*task.i_range), slice(*task.j_range))
+        with Device(task.dev):
+            if acc is None:
+                # No panel to multiply, the inner axis being empty
+                shape = tuple([s.stop - s.start for s in index])
+                acc = cupy.zeros(shape, kwargs.get(
+                    'dtype', cupy.result_type(a.dtype, b.dtype)))
+            chunk = _chunk._Chunk(
+                acc, get_current_stream().record(), index,
+                prevent_gc=(a._chunks_map, b._chunks_map))
+        chunks_map.setdefault(task.dev, []).append(chunk)
+
+
 def matmul(
     a: _array.DistributedArray, b: _array.DistributedArray,
-    out: _array.DistributedArray | None = None, **kwargs,
+    out: _array.DistributedArray | None = None, *,
+    algorithm: str = 'local', panel_size: int | None = None, **kwargs,
 ) -> _array.DistributedArray:
     """Matrix multiplication between distributed arrays.
 
@@ -232,10 +683,33 @@ def matmul(
     This operation converts its operands into the replica mode, and compute
     their product in the sum mode.
 
+    The product is computed with one of the following algorithms:
+
+    ``'local'``
+        Each pair of blocks is multiplied on a device that holds both of
+        them, without any communication. The result holds a partial sum
+        for each block on the inner axis.
+    ``'summa'``
+        Each block of the result is computed on one device, which receives
+        the panels of the operands it does not hold, slice by slice on the
+        inner axis. The transfers of the next panels overlap with the
+        multiplications of the current ones.
+    ``'2.5d'``
+        Same as ``'summa'``, but the panels for each block of the result are
+        split among multiple devices, whose partial sums are added up
+        later. This uses more devices when they outnumber the blocks.
+
+    With ``'auto'``, the algorithm with the least time estimated from the
+    blocking and the sizes of the operands is chosen.
+
     Args:
         a, b: Input distributed arrays.
         out (optional): A location into which the result is stored. This option
             is currently not supported.
+        algorithm (str, optional): One of ``'local'`` (default),
+            ``'summa'``, ``'2.5d'`` and ``'auto'``.
+        panel_size (int, optional): Width of the panels on the inner axis
+            transferred in a step of ``'summa'`` and ``'2.5d'``.
     Returns:
         The matrix product of the inputs.
 
@@ -301,35 +775,35 @@ def matmul(
 
     chunks_map: dict[int, list[_chunk._Chunk]] = {dev: [] for dev in a.devices}
     dtype = None
+    devices = sorted(a.devices | b.devices)
+    itemsize = max(a.itemsize, b.itemsize)
+    if panel_size is None:
+        panel_size = _DEFAULT_PANEL_SIZE
+    elif panel_size < 1:
+        raise ValueError(f'Invalid panel_size: {panel_size}')
 
     for batch_idx in location_maps_a.keys():
         location_map_a = location_maps_a[batch_idx]
         location_map_b = location_maps_b[batch_idx]
 
         blocking = _find_blocking(location_map_a, location_map_b)
-        plan = _make_execution_plan(blocking, location_map_a, location_map_b)
+        plan = _choose_algorithm(
+            blocking, location_map_a, location_map_b, devices, itemsize,
+            algorithm, panel_size)
 
         index_prefix = _convert_to_slices(batch_idx)
-        for block_a, block_b, dev in plan:
-            loc_a = location_map_a[block_a]
-            loc_b = location_map_b[block_b]
-            chunk_a = a._chunks_map[dev][loc_a[dev]]
-            chunk_b = b._chunks_map[dev][loc_b[dev]]
-            chunk_a.flush(_modes.REPLICA)
-            chunk_b.flush(_modes.REPLICA)
-
-            index = index_prefix + (slice(*block_a[0]), slice(*block_b[1]))
-            with chunk_a.on_ready() as stream:
-                stream.wait_event(chunk_b.ready)
-
-                chunk_ab_array = cupy.linalg._product.matmul(
-                    chunk_a.array, chunk_b.array, **kwargs)
-
-                chunk_ab = _chunk._Chunk(
-                    chunk_ab_array, stream.record(), index,
-                    prevent_gc=(chunk_a, chunk_b))
-                chunks_map[dev].append(chunk_ab)
-                dtype = chunk_ab_array.dtype
+        if isinstance(plan, _SummaSchedule):
+            _execute_summa(
+                a, b, index_prefix, location_map_a, location_map_b, plan,
+                chunks_map, kwargs)
+        else:
+            _execute_local(
+                a, b, index_prefix, location_map_a, location_map_b, plan,
+                chunks_map, kwargs)
+
+    for chunk in chain.from_iterable(chunks_map.values()):
+        dtype = chunk.array.dtype
+        break
 
     shape = a.shape[:-2] + (n, p)
     res = _array.DistributedArray(
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+import dataclasses
+import math
+
+from cupyx.distributed.array import _index_arith
+
+
+# Upper bound of the staging buffers (on both the sending and the receiving
+# sides) that a device holds at a time while resharding
+_DEFAULT_MAX_STAGING_BYTES = 1 << 30
+
+
+# Position of a chunk: (device, index in the list of chunks of the device)
+_ChunkKey = tuple[int, int]
+
+
+@dataclasses.dataclass(frozen=True)
+class _Transfer:
+    src: _ChunkKey
+    dst: _ChunkKey
+    idx: tuple[slice, ...]        # Index of the data in the whole array
+    src_idx: tuple[slice, ...]    # Index into the source chunk
+    dst_idx: tuple[slice, ...]    # Index into the destination chunk
+    nbytes: int
+
+    @property
+    def src_dev(self) -> int:
+        return self.src[0]
+
+    @property
+    def dst_dev(self) -> int:
+        return self.dst[0]
+
+    @property
+    def is_local(self) -> bool:
+        return self.src[0] == self.dst[0]
+
+
+@dataclasses.dataclass
+class _TransferPlan:
+    # Transfers within a device, which need no communication
+    local: list[_Transfer]
+    # Transfers across devices. Each batch is executed as a single NCCL
+    # group call, and its transfers are sorted by device pairs.
+    batches: list[list[_Transfer]]
+
+    @property
+    def nbytes(self) -> int:
+        """Total number of bytes moved across devices."""
+        return sum([t.nbytes for batch in self.batches for t in batch])
+
+    def bytes_per_link(self) -> dict[tuple[int, int], int]:
+        """Number of bytes moved for each (src_dev, dst_dev) pair."""
+        result: dict[tuple[int, int], int] = {}
+        for batch in self.batches:
+            for t in batch:
+                key = (t.src_dev, t.dst_dev)
+                result[key] = result.get(key, 0) + t.nbytes
+        return result
+
+
+def _make_transfer(
+    shape: tuple[int, ...], itemsize: int,
+    src: _ChunkKey, src_chunk_idx: tuple[slice, ...],
+    dst: _ChunkKey, dst_chunk_idx: tuple[slice, ...],
+    idx: tuple[slice, ...],
+) -> _Transfer:
+    size = math.prod(_index_arith._shape_after_indexing(shape, idx))
+    return _Transfer(
+        src, dst, idx,
+        _index_arith._index_for_subindex(src_chunk_idx, idx, shape),
+        _index_arith._index_for_subindex(dst_chunk_idx, idx, shape),
+        size * itemsize)
+
+
+def _find_transfers(
+    shape: tuple[int, ...], itemsize: int,
+    src_index_map: dict[int, list[tuple[slice, ...]]],
+    dst_index_map: dict[int, list[tuple[slice, ...]]],
+) -> list[_Transfer]:
+    # Return the transfers of all the intersections between source and
+    # destination chunks, in the order of source chunks.
+    transfers = []
+    for src_dev, src_idxs in src_index_map.items():
+        for i, src_idx in enumerate(src_idxs):
+            for dst_dev, dst_idxs in dst_index_map.items():
+                for j, dst_idx in enumerate(dst_idxs):
+                    intersection = _index_arith._index_intersection(
+                        src_idx, dst_idx, shape)
+                    if intersection is None:
+                        continue
+                    transfers.append(_make_transfer(
+                        shape, itemsize, (src_dev, i), src_idx,
+                        (dst_dev, j), dst_idx, intersection))
+    return transfers
+
+
+def _select_sources(
+    shape: tuple[int, ...], itemsize: int,
+    src_index_map: dict[int, list[tuple[slice, ...]]],
+    dst_index_map: dict[int, list[tuple[slice, ...]]],
+    transfers: list[_Transfer],
+    can_access_peer: Callable[[int, int], bool] | None,
+) -> list[_Transfer]:
+    # Choose, for each element of the destination chunks, only one of the
+    # source chunks holding it. This is valid when all the sources hold the
+    # same values on their overlaps, i.e., in the replica mode.
+    #
+    # Candidate sources are taken greedily, preferring chunks on the same
+    # device, then devices with peer access, then the links and senders that
+    # would be the least loaded.
+    # The region already taken from other sources is removed from each
+    # candidate. Where the remainder cannot be expressed with slices, the
+    # candidate is transferred as a whole, which is redundant but correct.
+    candidates_map: dict[_ChunkKey, list[_Transfer]] = {}
+    for t in transfers:
+        candidates_map.setdefault(t.dst, []).append(t)
+
+    link_load: dict[tuple[int, int], int] = {}
+    send_load: dict[int, int] = {}
+
+    def cost(t: _Transfer) -> tuple[int, int, int]:
+        if t.is_local:
+            return (0, 0, 0)
+        peer = can_access_peer is None or can_access_peer(
+            t.src_dev, t.dst_dev)
+        # Load of the link and the sender after taking this candidate
+        return (1, 0 if peer else 1,
+                link_load.get((t.src_dev, t.dst_dev), 0)
+                + send_load.get(t.src_dev, 0) + t.nbytes)
+
+    selected = []
+    for dst, candidates in candidates_map.items():
+        dst_chunk_idx = dst_index_map[dst[0]][dst[1]]
+        covered: list[tuple[slice, ...]] = []
+        while candidates:
+            best = min(candidates, key=cost)
+            candidates.remove(best)
+
+            pieces = [best.idx]
+            for covered_idx in covered:
+                new_pieces = []
+                for piece in pieces:
+                    diff = _index_arith._index_difference(
+                        piece, covered_idx, shape)
+                    new_pieces.extend([piece] if diff is None else diff)
+                pieces = new_pieces
+
+            src_chunk_idx = src_index_map[best.src[0]][best.src[1]]
+            for piece in pieces:
+                t = _make_transfer(
+                    shape, itemsize, best.src, src_chunk_idx,
+                    dst, dst_chunk_idx, piece)
+                selected.append(t)
+                covered.append(piece)
+                if not t.is_local:
+                    link = (t.src_dev, t.dst_dev)
+                    link_load[link] = link_load.get(link, 0) + t.nbytes
+                    send_load[t.src_dev] = (
+                        send_load.get(t.src_dev, 0) + t.nbytes)
+    return selected
+
+
+def _make_batches(
+    transfers: list[_Transfer], max_staging_bytes: int | None,
+) -> list[list[_Transfer]]:
+    # Split the transfers across devices into batches so that no device
+    # stages more than `max_staging_bytes` for a batch. Transfers are taken
+    # from each device pair in turn so that a batch uses as many links in
+    # parallel as possible.
+    queues: dict[tuple[int, int], list[_Transfer]] = {}
+    for t in transfers:
+        queues.setdefault((t.src_dev, t.dst_dev), []).append(t)
+    for queue in queues.values():
+        queue.reverse()    # Pop from the end
+
+    def pop(pair):
+        queue = queues[pair]
+        t = queue.pop()
+        if not queue:
+            del queues[pair]
+        return t
+
+    batches = []
+    while queues:
+        batch: list[_Transfer] = []
+        staging: dict[int, int] = {}
+        progress = True
+        while progress:
+            progress = False
+            for pair in sorted(queues):
+                t = queues[pair][-1]
+                src_bytes = staging.get(t.src_dev, 0) + t.nbytes
+                dst_bytes = staging.get(t.dst_dev, 0) + t.nbytes
+                if (max_staging_bytes is not None
+                        and max(src_bytes, dst_bytes) > max_staging_bytes):
+                    continue
+                batch.append(pop(pair))
+                staging[t.src_dev] = src_bytes
+                staging[t.dst_dev] = dst_bytes
+                progress = True
+        if not batch:
+            # No transfer fits in the limit; execute one of them alone
+            batch.append(pop(min(queues)))
+        batch.sort(key=lambda t: (t.src_dev, t.dst_dev))
+        batches.append(batch)
+    return batches
+
+
+def _plan_transfers(
+    shape: tuple[int, ...], itemsize: int,
+    src_index_map: dict[int, list[tuple[slice, ...]]],
+    dst_index_map: dict[int, list[tuple[slice, ...]]],
+    max_staging_bytes: int | None = _DEFAULT_MAX_STAGING_BYTES,
+    *, replica: bool = False,
+    can_access_peer: Callable[[int, int], bool] | None = None,
+) -> _TransferPlan:
+    """Compute the data movement to reshard an array.
+
+    Args:
+        shape: Shape of the array.
+        itemsize: Size of the elements of the array.
+        src_index_map: Current normalized index map.
+        dst_index_map: New normalized index map.
+        max_staging_bytes: Upper bound of the staging buffers a device uses
+            for a batch of transfers. A transfer larger than this is
+            executed in a batch on its own. ``None`` means no limit.
+        replica: If ``True``, the source chunks hold identical values on
+            their overlaps, so each element is transferred from only one of
+            them. Otherwise, all the sources are applied.
+        can_access_peer: Function telling if the first device can access
+            the second one directly, used to choose sources when
+            ``replica`` is ``True``.
+    """
+    transfers = _find_transfers(shape, itemsize, src_index_map, dst_index_map)
+    if replica:
+        transfers = _select_sources(
+            shape, itemsize, src_index_map, dst_index_map, transfers,
+            can_access_peer)
+    local = [t for t in transfers if t.is_local]
+    remote = [t for t in transfers if not t.is_local]
+    return _TransferPlan(local, _make_batches(remote, max_staging_bytes))
+
+
+@dataclasses.dataclass(frozen=True)
+class _Send:
+    src: int    # Position of the sender in the group of devices
+    dst: int    # Position of the receiver in the group of devices
+    start: int  # Range of the flattened data to send
+    stop: int
+    reduce: bool    # Combine with the data of the receiver or overwrite it
+
+
+def _ring_all_reduce_steps(n: int, size: int) -> list[list[_Send]]:
+    # All-reduce over `n` devices in a ring: the data is split into `n`
+    # segments, which are reduced while being passed around the ring
+    # (reduce-scatter) and then passed around once more (all-gather). Each
+    # device sends and receives 2 * (n - 1) / n of the data in total, which
+    # is optimal in bandwidth, but it takes 2 * (n - 1) steps.
+    bounds = [size * k // n for k in range(n + 1)]
+    steps = []
+    for reduce in (True, False):
+        for s in range(n - 1):
+            step = []
+            for r in range(n):
+                # In the reduce-scatter phase, device r sends the segment
+                # it has reduced in the previous step. After the phase,
+                # device r holds the result of the segment r + 1.
+                k = (r - s if reduce else r + 1 - s) % n
+                if bounds[k] < bounds[k + 1]:
+                    step.append(_Send(
+                        r, (r + 1) % n, bounds[k], bounds[k + 1], reduce))
+            if step:
+                steps.append(step)
+    return steps
+
+
+def _tree_all_reduce_steps(n: int, size: int) -> list[list[_Send]]:
+    # All-reduce over `n` devices with a binomial tree: the data is reduced
+    # into device 0 and then broadcast from it. It takes only
+    # 2 * ceil(log2(n)) steps, but the whole data is sent in each of them.
+    if size == 0:
+        return []
+    reduce_steps = []
+    distance = 1
+    while distance < n:
+        reduce_steps.append([
+            _Send(r, r - distance, 0, size, True)
+            for r in range(distance, n, 2 * distance)])
+        distance *= 2
+    bcast_steps = [
+        [_Send(t.dst, t.src, 0, size, False) for t in step]
+        for step in reversed(reduce_steps)]
+    return reduce_steps + bcast_steps
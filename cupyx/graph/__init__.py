@@ -0,0 +1,4 @@
+from __future__ import annotations
+
+from cupyx.graph._capture import capture  # NOQA
+from cupyx.graph._capture import CapturedFunction  # NOQA
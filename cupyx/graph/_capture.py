@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import functools
+import threading
+import warnings
+
+import cupy
+from cupy import _util
+from cupy.cuda import device
+from cupy.cuda import runtime
+
+
+_MISSING = object()
+
+
+class _CapturedGraph:
+    # A CUDA graph instantiated from a single call of the function, together
+    # with the buffers it reads from and writes to.
+
+    def __init__(self, graph, static_inputs, static_outputs, pool):
+        self.graph = graph
+        # ndarray arguments are copied into these buffers before the launch.
+        self.static_inputs = static_inputs
+        # Outputs of the function, overwritten by every launch.
+        self.static_outputs = static_outputs
+        # Private memory pool holding the intermediate arrays of the graph.
+        # It must be kept alive (and not shared) as long as the graph is.
+        self.pool = pool
+        # The buffers are shared by all the calls, which are serialized by
+        # this lock on the host and by this event on the device: each launch
+        # waits for the previous one, possibly on another stream, to finish
+        # with the buffers.
+        self.lock = threading.Lock()
+        self.done = None
+
+
+class CapturedFunction:
+    """A function whose kernel sequence is replayed as a CUDA graph.
+
+    Instances are created by :func:`cupyx.graph.capture`.
+
+    .. seealso:: :func:`cupyx.graph.capture`
+
+    """
+
+    def __init__(self, func, *, copy_outputs=True):
+        self.func = func
+        self.copy_outputs = copy_outputs
+        self._lock = threading.Lock()
+        # Held while capturing so that each key is captured by one thread
+        # only. Captures of different keys are not run concurrently either,
+        # as other threads must not allocate memory during a capture.
+        self._capture_lock = threading.Lock()
+        # key -> _CapturedGraph, or None if capture is not possible
+        self._graphs = {}
+
+    def __repr__(self):
+        return '<CapturedFunction {!r}>'.format(self.func)
+
+    def clear_cache(self):
+        """Releases all the graphs captured so far."""
+        with self._lock:
+            self._graphs = {}
+
+    def __call__(self, *args):
+        key = _get_key(args)
+        if key is None or runtime.is_hip:
+            return self.func(*args)
+
+        with self._lock:
+            entry = self._graphs.get(key, _MISSING)
+        if entry is _MISSING:
+            with self._capture_lock:
+                with self._lock:
+                    entry = self._graphs.get(key, _MISSING)
+                if entry is _MISSING:
+                    # Run once eagerly so that kernels are compiled and
+                    # library handles/plans are created outside of the
+                    # capture.
+                    ret = self.func(*args)
+                    entry = self._capture(args)
+                    with self._lock:
+                        self._graphs[key] = entry
+                    return ret
+        if entry is None:
+            return self.func(*args)
+        return self._launch(entry, args)
+
+    def _capture(self, args):
+        pool = cupy.cuda.MemoryPool()
+        stream = cupy.cuda.Stream(non_blocking=True)
+        # Capture must not start before the inputs are ready.
+        stream.wait_event(cupy.cuda.get_current_stream().record())
+        static_inputs = []
+        graph = None
+        try:
+            with cupy.cuda.using_allocator(pool.malloc), stream:
+                for a in args:
+                    if isinstance(a, cupy.ndarray):
+                        s = cupy.empty(a.shape, a.dtype)
+                        s[...] = a
+                        a = s
+                    static_inputs.append(a)
+                stream.begin_capture()
+                try:
+                    outputs = self.func(*static_inputs)
+                finally:
+                    graph = _end_capture(stream)
+        except Exception as e:
+            reason = '{}: {}'.format(type(e).__name__, e)
+        else:
+            if graph is None:
+                reason = 'the capture was invalidated'
+            elif not _is_array_tree(outputs):
+                reason = 'the function returned a non-array value'
+            else:
+                stream.synchronize()
+                return _CapturedGraph(graph, static_inputs, outputs, pool)
+        warnings.warn(
+            'Falling back to eager execution of {!r} as it cannot be '
+            'captured into a CUDA graph ({})'.format(self.func, reason),
+            _util.PerformanceWarning)
+        return None
+
+    def _launch(self, entry, args):
+        stream = cupy.cuda.get_current_stream()
+        with entry.lock:
+            if entry.done is not None:
+                stream.wait_event(entry.done)
+            for a, s in zip(args, entry.static_inputs):
+                if isinstance(a, cupy.ndarray) and a.data.ptr != s.data.ptr:
+                    s[...] = a
+            entry.graph.launch(stream)
+            outputs = entry.static_outputs
+            if self.copy_outputs:
+                outputs = _map_array_tree(lambda x: x.copy(), outputs)
+            entry.done = stream.record()
+        return outputs
+
+
+def _end_capture(stream):
+    # Ends the capture and returns the graph, or None if the capture was
+    # invalidated by an illegal operation.
+    try:
+        return stream.end_capture()
+    except Exception:
+        return None
+
+
+def _get_key(args):
+    # Returns the cache key of the arguments, or None if the arguments are
+    # not supported.
+    key = [device.get_device_id()]
+    for a in args:
+        if isinstance(a, cupy.ndarray):
+            key.append((type(a), a.shape, a.dtype))
+        else:
+            # Non-array arguments are baked into the graph.
+            try:
+                hash(a)
+            except TypeError:
+                return None
+            key.append((type(a), a))
+    return tuple(key)
+
+
+def _is_array_tree(x):
+    if x is None or isinstance(x, cupy.ndarray):
+        return True
+    if isinstance(x, (tuple, list)):
+        return all([_is_array_tree(y) for y in x])
+    return False
+
+
+def _map_array_tree(f, x):
+    if x is None:
+        return None
+    if isinstance(x, cupy.ndarray):
+        return f(x)
+    return type(x)([_map_array_tree(f, y) for y in x])
+
+
+def capture(func=None, *, copy_outputs=True):
+    """Decorator that replays the kernels launched by a function as a CUDA
+    graph.
+
+    On the first call of the decorated function for a combination of array
+    shapes and dtypes (and values of non-array arguments), the function is
+    executed normally, and then executed again under stream capture to record
+    its kernel sequence into a CUDA graph. The ndarray arguments are copied
+    into static staging buffers which the graph reads from. On later calls
+    with the same combination, the arguments are copied into the staging
+    buffers and the whole graph is launched at once on the current stream,
+    which saves the launch overhead of the individual kernels.
+
+    .. code-block:: py
+
+        @cupyx.graph.capture
+        def f(x, w):
+            return cupy.tanh(x @ w + 1)
+
+        for x in batches:
+            y = f(x, w)  # one graph launch instead of several kernels
+
+    The function must only launch asynchronous work on the current stream
+    and return a :class:`cupy.ndarray` or a (nested) tuple/list of them.
+    Functions that synchronize with the device (e.g., ``if a.sum() > 0:``)
+    or return host values cannot be captured; in that case
+    ``cupy._util.PerformanceWarning`` is emitted and the function is
+    executed eagerly from then on. The same applies on HIP.
+
+    Args:
+        func (callable): The function to capture.
+        copy_outputs (bool): If ``True`` (default), the outputs are copied
+            from the static buffers of the graph into new arrays. If
+            ``False``, the static buffers are returned as is, which avoids
+            the copy but the returned arrays are overwritten by the next
+            call, from any thread or stream.
+
+    Returns:
+        CapturedFunction: The wrapped function.
+
+    .. note::
+        Intermediate arrays allocated during the capture are served from a
+        private memory pool owned by the graph, so that the memory remains
+        valid for replays. Call :meth:`CapturedFunction.clear_cache` to
+        release it.
+
+    .. note::
+        The decorated function may be called from several threads and on
+        several streams (including the per-thread default stream). A graph
+        and its staging buffers are shared by all the calls with the same
+        combination of arguments, so these calls are serialized: each
+        launch waits on the device for the previous one to finish, even if
+        it was made on another stream. The first call for a combination is
+        captured by a single thread, while the others wait for it.
+
+    .. warning::
+        This feature is experimental and may be changed in the future.
+
+    """
+    def wrapper(f):
+        return functools.update_wrapper(
+            CapturedFunction(f, copy_outputs=copy_outputs), f)
+
+    if func is None:
+        return wrapper
+    return wrapper(func)
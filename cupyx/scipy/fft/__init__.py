@@ -13,3 +13,7 @@ from cupyx.scipy.fftpack import get_fft_plan
 from cupyx.scipy.fft._realtransforms import (
     dct, dctn, dst, dstn, idct, idctn, idst, idstn
 )
+from cupyx.scipy.fft._outofcore import (
+    FFTDecomposition, fftn_out_of_core, ifftn_out_of_core,
+    plan_fftn_decomposition
+)
@@ -0,0 +1,341 @@
+"""N-D FFTs of host arrays larger than the memory of the devices
+
+The transform is decomposed into passes. Each pass transforms a group of
+axes, over chunks of the array that contain the whole extent of these axes
+and are small enough to fit on a device. A pass over one group of axes
+splitting the array along another axis is a slab decomposition; when even
+the slab of a single index does not fit, the axes are split into more
+groups, which gives a pencil decomposition.
+
+The chunks of a pass are dealt round-robin to the devices. Each device has
+two slots, each with a stream, a device buffer and a pinned staging
+buffer, so that the host gathers the next chunk and the previous chunk is
+scattered back while the device copies and transforms the current one.
+"""
+from __future__ import annotations
+
+import itertools
+import math
+
+import numpy
+
+import cupy
+from cupy.exceptions import AxisError
+from cupyx._pinned_array import empty_pinned
+from cupyx.scipy.fft import _fft
+
+
+# Number of chunks in flight per device
+_n_slots = 2
+
+
+def _normalize_axes(ndim, axes):
+    if axes is None:
+        return tuple(range(ndim))
+    axes = tuple(int(a) for a in axes)
+    for a in axes:
+        if not -ndim <= a < ndim:
+            raise AxisError(a, ndim)
+    axes = tuple(sorted(a % ndim for a in axes))
+    if len(set(axes)) != len(axes):
+        raise ValueError('all axes must be unique')
+    return axes
+
+
+class FFTDecomposition:
+    """Decomposition of an N-D FFT into passes over chunks of an array.
+
+    Instances are returned by :func:`plan_fftn_decomposition`. Planning
+    only depends on the shape and the data type, so it can be done and
+    inspected without any device.
+
+    Attributes:
+        shape (tuple of ints): Shape of the transformed array.
+        dtype (numpy.dtype): Complex data type of the transform.
+        passes (tuple of tuples of ints): Axes transformed by each pass.
+        blocks (tuple of tuples of ints): Shape of the chunks of each pass.
+            Chunks at the end of an axis may be shorter.
+        max_chunk_bytes (int): Upper bound of the size of a chunk.
+        n_devices (int): Number of devices the chunks are dealt to.
+    """
+
+    def __init__(self, shape, dtype, passes, blocks, max_chunk_bytes,
+                 n_devices):
+        self.shape = shape
+        self.dtype = dtype
+        self.passes = passes
+        self.blocks = blocks
+        self.max_chunk_bytes = max_chunk_bytes
+        self.n_devices = n_devices
+
+    def __repr__(self):
+        return (f'<FFTDecomposition kind={self.kind!r} shape={self.shape} '
+                f'passes={self.passes} blocks={self.blocks}>')
+
+    @property
+    def kind(self):
+        """``'in-core'``, ``'batched'``, ``'slab'`` or ``'pencil'``."""
+        if len(self.passes) > 2:
+            return 'pencil'
+        elif len(self.passes) == 2:
+            return 'slab'
+        elif self.n_chunks(0) > 1:
+            return 'batched'
+        return 'in-core'
+
+    def n_chunks(self, i):
+        """Returns the number of chunks of the ``i``-th pass."""
+        return math.prod(
+            -(-n // b) for n, b in zip(self.shape, self.blocks[i]))
+
+    def chunks(self, i):
+        """Iterates over the chunks of the ``i``-th pass.
+
+        Args:
+            i (int): Index of the pass.
+
+        Yields:
+            tuple of slices: The index of the chunk in the array.
+        """
+        ranges = [range(0, n, b) for n, b in zip(self.shape, self.blocks[i])]
+        for starts in itertools.product(*ranges):
+            yield tuple(
+                slice(s, min(s + b, n))
+                for s, b, n in zip(starts, self.blocks[i], self.shape))
+
+    def device_chunks(self, i, device_index):
+        """Iterates over the chunks of the ``i``-th pass given to a device.
+
+        Args:
+            i (int): Index of the pass.
+            device_index (int): Index of the device, from 0 to
+                ``n_devices - 1``.
+
+        Yields:
+            tuple of slices: The index of the chunk in the array.
+        """
+        return itertools.islice(
+            self.chunks(i), device_index, None, self.n_devices)
+
+
+def plan_fftn_decomposition(shape, dtype, axes=None, *,
+                            max_device_bytes=None, n_devices=1):
+    """Plans the decomposition of an N-D FFT too large for the devices.
+
+    The transformed axes are grouped into passes from the last one, as long
+    as the whole extent of the group fits in a chunk. The chunks of a pass
+    then take as many entries along the other axes as fit, again from the
+    last axis, so that they are as contiguous as possible in host memory.
+
+    Args:
+        shape (tuple of ints): Shape of the array.
+        dtype: Data type of the array. Real types are transformed as the
+            corresponding complex type.
+        axes (tuple of ints): Axes over which to compute the FFT. The
+            default is all the axes.
+        max_device_bytes (int): Memory each device may use. The chunks are
+            limited to a quarter of it, leaving room for the two slots in
+            flight and their cuFFT work areas. The default is half the free
+            memory of the current device.
+        n_devices (int): Number of devices the chunks are dealt to.
+
+    Returns:
+        FFTDecomposition: The decomposition.
+    """
+    shape = tuple(int(n) for n in shape)
+    dtype = numpy.result_type(dtype, numpy.complex64)
+    axes = _normalize_axes(len(shape), axes)
+    for a in axes:
+        if shape[a] < 1:
+            raise ValueError(
+                f'invalid number of data points ({shape[a]}) along axis '
+                f'{a}')
+    if n_devices < 1:
+        raise ValueError('n_devices must be positive')
+    if max_device_bytes is None:
+        max_device_bytes = cupy.cuda.Device().mem_info[0] // 2
+    max_chunk_bytes = max_device_bytes // (2 * _n_slots)
+    max_elems = max_chunk_bytes // dtype.itemsize
+
+    passes = []
+    group = []
+    for a in reversed(axes):
+        if shape[a] > max_elems:
+            raise ValueError(
+                f'a transform of length {shape[a]} along axis {a} does not '
+                f'fit in chunks of {max_chunk_bytes} bytes')
+        if math.prod(shape[b] for b in group) * shape[a] > max_elems:
+            passes.append(tuple(sorted(group)))
+            group = []
+        group.append(a)
+    if group or not passes:
+        passes.append(tuple(sorted(group)))
+
+    blocks = []
+    for group in passes:
+        block = list(shape)
+        size = math.prod(shape[a] for a in group)
+        for a in reversed(range(len(shape))):
+            if a in group:
+                continue
+            block[a] = max(min(max_elems // max(size, 1), shape[a]), 1)
+            size *= block[a]
+        blocks.append(tuple(block))
+    return FFTDecomposition(
+        shape, dtype, tuple(passes), tuple(blocks), max_chunk_bytes,
+        n_devices)
+
+
+class _Slot:
+    # A chunk in flight on a device
+
+    def __init__(self, n_elems, dtype):
+        self.stream = cupy.cuda.Stream(non_blocking=True)
+        self.buffer = cupy.empty(n_elems, dtype)
+        self.staging = empty_pinned(n_elems, dtype)
+        self.pending = None
+
+    def finish(self, out):
+        # Scatter the result of the previous chunk
+        if self.pending is not None:
+            self.stream.synchronize()
+            chunk, result = self.pending
+            out[chunk] = result
+            self.pending = None
+
+
+def _execute(x, decomposition, inverse, norm, devices, out):
+    d = decomposition
+    n_elems = max(math.prod(
+        min(b, n) for b, n in zip(block, d.shape)) for block in d.blocks)
+    slots = []
+    for device in devices:
+        with cupy.cuda.Device(device):
+            slots.append([_Slot(n_elems, d.dtype) for _ in range(_n_slots)])
+    transform = _fft.ifftn if inverse else _fft.fftn
+
+    src = x
+    for i, group in enumerate(d.passes):
+        for k, chunk in enumerate(d.chunks(i)):
+            device = k % len(devices)
+            slot = slots[device][k // len(devices) % _n_slots]
+            slot.finish(out)
+            shape = tuple(s.stop - s.start for s in chunk)
+            size = math.prod(shape)
+            staging = slot.staging[:size].reshape(shape)
+            # Gathering the chunk also converts to the complex type
+            staging[...] = src[chunk]
+            with cupy.cuda.Device(devices[device]), slot.stream:
+                buffer = slot.buffer[:size].reshape(shape)
+                buffer.set(staging, slot.stream)
+                result = buffer
+                if group:
+                    result = transform(
+                        buffer, axes=group, norm=norm, overwrite_x=True)
+                result.get(slot.stream, out=staging, blocking=False)
+            slot.pending = chunk, staging
+        # The next pass reads the results of this one
+        for device_slots in slots:
+            for slot in device_slots:
+                slot.finish(out)
+        src = out
+    return out
+
+
+def _fftn_out_of_core(x, axes, norm, devices, max_device_bytes,
+                      decomposition, out, inverse):
+    if isinstance(x, cupy.ndarray):
+        raise TypeError(
+            'the input must be on the host; use cupyx.scipy.fft.fftn for '
+            'device arrays')
+    x = numpy.asarray(x)
+    if devices is None:
+        devices = [cupy.cuda.Device().id]
+    devices = [int(getattr(dev, 'id', dev)) for dev in devices]
+    if decomposition is None:
+        decomposition = plan_fftn_decomposition(
+            x.shape, x.dtype, axes, max_device_bytes=max_device_bytes,
+            n_devices=len(devices))
+    else:
+        axes = _normalize_axes(x.ndim, axes)
+        dtype = numpy.result_type(x.dtype, numpy.complex64)
+        if (decomposition.shape != x.shape
+                or decomposition.dtype != dtype
+                or tuple(sorted(itertools.chain(*decomposition.passes)))
+                != axes):
+            raise ValueError(
+                'the decomposition does not match the input or the axes')
+        if decomposition.n_devices != len(devices):
+            raise ValueError(
+                'the decomposition does not match the number of devices')
+    if out is None:
+        out = numpy.empty(x.shape, decomposition.dtype)
+    elif out.shape != x.shape or out.dtype != decomposition.dtype:
+        raise ValueError(
+            f'out must be a {decomposition.dtype} array of shape {x.shape}')
+    return _execute(x, decomposition, inverse, norm, devices, out)
+
+
+def fftn_out_of_core(x, axes=None, norm=None, *, devices=None,
+                     max_device_bytes=None, decomposition=None, out=None):
+    """Compute the N-dimensional FFT of an array on the host.
+
+    The array is streamed through the devices in chunks, so that it may be
+    much larger than their memory. See :func:`plan_fftn_decomposition` for
+    how the transform is decomposed. Keeping ``x`` and ``out`` in pinned
+    memory (see :func:`cupyx.empty_pinned`) speeds up the gathering and
+    scattering of the chunks.
+
+    Args:
+        x (numpy.ndarray): Array to be transformed.
+        axes (tuple of ints): Axes over which to compute the FFT. The
+            default is all the axes.
+        norm (``"backward"``, ``"ortho"``, or ``"forward"``): Optional keyword
+            to specify the normalization mode. Default is ``None``, which is
+            an alias of ``"backward"``.
+        devices (list of ints or cupy.cuda.Device): Devices to use. The
+            default is the current device.
+        max_device_bytes (int): Memory each device may use. Ignored if
+            ``decomposition`` is given.
+        decomposition (FFTDecomposition): Decomposition returned by
+            :func:`plan_fftn_decomposition` for the shape of ``x`` and the
+            number of devices.
+        out (numpy.ndarray): Output array, of the complex type of ``x``. It
+            also holds the intermediate results between the passes.
+
+    Returns:
+        numpy.ndarray: The transformed array.
+
+    .. seealso:: :func:`cupyx.scipy.fft.fftn`
+    """
+    return _fftn_out_of_core(x, axes, norm, devices, max_device_bytes,
+                             decomposition, out, False)
+
+
+def ifftn_out_of_core(x, axes=None, norm=None, *, devices=None,
+                      max_device_bytes=None, decomposition=None, out=None):
+    """Compute the N-dimensional inverse FFT of an array on the host.
+
+    Args:
+        x (numpy.ndarray): Array to be transformed.
+        axes (tuple of ints): Axes over which to compute the FFT. The
+            default is all the axes.
+        norm (``"backward"``, ``"ortho"``, or ``"forward"``): Optional keyword
+            to specify the normalization mode. Default is ``None``, which is
+            an alias of ``"backward"``.
+        devices (list of ints or cupy.cuda.Device): Devices to use. The
+            default is the current device.
+        max_device_bytes (int): Memory each device may use. Ignored if
+            ``decomposition`` is given.
+        decomposition (FFTDecomposition): Decomposition returned by
+            :func:`plan_fftn_decomposition` for the shape of ``x`` and the
+            number of devices.
+        out (numpy.ndarray): Output array, of the complex type of ``x``.
+
+    Returns:
+        numpy.ndarray: The transformed array.
+
+    .. seealso:: :func:`fftn_out_of_core`
+    """
+    return _fftn_out_of_core(x, axes, norm, devices, max_device_bytes,
+                             decomposition, out, True)
@@ -15,6 +15,13 @@ match the normalization conventions in SciPy.
 The modifications to turn a type II or III DCT to a DST were implemented as
 described in [5]_.
 
+The reordering of the entries and the twiddle factors are each applied by a
+single elementwise kernel around a real FFT. Multidimensional transforms use
+the N-D form of the algorithm in [1]_: the input is reordered along all the
+axes at once, transformed by one N-D FFT, and the spectrum is twiddled into
+the output in one pass, instead of applying the 1-D transform along each
+axis in turn.
+
 .. [1] J. Makhoul, "A fast cosine transform in one and two dimensions," in
     IEEE Transactions on Acoustics, Speech, and Signal Processing, vol. 28,
     no. 1, pp. 27-34, February 1980.
@@ -39,7 +46,6 @@ import operator
 
 import cupy
 from cupy import _core
-from cupy.fft._fft import _cook_shape
 from cupyx.scipy.fft import _fft
 from cupy.exceptions import AxisError
 
@@ -88,47 +94,267 @@ def _get_dct_norm_factor(n, inorm, dct_type=2):
     return fct
 
 
-def _reshuffle_dct2(x, n, axis, dst=False):
-    """Reorder entries to allow computation of DCT/DST-II via FFT."""
-    sl_even = [slice(None)] * x.ndim
-    sl_even[axis] = slice(0, None, 2)
-    sl_even = tuple(sl_even)
-    sl_odd = [slice(None)] * x.ndim
-    if n % 2:
-        sl_odd[axis] = slice(-2, None, -2)
-        sl_odd = tuple(sl_odd)
-    else:
-        sl_odd[axis] = slice(None, None, -2)
-        sl_odd = tuple(sl_odd)
-    if dst:
-        x = cupy.concatenate((x[sl_even], -x[sl_odd]), axis=axis)
-    else:
-        x = cupy.concatenate((x[sl_even], x[sl_odd]), axis=axis)
-    return x
-
-
-_mult_factor_dct2 = _core.ElementwiseKernel(
-    in_params='R xr, int32 N, R norm_factor',
-    out_params='C y',
-    operation="""
-    C j(0., -1.);
-    y = (R)2.0 * norm_factor * exp(j * (R)(i * M_PI / (2 * N)));""",
-)
-
+def _get_inorm(norm, forward):
+    if norm == 'ortho':
+        return 'sqrt'
+    elif norm == 'forward':
+        return 'full' if forward else 'none'
+    elif norm == 'backward' or norm is None:
+        return 'none' if forward else 'full'
+    raise ValueError(f'Invalid norm value "{norm}", should be "backward", '
+                     '"ortho" or "forward"')
+
+
+# The kernels below work on the transformed axes moved last, through views
+# of the input and output arrays, so that no transposed copy is needed. `i`
+# is decomposed into the index along each of the `D` transformed axes, whose
+# sizes are `n`, and the index `b` of the batch.
+_r2r_shape_code = '''
+constexpr int D = {ndim};
+const ptrdiff_t n[D] = {{{n}}};
+const ptrdiff_t l[D] = {{{l}}};
+'''
+
+
+_dct2_pre_code = '''
+// Reorder the entries of each transformed axis as x[0], x[2], ..., x[3],
+// x[1], negating the odd entries for the DST, and zero-pad to `n`
+ptrdiff_t idx = i;
+ptrdiff_t src = 0;
+ptrdiff_t stride = 1;
+bool pad = false;
+bool neg = false;
+for (int a = D - 1; a >= 0; a--) {
+    const ptrdiff_t m = idx % n[a];
+    idx /= n[a];
+    const bool odd = m >= (n[a] + 1) / 2;
+    const ptrdiff_t p = odd ? 2 * (n[a] - m) - 1 : 2 * m;
+    pad |= p >= l[a];
+    neg ^= odd;
+    src += p * stride;
+    stride *= l[a];
+}
+src += idx * stride;
+const R val = pad ? (R)0 : x[src];
+v = (dst && neg) ? -val : val;
+'''
+
+
+_dct2_post_code = '''
+// Twiddle the half spectrum `V` of the reordered input. For more than one
+// axis, the spectrum is combined with its reflections along all the axes
+// but the last, following Makhoul's N-D algorithm.
+ptrdiff_t k[D];
+R cs[D];
+R sn[D];
+ptrdiff_t idx = i;
+R fct = scale;
+for (int a = D - 1; a >= 0; a--) {
+    k[a] = idx % n[a];
+    idx /= n[a];
+    if (dst) {
+        k[a] = n[a] - 1 - k[a];
+    }
+    if (k[a] == 0) {
+        fct *= k0_scale;
+    }
+    const R t = (R)(k[a] * M_PI / (2 * n[a]));
+    cs[a] = cos(t);
+    sn[a] = sin(t);
+}
+const ptrdiff_t b = idx;
+const ptrdiff_t n_half = n[D - 1] / 2 + 1;
+
+R acc = 0;
+for (int s = 0; s < (1 << (D - 1)); s++) {
+    // Axis `a` is reflected when bit `a` of `s` is set
+    C w(1, 0);
+    ptrdiff_t q[D];
+    for (int a = 0; a < D; a++) {
+        const bool ref = (s >> a) & 1;
+        w *= C(cs[a], ref ? sn[a] : -sn[a]);
+        q[a] = ref ? (n[a] - k[a]) % n[a] : k[a];
+    }
+    // The other half follows from the Hermitian symmetry of the spectrum
+    const bool cj = q[D - 1] >= n_half;
+    ptrdiff_t src = b;
+    for (int a = 0; a < D; a++) {
+        const ptrdiff_t qa = cj ? (n[a] - q[a]) % n[a] : q[a];
+        src = src * (a == D - 1 ? n_half : n[a]) + qa;
+    }
+    const C val = cj ? conj(V[src]) : V[src];
+    acc += (w * val).real();
+}
+y = fct * acc;
+'''
+
+
+_dct3_pre_code = '''
+// Twiddle the input into the half spectrum whose inverse real FFT is the
+// reordered output. Along each axis, bin `k` combines the inputs `k` and
+// `n - k`, so that 2**D inputs contribute to each bin in N-D.
+ptrdiff_t idx = i;
+ptrdiff_t k[D];
+k[D - 1] = idx % (n[D - 1] / 2 + 1);
+idx /= n[D - 1] / 2 + 1;
+for (int a = D - 2; a >= 0; a--) {
+    k[a] = idx % n[a];
+    idx /= n[a];
+}
+const ptrdiff_t b = idx;
+
+ptrdiff_t q[D][2];
+C w[D][2];
+for (int a = 0; a < D; a++) {
+    q[a][0] = k[a];
+    q[a][1] = (n[a] - k[a]) % n[a];
+    for (int r = 0; r < 2; r++) {
+        const R t = (R)(q[a][r] * M_PI / (2 * n[a]));
+        w[a][r] = C(cos(t), r ? -sin(t) : sin(t));
+        if (q[a][r] == 0) {
+            w[a][r] *= k0_scale;
+        }
+        if (dst) {
+            q[a][r] = n[a] - 1 - q[a][r];
+        }
+    }
+}
+
+C acc(0, 0);
+for (int s = 0; s < (1 << D); s++) {
+    C c(1, 0);
+    ptrdiff_t src = b;
+    bool pad = false;
+    for (int a = 0; a < D; a++) {
+        const int r = (s >> a) & 1;
+        c *= w[a][r];
+        pad |= q[a][r] >= l[a];
+        src = src * l[a] + q[a][r];
+    }
+    if (!pad) {
+        acc += c * x[src];
+    }
+}
+H = scale * acc;
+'''
+
+
+_dct3_post_code = '''
+// Inverse of the reordering of `_dct2_pre`
+ptrdiff_t idx = i;
+ptrdiff_t src = 0;
+ptrdiff_t stride = 1;
+bool neg = false;
+for (int a = D - 1; a >= 0; a--) {
+    const ptrdiff_t p = idx % n[a];
+    idx /= n[a];
+    const bool odd = p % 2;
+    src += (odd ? n[a] - 1 - p / 2 : p / 2) * stride;
+    neg ^= odd;
+    stride *= n[a];
+}
+src += idx * stride;
+y = (dst && neg) ? -v[src] : v[src];
+'''
+
+
+@cupy._util.memoize(for_each_device=True)
+def _get_r2r_kernel(name, ndim):
+    in_params, out_params, code = {
+        'dct2_pre': ('raw R x, bool dst', 'R v', _dct2_pre_code),
+        'dct2_post': ('raw C V, bool dst, R scale, R k0_scale', 'R y',
+                      _dct2_post_code),
+        'dct3_pre': ('raw R x, bool dst, R scale, R k0_scale', 'C H',
+                     _dct3_pre_code),
+        'dct3_post': ('raw R v, bool dst', 'R y', _dct3_post_code),
+    }[name]
+    in_params += ''.join(f', int64 n{a}, int64 l{a}' for a in range(ndim))
+    shape_code = _r2r_shape_code.format(
+        ndim=ndim,
+        n=', '.join(f'(ptrdiff_t)n{a}' for a in range(ndim)),
+        l=', '.join(f'(ptrdiff_t)l{a}' for a in range(ndim)))
+    return _core.ElementwiseKernel(
+        in_params, out_params, shape_code + code,
+        f'cupyx_scipy_fft_{name}_{ndim}d')
+
+
+def _dct_or_dst_nd(x, shape, axes, dct_type, norm, forward, dst):
+    """DCT/DST-II or III over several axes with fused reordering and twiddles
+
+    Type II transforms reorder the input along each axis into a single
+    kernel pass, take one real N-D FFT, and twiddle its half spectrum into
+    the output in a second pass. Type III transforms run the same steps
+    backwards with an inverse real N-D FFT. The transformed axes are moved
+    last in both passes, so that cuFFT sees contiguous axes and no
+    transposed copy of the data is made. Zero-padding and truncation to
+    `shape` are also folded into the first pass.
 
-def _exp_factor_dct2(x, n, axis, norm_factor, n_truncate=None):
-    """Twiddle & scaling factors for computation of DCT/DST-II via FFT."""
-    if n_truncate is None:
-        n_truncate = n
-    tmp = cupy.empty((n_truncate,), dtype=x.dtype)
-    _mult_factor_dct2(tmp.real, n, norm_factor, tmp)
+    Parameters
+    ----------
+    x : cupy.ndarray
+        The real data to transform.
+    shape : sequence of int or None
+        The sizes of the transforms. If an entry is None, the size of `x`
+        along the corresponding axis is used.
+    axes : sequence of int
+        Non-negative axes along which the transform is applied.
+    dct_type : {2, 3}
+        The type of the transform.
+    norm : {None, 'ortho', 'forward', 'backward'}
+        The normalization convention to use.
+    forward : bool
+        Set true to indicate that this is a forward transform as opposed to
+        the inverse of the other type (the difference between the two is
+        only in the normalization factor).
+    dst : bool
+        If True, a discrete sine transform is computed rather than the
+        discrete cosine transform.
 
-    if x.ndim == 1:
-        return tmp
-    tmp_shape = [1] * x.ndim
-    tmp_shape[axis] = n_truncate
-    tmp_shape = tuple(tmp_shape)
-    return tmp.reshape(tmp_shape)
+    Returns
+    -------
+    y: cupy.ndarray
+        The transformed array.
+    """
+    inorm = _get_inorm(norm, forward)
+    ns = [x.shape[a] if n is None else n for n, a in zip(shape, axes)]
+
+    # Truncation is a view, padding is done by the kernels
+    sl = [slice(None)] * x.ndim
+    for n, a in zip(ns, axes):
+        sl[a] = slice(0, n)
+    x = x[tuple(sl)]
+    ls = [x.shape[a] for a in axes]
+    out_shape = list(x.shape)
+    for n, a in zip(ns, axes):
+        out_shape[a] = n
+
+    ndim = len(axes)
+    perm = [a for a in range(x.ndim) if a not in axes] + list(axes)
+    batch_shape = tuple(x.shape[a] for a in perm[:x.ndim - ndim])
+    fft_axes = tuple(range(-ndim, 0))
+    sizes = [v for nl in zip(ns, ls) for v in nl]
+    norm_factor = math.prod(
+        _get_dct_norm_factor(n, inorm=inorm, dct_type=dct_type) for n in ns)
+    out = cupy.empty(out_shape, dtype=x.dtype)
+
+    if dct_type == 2:
+        v = cupy.empty(batch_shape + tuple(ns), dtype=x.dtype)
+        _get_r2r_kernel('dct2_pre', ndim)(x.transpose(perm), dst, *sizes, v)
+        v = _fft.rfftn(v, axes=fft_axes, overwrite_x=True)
+        k0_scale = math.sqrt(0.5) if norm == 'ortho' else 1
+        _get_r2r_kernel('dct2_post', ndim)(
+            v, dst, 2 * norm_factor, k0_scale, *sizes, out.transpose(perm))
+    else:
+        h_shape = batch_shape + tuple(ns[:-1]) + (ns[-1] // 2 + 1,)
+        dtype = cupy.promote_types(x.dtype, cupy.complex64)
+        h = cupy.empty(h_shape, dtype=dtype)
+        k0_scale = math.sqrt(0.5) if norm == 'ortho' else 0.5
+        scale = norm_factor * math.prod(ns)
+        _get_r2r_kernel('dct3_pre', ndim)(
+            x.transpose(perm), dst, scale, k0_scale, *sizes, h)
+        v = _fft.irfftn(h, s=ns, axes=fft_axes, overwrite_x=True)
+        _get_r2r_kernel('dct3_post', ndim)(v, dst, *sizes, out.transpose(perm))
+    return out
 
 
 def _dct_or_dst_type2(
@@ -170,85 +396,7 @@ def _dct_or_dst_type2(
         raise ValueError(
             f'invalid number of data points ({n}) specified'
         )
-
-    x = _cook_shape(x, (n,), (axis,), 'R2R')
-    n = x.shape[axis]
-
-    x = _reshuffle_dct2(x, x.shape[axis], axis, dst)
-
-    if norm == 'ortho':
-        inorm = 'sqrt'
-    elif norm == 'forward':
-        inorm = 'full' if forward else 'none'
-    else:
-        inorm = 'none' if forward else 'full'
-    norm_factor = _get_dct_norm_factor(n, inorm=inorm, dct_type=2)
-
-    x = _fft.fft(x, n=n, axis=axis, overwrite_x=True)
-    tmp = _exp_factor_dct2(x, n, axis, norm_factor)
-
-    x *= tmp  # broadcasting
-    x = cupy.real(x)
-
-    if norm == 'ortho':
-        sl0 = [slice(None)] * x.ndim
-        sl0[axis] = slice(1)
-        x[tuple(sl0)] *= math.sqrt(2) * 0.5
-
-    if dst:
-        slrev = [slice(None)] * x.ndim
-        slrev[axis] = slice(None, None, -1)
-        x = x[tuple(slrev)]
-    return x
-
-
-def _reshuffle_dct3(y, n, axis, dst):
-    """Reorder entries to allow computation of DCT/DST-II via FFT."""
-    x = cupy.empty_like(y)
-    n_half = (n + 1) // 2
-
-    # Store first half of y in the even entries of the output
-    sl_even = [slice(None)] * y.ndim
-    sl_even[axis] = slice(0, None, 2)
-    sl_even = tuple(sl_even)
-
-    sl_half = [slice(None)] * y.ndim
-    sl_half[axis] = slice(0, n_half)
-    x[sl_even] = y[tuple(sl_half)]
-
-    # Store the second half of y in the odd entries of the output
-    sl_odd = [slice(None)] * y.ndim
-    sl_odd[axis] = slice(1, None, 2)
-    sl_odd = tuple(sl_odd)
-
-    sl_half[axis] = slice(-1, n_half - 1, -1)
-    if dst:
-        x[sl_odd] = -y[tuple(sl_half)]
-    else:
-        x[sl_odd] = y[tuple(sl_half)]
-    return x
-
-
-_mult_factor_dct3 = _core.ElementwiseKernel(
-    in_params='R xr, int32 N, R norm_factor',
-    out_params='C y',
-    operation="""
-    C j(0., 1.);
-    y = (R)(2 * N * norm_factor) * exp(j * (R)(i * M_PI / (2 * N)));""",
-)
-
-
-def _exp_factor_dct3(x, n, axis, dtype, norm_factor):
-    """Twiddle & scaling factors for computation of DCT/DST-III via FFT."""
-    tmp = cupy.empty((n,), dtype=dtype)
-    _mult_factor_dct3(tmp.real, n, norm_factor, tmp)
-    if x.ndim == 1:
-        return tmp
-    # prepare shape for broadcasting along non-transformed axes
-    tmp_shape = [1] * x.ndim
-    tmp_shape[axis] = n
-    tmp_shape = tuple(tmp_shape)
-    return tmp.reshape(tmp_shape)
+    return _dct_or_dst_nd(x, (n,), (axis,), 2, norm, forward, dst)
 
 
 def _dct_or_dst_type3(
@@ -291,53 +439,7 @@ def _dct_or_dst_type3(
         raise ValueError(
             f'invalid number of data points ({n}) specified'
         )
-
-    x = _cook_shape(x, (n,), (axis,), 'R2R')
-    n = x.shape[axis]
-
-    # determine normalization factor
-    if norm == 'ortho':
-        sl0_scale = 0.5 * math.sqrt(2)
-        inorm = 'sqrt'
-    elif norm == 'forward':
-        sl0_scale = 0.5
-        inorm = 'full' if forward else 'none'
-    elif norm == 'backward' or norm is None:
-        sl0_scale = 0.5
-        inorm = 'none' if forward else 'full'
-    else:
-        raise ValueError(f'Invalid norm value "{norm}", should be "backward", '
-                         '"ortho" or "forward"')
-    norm_factor = _get_dct_norm_factor(n, inorm=inorm, dct_type=3)
-    dtype = cupy.promote_types(x, cupy.complex64)
-
-    sl0 = [slice(None)] * x.ndim
-    sl0[axis] = slice(1)
-
-    if dst:
-        slrev = [slice(None)] * x.ndim
-        slrev[axis] = slice(None, None, -1)
-        x = x[tuple(slrev)]
-        if norm == 'ortho':
-            float_dtype = cupy.promote_types(x.dtype, cupy.float32)
-            if x.dtype != float_dtype:
-                x = x.astype(float_dtype)
-            elif not overwrite_x:
-                x = x.copy()
-            x[tuple(sl0)] *= math.sqrt(2)
-            sl0_scale = 0.5
-
-    # scale by exponentials and normalization factor
-    tmp = _exp_factor_dct3(x, n, axis, dtype, norm_factor)
-    x = x * tmp  # broadcasting
-    x[tuple(sl0)] *= sl0_scale
-
-    # inverse fft
-    x = _fft.ifft(x, n=n, axis=axis, overwrite_x=True)
-    x = cupy.real(x)
-
-    # reorder entries
-    return _reshuffle_dct3(x, n, axis, dst)
+    return _dct_or_dst_nd(x, (n,), (axis,), 3, norm, forward, dst)
 
 
 @_fft._implements(_fft._scipy_fft.dct)
@@ -737,11 +839,16 @@ def dctn(x, type=2, s=None, axes=None, norm=None, overwrite_x=False):
     if len(axes) == 0:
         return x
 
-    for n, axis in zip(shape, axes):
-        x = dct(
-            x, type=type, n=n, axis=axis, norm=norm, overwrite_x=overwrite_x
+    if type == 2 or type == 3:
+        return _dct_or_dst_nd(
+            x, shape, axes, type, norm, forward=True, dst=False
         )
-    return x
+    elif type in [1, 4]:
+        raise NotImplementedError(
+            'Only DCT-II and DCT-III have been implemented.'
+        )
+    else:
+        raise ValueError('invalid DCT type')
 
 
 @_fft._implements(_fft._scipy_fft.idctn)
@@ -797,11 +904,17 @@ def idctn(x, type=2, s=None, axes=None, norm=None, overwrite_x=False):
     if len(axes) == 0:
         return x
 
-    for n, axis in zip(shape, axes):
-        x = idct(
-            x, type=type, n=n, axis=axis, norm=norm, overwrite_x=overwrite_x
+    if type == 2 or type == 3:
+        # DCT-III is the inverse of DCT-II and vice versa
+        return _dct_or_dst_nd(
+            x, shape, axes, 5 - type, norm, forward=False, dst=False
         )
-    return x
+    elif type in [1, 4]:
+        raise NotImplementedError(
+            'Only DCT-II and DCT-III have been implemented.'
+        )
+    else:
+        raise ValueError('invalid DCT type')
 
 
 @_fft._implements(_fft._scipy_fft.dstn)
@@ -857,11 +970,16 @@ def dstn(x, type=2, s=None, axes=None, norm=None, overwrite_x=False):
     if len(axes) == 0:
         return x
 
-    for n, axis in zip(shape, axes):
-        x = dst(
-            x, type=type, n=n, axis=axis, norm=norm, overwrite_x=overwrite_x
+    if type == 2 or type == 3:
+        return _dct_or_dst_nd(
+            x, shape, axes, type, norm, forward=True, dst=True
         )
-    return x
+    elif type in [1, 4]:
+        raise NotImplementedError(
+            'Only DST-II and DST-III have been implemented.'
+        )
+    else:
+        raise ValueError('invalid DST type')
 
 
 @_fft._implements(_fft._scipy_fft.idstn)
@@ -917,8 +1035,14 @@ def idstn(x, type=2, s=None, axes=None, norm=None, overwrite_x=False):
     if len(axes) == 0:
         return x
 
-    for n, axis in zip(shape, axes):
-        x = idst(
-            x, type=type, n=n, axis=axis, norm=norm, overwrite_x=overwrite_x
+    if type == 2 or type == 3:
+        # DST-III is the inverse of DST-II and vice versa
+        return _dct_or_dst_nd(
+            x, shape, axes, 5 - type, norm, forward=False, dst=True
         )
-    return x
+    elif type in [1, 4]:
+        raise NotImplementedError(
+            'Only DST-II and DST-III have been implemented.'
+        )
+    else:
+        raise ValueError('invalid DST type')
@@ -24,6 +24,7 @@ from cupyx.scipy.signal._signaltools import hilbert2  # NOQA
 
 from cupyx.scipy.signal._resample import resample  # NOQA
 from cupyx.scipy.signal._resample import resample_poly  # NOQA
+from cupyx.scipy.signal._resample import Resampler  # NOQA
 from cupyx.scipy.signal._resample import decimate  # NOQA
 
 from cupyx.scipy.signal._polyutils import unique_roots  # NOQA
@@ -137,7 +138,15 @@ from cupyx.scipy.signal._lti_conversion import abcd_normalize   # NOQA
 
 from cupyx.scipy.signal._upfirdn import upfirdn  # NOQA
 
+from cupyx.scipy.signal._streaming import StreamingSTFT  # NOQA
+from cupyx.scipy.signal._streaming import StreamingISTFT  # NOQA
+from cupyx.scipy.signal._streaming import StreamingLFilter  # NOQA
+from cupyx.scipy.signal._streaming import StreamingSOSFilter  # NOQA
+from cupyx.scipy.signal._streaming import StreamingUpFIRDn  # NOQA
+from cupyx.scipy.signal._streaming import StreamingConvolver  # NOQA
+
 from cupyx.scipy.signal._peak_finding import find_peaks  # NOQA
+from cupyx.scipy.signal._peak_finding import find_peaks_batched  # NOQA
 from cupyx.scipy.signal._peak_finding import peak_prominences  # NOQA
 from cupyx.scipy.signal._peak_finding import peak_widths  # NOQA
 
@@ -18,6 +18,8 @@ CZT : callable (x, axis=-1) -> array
    Define a chirp z-transform that can be applied to different signals.
 ZoomFFT : callable (x, axis=-1) -> array
    Define a Fourier transform on a range of frequencies.
+MultiZoomFFT : callable (x, axis=-1) -> array
+   Define a Fourier transform on several ranges of frequencies.
 
 Functions
 ---------
@@ -32,11 +34,17 @@ from __future__ import annotations
 
 import cmath
 import numbers
+import threading
+import numpy
 import cupy
 from numpy import pi
-from cupyx.scipy.fft import fft, ifft, next_fast_len
+from cupyx.scipy.fft import fft, ifft, next_fast_len, get_fft_plan
 
-__all__ = ['czt', 'zoom_fft', 'CZT', 'ZoomFFT', 'czt_points']
+__all__ = ['czt', 'zoom_fft', 'CZT', 'ZoomFFT', 'MultiZoomFFT', 'czt_points']
+
+# Number of signal shapes for which a transform keeps a work buffer and a
+# cuFFT plan
+_MAX_PLANS = 8
 
 
 def _validate_sizes(n, m):
@@ -148,6 +156,11 @@ class CZT:
     The chirp z-transform can be faster than an equivalent FFT with
     zero padding.  Try it with your own array sizes to see.
 
+    For the last few shapes of the signals it was called with, the object
+    keeps a padded work buffer and the cuFFT plan of the convolution with
+    the chirp, in which both FFTs are computed in place. Repeated calls on
+    signals of the same shape thus only allocate the output array.
+
     However, the chirp z-transform is considerably less precise than the
     equivalent zero-padded FFT.
 
@@ -194,6 +207,40 @@ class CZT:
         self._Fwk2 = fft(1/cupy.hstack((wk2[n-1:0:-1], wk2[:m])), nfft)
         self._wk2 = wk2[:m]
         self._yidx = slice(n-1, n+m-1)
+        self._tls = threading.local()
+
+    def _get_plans(self):
+        # The work buffers are kept per thread, as threads may run the
+        # transform concurrently, even on the same stream
+        plans = getattr(self._tls, 'plans', None)
+        if plans is None:
+            plans = self._tls.plans = {}
+        return plans
+
+    def _convolve(self, x, Awk2, Fwk2):
+        # Convolution of the signals multiplied by `Awk2` with the chirp, in
+        # the work buffer for the shape of the signals and with its plan
+        shape = numpy.broadcast_shapes(x.shape, Awk2.shape)[:-1]
+        dtype = cupy.result_type(x, Awk2)
+        key = (shape, dtype, cupy.cuda.Device().id,
+               cupy.cuda.get_current_stream().ptr)
+        plans = self._get_plans()
+        entry = plans.pop(key, None)
+        if entry is None:
+            if len(plans) >= _MAX_PLANS:
+                del plans[next(iter(plans))]
+            buf = cupy.empty(shape + (self._nfft,), dtype=dtype)
+            plan = get_fft_plan(buf, axes=-1) if buf.size else None
+            entry = (buf, plan)
+        # Most recently used last
+        plans[key] = entry
+        buf, plan = entry
+
+        cupy.multiply(x, Awk2, out=buf[..., :self.n])
+        buf[..., self.n:] = 0
+        y = fft(buf, overwrite_x=True, plan=plan)
+        y *= Fwk2
+        return ifft(y, overwrite_x=True, plan=plan)
 
     def __call__(self, x, *, axis=-1):
         """
@@ -221,7 +268,7 @@ class CZT:
         trnsp = list(range(x.ndim))
         trnsp[axis], trnsp[-1] = trnsp[-1], trnsp[axis]
         x = x.transpose(*trnsp)
-        y = ifft(self._Fwk2 * fft(x*self._Awk2, self._nfft))
+        y = self._convolve(x, self._Awk2, self._Fwk2)
         y = y[..., self._yidx] * self._wk2
         return y.transpose(*trnsp)
 
@@ -335,6 +382,131 @@ class ZoomFFT(CZT):
         self._Fwk2 = fft(1/cupy.hstack((wk2[n-1:0:-1], wk2[:m])), nfft)
         self._wk2 = wk2[:m]
         self._yidx = slice(n-1, n+m-1)
+        self._tls = threading.local()
+
+
+class MultiZoomFFT(CZT):
+    """
+    Create a callable zoom FFT transform function for several ranges.
+
+    This evaluates the Fourier transform on several ranges of frequencies,
+    each as `ZoomFFT` would. The chirps of all the ranges are precalculated,
+    and the transforms of all the ranges are computed by the same batched
+    FFTs.
+
+    Parameters
+    ----------
+    n : int
+        The size of the signal.
+    fn : array_like
+        A sequence of `n_ranges` length-2 sequences [`f1`, `f2`] giving the
+        frequency ranges, or a 1-D sequence of scalars, for which the ranges
+        [0, `fn`] are assumed.
+    m : int, optional
+        The number of points to evaluate in each range.  Default is `n`.
+    fs : float, optional
+        The sampling frequency, as in `ZoomFFT`.
+    endpoint : bool, optional
+        If True, `f2` is the last sample. Otherwise, it is not included.
+        Default is False.
+
+    Returns
+    -------
+    f : MultiZoomFFT
+        Callable object ``f(x, axis=-1)`` for computing the zoom FFTs on
+        `x`.
+
+    See Also
+    --------
+    ZoomFFT : Class that creates a callable partial FFT function.
+
+    Examples
+    --------
+    >>> import cupy
+    >>> from cupyx.scipy.signal import MultiZoomFFT
+    >>> transform = MultiZoomFFT(1000, [[0.1, 0.2], [0.5, 0.55]], m=64)
+    >>> x = cupy.random.randn(8, 1000)
+    >>> transform(x).shape
+    (8, 2, 64)
+    """
+
+    def __init__(self, n, fn, m=None, *, fs=2, endpoint=False):
+        m = _validate_sizes(n, m)
+
+        k = cupy.arange(max(m, n), dtype=cupy.min_scalar_type(-max(m, n)**2))
+
+        fn = cupy.asarray(fn, dtype=cupy.float64)
+        if fn.ndim == 1:
+            f1, f2 = cupy.zeros_like(fn), fn
+        elif fn.ndim == 2 and fn.shape[1] == 2:
+            f1, f2 = fn[:, 0], fn[:, 1]
+        else:
+            raise ValueError(
+                'fn must be a 1-D sequence of scalars or of 2-length '
+                'sequences')
+
+        self.f1, self.f2, self.fs = f1, f2, fs
+
+        if endpoint:
+            scale = ((f2 - f1) * m) / (fs * (m - 1))
+        else:
+            scale = (f2 - f1) / fs
+        wk2 = cupy.exp(-(1j * pi * scale[:, None] * k**2) / m)
+
+        self.w = cupy.exp(-2j * pi / m * scale)
+        self.a = cupy.exp(2j * pi * f1 / fs)
+        self.m, self.n = m, n
+
+        ak = cupy.exp(-2j * pi * f1[:, None] / fs * k[:n])
+        self._Awk2 = ak * wk2[:, :n]
+
+        nfft = next_fast_len(n + m - 1)
+        self._nfft = nfft
+        self._Fwk2 = fft(1/cupy.concatenate(
+            (wk2[:, n-1:0:-1], wk2[:, :m]), axis=-1), nfft)
+        self._wk2 = wk2[:, :m]
+        self._yidx = slice(n-1, n+m-1)
+        self._tls = threading.local()
+
+    def __call__(self, x, *, axis=-1):
+        """
+        Calculate the zoom FFTs of a signal.
+
+        Parameters
+        ----------
+        x : array
+            The signal to transform.
+        axis : int, optional
+            Axis over which to compute the FFT. If not given, the last axis is
+            used.
+
+        Returns
+        -------
+        out : ndarray
+            An array of the same dimensions as `x`, but with the transformed
+            axis replaced by two axes of lengths `n_ranges` and `m`.
+        """
+        x = cupy.asarray(x)
+        if x.shape[axis] != self.n:
+            raise ValueError(f"MultiZoomFFT defined for length {self.n}, not "
+                             f"{x.shape[axis]}")
+        axis %= x.ndim
+        x = cupy.moveaxis(x, axis, -1)
+        y = self._convolve(x[..., None, :], self._Awk2, self._Fwk2)
+        y = y[..., self._yidx] * self._wk2
+        return cupy.moveaxis(y, (-2, -1), (axis, axis + 1))
+
+    def points(self):
+        """
+        Return the points at which the zoom FFTs are computed.
+
+        Returns
+        -------
+        out : ndarray
+            An array of shape ``(n_ranges, m)`` of the points of each range.
+        """
+        k = cupy.arange(self.m)
+        return self.a[:, None] * self.w[:, None] ** -k
 
 
 def czt(x, m=None, w=None, a=1+0j, *, axis=-1):
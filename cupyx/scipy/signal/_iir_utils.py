@@ -531,7 +531,8 @@ def compute_correction_factors(a, block_sz, dtype):
     return correction
 
 
-def apply_iir(x, a, axis=-1, zi=None, dtype=None, block_sz=1024):
+def apply_iir(x, a, axis=-1, zi=None, dtype=None, block_sz=1024,
+              correction=None):
     # GPU throughput is faster when using single precision floating point
     # numbers
     # x = x.astype(cupy.float32)
@@ -560,20 +561,16 @@ def apply_iir(x, a, axis=-1, zi=None, dtype=None, block_sz=1024):
     n_blocks = (n + block_sz - 1) // block_sz
     total_blocks = num_rows * n_blocks
 
-    correction = cupy.eye(k, dtype=dtype)
-    correction = cupy.c_[
-        correction[::-1], cupy.empty((k, block_sz), dtype=dtype)]
+    if correction is None:
+        correction = compute_correction_factors(a, block_sz, dtype)
     carries = cupy.empty(
         (num_rows, n_blocks, k), dtype=dtype)
 
-    corr_kernel = _get_module_func(
-        IIR_MODULE, 'compute_correction_factors', correction, a)
     first_pass_kernel = _get_module_func(IIR_MODULE, 'first_pass_iir', out)
     second_pass_kernel = _get_module_func(IIR_MODULE, 'second_pass_iir', out)
     carry_correction_kernel = _get_module_func(
         IIR_MODULE, 'correct_carries', out)
 
-    corr_kernel((k,), (1,), (block_sz, k, a, correction))
     first_pass_kernel((total_blocks,), (block_sz // 2,),
                       (block_sz, k, n, n_blocks, (n_blocks) * k,
                        correction, out, carries))
@@ -623,8 +620,17 @@ def compute_correction_factors_sos(sos, block_sz, dtype):
     return correction
 
 
+def _last_two(prev, out, n):
+    # Last two samples of each row, completed with the previous ones for
+    # signals shorter than two samples
+    if n >= 2:
+        return axis_slice(out, n - 2, n)
+    out = out.reshape(prev.shape[0], n)
+    return cupy.concatenate((prev, out), axis=-1)[:, -2:]
+
+
 def apply_iir_sos(x, sos, axis=-1, zi=None, dtype=None, block_sz=1024,
-                  apply_fir=True, out=None):
+                  apply_fir=True, out=None, correction=None):
     if dtype is None:
         dtype = cupy.result_type(x.dtype, sos.dtype)
 
@@ -654,7 +660,8 @@ def apply_iir_sos(x, sos, axis=-1, zi=None, dtype=None, block_sz=1024,
     n_blocks = (n + block_sz - 1) // block_sz
     total_blocks = num_rows * n_blocks
 
-    correction = compute_correction_factors_sos(sos, block_sz, dtype)
+    if correction is None:
+        correction = compute_correction_factors_sos(sos, block_sz, dtype)
     carries = cupy.empty(
         (num_rows, n_blocks, k), dtype=dtype)
     all_carries = carries
@@ -686,7 +693,7 @@ def apply_iir_sos(x, sos, axis=-1, zi=None, dtype=None, block_sz=1024,
         if zi is not None:
             section_zi = zi[s, :, :2]
             all_carries[:, 0, :] = section_zi
-            zi_out[s, :, :2] = axis_slice(out, n - 2, n)
+            zi_out[s, :, :2] = _last_two(section_zi, out, n)
 
         if apply_fir:
             fir_kernel((num_rows * n_blocks,), (block_sz,),
@@ -719,7 +726,7 @@ def apply_iir_sos(x, sos, axis=-1, zi=None, dtype=None, block_sz=1024,
                  out, all_carries))
 
         if zi is not None:
-            zi_out[s, :, 2:] = axis_slice(out, n - 2, n)
+            zi_out[s, :, 2:] = _last_two(zi[s, :, 2:], out, n)
 
     if x_ndim > 1:
         out = out.reshape(x_shape)
@@ -30,6 +30,7 @@ from __future__ import annotations
 import math
 import cupy
 
+from cupy._core import internal
 from cupy._core._scalar import get_typename
 from cupy_backends.cuda.api import runtime
 
@@ -74,24 +75,27 @@ PEAKS_KERNEL = r"""
 
 template<typename T>
 __global__ void local_maxima_1d(
-        const int n, const T* __restrict__ x, long long* midpoints,
-        long long* left_edges, long long* right_edges) {
+        const int n, const long long n_samples, const T* __restrict__ x,
+        long long* midpoints, long long* left_edges, long long* right_edges) {
 
-    const int orig_idx = blockDim.x * blockIdx.x + threadIdx.x;
-    const int idx = orig_idx + 1;
+    // `x` holds rows of `n` samples, whose inner samples are all searched
+    const long long orig_idx = (long long) blockDim.x * blockIdx.x + threadIdx.x;
 
-    if(idx >= n - 1) {
+    if(orig_idx >= n_samples) {
         return;
     }
 
+    const long long row_end = (orig_idx / (n - 2) + 1) * n - 1;
+    const long long idx = row_end - n + 2 + orig_idx % (n - 2);
+
     long long midpoint = -1;
     long long left = -1;
     long long right = -1;
 
     if(x[idx - 1] < x[idx]) {
-        int i_ahead = idx + 1;
+        long long i_ahead = idx + 1;
 
-        while(i_ahead < n - 1 && x[i_ahead] == x[idx]) {
+        while(i_ahead < row_end && x[i_ahead] == x[idx]) {
             i_ahead++;
         }
 
@@ -118,9 +122,10 @@ __global__ void peak_prominences(
         return;
     }
 
+    // Peaks are searched in their row of `n` samples
     const long long peak = peaks[idx];
-    long long i_min = 0;
-    long long i_max = n - 1;
+    long long i_min = peak - peak % n;
+    long long i_max = i_min + n - 1;
 
     if(wlen >= 2) {
         i_min = max(peak - wlen / 2, i_min);
@@ -165,9 +170,10 @@ __global__ void peak_prominences<half>(
         return;
     }
 
+    // Peaks are searched in their row of `n` samples
     const long long peak = peaks[idx];
-    long long i_min = 0;
-    long long i_max = n - 1;
+    long long i_min = peak - peak % n;
+    long long i_max = i_min + n - 1;
 
     if(wlen >= 2) {
         i_min = max(peak - wlen / 2, i_min);
@@ -201,6 +207,83 @@ __global__ void peak_prominences<half>(
     prominences[idx] = x[peak] - __hmax(left_min, right_min);
 }
 
+template<typename T>
+__device__ bool higher_priority(
+        const T a, const long long i, const T b, const long long j) {
+    // Order of a stable argsort of the priorities, with NaNs last
+    const bool a_nan = a != a;
+    const bool b_nan = b != b;
+    if(a_nan != b_nan) {
+        return a_nan;
+    }
+    if(!a_nan && a != b) {
+        return a > b;
+    }
+    return i > j;
+}
+
+template<typename T>
+__global__ void peak_distance_select(
+        const int n_peaks, const long long n, const long long distance,
+        const long long* __restrict__ peaks, const T* __restrict__ priority,
+        signed char* state) {
+
+    // Keep the undecided peaks (state 0) with the highest priority among
+    // the peaks of their row closer than `distance` which are not removed
+    // (state 2). Peaks kept concurrently are never neighbours.
+    const int idx = blockDim.x * blockIdx.x + threadIdx.x;
+    if(idx >= n_peaks || state[idx] != 0) {
+        return;
+    }
+
+    const long long peak = peaks[idx];
+    const long long row_start = peak - peak % n;
+    const T p = priority[idx];
+
+    for(int k = idx - 1; k >= 0 && peaks[k] >= row_start
+            && peak - peaks[k] < distance; k--) {
+        if(state[k] != 2 && higher_priority(priority[k], k, p, idx)) {
+            return;
+        }
+    }
+    for(int k = idx + 1; k < n_peaks && peaks[k] < row_start + n
+            && peaks[k] - peak < distance; k++) {
+        if(state[k] != 2 && higher_priority(priority[k], k, p, idx)) {
+            return;
+        }
+    }
+    state[idx] = 1;
+}
+
+__global__ void peak_distance_remove(
+        const int n_peaks, const long long n, const long long distance,
+        const long long* __restrict__ peaks, signed char* state) {
+
+    // Remove the undecided peaks closer than `distance` to a kept peak
+    const int idx = blockDim.x * blockIdx.x + threadIdx.x;
+    if(idx >= n_peaks || state[idx] != 0) {
+        return;
+    }
+
+    const long long peak = peaks[idx];
+    const long long row_start = peak - peak % n;
+
+    for(int k = idx - 1; k >= 0 && peaks[k] >= row_start
+            && peak - peaks[k] < distance; k--) {
+        if(state[k] == 1) {
+            state[idx] = 2;
+            return;
+        }
+    }
+    for(int k = idx + 1; k < n_peaks && peaks[k] < row_start + n
+            && peaks[k] - peak < distance; k++) {
+        if(state[k] == 1) {
+            state[idx] = 2;
+            return;
+        }
+    }
+}
+
 template<typename T>
 __global__ void peak_widths(
         const int n, const T* __restrict__ x,
@@ -310,7 +393,9 @@ PEAKS_MODULE = cupy.RawModule(
     code=PEAKS_KERNEL,
     name_expressions=[f'local_maxima_1d<{x}>' for x in TYPE_NAMES] +
     [f'peak_prominences<{x}>' for x in TYPE_NAMES] +
-    [f'peak_widths<{x}>' for x in TYPE_NAMES])
+    [f'peak_widths<{x}>' for x in TYPE_NAMES] +
+    [f'peak_distance_select<{x}>' for x in TYPE_NAMES] +
+    ['peak_distance_remove'])
 
 
 ARGREL_KERNEL = r"""
@@ -490,7 +575,13 @@ def _get_module_func(module, func_name, *template_args):
 
 
 def _local_maxima_1d(x):
-    samples = x.shape[0] - 2
+    # Local maxima in each row of the C-contiguous array `x`, as indices in
+    # the flattened array
+    n = x.shape[-1]
+    samples = max(n - 2, 0) * (x.size // n if n else 0)
+    if samples == 0:
+        empty = cupy.empty(0, dtype=cupy.int64)
+        return empty, empty, empty
     block_sz = 128
     n_blocks = (samples + block_sz - 1) // block_sz
 
@@ -500,7 +591,7 @@ def _local_maxima_1d(x):
 
     local_max_kernel = _get_module_func(PEAKS_MODULE, 'local_maxima_1d', x)
     local_max_kernel((n_blocks,), (block_sz,),
-                     (x.shape[0], x, midpoints, left_edges, right_edges))
+                     (n, samples, x, midpoints, left_edges, right_edges))
 
     pos_idx = midpoints > 0
     midpoints = midpoints[pos_idx]
@@ -547,12 +638,12 @@ def _unpack_condition_args(interval, x, peaks):
         if imin.size != x.size:
             raise ValueError(
                 'array size of lower interval border must match x')
-        imin = imin[peaks]
+        imin = imin.ravel()[peaks]
     if isinstance(imax, cupy.ndarray):
         if imax.size != x.size:
             raise ValueError(
                 'array size of upper interval border must match x')
-        imax = imax[peaks]
+        imax = imax.ravel()[peaks]
 
     return imin, imax
 
@@ -632,7 +723,7 @@ def _select_by_peak_threshold(x, peaks, tmin, tmax):
     return keep, stacked_thresholds[0], stacked_thresholds[1]
 
 
-def _select_by_peak_distance(peaks, priority, distance):
+def _select_by_peak_distance(peaks, priority, distance, n=None):
     """
     Evaluate which peaks fulfill the distance condition.
 
@@ -645,6 +736,10 @@ def _select_by_peak_distance(peaks, priority, distance):
         peak with a higher priority value is kept over one with a lower one.
     distance : np.float64
         Minimal distance that peaks must be spaced.
+    n : int, optional
+        Length of the rows of the signals, if `peaks` are sorted indices in
+        several consecutive signals. Peaks of different rows never exclude
+        each other.
 
     Returns
     -------
@@ -654,48 +749,38 @@ def _select_by_peak_distance(peaks, priority, distance):
 
     Notes
     -----
-    Declaring the input arrays as C-contiguous doesn't seem to have performance
-    advantages.
+    The peaks are processed by order of decreasing priority in SciPy, and a
+    kept peak removes its neighbours closer than `distance`. The same peaks
+    are kept in rounds: the peaks with the highest priority among their
+    remaining neighbours are kept, and then their neighbours are removed.
+    Each round is a kernel launch for all the peaks of all the signals, and
+    the number of rounds is the length of the longest chain of neighbours
+    with increasing priorities.
     """
     peaks_size = peaks.shape[0]
+    state = cupy.zeros(peaks_size, dtype=cupy.int8)
+    if peaks_size == 0:
+        return state == 0
+    if n is None:
+        n = int(peaks[-1]) + 1
     # Round up because actual peak distance can only be natural number
-    distance_ = cupy.ceil(distance)
-    keep = cupy.ones(peaks_size, dtype=cupy.bool_)  # Prepare array of flags
-
-    # Create map from `i` (index for `peaks` sorted by `priority`) to `j`
-    # (index for `peaks` sorted by position). This allows to iterate `peaks`
-    # and `keep` with `j` by order of `priority` while still maintaining the
-    # ability to step to neighbouring peaks with (`j` + 1) or (`j` - 1).
-    priority_to_position = cupy.argsort(priority)
-
-    # Highest priority first -> iterate in reverse order (decreasing)
-
-    # NOTE: There's not an alternative way to do this procedure in a parallel
-    # fashion, since discarding a peak requires to know if there's a valid
-    # neighbour that subsumes it, which in turn requires to know
-    # if that neighbour is valid. If it was to done in parallel, there would be
-    # tons of repeated computations per peak, thus increasing the total runtime
-    # per peak compared to a sequential implementation.
-    for i in range(peaks_size - 1, -1, -1):
-        # "Translate" `i` to `j` which points to current peak whose
-        # neighbours are to be evaluated
-        j = priority_to_position[i]
-        if keep[j] == 0:
-            # Skip evaluation for peak already marked as "don't keep"
-            continue
-
-        k = j - 1
-        # Flag "earlier" peaks for removal until minimal distance is exceeded
-        while 0 <= k and peaks[j] - peaks[k] < distance_:
-            keep[k] = 0
-            k -= 1
-
-        k = j + 1
-        # Flag "later" peaks for removal until minimal distance is exceeded
-        while k < peaks_size and peaks[k] - peaks[j] < distance_:
-            keep[k] = 0
-            k += 1
-    return keep
+    distance_ = math.ceil(distance)
+
+    block_sz = 128
+    n_blocks = (peaks_size + block_sz - 1) // block_sz
+    select_kernel = _get_module_func(
+        PEAKS_MODULE, 'peak_distance_select', priority)
+    remove_kernel = _get_module_func(PEAKS_MODULE, 'peak_distance_remove')
+
+    # Every round keeps at least the peak with the highest priority left
+    while True:
+        select_kernel((n_blocks,), (block_sz,),
+                      (peaks_size, n, distance_, peaks, priority, state))
+        remove_kernel((n_blocks,), (block_sz,),
+                      (peaks_size, n, distance_, peaks, state))
+        if not (state == 0).any():
+            break
+    return state == 1
 
 
 def _arg_x_as_expected(value):
@@ -787,7 +872,8 @@ def _peak_prominences(x, peaks, wlen=None, check=False):
     peak_prom_kernel = _get_module_func(PEAKS_MODULE, 'peak_prominences', x)
     peak_prom_kernel(
         (n_blocks,), (block_sz,),
-        (x.shape[0], n, x, peaks, wlen, prominences, left_bases, right_bases))
+        (x.shape[-1], n, x, peaks, wlen, prominences, left_bases,
+         right_bases))
 
     return prominences, left_bases, right_bases
 
@@ -1151,10 +1237,20 @@ def find_peaks(x, height=None, threshold=None, distance=None,
     """  # NOQA
 
     x = _arg_x_as_expected(x)
+    return _find_peaks(x[None], height, threshold, distance, prominence,
+                       width, wlen, rel_height, plateau_size)
+
+
+def _find_peaks(x, height, threshold, distance, prominence, width, wlen,
+                rel_height, plateau_size):
+    # Peaks in the rows of the 2-D C-contiguous array `x`, as indices in the
+    # flattened array, with their properties
     if distance is not None and distance < 1:
         raise ValueError('`distance` must be greater or equal to 1')
 
+    x_rows = x
     peaks, left_edges, right_edges = _local_maxima_1d(x)
+    x = x.ravel()
     properties = {}
 
     if plateau_size is not None:
@@ -1189,7 +1285,8 @@ def find_peaks(x, height=None, threshold=None, distance=None,
 
     if distance is not None:
         # Evaluate distance condition
-        keep = _select_by_peak_distance(peaks, x[peaks], distance)  # NOQA
+        keep = _select_by_peak_distance(
+            peaks, x[peaks], distance, x_rows.shape[-1])
         peaks = peaks[keep]
         properties = {key: array[keep] for key, array in properties.items()}
 
@@ -1198,7 +1295,7 @@ def find_peaks(x, height=None, threshold=None, distance=None,
         wlen = _arg_wlen_as_expected(wlen)  # NOQA
         properties.update(zip(
             ['prominences', 'left_bases', 'right_bases'],
-            _peak_prominences(x, peaks, wlen=wlen)  # NOQA
+            _peak_prominences(x_rows, peaks, wlen=wlen)  # NOQA
         ))
 
     if prominence is not None:
@@ -1224,6 +1321,98 @@ def find_peaks(x, height=None, threshold=None, distance=None,
     return peaks, properties
 
 
+def _move_condition_axis(interval, axis):
+    # Arrange the arrays of a condition of `find_peaks_batched` as the
+    # signals, with the samples along the last axis
+    if isinstance(interval, cupy.ndarray):
+        interval = (interval, None)
+    elif not isinstance(interval, (tuple, list)):
+        return interval
+    return tuple(
+        cupy.moveaxis(value, axis, -1)
+        if isinstance(value, cupy.ndarray) and value.ndim == 2 else value
+        for value in interval)
+
+
+def find_peaks_batched(x, height=None, threshold=None, distance=None,
+                       prominence=None, width=None, wlen=None, rel_height=0.5,
+                       plateau_size=None, axis=-1):
+    """
+    Find peaks inside many signals based on peak properties.
+
+    This is the batched version of `find_peaks` for a 2-D array of signals.
+    The peaks of all the signals are found and selected at once by kernels
+    processing all the signals, and returned in compressed sparse row (CSR)
+    form: the peaks of the signal ``i`` are
+    ``peaks[offsets[i]:offsets[i + 1]]``.
+
+    Parameters
+    ----------
+    x : array_like
+        A 2-D array of signals.
+    height, threshold, distance, prominence : optional
+        Conditions on the peaks, as in `find_peaks`. The arrays given as
+        interval borders must have the shape of `x`.
+    width, wlen, rel_height, plateau_size : optional
+        Conditions on the widths and plateaus of the peaks, as in
+        `find_peaks`.
+    axis : int, optional
+        The axis of `x` along which the samples of each signal are. The
+        other axis enumerates the signals. Default is -1.
+
+    Returns
+    -------
+    offsets : ndarray
+        Array of ``n_signals + 1`` offsets of the peaks of each signal in
+        `peaks` and in the arrays of `properties`.
+    peaks : ndarray
+        Indices of peaks in their signal that satisfy all given conditions.
+    properties : dict
+        A dictionary containing properties of the returned peaks, as in
+        `find_peaks`. The indices are relative to the start of the signal of
+        each peak.
+
+    See Also
+    --------
+    find_peaks
+        Find peaks inside a signal.
+
+    Examples
+    --------
+    >>> import cupy
+    >>> from cupyx.scipy.signal import find_peaks_batched
+    >>> x = cupy.array([[0, 2, 0, 3, 0], [0, 0, 1, 0, 0]])
+    >>> offsets, peaks, _ = find_peaks_batched(x)
+    >>> offsets
+    array([0, 2, 3])
+    >>> peaks
+    array([1, 3, 2])
+    """
+    x = cupy.asarray(x)
+    if x.ndim != 2:
+        raise ValueError('`x` must be a 2-D array')
+    axis = internal._normalize_axis_index(axis, x.ndim)
+    height, threshold, prominence, width, plateau_size = [
+        _move_condition_axis(interval, axis) for interval in (
+            height, threshold, prominence, width, plateau_size)]
+    x = cupy.ascontiguousarray(cupy.moveaxis(x, axis, -1))
+
+    peaks, properties = _find_peaks(
+        x, height, threshold, distance, prominence, width, wlen, rel_height,
+        plateau_size)
+
+    n_signals, n = x.shape
+    signals = peaks // n
+    starts = signals * n
+    offsets = cupy.zeros(n_signals + 1, dtype=cupy.int64)
+    cupy.cumsum(cupy.bincount(signals, minlength=n_signals), out=offsets[1:])
+    for key in ('left_edges', 'right_edges', 'left_bases', 'right_bases',
+                'left_ips', 'right_ips'):
+        if key in properties:
+            properties[key] = properties[key] - starts
+    return offsets, peaks - starts, properties
+
+
 def _peak_finding(data, comparator, axis, order, mode, results):
     comp = _modedict[comparator]
     clip = mode == 'clip'
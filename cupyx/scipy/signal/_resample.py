@@ -39,7 +39,8 @@ from cupyx.scipy.signal._iir_filter_conversions import zpk2sos
 from cupyx.scipy.signal._ltisys import dlti
 from cupyx.scipy.signal._upfirdn import upfirdn, _output_len
 from cupyx.scipy.signal._signaltools import (
-    sosfiltfilt, filtfilt, sosfilt, lfilter)
+    sosfiltfilt, filtfilt, sosfilt, lfilter, _validate_x)
+from cupyx.scipy.signal._streaming import StreamingUpFIRDn
 from cupyx.scipy.signal.windows._windows import get_window
 
 
@@ -98,6 +99,40 @@ def _design_resample_poly(up, down, window):
     return h
 
 
+def _resample_poly_filter(up, down, window):
+    # Polyphase filter of `resample_poly` for the reduced `up` and `down`,
+    # zero-padded so that output `i` of `upfirdn` with it is the resampled
+    # sample `i - n_pre_remove`, for any length of the signal
+    if isinstance(window, (list, cupy.ndarray)):
+        window = cupy.asarray(window)
+        if window.ndim > 1:
+            raise ValueError("window must be 1-D")
+        half_len = (window.size - 1) // 2
+        h = up * window
+    else:
+        half_len = 10 * max(up, down)
+        h = up * _design_resample_poly(up, down, window)
+
+    # Zero-pad our filter to put the output samples at the center
+    n_pre_pad = down - half_len % down
+    n_post_pad = 0
+    n_pre_remove = (half_len + n_pre_pad) // down
+    # Both sides of the condition grow by `up` when the length of the signal
+    # grows by `down`, so checking one period of lengths is enough. We
+    # should rarely need to do this given our filter lengths...
+    for in_len in range(1, down + 1):
+        n_out = -(-in_len * up // down)
+        while (
+            _output_len(len(h) + n_pre_pad + n_post_pad, in_len, up, down)
+            < n_out + n_pre_remove
+        ):
+            n_post_pad += 1
+
+    h = cupy.concatenate(
+        (cupy.zeros(n_pre_pad, h.dtype), h, cupy.zeros(n_post_pad, h.dtype)))
+    return h, n_pre_remove
+
+
 def decimate(x, q, n=None, ftype='iir', axis=-1, zero_phase=True):
     """
     Downsample the signal after applying an anti-aliasing filter.
@@ -528,29 +563,7 @@ def resample_poly(x, up, down, axis=0, window=("kaiser", 5.0),
     n_out = x.shape[axis] * up
     n_out = n_out // down + bool(n_out % down)
 
-    if isinstance(window, (list, cupy.ndarray)):
-        window = cupy.asarray(window)
-        if window.ndim > 1:
-            raise ValueError("window must be 1-D")
-        half_len = (window.size - 1) // 2
-        h = up * window
-    else:
-        half_len = 10 * max(up, down)
-        h = up * _design_resample_poly(up, down, window)
-
-    # Zero-pad our filter to put the output samples at the center
-    n_pre_pad = down - half_len % down
-    n_post_pad = 0
-    n_pre_remove = (half_len + n_pre_pad) // down
-    # We should rarely need to do this given our filter lengths...
-    while (
-        _output_len(len(h) + n_pre_pad + n_post_pad, x.shape[axis], up, down)
-        < n_out + n_pre_remove
-    ):
-        n_post_pad += 1
-
-    h = cupy.concatenate(
-        (cupy.zeros(n_pre_pad, h.dtype), h, cupy.zeros(n_post_pad, h.dtype)))
+    h, n_pre_remove = _resample_poly_filter(up, down, window)
     n_pre_remove_end = n_pre_remove + n_out
 
     # filter then remove excess
@@ -559,3 +572,155 @@ def resample_poly(x, up, down, axis=0, window=("kaiser", 5.0),
     keep[axis] = slice(n_pre_remove, n_pre_remove_end)
 
     return y[tuple(keep)]
+
+
+class Resampler:
+    """
+    Polyphase resampler for a fixed rational rate change.
+
+    The low-pass filter of :func:`resample_poly` is designed once and its
+    polyphase arrangement is kept on the device, so that resampling many
+    signals or many blocks of a long signal does not redo the setup. All
+    the channels of a batch are resampled with a single kernel launch.
+
+    Calling the object resamples whole signals, with the same result as
+    ``resample_poly(x, up, down, axis, window)``. The :meth:`process` and
+    :meth:`flush` methods resample a signal received in blocks along the
+    last axis, carrying the filter state between the blocks; concatenating
+    their outputs gives the same result as resampling the whole signal.
+
+    Parameters
+    ----------
+    up : int
+        The upsampling factor.
+    down : int
+        The downsampling factor.
+    window : string, tuple, or array_like, optional
+        Desired window to use to design the low-pass filter, or the FIR filter
+        coefficients to employ. See `resample_poly` for details.
+
+    Attributes
+    ----------
+    up : int
+        The upsampling factor, divided by ``gcd(up, down)``.
+    down : int
+        The downsampling factor, divided by ``gcd(up, down)``.
+
+    See Also
+    --------
+    resample_poly : Resample a signal using the polyphase method.
+    StreamingUpFIRDn : Upsample, FIR filter, and downsample a signal
+        received in blocks.
+
+    Examples
+    --------
+    >>> import cupy
+    >>> from cupyx.scipy.signal import Resampler
+    >>> resampler = Resampler(160, 441)
+    >>> x = cupy.random.randn(8, 44100)
+    >>> y = resampler(x, axis=-1)
+    >>> y.shape
+    (8, 16000)
+    """
+
+    def __init__(self, up, down, window=("kaiser", 5.0)):
+        up = int(up)
+        down = int(down)
+        if up < 1 or down < 1:
+            raise ValueError("up and down must be >= 1")
+        g_ = gcd(up, down)
+        self.up = up // g_
+        self.down = down // g_
+        if self.up == self.down == 1:
+            self._stream = None
+        else:
+            h, self._n_pre_remove = _resample_poly_filter(
+                self.up, self.down, window)
+            self._stream = StreamingUpFIRDn(h, self.up, self.down)
+        self.reset()
+
+    def _n_out(self, n_in):
+        return -(-n_in * self.up // self.down)
+
+    def __call__(self, x, axis=0):
+        """Resample whole signals.
+
+        Parameters
+        ----------
+        x : array_like
+            The data to be resampled.
+        axis : int, optional
+            The axis of `x` that is resampled. Default is 0.
+
+        Returns
+        -------
+        resampled_x : ndarray
+            The resampled array.
+        """
+        x = cupy.asarray(x)
+        if self._stream is None:
+            return x.copy()
+        stream = self._stream
+        f = stream._filter(cupy.result_type(stream._h, x, cupy.float32))
+        y = f.apply_filter(x, axis)
+        start = self._n_pre_remove
+        keep = [slice(None)] * x.ndim
+        keep[axis] = slice(start, start + self._n_out(x.shape[axis]))
+        return y[tuple(keep)]
+
+    def reset(self):
+        """Discard the state carried from the previous blocks."""
+        if self._stream is not None:
+            self._stream.reset()
+        self._n_in = 0
+        self._n_emitted = 0
+        self._empty = None
+
+    def process(self, x):
+        """Resample a block of the signal.
+
+        Parameters
+        ----------
+        x : array_like
+            Block of the signal, along the last axis. The other axes are
+            independent channels, and must be the same for all the blocks.
+
+        Returns
+        -------
+        y : ndarray
+            The resampled samples that depend only on the samples received
+            so far.
+        """
+        x = _validate_x(x)
+        if self._stream is None:
+            self._empty = x[..., :0]
+            return x.copy()
+        self._n_in += x.shape[-1]
+        y = self._stream.process(x)
+        # Drop the outputs of the filter delay
+        n_before = self._stream._n_out - y.shape[-1]
+        y = y[..., max(self._n_pre_remove - n_before, 0):]
+        self._n_emitted += y.shape[-1]
+        return y
+
+    def flush(self):
+        """Return the resampled samples depending on the last block, and
+        reset.
+
+        Returns
+        -------
+        y : ndarray
+            The remaining resampled samples.
+        """
+        if self._stream is None:
+            y = cupy.empty(0) if self._empty is None else self._empty.copy()
+            self.reset()
+            return y
+        n_total = self._n_out(self._n_in)
+        # `StreamingUpFIRDn.flush` resets its output count
+        n_before = self._stream._n_out
+        y = self._stream.flush()
+        start = max(self._n_pre_remove - n_before, 0)
+        y = y[..., start:n_total - self._n_emitted + start]
+        self.reset()
+        return y
@@ -0,0 +1,987 @@
+"""
+Stateful objects processing signals received in consecutive blocks.
+
+Each object keeps on the device the part of the signal that the next block
+depends on, so that the concatenation of the outputs for a signal split into
+blocks of any length equals the output of the corresponding one-shot
+function for the whole signal.
+"""
+from __future__ import annotations
+
+import math
+import warnings
+
+import cupy
+
+from cupyx.scipy.ndimage import _filters
+import cupyx.scipy.signal._signaltools as filtering
+from cupyx.scipy.signal._arraytools import _as_strided
+from cupyx.scipy.signal._iir_utils import (
+    apply_iir, apply_iir_sos, compute_correction_factors,
+    compute_correction_factors_sos)
+from cupyx.scipy.signal._spectral import check_NOLA
+from cupyx.scipy.signal._upfirdn import _output_len, _UpFIRDn
+from cupyx.scipy.signal.windows._windows import get_window
+
+
+def _parse_window(window, nperseg):
+    if isinstance(window, str) or type(window) is tuple:
+        if nperseg is None:
+            nperseg = 256
+        nperseg = int(nperseg)
+        if nperseg < 1:
+            raise ValueError('nperseg must be a positive integer')
+        return get_window(window, nperseg), nperseg
+    win = cupy.asarray(window)
+    if win.ndim != 1:
+        raise ValueError('window must be 1-D')
+    if nperseg is not None and int(nperseg) != win.shape[0]:
+        raise ValueError(
+            'value specified for nperseg is different from length of window')
+    return win, win.shape[0]
+
+
+def _parse_overlap(nperseg, noverlap, nfft):
+    if nfft is None:
+        nfft = nperseg
+    elif nfft < nperseg:
+        raise ValueError('nfft must be greater than or equal to nperseg.')
+    if noverlap is None:
+        noverlap = nperseg // 2
+    noverlap = int(noverlap)
+    if noverlap >= nperseg:
+        raise ValueError('noverlap must be less than nperseg.')
+    if noverlap < 0:
+        raise ValueError('noverlap must be a nonnegative integer')
+    return noverlap, int(nfft)
+
+
+def _overlap_add(out, frames, nstep):
+    # Add the frames (..., k, nperseg) into `out` (..., >= nperseg +
+    # (k - 1) * nstep), frame j starting at j * nstep. The frames are added
+    # in slices of `nstep` samples, which do not overlap across frames, so
+    # that all the frames are added at once for each slice.
+    nframes, nperseg = frames.shape[-2:]
+    if nframes == 0:
+        return
+    lead_strides = out.strides[:-1]
+    itemsize = out.strides[-1]
+    for lo in range(0, nperseg, nstep):
+        hi = min(lo + nstep, nperseg)
+        view = _as_strided(
+            out[..., lo:], shape=out.shape[:-1] + (nframes, hi - lo),
+            strides=lead_strides + (nstep * itemsize, itemsize))
+        view += frames[..., lo:hi]
+
+
+class StreamingSTFT:
+    r"""
+    Short Time Fourier Transform of a signal received in blocks.
+
+    The blocks can have any length. The samples that the next segments
+    overlap are kept on the device, and all the segments completed by a
+    block are transformed with a single batched FFT, so that the cuFFT plan
+    and the scaled window are reused for all the blocks.
+
+    Concatenating the outputs of :meth:`process` for all the blocks and of
+    :meth:`flush` along the last axis gives the same result as
+    ``stft(x, ..., boundary=None, padded=True)`` for the whole signal.
+
+    Parameters
+    ----------
+    fs : float, optional
+        Sampling frequency of the signal. Defaults to 1.0.
+    window : str or tuple or array_like, optional
+        Desired window to use, as in `stft`. Defaults to a Hann window.
+    nperseg : int, optional
+        Length of each segment. Defaults to 256 if `window` is a string or
+        tuple, and to the length of the window otherwise.
+    noverlap : int, optional
+        Number of points to overlap between segments. If `None`,
+        ``noverlap = nperseg // 2``.
+    nfft : int, optional
+        Length of the FFT used, if a zero padded FFT is desired. If `None`,
+        the FFT length is `nperseg`.
+    detrend : str or function or `False`, optional
+        Specifies how to detrend each segment, as in `stft`. Defaults to
+        `False`.
+    return_onesided : bool, optional
+        If `True`, return a one-sided spectrum for real data. For complex
+        data, a two-sided spectrum is always returned.
+    scaling : {'spectrum', 'psd'}
+        The scaling of the STFT, as in `stft`.
+
+    See Also
+    --------
+    stft: Short Time Fourier Transform of a whole signal
+    StreamingISTFT: Inverse of a STFT received in blocks
+
+    Examples
+    --------
+    >>> import cupy
+    >>> from cupyx.scipy.signal import StreamingSTFT
+    >>> engine = StreamingSTFT(fs=1e3, nperseg=128)
+    >>> blocks = [cupy.random.randn(1000) for _ in range(10)]
+    >>> Zxx = cupy.concatenate(
+    ...     [engine.process(b) for b in blocks] + [engine.flush()], axis=-1)
+    >>> Zxx.shape
+    (65, 156)
+    """
+
+    def __init__(self, fs=1.0, window='hann', nperseg=None, noverlap=None,
+                 nfft=None, detrend=False, return_onesided=True,
+                 scaling='spectrum'):
+        win, nperseg = _parse_window(window, nperseg)
+        noverlap, nfft = _parse_overlap(nperseg, noverlap, nfft)
+
+        if scaling == 'spectrum':
+            scale = 1.0 / win.sum()
+        elif scaling == 'psd':
+            scale = 1.0 / cupy.sqrt(fs * (win * win).sum())
+        else:
+            raise ValueError(
+                f"Parameter {scaling=} not in ['spectrum', 'psd']!")
+
+        if not detrend:
+            self._detrend = None
+        elif not callable(detrend):
+            def detrend_func(d):
+                return filtering.detrend(d, type=detrend, axis=-1)
+            self._detrend = detrend_func
+        else:
+            self._detrend = detrend
+
+        self.fs = fs
+        self.nperseg = nperseg
+        self.noverlap = noverlap
+        self.nfft = nfft
+        self.return_onesided = return_onesided
+        self._nstep = nperseg - noverlap
+        # Window including the scaling of the transform, for each dtype
+        self._scaled_win = win * scale
+        self._win_cache = {}
+        self.reset()
+
+    def reset(self):
+        """Discard the samples kept from the previous blocks."""
+        self._tail = None
+        self._onesided = self.return_onesided
+        self._n_frames = 0
+
+    @property
+    def n_frames(self):
+        """Number of segments returned since the last reset."""
+        return self._n_frames
+
+    @property
+    def freqs(self):
+        """Array of the sample frequencies."""
+        if self._onesided:
+            return cupy.fft.rfftfreq(self.nfft, 1 / self.fs)
+        return cupy.fft.fftfreq(self.nfft, 1 / self.fs)
+
+    def frame_times(self, start=0, stop=None):
+        """Return the times of the centers of the segments.
+
+        Parameters
+        ----------
+        start : int, optional
+            Index of the first segment since the last reset.
+        stop : int, optional
+            Index after the last segment. Defaults to :attr:`n_frames`.
+
+        Returns
+        -------
+        t : ndarray
+            Array of the segment times.
+        """
+        if stop is None:
+            stop = self._n_frames
+        return (cupy.arange(start, stop) * self._nstep
+                + self.nperseg / 2) / float(self.fs)
+
+    def _window(self, dtype):
+        win = self._win_cache.get(dtype)
+        if win is None:
+            win = self._scaled_win.astype(dtype)
+            self._win_cache[dtype] = win
+        return win
+
+    def _transform(self, data, nframes):
+        shape = data.shape[:-1] + (nframes, self.nperseg)
+        strides = data.strides[:-1] + (
+            self._nstep * data.strides[-1], data.strides[-1])
+        frames = _as_strided(data, shape=shape, strides=strides)
+        if self._detrend is not None and nframes:
+            frames = self._detrend(frames)
+        outdtype = cupy.result_type(data, cupy.complex64)
+        frames = frames * self._window(outdtype.char.lower())
+        if self._onesided:
+            result = cupy.fft.rfft(frames, n=self.nfft)
+        else:
+            result = cupy.fft.fft(frames, n=self.nfft)
+        self._n_frames += nframes
+        # Frequency axis before the time axis, as in stft
+        return cupy.moveaxis(result.astype(outdtype, copy=False), -1, -2)
+
+    def process(self, x):
+        """Transform the segments completed by a block of the signal.
+
+        Parameters
+        ----------
+        x : array_like
+            Block of the signal, along the last axis. The other axes are
+            independent channels, and must be the same for all the blocks.
+
+        Returns
+        -------
+        Zxx : ndarray
+            STFT of the segments completed by the block, with the frequency
+            axis before the last axis, which is the segment axis.
+        """
+        x = cupy.asarray(x)
+        if x.ndim == 0:
+            raise ValueError('x must be at least 1-D')
+        if self._tail is None:
+            if self._onesided and x.dtype.kind == 'c':
+                warnings.warn(
+                    'Input data is complex, switching to '
+                    'return_onesided=False')
+                self._onesided = False
+            data = x
+        else:
+            if x.shape[:-1] != self._tail.shape[:-1]:
+                raise ValueError(
+                    'x must have the shape {} except for the last '
+                    'axis'.format(self._tail.shape[:-1]))
+            data = cupy.concatenate(
+                (self._tail, x.astype(self._tail.dtype, copy=False)),
+                axis=-1)
+
+        n = data.shape[-1]
+        nframes = 0
+        if n >= self.nperseg:
+            nframes = (n - self.noverlap) // self._nstep
+        result = self._transform(data, nframes)
+        self._tail = data[..., nframes * self._nstep:].copy()
+        return result
+
+    def flush(self):
+        """Transform the remaining samples padded with zeros, and reset.
+
+        Returns
+        -------
+        Zxx : ndarray
+            STFT of the last segment, which is empty if no sample is left
+            after the last complete segment.
+        """
+        if self._tail is None:
+            nfreq = self.nfft // 2 + 1 if self._onesided else self.nfft
+            return cupy.empty((nfreq, 0), dtype=cupy.complex128)
+        # A segment is left if there are samples after the overlap with
+        # the last segment, which is the whole tail before the first one
+        tail = self._tail
+        nframes = 0
+        if tail.shape[-1] > self.noverlap:
+            pad = cupy.zeros(
+                tail.shape[:-1] + (self.nperseg - tail.shape[-1],),
+                dtype=tail.dtype)
+            tail = cupy.concatenate((tail, pad), axis=-1)
+            nframes = 1
+        result = self._transform(tail, nframes)
+        self.reset()
+        return result
+
+
+class StreamingISTFT:
+    r"""
+    Inverse Short Time Fourier Transform of segments received in blocks.
+
+    The segments are inverted with a single batched FFT for each block and
+    overlap-added on the device. The samples that the following segments
+    do not overlap are returned, and the others are kept for the next
+    block.
+
+    Concatenating the outputs of :meth:`process` for all the blocks and of
+    :meth:`flush` gives the same result as
+    ``istft(Zxx, ..., boundary=False)`` for the whole STFT.
+
+    Parameters
+    ----------
+    fs : float, optional
+        Sampling frequency of the signal. Defaults to 1.0.
+    window : str or tuple or array_like, optional
+        Desired window to use, as in `istft`. Defaults to a Hann window.
+    nperseg : int, optional
+        Number of data points per segment. If `None`, it is determined from
+        the number of frequencies of the first block, as in `istft`.
+    noverlap : int, optional
+        Number of points to overlap between segments. If `None`, half of
+        the segment length.
+    nfft : int, optional
+        Number of FFT points, as in `istft`.
+    input_onesided : bool, optional
+        Interpret the input as one-sided FFTs. Defaults to `True`.
+    scaling : {'spectrum', 'psd'}
+        The scaling of the STFT, as in `istft`.
+
+    See Also
+    --------
+    istft: Inverse Short Time Fourier Transform of a whole STFT
+    StreamingSTFT: Short Time Fourier Transform of a signal received in
+        blocks
+    """
+
+    def __init__(self, fs=1.0, window='hann', nperseg=None, noverlap=None,
+                 nfft=None, input_onesided=True, scaling='spectrum'):
+        if scaling not in ('spectrum', 'psd'):
+            raise ValueError(
+                f"Parameter {scaling=} not in ['spectrum', 'psd']!")
+        if nperseg is not None:
+            nperseg = int(nperseg)
+            if nperseg < 1:
+                raise ValueError('nperseg must be a positive integer')
+        self.fs = fs
+        self.window = window
+        self.nperseg = nperseg
+        self.noverlap = noverlap
+        self.nfft = nfft
+        self.input_onesided = input_onesided
+        self.scaling = scaling
+        self._win = None
+        self.reset()
+
+    def reset(self):
+        """Discard the samples kept from the previous blocks."""
+        self._acc = None
+        self._norm = None
+
+    def _setup(self, nfreq):
+        # Determine the segment parameters from the first block as istft
+        if self.input_onesided:
+            n_default = 2 * (nfreq - 1)
+        else:
+            n_default = nfreq
+        nperseg = self.nperseg
+        if nperseg is None:
+            if isinstance(self.window, str) or type(self.window) is tuple:
+                nperseg = n_default
+            else:
+                nperseg = len(self.window)
+        nfft = self.nfft
+        if nfft is None:
+            if self.input_onesided and nperseg == n_default + 1:
+                # Odd nperseg, no FFT padding
+                nfft = nperseg
+            else:
+                nfft = n_default
+        win, nperseg = _parse_window(self.window, nperseg)
+        noverlap, nfft = _parse_overlap(nperseg, self.noverlap, nfft)
+
+        if not check_NOLA(win, nperseg, noverlap):
+            warnings.warn('NOLA condition failed, STFT may not be invertible')
+        if self.scaling == 'spectrum':
+            synth = win * win.sum()
+        else:
+            synth = win * cupy.sqrt(self.fs * cupy.sum(win ** 2))
+
+        self.nperseg = nperseg
+        self.noverlap = noverlap
+        self.nfft = nfft
+        self._nstep = nperseg - noverlap
+        self._win = win
+        self._synth_win = synth
+        self._win_sq = win * win
+
+    def process(self, Zxx):
+        """Reconstruct the samples completed by a block of segments.
+
+        Parameters
+        ----------
+        Zxx : array_like
+            Block of the STFT, with the frequency axis before the last axis,
+            which is the segment axis. The other axes are independent
+            channels, and must be the same for all the blocks.
+
+        Returns
+        -------
+        x : ndarray
+            The samples that the following segments do not overlap.
+        """
+        Zxx = cupy.asarray(Zxx)
+        if Zxx.ndim < 2:
+            raise ValueError('Input stft must be at least 2d!')
+        Zxx = Zxx.astype(cupy.result_type(Zxx, cupy.complex64), copy=False)
+        if self._win is None:
+            self._setup(Zxx.shape[-2])
+        nstep = self._nstep
+        nframes = Zxx.shape[-1]
+        lead = Zxx.shape[:-2]
+
+        ifunc = cupy.fft.irfft if self.input_onesided else cupy.fft.ifft
+        frames = ifunc(cupy.moveaxis(Zxx, -1, -2), n=self.nfft)
+        frames = frames[..., :self.nperseg]
+        dtype = frames.dtype
+        synth = self._synth_win.astype(dtype, copy=False)
+        frames *= synth
+
+        if self._acc is None:
+            self._acc = cupy.zeros(lead + (self.noverlap,), dtype=dtype)
+            self._norm = cupy.zeros(self.noverlap, dtype=self._win.dtype)
+        elif self._acc.shape[:-1] != lead:
+            raise ValueError(
+                'Zxx must have the shape {} except for the last two '
+                'axes'.format(self._acc.shape[:-1]))
+
+        length = self.noverlap + nframes * nstep
+        out = cupy.zeros(lead + (length,), dtype=self._acc.dtype)
+        out[..., :self.noverlap] = self._acc
+        norm = cupy.zeros(length, dtype=self._norm.dtype)
+        norm[:self.noverlap] = self._norm
+        _overlap_add(out, frames, nstep)
+        _overlap_add(
+            norm, cupy.broadcast_to(self._win_sq, (nframes, self.nperseg)),
+            nstep)
+
+        ready = nframes * nstep
+        self._acc = out[..., ready:].copy()
+        self._norm = norm[ready:].copy()
+        return self._normalize(out[..., :ready], norm[:ready])
+
+    def _normalize(self, x, norm):
+        x /= cupy.where(norm > 1e-10, norm, 1.0).astype(x.dtype.char.lower())
+        return x
+
+    def flush(self):
+        """Return the samples of the last segment, and reset.
+
+        Returns
+        -------
+        x : ndarray
+            The samples overlapped by the last segment only.
+        """
+        if self._acc is None:
+            return cupy.empty(0)
+        x = self._normalize(self._acc, self._norm)
+        self.reset()
+        return x
+
+
+def _check_lead(x, lead):
+    if x.shape[:-1] != lead:
+        raise ValueError(
+            'x must have the shape {} except for the last axis'.format(lead))
+
+
+class StreamingLFilter:
+    r"""
+    IIR or FIR filter applied to a signal received in blocks.
+
+    The normalized coefficients and the correction factors of the parallel
+    IIR solver are computed once on the device, and the last inputs and
+    outputs of each channel are kept on the device between the blocks, so
+    that no filter state has to be passed around by the caller.
+
+    Concatenating the outputs of :meth:`process` for all the blocks along
+    the last axis gives the same result as ``lfilter(b, a, x)`` for the
+    whole signal.
+
+    Parameters
+    ----------
+    b : array_like
+        The numerator coefficient vector in a 1-D sequence.
+    a : array_like
+        The denominator coefficient vector in a 1-D sequence.  If ``a[0]``
+        is not 1, then both `a` and `b` are normalized by ``a[0]``.
+
+    See Also
+    --------
+    lfilter: Filter a whole signal with an IIR or FIR filter
+    StreamingSOSFilter: Second-order sections filter applied to a signal
+        received in blocks
+
+    Examples
+    --------
+    >>> import cupy
+    >>> from cupyx.scipy.signal import StreamingLFilter, butter
+    >>> b, a = butter(4, 0.1)
+    >>> engine = StreamingLFilter(b, a)
+    >>> blocks = [cupy.random.randn(64, 1000) for _ in range(10)]
+    >>> y = cupy.concatenate([engine.process(x) for x in blocks], axis=-1)
+    >>> y.shape
+    (64, 10000)
+    """
+
+    def __init__(self, b, a):
+        b = cupy.atleast_1d(cupy.asarray(b))
+        a = cupy.atleast_1d(cupy.asarray(a))
+        if b.ndim != 1 or a.ndim != 1 or b.size == 0 or a.size == 0:
+            raise ValueError('b and a must be non-empty 1-D sequences')
+        a0 = a[0]
+        self._b = b / a0
+        self._a_r = -a[1:] / a0
+        self.reset()
+
+    def reset(self):
+        """Reset the filter to initial rest."""
+        self._prev_in = None
+        self._prev_out = None
+
+    def _setup(self, x):
+        dtype = cupy.result_type(x, self._b, self._a_r)
+        lead = x.shape[:-1]
+        num_b = self._b.size - 1
+        num_a = self._a_r.size
+        self._dtype = dtype
+        self._b_t = self._b.astype(dtype)
+        self._a_t = self._a_r.astype(dtype)
+        self._correction = None
+        if num_a > 0:
+            self._correction = compute_correction_factors(
+                self._a_t, 1024, dtype)
+        self._prev_in = cupy.zeros(lead + (num_b,), dtype=dtype)
+        self._prev_out = cupy.zeros(lead + (num_a,), dtype=dtype)
+
+    def process(self, x):
+        """Filter a block of the signal.
+
+        Parameters
+        ----------
+        x : array_like
+            Block of the signal, along the last axis. The other axes are
+            independent channels, and must be the same for all the blocks.
+
+        Returns
+        -------
+        y : ndarray
+            The output of the filter for the block.
+        """
+        x = filtering._validate_x(x)
+        if self._prev_in is None:
+            self._setup(x)
+        else:
+            _check_lead(x, self._prev_in.shape[:-1])
+        n = x.shape[-1]
+        if n == 0:
+            return cupy.empty(x.shape, dtype=self._dtype)
+        num_b = self._prev_in.shape[-1]
+        num_a = self._prev_out.shape[-1]
+
+        x_full = cupy.concatenate(
+            (self._prev_in, x.astype(self._dtype, copy=False)), axis=-1)
+        out = _filters.convolve1d(
+            x_full, self._b_t, axis=-1, mode='constant', origin=-num_b // 2)
+        out = out[..., num_b:]
+        if num_a > 0:
+            out = apply_iir(
+                out, self._a_t, axis=-1, zi=self._prev_out,
+                dtype=self._dtype, correction=self._correction)
+
+        self._prev_in = x_full[..., n:].copy()
+        if n < num_a:
+            out_full = cupy.concatenate((self._prev_out, out), axis=-1)
+            self._prev_out = out_full[..., n:]
+        else:
+            self._prev_out = out[..., n - num_a:].copy()
+        return out
+
+
+class StreamingSOSFilter:
+    r"""
+    Second-order sections filter applied to a signal received in blocks.
+
+    The coefficients and the correction factors of the parallel IIR solver
+    are cast and computed once on the device, and the state of each section
+    and channel is kept on the device between the blocks.
+
+    Concatenating the outputs of :meth:`process` for all the blocks along
+    the last axis gives the same result as ``sosfilt(sos, x)`` for the
+    whole signal.
+
+    Parameters
+    ----------
+    sos : array_like
+        Array of second-order filter coefficients, must have shape
+        ``(n_sections, 6)``. See `sosfilt` for the SOS filter format
+        specification.
+
+    See Also
+    --------
+    sosfilt: Filter a whole signal using cascaded second-order sections
+    StreamingLFilter: IIR or FIR filter applied to a signal received in
+        blocks
+    """
+
+    def __init__(self, sos):
+        self._sos, self._n_sections = filtering._validate_sos(
+            cupy.asarray(sos))
+        self.reset()
+
+    def reset(self):
+        """Reset the filter to initial rest."""
+        self._zi = None
+
+    def process(self, x):
+        """Filter a block of the signal.
+
+        Parameters
+        ----------
+        x : array_like
+            Block of the signal, along the last axis. The other axes are
+            independent channels, and must be the same for all the blocks.
+
+        Returns
+        -------
+        y : ndarray
+            The output of the filter for the block.
+        """
+        x = filtering._validate_x(x)
+        if self._zi is None:
+            dtype = cupy.result_type(x, self._sos)
+            self._dtype = dtype
+            self._sos_t = self._sos.astype(dtype)
+            self._correction = compute_correction_factors_sos(
+                self._sos_t, 1024, dtype)
+            self._zi = cupy.zeros(
+                (self._n_sections,) + x.shape[:-1] + (4,), dtype=dtype)
+        else:
+            _check_lead(x, self._zi.shape[1:-1])
+        if x.shape[-1] == 0:
+            return cupy.empty(x.shape, dtype=self._dtype)
+        out, self._zi = apply_iir_sos(
+            x, self._sos_t, axis=-1, zi=self._zi, dtype=self._dtype,
+            correction=self._correction)
+        return out
+
+
+class StreamingUpFIRDn:
+    r"""
+    Upsample, FIR filter, and downsample a signal received in blocks.
+
+    The polyphase arrangement of the filter is prepared once on the device.
+    For each block, the outputs that depend only on the samples received so
+    far are computed with a single kernel launch for all the channels, and
+    the samples needed by the next outputs are kept on the device.
+
+    Concatenating the outputs of :meth:`process` for all the blocks and of
+    :meth:`flush` along the last axis gives the same result as
+    ``upfirdn(h, x, up, down)`` for the whole signal.
+
+    Parameters
+    ----------
+    h : array_like
+        1-D FIR (finite-impulse response) filter coefficients.
+    up : int, optional
+        Upsampling rate. Default is 1.
+    down : int, optional
+        Downsampling rate. Default is 1.
+
+    See Also
+    --------
+    upfirdn: Upsample, FIR filter, and downsample a whole signal
+    """
+
+    def __init__(self, h, up=1, down=1):
+        h = cupy.asarray(h)
+        if h.ndim != 1 or h.size == 0:
+            raise ValueError('h must be 1-D with non-zero length')
+        up = int(up)
+        down = int(down)
+        if up < 1 or down < 1:
+            raise ValueError('Both up and down must be >= 1')
+        self._h = h
+        self.up = up
+        self.down = down
+        self._h_per_phase = -(-h.size // up)
+        # Input indices whose upsampled position is a multiple of `down`,
+        # where the computation of a block can start
+        self._align = down // math.gcd(up, down)
+        self._filters = {}
+        self.reset()
+
+    def reset(self):
+        """Discard the samples kept from the previous blocks."""
+        self._hist = None
+        self._n_in = 0
+        self._n_out = 0
+
+    def _filter(self, dtype):
+        f = self._filters.get(dtype)
+        if f is None:
+            f = _UpFIRDn(self._h, dtype, self.up, self.down)
+            self._filters[dtype] = f
+        return f
+
+    def _apply(self, data, stop):
+        # Outputs `self._n_out` to `stop` from the samples `data` starting
+        # at the input index `self._n_in - data.shape[-1]`
+        start = self._n_in - data.shape[-1]
+        offset = start * self.up // self.down
+        f = self._filter(data.dtype)
+        if data.shape[-1] == 0 or stop == self._n_out:
+            return cupy.empty(
+                data.shape[:-1] + (0,), dtype=f._output_type)
+        out = f.apply_filter(data, -1)
+        result = out[..., self._n_out - offset:stop - offset]
+        self._n_out = stop
+        return result
+
+    def process(self, x):
+        """Filter a block of the signal.
+
+        Parameters
+        ----------
+        x : array_like
+            Block of the signal, along the last axis. The other axes are
+            independent channels, and must be the same for all the blocks.
+
+        Returns
+        -------
+        y : ndarray
+            The outputs that depend only on the samples received so far.
+        """
+        x = filtering._validate_x(x)
+        if self._hist is None:
+            dtype = cupy.result_type(self._h, x, cupy.float32)
+            self._hist = cupy.empty(x.shape[:-1] + (0,), dtype=dtype)
+        else:
+            _check_lead(x, self._hist.shape[:-1])
+        data = cupy.concatenate(
+            (self._hist, x.astype(self._hist.dtype, copy=False)), axis=-1)
+        self._n_in += x.shape[-1]
+        n_in = self._n_in
+
+        # The following outputs also depend on the next samples, except
+        # for short filters whose whole response is already complete
+        stop = 0
+        if n_in > 0:
+            stop = min((n_in * self.up - 1) // self.down + 1,
+                       _output_len(self._h.size, n_in, self.up, self.down))
+        result = self._apply(data, stop)
+
+        # Keep the samples that the next outputs depend on, from an input
+        # index whose upsampled position is a multiple of `down` and not
+        # after the next output
+        keep = max(n_in - self._h_per_phase + 1, 0)
+        keep = min(keep, self._n_out * self.down // self.up)
+        keep -= keep % self._align
+        self._hist = data[..., keep - n_in + data.shape[-1]:].copy()
+        return result
+
+    def flush(self):
+        """Return the outputs depending on the last samples, and reset.
+
+        Returns
+        -------
+        y : ndarray
+            The remaining outputs, which is empty if no sample was
+            received.
+        """
+        if self._hist is None:
+            return cupy.empty(
+                0, dtype=cupy.result_type(self._h, cupy.float32))
+        stop = 0
+        if self._n_in > 0:
+            stop = _output_len(self._h.size, self._n_in, self.up, self.down)
+        result = self._apply(self._hist, stop)
+        self.reset()
+        return result
+
+
+_fdl_mac_kernel = cupy.ElementwiseKernel(
+    "raw T H, raw T X, int32 n_parts, int32 n_frames, int32 n_freqs",
+    "T y",
+    """
+    // Output frame `k` of channel `c` sums the products of the partition
+    // `p` of the filter and the input frame `k - p` of the delay line,
+    // which holds the `n_parts - 1` previous frames before the new ones.
+    const ptrdiff_t f { i % n_freqs };
+    const ptrdiff_t k { ( i / n_freqs ) % n_frames };
+    const ptrdiff_t c { i / ( n_freqs * n_frames ) };
+    const ptrdiff_t n_rows { n_frames + n_parts - 1 };
+    const T* x_row { &X[( c * n_rows + k + n_parts - 1 ) * n_freqs + f] };
+
+    T acc {};
+    for ( int p = 0; p < n_parts; p++ ) {
+        acc += H[p * n_freqs + f] * x_row[-p * n_freqs];
+    }
+    y = acc;
+    """,
+    "_fdl_mac_kernel",
+)
+
+
+class StreamingConvolver:
+    r"""
+    Convolution of a signal received in blocks with a fixed, long filter.
+
+    The filter is split into partitions of `block_size` taps, whose FFTs
+    are computed once (uniformly partitioned overlap-save). Each complete
+    block of the signal is transformed once and pushed into a
+    frequency-domain delay line, and each output block is the inverse FFT
+    of the sum of the products of the partitions with the delay line. The
+    latency is `block_size` samples whatever the length of the filter, and
+    all the blocks completed by a call are processed with batched FFTs and
+    a single multiply-accumulate kernel.
+
+    Concatenating the outputs of :meth:`process` for all the chunks and of
+    :meth:`flush` along the last axis gives the same result as
+    ``fftconvolve(x, h[None, ..., :])``, i.e. the full convolution of each
+    channel with `h`.
+
+    Parameters
+    ----------
+    h : array_like
+        1-D filter (impulse response).
+    block_size : int, optional
+        Length of the partitions of the filter and of the blocks of the
+        signal. Defaults to the smallest power of two not smaller than the
+        length of the filter, up to 4096.
+
+    See Also
+    --------
+    fftconvolve: Convolve two whole arrays using FFT
+    oaconvolve: Convolve two whole arrays using the overlap-add method
+
+    Examples
+    --------
+    >>> import cupy
+    >>> from cupyx.scipy.signal import StreamingConvolver
+    >>> h = cupy.random.randn(48000)
+    >>> engine = StreamingConvolver(h, block_size=512)
+    >>> chunks = [cupy.random.randn(2, 4800) for _ in range(10)]
+    >>> y = cupy.concatenate(
+    ...     [engine.process(x) for x in chunks] + [engine.flush()], axis=-1)
+    >>> y.shape
+    (2, 95999)
+    """
+
+    def __init__(self, h, block_size=None):
+        h = cupy.asarray(h)
+        if h.ndim != 1 or h.size == 0:
+            raise ValueError('h must be 1-D with non-zero length')
+        if block_size is None:
+            block_size = min(1 << (h.size - 1).bit_length(), 4096)
+        block_size = int(block_size)
+        if block_size < 1:
+            raise ValueError('block_size must be a positive integer')
+        self._h = h
+        self.block_size = block_size
+        self.n_parts = -(-h.size // block_size)
+        self._spectra = {}
+        self.reset()
+
+    def reset(self):
+        """Discard the samples kept from the previous chunks."""
+        self._buf = None
+        self._fdl = None
+        self._n_in = 0
+        self._n_out = 0
+
+    def _filter_spectra(self):
+        H = self._spectra.get(self._dtype)
+        if H is None:
+            B = self.block_size
+            taps = cupy.zeros(self.n_parts * B, dtype=self._dtype)
+            taps[:self._h.size] = self._h
+            parts = cupy.zeros((self.n_parts, 2 * B), dtype=self._dtype)
+            parts[:, :B] = taps.reshape(self.n_parts, B)
+            if self._real:
+                H = cupy.fft.rfft(parts)
+            else:
+                H = cupy.fft.fft(parts)
+            self._spectra[self._dtype] = H
+        return H
+
+    def _setup(self, x):
+        dtype = cupy.result_type(x, self._h, cupy.float32)
+        self._dtype = dtype
+        self._real = dtype.kind != 'c'
+        lead = x.shape[:-1]
+        B = self.block_size
+        n_freqs = B + 1 if self._real else 2 * B
+        cdtype = cupy.result_type(dtype, cupy.complex64)
+        # Previous block of the signal, followed by the incomplete one
+        self._buf = cupy.zeros(lead + (B,), dtype=dtype)
+        self._fdl = cupy.zeros(
+            lead + (self.n_parts - 1, n_freqs), dtype=cdtype)
+
+    def _convolve(self, data):
+        # Output blocks for the complete blocks in `data`, which starts
+        # with the previous block
+        B = self.block_size
+        n_frames = (data.shape[-1] - B) // B
+        lead = data.shape[:-1]
+        if n_frames == 0:
+            return cupy.empty(lead + (0,), dtype=self._dtype)
+        frames = _as_strided(
+            data, shape=lead + (n_frames, 2 * B),
+            strides=data.strides[:-1] + (
+                B * data.strides[-1], data.strides[-1]))
+        if self._real:
+            X = cupy.fft.rfft(frames)
+        else:
+            X = cupy.fft.fft(frames)
+        X = cupy.concatenate((self._fdl, X), axis=-2)
+        H = self._filter_spectra()
+        Y = cupy.empty(lead + (n_frames, X.shape[-1]), dtype=X.dtype)
+        _fdl_mac_kernel(H, X, self.n_parts, n_frames, X.shape[-1], Y)
+        self._fdl = X[..., n_frames:, :].copy()
+        if self._real:
+            y = cupy.fft.irfft(Y, n=2 * B)
+        else:
+            y = cupy.fft.ifft(Y)
+        # The first half of each frame is corrupted by circular aliasing
+        y = y[..., B:].reshape(lead + (n_frames * B,))
+        self._n_out += n_frames * B
+        return y.astype(self._dtype, copy=False)
+
+    def process(self, x):
+        """Convolve the blocks completed by a chunk of the signal.
+
+        Parameters
+        ----------
+        x : array_like
+            Chunk of the signal, along the last axis. The other axes are
+            independent channels, and must be the same for all the chunks.
+
+        Returns
+        -------
+        y : ndarray
+            The next samples of the convolution, whose number is a multiple
+            of `block_size`.
+        """
+        x = filtering._validate_x(x)
+        if self._buf is None:
+            self._setup(x)
+        else:
+            _check_lead(x, self._buf.shape[:-1])
+        data = cupy.concatenate(
+            (self._buf, x.astype(self._dtype, copy=False)), axis=-1)
+        self._n_in += x.shape[-1]
+        y = self._convolve(data)
+        self._buf = data[..., y.shape[-1]:].copy()
+        return y
+
+    def flush(self):
+        """Return the last samples of the convolution, and reset.
+
+        Returns
+        -------
+        y : ndarray
+            The remaining samples of the full convolution, which is empty if
+            no sample was received.
+        """
+        if self._buf is None or self._n_in == 0:
+            lead = () if self._buf is None else self._buf.shape[:-1]
+            self.reset()
+            return cupy.empty(
+                lead + (0,), dtype=cupy.result_type(self._h, cupy.float32))
+        B = self.block_size
+        remaining = self._n_in + self._h.size - 1 - self._n_out
+        n_pad = -(-remaining // B) * B - (self._buf.shape[-1] - B)
+        pad = cupy.zeros(
+            self._buf.shape[:-1] + (n_pad,), dtype=self._dtype)
+        y = self._convolve(cupy.concatenate((self._buf, pad), axis=-1))
+        self.reset()
+        return y[..., :remaining]
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import numpy
 import pytest
 
 import cupy
 from cupy import testing
+from cupy._core import _carray
 
 
 class TestCArray:
@@ -49,6 +51,83 @@ class TestCArray:
         testing.assert_array_equal(y, x)
 
 
+def _divide(n, mul, shift):
+    # Emulates the division-free index math of CIndexer on the host.
+    hi = (n * numpy.uint64(mul)) >> numpy.uint64(32)
+    assert (hi + n < 2 ** 32).all()
+    return (hi + n) >> numpy.uint64(shift)
+
+
+class TestCIndexerDivisor:
+
+    def _check(self, d):
+        mul, shift = _carray._get_divisor(d)
+        assert 0 <= mul < 2 ** 32
+        assert 0 <= shift <= 31
+        limit = 2 ** 31
+        n = numpy.concatenate([
+            numpy.arange(4096),
+            numpy.arange(limit - 4096, limit),
+            numpy.random.randint(0, limit, size=4096),
+            [k * d + r for k in (1, 2, limit // d - 1, limit // d)
+             for r in (-1, 0, 1) if 0 <= k * d + r < limit],
+        ]).astype(numpy.uint64)
+        expected = n // numpy.uint64(d)
+        testing.assert_array_equal(_divide(n, mul, shift), expected)
+
+    @pytest.mark.parametrize('d', list(range(1, 130)))
+    def test_small(self, d):
+        self._check(d)
+
+    @pytest.mark.parametrize('k', list(range(1, 32)))
+    def test_around_power_of_two(self, k):
+        for d in (2 ** k - 1, 2 ** k, 2 ** k + 1):
+            if d <= 2 ** 31:
+                self._check(d)
+
+    def test_max(self):
+        self._check(2 ** 31)
+        self._check(2 ** 31 - 1)
+
+    def test_random(self):
+        for d in numpy.random.RandomState(0).randint(
+                1, 2 ** 31, size=256, dtype=numpy.int64):
+            self._check(int(d))
+
+    @pytest.mark.parametrize('d', [0, -1, 2 ** 31 + 1, 2 ** 40])
+    def test_out_of_range(self, d):
+        # Never used by the 32-bit indexing path.
+        assert _carray._get_divisor(d) == (0, 0)
+
+
+@testing.parameterize(*testing.product({
+    'shape': [(3, 5), (2, 3, 7), (4, 1, 6, 5), (1, 1000, 3), (6, 17, 31)],
+}))
+class TestCIndexerDivisionFree:
+
+    @testing.for_all_dtypes(no_bool=True, no_complex=True)
+    @testing.numpy_cupy_array_equal()
+    def test_transpose(self, xp, dtype):
+        a = testing.shaped_arange(self.shape, xp, dtype)
+        return a.T + 0
+
+    @testing.numpy_cupy_array_equal()
+    def test_broadcast(self, xp):
+        a = testing.shaped_arange(self.shape[-1:], xp)
+        return xp.broadcast_to(a, self.shape) * 1
+
+    @testing.numpy_cupy_array_equal()
+    def test_strided(self, xp):
+        a = testing.shaped_arange(
+            tuple([2 * s for s in self.shape]), xp)
+        return a[(slice(None, None, 2),) * len(self.shape)] + 1
+
+    @testing.numpy_cupy_array_equal()
+    def test_reduction(self, xp):
+        a = testing.shaped_arange(self.shape, xp)
+        return a.transpose().sum(axis=-1)
+
+
 @pytest.mark.parametrize('size', [
     2 ** 31 - 1024,
     2 ** 31,
@@ -143,3 +143,63 @@ class TestElementwiseType:
         a = xp.array([xp.iinfo(dtype).min + 1], dtype=dtype)
         b = xp.int8(-1)
         return a + b
+
+
+class TestElementwiseVectorized:
+
+    # Large enough for the vectorized code path, and not a multiple of the
+    # vector width to exercise the tail loop.
+    size = (1 << 16) + 3
+
+    @testing.for_all_dtypes()
+    @testing.numpy_cupy_allclose()
+    def test_binary(self, xp, dtype):
+        a = testing.shaped_arange((self.size,), xp, dtype)
+        b = testing.shaped_reverse_arange((self.size,), xp, dtype)
+        return a + b
+
+    @testing.for_dtypes_combination(
+        [numpy.bool_, numpy.int8, numpy.float16, numpy.int32, numpy.float64,
+         numpy.complex64], names=['dtype1', 'dtype2'])
+    @testing.numpy_cupy_allclose()
+    def test_mixed_dtypes(self, xp, dtype1, dtype2):
+        a = testing.shaped_arange((self.size,), xp, dtype1)
+        b = testing.shaped_reverse_arange((self.size,), xp, dtype2)
+        return xp.multiply(a, b)
+
+    @testing.for_all_dtypes(no_bool=True)
+    @testing.numpy_cupy_allclose()
+    def test_scalar(self, xp, dtype):
+        a = testing.shaped_arange((self.size,), xp, dtype)
+        return a * 3
+
+    @testing.for_all_dtypes()
+    @testing.numpy_cupy_allclose()
+    def test_unaligned(self, xp, dtype):
+        a = testing.shaped_arange((self.size + 1,), xp, dtype)
+        b = testing.shaped_reverse_arange((self.size,), xp, dtype)
+        return a[1:] + b
+
+    @testing.numpy_cupy_allclose()
+    def test_multi_dim(self, xp):
+        a = testing.shaped_arange((4, self.size), xp, xp.float32)
+        return xp.sqrt(a)
+
+    @testing.numpy_cupy_allclose()
+    def test_in_place(self, xp):
+        a = testing.shaped_arange((self.size,), xp, xp.float32)
+        a += 1
+        return a
+
+    @testing.numpy_cupy_allclose()
+    def test_where(self, xp):
+        a = testing.shaped_arange((self.size,), xp, xp.float32)
+        out = xp.zeros((self.size,), xp.float32)
+        mask = a % 3 == 0
+        xp.add(a, a, out=out, where=mask)
+        return out
+
+    @testing.numpy_cupy_allclose()
+    def test_divmod(self, xp):
+        a = testing.shaped_arange((self.size,), xp, xp.float64)
+        return xp.divmod(a, 7)
@@ -278,3 +278,48 @@ class TestUfunc:
         ret = xp.divmod(a, b, out=(None, out1))
         assert ret[1] is out1
         return ret
+
+
+class TestUfuncFastPath:
+
+    def _ufunc(self):
+        return cupy._core.create_ufunc(
+            'fast_path_test', ('bb->b', 'll->l', 'dd->d'), 'out0 = in0 + in1')
+
+    @testing.for_dtypes('bld')
+    def test_cached(self, dtype):
+        ufunc = self._ufunc()
+        a = testing.shaped_arange((2, 3), cupy, dtype)
+        b = testing.shaped_reverse_arange((2, 3), cupy, dtype)
+        expected = a.get() + b.get()
+        for _ in range(3):
+            testing.assert_array_equal(ufunc(a, b), expected)
+        assert len(ufunc._fast_path_cache) == 1
+        assert len(ufunc._kernel_memo) == 1
+
+    @testing.numpy_cupy_array_equal()
+    def test_weak_scalar(self, xp):
+        a = testing.shaped_arange((2, 3), xp, xp.int8)
+        # Python scalars of different kinds must not share a cached entry
+        return xp.stack([xp.add(a, 1), xp.add(a, 2.5), xp.add(a, 3)])
+
+    def test_not_eligible(self):
+        ufunc = self._ufunc()
+        a = testing.shaped_arange((2, 3), cupy, cupy.float64)
+        b = testing.shaped_arange((3,), cupy, cupy.float64)
+        out = cupy.empty((2, 3), cupy.float64)
+        ufunc(a, b)  # broadcast
+        ufunc(a.T, a.T)  # non-contiguous
+        ufunc(a, a, out=out)
+        ufunc(a[:0], a[:0])  # empty
+        ufunc(a.view(C), a)  # subclass
+        assert not ufunc._fast_path_cache
+        testing.assert_array_equal(out, a.get() * 2)
+
+    def test_shape_change(self):
+        ufunc = self._ufunc()
+        for shape in [(4,), (2, 3), (5,), (2, 3, 4)]:
+            a = testing.shaped_arange(shape, cupy, cupy.int64)
+            testing.assert_array_equal(ufunc(a, a), a.get() * 2)
+        # Entries are keyed on the number of dimensions
+        assert len(ufunc._fast_path_cache) == 3
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import contextlib
 import io
+import os
 import queue
+import tempfile
 import threading
 import unittest
 
@@ -517,3 +519,131 @@ class TestPlanCache(unittest.TestCase):
         assert cache.get_curr_memsize() == 2048 == cache.get_memsize()
         plan2 = next(iter(cache))[1].plan
         assert plan2 is not plan
+
+    @prepare_and_restore_caches()
+    @pytest.mark.thread_unsafe(reason="recording is process-wide")
+    def test_plan_key_recording(self):
+        # test if the recorded keys can be saved and used to recreate the
+        # same plans
+        cache = config.get_plan_cache()
+        a = testing.shaped_random((10,), cupy, cupy.float32)
+        b = testing.shaped_random((8, 8, 8), cupy, cupy.complex64)
+        cupy.fft.fft(a)  # cached before recording, used again below
+
+        config.start_plan_key_recording()
+        try:
+            cupy.fft.fft(a)
+            cupy.fft.fftn(b)
+            cupy.fft.fft(a)
+        finally:
+            keys = config.stop_plan_key_recording()
+        assert [plan_type for plan_type, _ in keys] == ['Plan1d', 'PlanNd']
+        assert {key for key, _ in cache} == {key for _, key in keys}
+        assert config.stop_plan_key_recording() == []
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'keys.json')
+            config.save_plan_keys(keys, path)
+            assert config.load_plan_keys(path) == keys
+
+        cache.clear()
+        assert config.prewarm_plan_cache(keys) == 2
+        assert cache.get_curr_size() == 2
+        assert isinstance(next(iter(cache))[1].plan, cufft.PlanNd)
+        plans = [node.plan for _, node in cache]
+
+        # the plans are already in the cache
+        assert config.prewarm_plan_cache(keys) == 0
+        cupy.fft.fftn(b)
+        cupy.fft.fft(a)
+        assert sorted([id(node.plan) for _, node in cache]) == sorted(
+            [id(plan) for plan in plans])
+
+    @prepare_and_restore_caches()
+    def test_prewarm_plan_cache_thread(self):
+        # test if the plans are created in the cache of the calling thread
+        keys = [('Plan1d', (10, cufft.CUFFT_R2C, 1, None))]
+        results = queue.Queue()
+
+        def run():
+            cache = config.get_plan_cache()
+            results.put((config.prewarm_plan_cache(keys),
+                         [key for key, _ in cache]))
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        assert results.get() == (1, [keys[0][1]])
+        assert config.get_plan_cache().get_curr_size() == 0
+
+    @prepare_and_restore_caches()
+    @pytest.mark.thread_unsafe(reason="changes the global FFT config")
+    def test_share_work_area(self):
+        # test if the cached plans use the shared work area
+        cache = config.get_plan_cache()
+        a = testing.shaped_random((64, 129), cupy, cupy.complex64)
+        b = testing.shaped_random((8, 8, 8), cupy, cupy.complex128)
+        config.share_work_area = True
+        try:
+            out_a = cupy.fft.fft(a)
+            out_b = cupy.fft.fftn(b)
+        finally:
+            config.share_work_area = False
+        assert cache.get_curr_size() == 2
+        assert cache.get_curr_memsize() == 0
+        for _, node in cache:
+            assert node.plan.work_area is None
+            assert node.memsize == 0
+
+        # compare with the plans owning a work area, on another stream too
+        plans = [node.plan for _, node in cache]
+        cache.clear()
+        testing.assert_allclose(out_a, cupy.fft.fft(a), rtol=1e-5)
+        testing.assert_allclose(out_b, cupy.fft.fftn(b), rtol=1e-5)
+        assert all([node.plan.work_area is not None for _, node in cache])
+        with cupy.cuda.Stream():
+            with plans[1]:
+                testing.assert_allclose(out_a, cupy.fft.fft(a), rtol=1e-5)
+            with plans[0]:
+                testing.assert_allclose(out_b, cupy.fft.fftn(b), rtol=1e-5)
+        config.free_shared_work_areas()
+        with plans[1]:
+            testing.assert_allclose(out_a, cupy.fft.fft(a), rtol=1e-5)
+
+    @pytest.mark.thread_unsafe(reason="changes the global FFT config")
+    def test_share_work_area_per_thread_stream(self):
+        # test if the threads running on the per-thread default stream, which
+        # is a different stream in each thread, do not share the work area
+        xs = [testing.shaped_random((16, 32, 64), cupy, cupy.complex64,
+                                    seed=i) for i in range(4)]
+        expected = [cupy.fft.fftn(x) for x in xs]
+        errors = queue.Queue()
+
+        def run(x, out):
+            # the setting is a context variable not inherited by the threads
+            config.share_work_area = True
+            try:
+                with cupy.cuda.Stream.ptds:
+                    for _ in range(10):
+                        testing.assert_allclose(
+                            cupy.fft.fftn(x), out, rtol=1e-5)
+                cache = config.get_plan_cache()
+                assert cache.get_curr_size() > 0
+                assert all([node.plan.work_area is None
+                            for _, node in cache])
+            except Exception as e:
+                errors.put(e)
+            finally:
+                config.share_work_area = False
+                config.clear_plan_cache()
+
+        try:
+            threads = [threading.Thread(target=run, args=args)
+                       for args in zip(xs, expected)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            config.free_shared_work_areas()
+        assert errors.empty()
@@ -162,6 +162,45 @@ def _set_store_cb(
     return callback
 
 
+@pytest.mark.skipif(cupy.cuda.runtime.is_hip,
+                    reason='hipFFT does not support callbacks')
+class TestPlanKeyRecordingWithCallbacks:
+
+    @pytest.mark.thread_unsafe(reason="recording is process-wide")
+    def test_plan_key_recording(self):
+        # only the keys of the plans without callbacks are recorded, as the
+        # others cannot be recreated
+        check_should_skip_jit_test()
+        config = cupy.fft.config
+        types = ('x.x', 'cufftComplex', 'cufftCallbackLoadC',
+                 'cufftJITCallbackLoadComplex')
+        cb_load = _set_load_cb(_load_callback, *types, cb_ver='jit')
+        a = testing.shaped_random((10,), cupy, np.complex64)
+        b = testing.shaped_random((4, 6, 8), cupy, np.complex64)
+
+        with use_temporary_cache_dir():
+            config.start_plan_key_recording()
+            try:
+                with config.set_cufft_callbacks(
+                        cb_load=cb_load, cb_ver='jit'):
+                    cupy.fft.fft(a)
+                    cupy.fft.fftn(b)
+                cupy.fft.fft(a)
+                cupy.fft.fftn(b)
+            finally:
+                keys = config.stop_plan_key_recording()
+        assert [plan_type for plan_type, _ in keys] == ['Plan1d', 'PlanNd']
+        assert [len(key) for _, key in keys] == [4, 12]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'keys.json')
+            config.save_plan_keys(keys, path)
+            keys = config.load_plan_keys(path)
+        cache = config.get_plan_cache()
+        cache.clear()
+        assert config.prewarm_plan_cache(keys) == 2
+
+
 # Note: this class is place here instead of at the end of this file, because
 # pytest does not reset warnings internally, and other tests would suppress
 # the warnings such that at the end we have no warnings to capture, but we want
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
+import os
 import sys
+import tempfile
 import time
 import warnings
 
+import numpy
+
 import cupy
 from cupy import cuda
 from cupy.cuda import nccl
 from cupy import testing
 
 from cupyx.distributed import init_process_group
+from cupyx.distributed import merge_traces
 from cupyx.distributed._nccl_comm import NCCLBackend
 from cupyx.distributed._store import ExceptionAwareProcess
 from cupyx.scipy import sparse
@@ -107,6 +112,38 @@ def all_reduce(dtype, use_mpi=False):
         _launch_workers(run_all_reduce, (dtype,))
 
 
+def all_reduce_bucketed(dtype, use_mpi=False):
+    if dtype in 'hH':
+        return  # nccl does not support int16
+
+    def run_all_reduce_bucketed(rank, dtype, use_mpi=False):
+        dev = cuda.Device(rank)
+        dev.use()
+        comm = NCCLBackend(N_WORKERS, rank, use_mpi=use_mpi)
+        arrays = [
+            cupy.arange(n, dtype=dtype) + rank for n in (1, 5, 3, 40, 7)]
+        arrays.append(cupy.asfortranarray(
+            cupy.arange(12, dtype='f').reshape(3, 4) + rank))
+        arrays.append(cupy.arange(6, dtype=dtype).reshape(2, 3) + rank)
+        expected = [a - rank + a - rank + 1 for a in arrays]
+
+        # Small buckets to split the arrays into several of them
+        handle = comm.all_reduce_bucketed(
+            arrays, bucket_size=8 * arrays[0].itemsize)
+        handle.wait()
+        for a, e in zip(arrays, expected):
+            testing.assert_allclose(a, e)
+        handle.synchronize()
+        assert handle.done()
+
+    if use_mpi:
+        from mpi4py import MPI
+        # This process was run with mpiexec
+        run_all_reduce_bucketed(MPI.COMM_WORLD.Get_rank(), dtype, True)
+    else:
+        _launch_workers(run_all_reduce_bucketed, (dtype,))
+
+
 def reduce_scatter(dtype, use_mpi=False):
     if dtype in 'hH':
         return  # nccl does not support int16
@@ -465,6 +502,55 @@ def sparse_all_reduce(dtype, use_mpi=False):
         _launch_workers(run_all_reduce, (dtype, 'prod'))
 
 
+def sparse_all_reduce_structure(dtype, use_mpi=False):
+
+    def run_all_reduce_structure(rank, dtype, use_mpi=False):
+        dev = cuda.Device(rank)
+        dev.use()
+        comm = NCCLBackend(N_WORKERS, rank, use_mpi=use_mpi)
+        warnings.filterwarnings(
+            'ignore', '.*transferring sparse.*', UserWarning)
+        # Same structure with different values, reducing only the values
+        in_array = (rank + 1) * _make_sparse(dtype)
+        for _ in range(2):
+            out_array = _make_sparse_empty(dtype)
+            comm.all_reduce(in_array, out_array, 'sum')
+            testing.assert_allclose(
+                out_array.todense(), 3 * _make_sparse(dtype).todense())
+        # In place
+        comm.all_reduce(in_array, in_array, 'sum')
+        testing.assert_allclose(
+            in_array.todense(), 3 * _make_sparse(dtype).todense())
+
+        # Structure modified in place in a single rank
+        in_array = _make_sparse(dtype)
+        comm.all_reduce(in_array, _make_sparse_empty(dtype), 'sum')
+        if rank == 1:
+            in_array.indices[...] = cupy.array([1, 3, 1, 3, 0, 2], 'i')
+        out_array = _make_sparse_empty(dtype)
+        comm.all_reduce(in_array, out_array, 'sum')
+        expected = _make_sparse(dtype).todense()
+        modified = expected.copy()
+        modified[0] = cupy.array([0, 1, 0, 3], dtype)
+        testing.assert_allclose(out_array.todense(), expected + modified)
+
+        # Different structures
+        in_array = _make_sparse(dtype)
+        if rank == 1:
+            in_array = in_array.T.tocsr()
+        out_array = _make_sparse_empty(dtype)
+        comm.all_reduce(in_array, out_array, 'sum')
+        expected = _make_sparse(dtype).todense()
+        testing.assert_allclose(out_array.todense(), expected + expected.T)
+
+    if use_mpi:
+        from mpi4py import MPI
+        # This process was run with mpiexec
+        run_all_reduce_structure(MPI.COMM_WORLD.Get_rank(), dtype, True)
+    else:
+        _launch_workers(run_all_reduce_structure, (dtype,))
+
+
 def sparse_scatter(dtype, use_mpi=False):
 
     def run_scatter(rank, root, dtype, use_mpi=False):
@@ -597,6 +683,173 @@ def sparse_reduce_scatter(dtype, use_mpi=False):
         _launch_workers(run_reduce_scatter, (1, dtype))
 
 
+def socket_all_reduce(dtype, use_mpi=False):
+
+    def run_all_reduce(rank, dtype, n_workers, port):
+        comm = init_process_group(
+            n_workers, rank, backend='socket', port=port)
+        in_array = numpy.arange(25, dtype=dtype).reshape(5, 5) + rank
+        out_array = numpy.zeros((5, 5), dtype)
+        comm.all_reduce(in_array, out_array)
+        expected = sum(numpy.arange(25, dtype=dtype).reshape(5, 5) + r
+                       for r in range(n_workers))
+        numpy.testing.assert_allclose(out_array, expected)
+        if numpy.dtype(dtype).kind != 'c':
+            # In place, with a F-contiguous array
+            in_array = numpy.asfortranarray(in_array)
+            comm.all_reduce(in_array, in_array, 'max')
+            numpy.testing.assert_allclose(
+                in_array, numpy.arange(25, dtype=dtype).reshape(5, 5)
+                + n_workers - 1)
+        out_array = numpy.zeros(10, dtype)
+        comm.reduce(numpy.ones(10, dtype) * (rank + 1), out_array, 1)
+        if rank == 1:
+            numpy.testing.assert_allclose(
+                out_array, sum(range(1, n_workers + 1)))
+        comm.stop()
+
+    # Also use an odd number of ranks, which splits the data unevenly
+    for n_workers, port in [(N_WORKERS, 13340), (3, 13341)]:
+        _launch_workers(
+            run_all_reduce, (dtype, n_workers, port), n_workers=n_workers)
+
+
+def socket_broadcast(dtype, use_mpi=False):
+
+    def run_broadcast(rank, dtype, n_workers, port):
+        comm = init_process_group(
+            n_workers, rank, backend='socket', port=port)
+        expected = numpy.arange(1 << 18).astype(dtype)
+        for root in range(n_workers):
+            if rank == root:
+                array = expected.copy()
+            else:
+                array = numpy.zeros_like(expected)
+            comm.broadcast(array, root)
+            numpy.testing.assert_array_equal(array, expected)
+        comm.stop()
+
+    for n_workers, port in [(N_WORKERS, 13342), (3, 13343)]:
+        _launch_workers(
+            run_broadcast, (dtype, n_workers, port), n_workers=n_workers)
+
+
+def socket_collectives(dtype, use_mpi=False):
+
+    def run_collectives(rank, dtype, n_workers, port):
+        comm = init_process_group(
+            n_workers, rank, backend='socket', port=port)
+        n = n_workers
+        count = 3
+        # reduce_scatter
+        in_array = numpy.arange(count * n, dtype=dtype) + rank
+        out_array = numpy.zeros(count, dtype)
+        comm.reduce_scatter(in_array, out_array, count)
+        expected = sum(numpy.arange(count * n, dtype=dtype) + r
+                       for r in range(n))
+        numpy.testing.assert_allclose(
+            out_array, expected[rank * count:(rank + 1) * count])
+        # all_gather
+        out_array = numpy.zeros(count * n, dtype)
+        comm.all_gather(numpy.full(count, rank, dtype), out_array, count)
+        numpy.testing.assert_array_equal(
+            out_array, numpy.repeat(numpy.arange(n), count).astype(dtype))
+        # send and recv
+        if rank == 0:
+            comm.send(numpy.arange(10, dtype=dtype), 1)
+        elif rank == 1:
+            out_array = numpy.zeros(10, dtype)
+            comm.recv(out_array, 0)
+            numpy.testing.assert_array_equal(
+                out_array, numpy.arange(10, dtype=dtype))
+        # send_recv between the ranks 0 and 1
+        if rank < 2:
+            out_array = numpy.zeros(10, dtype)
+            comm.send_recv(
+                numpy.full(10, rank, dtype), out_array, 1 - rank)
+            numpy.testing.assert_array_equal(
+                out_array, numpy.full(10, 1 - rank, dtype))
+        # scatter and gather
+        in_array = numpy.arange(n * 4, dtype=dtype).reshape(n, 4)
+        out_array = numpy.zeros(4, dtype)
+        comm.scatter(in_array, out_array, 1)
+        numpy.testing.assert_array_equal(out_array, in_array[rank])
+        out_array = numpy.zeros((n, 4), dtype)
+        comm.gather(in_array[rank], out_array, 0)
+        if rank == 0:
+            numpy.testing.assert_array_equal(out_array, in_array)
+        # all_to_all
+        in_array = numpy.arange(n * 2, dtype=dtype).reshape(n, 2) + rank
+        out_array = numpy.zeros((n, 2), dtype)
+        comm.all_to_all(in_array, out_array)
+        for i in range(n):
+            numpy.testing.assert_array_equal(
+                out_array[i], numpy.arange(2 * rank, 2 * rank + 2) + i)
+        comm.barrier()
+        comm.stop()
+
+    for n_workers, port in [(N_WORKERS, 13344), (3, 13345)]:
+        _launch_workers(
+            run_collectives, (dtype, n_workers, port), n_workers=n_workers)
+
+
+def socket_device_arrays(dtype, use_mpi=False):
+
+    def run_device_arrays(rank, dtype):
+        dev = cuda.Device(rank)
+        dev.use()
+        comm = init_process_group(
+            N_WORKERS, rank, backend='socket', port=13346)
+        in_array = cupy.arange(10, dtype=dtype) + rank
+        out_array = cupy.zeros(10, dtype)
+        comm.all_reduce(in_array, out_array)
+        testing.assert_allclose(
+            out_array, 2 * cupy.arange(10, dtype=dtype) + 1)
+        comm.broadcast(in_array, 0)
+        testing.assert_allclose(in_array, cupy.arange(10, dtype=dtype))
+        comm.stop()
+
+    _launch_workers(run_device_arrays, (dtype,))
+
+
+def socket_trace(use_mpi=False):
+
+    def run_trace(rank, path):
+        comm = init_process_group(
+            N_WORKERS, rank, backend='socket', port=13347)
+        tracer = comm.start_tracing()
+        in_array = numpy.arange(1 << 16, dtype='f')
+        out_array = numpy.zeros_like(in_array)
+        if rank == 1:
+            # Rank 1 is the straggler of the all-reduce
+            time.sleep(0.1)
+        comm.all_reduce(in_array, out_array)
+        comm.broadcast(out_array, 0)
+        comm.barrier()
+        assert comm.stop_tracing() is tracer
+        comm.all_reduce(in_array, out_array)
+        records = tracer.records()
+        assert [r['op'] for r in records] == ['all_reduce', 'broadcast']
+        assert records[0]['bytes'] == in_array.nbytes
+        assert records[0]['busbw'] == records[0]['algbw']
+        assert records[1]['peers'] == [0]
+        tracer.save(os.path.join(path, f'trace{rank}.json'))
+        comm.stop()
+
+    with tempfile.TemporaryDirectory() as path:
+        _launch_workers(run_trace, (path,))
+        merged = merge_traces(
+            [os.path.join(path, f'trace{rank}.json')
+             for rank in range(N_WORKERS)])
+    assert merged['metadata']['ranks'] == list(range(N_WORKERS))
+    assert merged['metadata']['stragglers'][1] >= 1
+    events = [e for e in merged['traceEvents']
+              if e['ph'] == 'X' and e['name'] == 'all_reduce']
+    assert len(events) == N_WORKERS
+    assert events[0]['args']['straggler'] == 1
+    assert events[0]['args']['straggler_delay_us'] > 5e4
+
+
 if __name__ == '__main__':
     # Run the templatized test
     func = globals()[sys.argv[1]]
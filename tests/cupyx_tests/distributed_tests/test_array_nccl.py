@@ -1,6 +1,7 @@
 # import sys
 from __future__ import annotations
 
+import functools
 import warnings
 
 import numpy
@@ -189,6 +190,13 @@ class _TestDistributedArray:
         np_a = numpy.arange(size, dtype='q').reshape(shape)
         # Initialize without comms
         d_a = darray.distributed_array(np_a, index_map_a, mode)
+        if mode == REPLICA:
+            # Each element of a chunk is transferred at most once
+            normalized = _index_arith._normalize_index_map(
+                shape, index_map_b)
+            assert d_a.reshard_nbytes(index_map_b) <= sum([
+                np_a[idx].nbytes
+                for idxs in normalized.values() for idx in idxs])
         d_b = d_a.reshard(index_map_b)
         testing.assert_array_equal(d_b, np_a)
         testing.assert_array_equal(d_a, np_a)
@@ -281,6 +289,33 @@ class _TestDistributedArray:
         testing.assert_array_equal(np_d, d_d)
         testing.assert_array_equal(np_c2, d_c2)
 
+    def _test_all_reduce(
+            self, shape, devices, mode, algorithm, comm_devices=()):
+        rng = numpy.random.default_rng(0)
+        # Chunks of the same index on all the devices and another group of
+        # chunks disjoint from them
+        idxs = [(slice(0, shape[0] // 2),), (slice(shape[0] // 2, None),)]
+        idxs = [_index_arith._normalize_index(shape, idx) for idx in idxs]
+        np_a = numpy.empty(shape, dtype='q')
+        chunks_map = {}
+        for idx in idxs:
+            parts = [rng.integers(1, 4, np_a[idx].shape) for _ in devices]
+            np_a[idx] = functools.reduce(mode.numpy_func, parts)
+            for dev, part in zip(devices, parts):
+                with cupy.cuda.Device(dev):
+                    chunk = _chunk._Chunk(
+                        cupy.asarray(part),
+                        cupy.cuda.get_current_stream().record(), idx)
+                chunks_map.setdefault(dev, []).append(chunk)
+        d_a = darray.DistributedArray(shape, np_a.dtype, chunks_map, mode)
+        d_a._prepare_comms_and_streams(comm_devices)
+        _chunk._all_reduce_intersections(
+            mode, shape, chunks_map, d_a._comms, d_a._streams, algorithm)
+        for chunks in chunks_map.values():
+            for chunk in chunks:
+                chunk.ready.synchronize()
+                testing.assert_array_equal(chunk.array, np_a[chunk.index])
+
 
 _2d_mappings = [
     {
@@ -438,6 +473,12 @@ class TestDistributedArray2Devices(_TestDistributedArray):
     def test_mul_max_mul(self, shape, index_map_a, index_map_b):
         super()._test_mul_max_mul(shape, index_map_a, index_map_b)
 
+    @pytest.mark.parametrize('shape', [(size,), shape_dim2])
+    @pytest.mark.parametrize('mode', [SUM, MAX, PROD])
+    @pytest.mark.parametrize('algorithm', [None, 'ring', 'tree'])
+    def test_all_reduce(self, shape, mode, algorithm):
+        super()._test_all_reduce(shape, [0, 1], mode, algorithm)
+
     def test_random_reshard_change_mode(self):
         pytest.skip("TODO")
 
@@ -601,6 +642,18 @@ class TestDistributedArray4Devices(_TestDistributedArray):
     def test_mul_max_mul(self, shape, index_map_a, index_map_b):
         super()._test_mul_max_mul(shape, index_map_a, index_map_b)
 
+    @pytest.mark.parametrize('shape', [(size,), shape_dim2])
+    @pytest.mark.parametrize('mode', [SUM, MAX, PROD])
+    @pytest.mark.parametrize('algorithm', [None, 'ring', 'tree'])
+    def test_all_reduce(self, shape, mode, algorithm):
+        super()._test_all_reduce(shape, [0, 1, 2, 3], mode, algorithm)
+
+    @pytest.mark.parametrize('mode', [SUM, MAX])
+    def test_all_reduce_subset(self, mode):
+        # Not all the devices of the communicators take part
+        super()._test_all_reduce(
+            shape_dim2, [0, 2, 3], mode, None, comm_devices=[0, 1, 2, 3])
+
     def test_random_reshard_change_mode(self):
         n_iter = 5
         n_ops = 4
@@ -9,10 +9,13 @@ import os
 import numpy
 import pytest
 
+import cupy
 from cupy.cuda import nccl
 from cupy import testing
 
 from cupyx.distributed import init_process_group
+from cupyx.distributed import _nccl_comm
+from cupyx.distributed._nccl_comm import _make_buckets
 from cupyx.distributed._nccl_comm import _mpi_available
 
 
@@ -54,6 +57,56 @@ def _run_test_with_mpi(test_name, dtype=None):
     assert proc.returncode == 0
 
 
+def test_make_buckets():
+    infos = [('f', 8), ('d', 16), ('f', 8), ('f', 40), ('f', 4), ('d', 8)]
+    assert _make_buckets(infos, 16) == [[0, 2], [1], [3], [4], [5]]
+    assert _make_buckets(infos, 1 << 20) == [[0, 2, 3, 4], [1, 5]]
+    assert _make_buckets(infos, 0) == [[i] for i in range(len(infos))]
+    assert _make_buckets([], 16) == []
+
+
+def test_packed_layout():
+    offsets, total = _nccl_comm._packed_layout(
+        [3, 5, 0, 2], ['f', 'i', 'd', 'D'])
+    assert offsets == [0, 16, 48, 48]
+    assert total == 80
+
+
+def test_pack_arrays():
+    arrays = [cupy.arange(3, dtype='D'), cupy.arange(5, dtype='i'),
+              cupy.empty(0, 'q'), cupy.arange(7, dtype='e')]
+    buf = _nccl_comm._pack_arrays(arrays)
+    assert buf.dtype == numpy.uint8
+    unpacked = _nccl_comm._unpack_arrays(
+        buf, [a.size for a in arrays], [a.dtype for a in arrays])
+    for a, b in zip(arrays, unpacked):
+        assert a.dtype == b.dtype
+        testing.assert_array_equal(a, b)
+
+
+def test_structure_header():
+    data = cupy.array([1, 2, 3], 'f')
+    indptr = cupy.array([0, 2, 3], 'i')
+    indices = cupy.array([0, 1, 1], 'i')
+    header = _nccl_comm._structure_header(
+        'csr', (2, 2), [data, indptr, indices])
+    assert header.dtype == numpy.uint64
+    testing.assert_array_equal(header[:6], [1, 2, 2, 3, 3, 3])
+    # Values do not take part in the structure
+    testing.assert_array_equal(
+        header, _nccl_comm._structure_header(
+            'csr', (2, 2), [data * 2, indptr.copy(), indices.copy()]))
+    others = [
+        ('csc', (2, 2), [data, indptr, indices]),
+        ('csr', (2, 3), [data, indptr, indices]),
+        ('csr', (2, 2), [data, cupy.array([0, 1, 3], 'i'), indices]),
+        ('csr', (2, 2), [data, indptr, cupy.array([1, 0, 1], 'i')]),
+    ]
+    for other in others:
+        assert not (header
+                    == _nccl_comm._structure_header(*other)).all()
+
+
 @pytest.mark.skipif(not nccl_available, reason='nccl is not installed')
 @testing.multi_gpu(2)
 class TestNCCLBackend:
@@ -72,6 +125,10 @@ class TestNCCLBackend:
     def test_all_reduce(self, dtype):
         self._run_test('all_reduce', dtype)
 
+    @testing.for_all_dtypes(no_bool=True)
+    def test_all_reduce_bucketed(self, dtype):
+        self._run_test('all_reduce_bucketed', dtype)
+
     @testing.for_all_dtypes(no_bool=True)
     def test_reduce_scatter(self, dtype):
         self._run_test('reduce_scatter', dtype)
@@ -133,6 +190,10 @@ class TestNCCLBackendSparse:
     def test_all_reduce(self, dtype):
         self._run_test('sparse_all_reduce', dtype)
 
+    @testing.for_dtypes('fdFD')
+    def test_all_reduce_structure(self, dtype):
+        self._run_test('sparse_all_reduce_structure', dtype)
+
     @testing.for_dtypes('fdFD')
     def test_scatter(self, dtype):
         self._run_test('sparse_scatter', dtype)
@@ -165,6 +226,29 @@ class TestNCCLBackendSparseWithMPI(TestNCCLBackendSparse):
         _run_test_with_mpi(test, dtype)
 
 
+class TestSocketBackend:
+
+    @testing.for_all_dtypes(no_bool=True)
+    def test_all_reduce(self, dtype):
+        _run_test('socket_all_reduce', dtype)
+
+    @testing.for_dtypes('bfD')
+    def test_broadcast(self, dtype):
+        _run_test('socket_broadcast', dtype)
+
+    @testing.for_dtypes('ifD')
+    def test_collectives(self, dtype):
+        _run_test('socket_collectives', dtype)
+
+    @testing.multi_gpu(2)
+    @testing.for_dtypes('fD')
+    def test_device_arrays(self, dtype):
+        _run_test('socket_device_arrays', dtype)
+
+    def test_trace(self):
+        _run_test('socket_trace')
+
+
 @pytest.mark.skipif(not nccl_available, reason='nccl is not installed')
 class TestInitDistributed(unittest.TestCase):
 
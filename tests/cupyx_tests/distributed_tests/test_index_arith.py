@@ -3,6 +3,8 @@ from __future__ import annotations
 import random
 import math
 
+import numpy
+
 from cupyx.distributed.array import _index_arith
 
 
@@ -44,3 +46,32 @@ def test_slice_intersection():
             assert all_indices(c) == all_indices(a) & all_indices(b)
             p = _index_arith._index_for_subslice(a, c, max_value)
             assert all_indices(c) == all_indices(a, p)
+
+
+def test_index_difference():
+    iteration = 300
+    shape = (12, 10)
+    a = numpy.arange(numpy.prod(shape)).reshape(shape)
+
+    def random_index(max_step):
+        idx = []
+        for length in shape:
+            start = random.randint(0, length - 1)
+            stop = random.randint(start + 1, length)
+            step = random.randint(1, max_step)
+            idx.append(slice(start, stop, step))
+        return tuple(idx)
+
+    for _ in range(iteration):
+        max_step = random.choice([1, 3])
+        a_idx = random_index(max_step)
+        b_idx = random_index(max_step)
+        diff = _index_arith._index_difference(a_idx, b_idx, shape)
+        if diff is None:
+            # b does not cover a contiguous run of a on some axis
+            assert max_step > 1
+            continue
+        expected = set(a[a_idx].ravel()) - set(a[b_idx].ravel())
+        actual = [set(a[idx].ravel()) for idx in diff]
+        assert set().union(*actual) == expected
+        assert sum([len(s) for s in actual]) == len(expected)
@@ -139,6 +139,140 @@ configs_b = [
                     [{1}, {1}]])]
 
 
+# No device holds both blocks of A and B to multiply
+config_2x1_1x2 = MatMulConfig(
+    make_2d_config([0, 6, 10], [0, 20],
+                   [[{0}],
+                    [{1}]]),
+    make_2d_config([0, 20], [0, 7, 12],
+                   [[{2}, {3}]]))
+
+
+# The inner axis is empty
+config_2x0_0x2 = MatMulConfig(
+    ArrayConfig((10, 0), {0: [(slice(0, 6), slice(0, 0))],
+                          1: [(slice(6, 10), slice(0, 0))]}),
+    ArrayConfig((0, 12), {2: [(slice(0, 0), slice(0, 7))],
+                          3: [(slice(0, 0), slice(7, 12))]}))
+
+
+def _location_maps(config):
+    return (_linalg._group_by_batch(config.a.shape, config.a.index_map)[()],
+            _linalg._group_by_batch(config.b.shape, config.b.index_map)[()])
+
+
+@pytest.mark.parametrize(
+    'config',
+    [config_1x2_2x2, config_2x2_2x2, config_1x4_4x1, config_2x3_3x2,
+     config_2x1_1x2])
+@pytest.mark.parametrize('n_layers', [1, 2, 3])
+@pytest.mark.parametrize('panel_size', [1, 4, 1024])
+def test_make_summa_schedule(config, n_layers, panel_size):
+    location_map_a, location_map_b = _location_maps(config)
+    blocking = _linalg._find_blocking(location_map_a, location_map_b)
+    schedule = _linalg._make_summa_schedule(
+        blocking, location_map_a, location_map_b, [0, 1, 2, 3], 8,
+        panel_size, n_layers)
+
+    # The panels of each output block are covered once by distinct devices
+    n = blocking.k_partitions[-1]
+    blocks: dict[tuple, list] = {}
+    for task in schedule.tasks:
+        blocks.setdefault((task.i_range, task.j_range), []).append(task)
+    n_blocks = ((len(blocking.i_partitions) - 1)
+                * (len(blocking.j_partitions) - 1))
+    assert len(blocks) == n_blocks
+    for tasks in blocks.values():
+        assert len({task.dev for task in tasks}) == len(tasks)
+        assert len(tasks) == min(n_layers, 4, len(_linalg._split_panels(
+            blocking.k_partitions, panel_size)))
+        k_ranges = sorted([k for task in tasks for k in task.k_ranges])
+        assert k_ranges[0][0] == 0 and k_ranges[-1][1] == n
+        for (_, stop), (start, _) in zip(k_ranges, k_ranges[1:]):
+            assert stop == start
+        assert all([stop - start <= panel_size for start, stop in k_ranges])
+
+    # Each device holds or receives the panels it multiplies
+    for step in schedule.steps:
+        sends = {(s.matrix, s.block, s.k_range, s.dst): s for s in step.sends}
+        assert len(sends) == len(step.sends)
+        used = set()
+        for t, k_range, block_a, block_b in step.products:
+            dev = schedule.tasks[t].dev
+            for matrix, block, location_map in (
+                    (0, block_a, location_map_a),
+                    (1, block_b, location_map_b)):
+                key = (matrix, block, k_range, dev)
+                if dev in location_map[block]:
+                    assert key not in sends
+                else:
+                    assert sends[key].src in location_map[block]
+                    used.add(key)
+        assert used == sends.keys()
+
+
+def test_choose_algorithm():
+    devices = [0, 1, 2, 3]
+    location_map_a, location_map_b = _location_maps(config_1x4_4x1)
+    blocking = _linalg._find_blocking(location_map_a, location_map_b)
+
+    def choose(algorithm, itemsize=8):
+        return _linalg._choose_algorithm(
+            blocking, location_map_a, location_map_b, devices, itemsize,
+            algorithm, panel_size=4)
+
+    assert isinstance(choose('local'), list)
+    schedule = choose('summa')
+    assert len(schedule.tasks) == 1
+    schedule = choose('2.5d')
+    assert len(schedule.tasks) > 1
+    with pytest.raises(ValueError, match='Unknown'):
+        choose('cannon')
+
+    # Co-located large blocks are multiplied without moving them
+    plan = choose('auto', itemsize=1 << 20)
+    if isinstance(plan, _linalg._SummaSchedule):
+        assert all([not step.sends for step in plan.steps])
+
+    # SUMMA is needed when no device holds both blocks
+    location_map_a, location_map_b = _location_maps(config_2x1_1x2)
+    blocking = _linalg._find_blocking(location_map_a, location_map_b)
+    with pytest.raises(RuntimeError, match='no device'):
+        choose('local')
+    assert isinstance(choose('auto'), _linalg._SummaSchedule)
+
+
+@pytest.mark.parametrize('n_layers', [1, 2])
+def test_make_summa_schedule_empty_inner_axis(n_layers):
+    location_map_a, location_map_b = _location_maps(config_2x0_0x2)
+    blocking = _linalg._find_blocking(location_map_a, location_map_b)
+    schedule = _linalg._make_summa_schedule(
+        blocking, location_map_a, location_map_b, [0, 1, 2, 3], 8,
+        4, n_layers)
+    # Every output block is still assigned to a device
+    assert sorted([(task.i_range, task.j_range)
+                   for task in schedule.tasks]) == [
+        ((0, 6), (0, 7)), ((0, 6), (7, 12)),
+        ((6, 10), (0, 7)), ((6, 10), (7, 12))]
+    assert all([task.k_ranges == () for task in schedule.tasks])
+    assert schedule.steps == []
+
+
+def test_estimate_time():
+    location_map_a, location_map_b = _location_maps(config_2x1_1x2)
+    blocking = _linalg._find_blocking(location_map_a, location_map_b)
+    model = _linalg._CostModel(latency=1, bandwidth=1, flops=1)
+
+    def estimate(panel_size, n_layers):
+        schedule = _linalg._make_summa_schedule(
+            blocking, location_map_a, location_map_b, [0, 1, 2, 3], 1,
+            panel_size, n_layers, model)
+        return _linalg._estimate_summa_time(schedule, 1, model)
+
+    # Smaller panels overlap more of the communication with computation
+    assert estimate(20, 1) > estimate(5, 1)
+
+
 @testing.multi_gpu(4)
 class TestDistributedMatMul:
     @pytest.mark.parametrize(
@@ -151,6 +285,45 @@ class TestDistributedMatMul:
         d_c = d_a @ d_b
         testing.assert_array_equal(d_c.get(), np_c, strict=True)
 
+    @pytest.mark.parametrize(
+        'config',
+        [config_1x2_2x2, config_2x2_2x2, config_1x4_4x1, config_2x3_3x2,
+         config_2x1_1x2])
+    @pytest.mark.parametrize('algorithm', ['summa', '2.5d'])
+    @pytest.mark.parametrize('panel_size', [3, 1024])
+    def test_matmul_summa(self, config, algorithm, panel_size):
+        np_a, d_a, np_b, d_b = config.instantiate()
+        np_c = np_a @ np_b
+        d_c = array.matmul(
+            d_a, d_b, algorithm=algorithm, panel_size=panel_size)
+        assert d_c.mode is SUM
+        testing.assert_array_equal(d_c.get(), np_c, strict=True)
+        testing.assert_array_equal(
+            d_c.change_mode(REPLICA).get(), np_c, strict=True)
+
+    def test_matmul_local_not_colocated(self):
+        np_a, d_a, np_b, d_b = config_2x1_1x2.instantiate()
+        with pytest.raises(RuntimeError, match=r'no device'):
+            d_a @ d_b
+        testing.assert_array_equal(
+            array.matmul(d_a, d_b, algorithm='auto').get(), np_a @ np_b)
+
+    @pytest.mark.parametrize('algorithm', ['summa', '2.5d', 'auto'])
+    def test_matmul_empty_inner_axis(self, algorithm):
+        np_a, d_a, np_b, d_b = config_2x0_0x2.instantiate()
+        d_c = array.matmul(d_a, d_b, algorithm=algorithm)
+        testing.assert_array_equal(d_c.get(), np_a @ np_b, strict=True)
+
+    def test_matmul_local_empty_inner_axis(self):
+        config = MatMulConfig(
+            ArrayConfig((10, 0), {0: [(slice(0, 10), slice(0, 0))],
+                                  1: [(slice(0, 10), slice(0, 0))]}),
+            ArrayConfig((0, 12), {0: [(slice(0, 0), slice(0, 7))],
+                                  1: [(slice(0, 0), slice(7, 12))]}))
+        np_a, d_a, np_b, d_b = config.instantiate()
+        testing.assert_array_equal(
+            (d_a @ d_b).get(), np_a @ np_b, strict=True)
+
     def test_incompatible_blockings(self):
         wrong_config = MatMulConfig(config_1x2_2x2.a, config_2x3_3x2.b)
         np_a, d_a, np_b, d_b = wrong_config.instantiate()
@@ -7,11 +7,46 @@ import pytest
 from cupy.cuda import nccl
 from cupy.testing import _condition
 from cupyx.distributed import _store
+from cupyx.distributed import _store_tree
 
 
 nccl_available = nccl.available
 
 
+def _barrier_worker(rank, world_size):
+    proxy = _store.TCPStoreProxy()
+    proxy[f'rank-{rank}'] = rank
+    proxy.barrier()
+    keys = [f'rank-{i}' for i in range(world_size)]
+    assert proxy.multi_get(keys) == list(range(world_size))
+    proxy.barrier()
+    proxy.close()
+
+
+def _tree_worker(rank, world_size, fanout, algorithm):
+    proxy = _store.TCPStoreProxy()
+    tree = _store_tree.StoreTree(proxy, rank, world_size, fanout=fanout)
+    try:
+        keys = [f'rank-{i}' for i in range(world_size)]
+        for i in range(3):
+            proxy[f'rank-{rank}'] = i
+            tree.barrier(algorithm)
+            # All the ranks have set their values before the barrier
+            assert proxy.multi_get(keys) == [i] * world_size
+            tree.barrier(algorithm)
+        for root in range(world_size):
+            value = b'root-%d' % root if rank == root else None
+            assert tree.broadcast('key', value, root) == b'root-%d' % root
+        root = world_size - 1
+        value = 1234 if rank == root else None
+        assert tree.broadcast('int', value, root) == 1234
+        # The keys of the completed operations have been removed
+        assert tree._store.storage == {}
+    finally:
+        tree.close()
+        proxy.close()
+
+
 @pytest.mark.skipif(not nccl_available, reason='nccl is not installed')
 class TestTCPStore(unittest.TestCase):
 
@@ -42,4 +77,125 @@ class TestTCPStore(unittest.TestCase):
                 a = proxy[123]  # NOQA
         finally:
             store.stop()
-    # Barrier is tested directly in the communicators
+
+    @_condition.retry(10)
+    def test_store_large_value(self):
+        store = _store.TCPStore(1)
+        store.run()
+        try:
+            proxy = _store.TCPStoreProxy()
+            value = bytes(range(256)) * 4096
+            proxy['test-large'] = value
+            assert proxy['test-large'] == value
+        finally:
+            store.stop()
+
+    @_condition.retry(10)
+    def test_store_multi_get_set(self):
+        store = _store.TCPStore(1)
+        store.run()
+        try:
+            proxy = _store.TCPStoreProxy()
+            proxy.multi_set({'a': 1, 'b': b'2', 'c': 3})
+            assert proxy.multi_get(['c', 'a', 'b']) == [3, 1, b'2']
+            proxy.multi_set([('a', 4), ('d', 5)])
+            assert proxy.multi_get(['a', 'd']) == [4, 5]
+            with pytest.raises(RuntimeError):
+                proxy.multi_get(['a', 'missing'])
+            # The connection is still usable after an error
+            assert proxy['a'] == 4
+        finally:
+            store.stop()
+
+    @_condition.retry(10)
+    def test_store_persistent_connection(self):
+        store = _store.TCPStore(1)
+        store.run()
+        try:
+            proxy = _store.TCPStoreProxy()
+            proxy['test-value'] = 0
+            sock = proxy._socket
+            for i in range(100):
+                proxy['test-value'] = i
+                assert proxy['test-value'] == i
+            assert proxy._socket is sock
+        finally:
+            store.stop()
+
+    @_condition.retry(10)
+    def test_store_barrier(self):
+        world_size = 8
+        store = _store.TCPStore(world_size)
+        store.run()
+        try:
+            processes = [
+                _store.ExceptionAwareProcess(
+                    target=_barrier_worker, args=(rank, world_size))
+                for rank in range(world_size)]
+            for p in processes:
+                p.start()
+            for p in processes:
+                p.join()
+        finally:
+            store.stop()
+    # Barrier is also tested directly in the communicators
+
+    @_condition.retry(10)
+    def test_store_wait(self):
+        store = _store.TCPStore(1)
+        store.run()
+        try:
+            proxy = _store.TCPStoreProxy()
+            proxy.wait([])
+            proxy['test-a'] = 1
+            proxy.wait(['test-a'])
+            assert proxy.multi_get(['test-a'], wait=True) == [1]
+        finally:
+            store.stop()
+
+    @_condition.retry(10)
+    def test_store_delete(self):
+        store = _store.TCPStore(1)
+        store.run()
+        try:
+            proxy = _store.TCPStoreProxy()
+            proxy.multi_set({'test-a': 1, 'test-b': 2, 'test-c': 3})
+            assert proxy.multi_get(
+                ['test-a', 'test-b'], wait=True, delete=True) == [1, 2]
+            proxy.wait(['test-c'], delete=True)
+            # Deleting keys that are not set is not an error
+            proxy.multi_del(['test-a', 'test-d'])
+            for key in ['test-a', 'test-b', 'test-c']:
+                with pytest.raises(RuntimeError):
+                    proxy[key]
+            proxy['test-a'] = 4
+            assert proxy['test-a'] == 4
+        finally:
+            store.stop()
+
+
+@pytest.mark.parametrize('world_size', [1, 5, 16])
+@pytest.mark.parametrize('fanout', [1, 2, 4])
+@pytest.mark.parametrize('algorithm', ['dissemination', 'tree'])
+def test_store_tree(world_size, fanout, algorithm):
+    store = _store.TCPStore(world_size)
+    store.run()
+    try:
+        processes = [
+            _store.ExceptionAwareProcess(
+                target=_tree_worker,
+                args=(rank, world_size, fanout, algorithm))
+            for rank in range(world_size)]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+    finally:
+        store.stop()
+
+
+def test_store_tree_invalid():
+    with pytest.raises(ValueError):
+        _store_tree.StoreTree(None, 2, 2)
+    with pytest.raises(ValueError):
+        _store_tree.StoreTree(None, 0, 2, fanout=0)
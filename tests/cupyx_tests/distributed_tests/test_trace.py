@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+
+import numpy
+import pytest
+
+from cupy import testing
+from cupyx.distributed import _trace
+
+
+def test_describe():
+    a = numpy.empty(10, 'f')
+    b = numpy.empty((4, 10), 'f')
+    assert _trace._describe('all_reduce', (a, a, 'sum', None), 4) == (
+        40, [0, 1, 2, 3])
+    assert _trace._describe('reduce', (a, a, 2, 'sum', None), 4) == (
+        40, [2])
+    assert _trace._describe('broadcast', (a, 1, None), 4) == (40, [1])
+    assert _trace._describe('all_gather', (a, b, 10, None), 4) == (
+        160, [0, 1, 2, 3])
+    assert _trace._describe('scatter', (b, a, 0, None), 4) == (160, [0])
+    assert _trace._describe('send', (a, 3, None), 4) == (40, [3])
+    assert _trace._describe('recv', (a, 3, None), 4) == (40, [3])
+    assert _trace._describe('send_recv', (a, a, 1, None), 4) == (40, [1])
+    assert _trace._describe(
+        'all_reduce_bucketed', ([a, b], 'sum', None, None), 4) == (
+            200, [0, 1, 2, 3])
+
+
+def test_tracer_host_timing():
+    tracer = _trace.CollectiveTracer(0, 4, device_timing=False)
+    for nbytes in (100, 300):
+        with tracer._trace('all_reduce', nbytes, [0, 1, 2, 3]):
+            pass
+    with tracer._trace('send', 50, [1]):
+        pass
+    records = tracer.records()
+    assert [(r['op'], r['bytes'], r['seq']) for r in records] == [
+        ('all_reduce', 100, 0), ('all_reduce', 300, 1), ('send', 50, 0)]
+    for r in records:
+        assert 0 <= r['start'] <= r['end']
+    r = records[0]
+    if r['end'] > r['start']:
+        assert r['algbw'] == pytest.approx(100 / (r['end'] - r['start']))
+        assert r['busbw'] == pytest.approx(r['algbw'] * 1.5)
+    summary = tracer.summary()
+    assert summary['all_reduce']['calls'] == 2
+    assert summary['all_reduce']['bytes'] == 400
+    assert summary['send']['busbw'] == summary['send']['algbw']
+
+
+def test_tracer_chrome_trace(tmp_path):
+    tracer = _trace.CollectiveTracer(2, 4, device_timing=False)
+    with tracer._trace('broadcast', 8, [0]):
+        pass
+    path = str(tmp_path / 'trace.json')
+    tracer.save(path)
+    with open(path) as f:
+        trace = json.load(f)
+    assert trace['metadata'] == {'rank': 2, 'n_ranks': 4}
+    events = [e for e in trace['traceEvents'] if e['ph'] == 'X']
+    assert len(events) == 1
+    assert events[0]['name'] == 'broadcast'
+    assert events[0]['pid'] == 2
+    assert events[0]['args']['bytes'] == 8
+
+
+def _make_trace(rank, calls):
+    # calls: list of (op, seq, ts, dur)
+    return {
+        'traceEvents': [
+            {'name': op, 'ph': 'X', 'pid': rank, 'tid': 0, 'ts': ts,
+             'dur': dur, 'args': {'seq': seq, 'bytes': 0}}
+            for op, seq, ts, dur in calls],
+        'metadata': {'rank': rank, 'n_ranks': 2}}
+
+
+def test_merge_traces(tmp_path):
+    # Rank 1 has a clock 1000us ahead and arrives 30us late at the
+    # all_reduce, while rank 0 arrives late at the broadcast
+    trace0 = _make_trace(0, [
+        ('all_reduce', 0, 100, 50), ('broadcast', 0, 300, 20),
+        ('send', 0, 400, 5)])
+    trace1 = _make_trace(1, [
+        ('all_reduce', 0, 1130, 20), ('broadcast', 0, 1290, 30),
+        ('recv', 0, 1400, 10)])
+    path = str(tmp_path / 'trace1.json')
+    with open(path, 'w') as f:
+        json.dump(trace1, f)
+
+    out = str(tmp_path / 'merged.json')
+    merged = _trace.merge_traces([trace0, path], out)
+    with open(out) as f:
+        assert json.load(f) == merged
+
+    assert merged['metadata']['ranks'] == [0, 1]
+    testing.assert_allclose(merged['metadata']['offsets_us'], [0, -1000])
+    events = {(e['pid'], e['name']): e for e in merged['traceEvents']}
+    assert events[1, 'all_reduce']['ts'] == 130
+    assert events[1, 'recv']['ts'] == 400
+    assert events[0, 'all_reduce']['args']['straggler'] == 1
+    assert events[0, 'all_reduce']['args']['straggler_delay_us'] == 30
+    assert events[1, 'broadcast']['args']['straggler'] == 0
+    assert 'straggler' not in events[0, 'send']['args']
+    assert merged['metadata']['stragglers'] == [1, 1]
+
+
+def test_merge_traces_empty():
+    with pytest.raises(ValueError):
+        _trace.merge_traces([])
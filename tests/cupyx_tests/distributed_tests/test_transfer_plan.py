@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import random
+
+import numpy
+import pytest
+
+from cupyx.distributed.array import _index_arith
+from cupyx.distributed.array import _transfer_plan
+
+
+def _random_index_map(shape, n_devices, n_chunks):
+    index_map = {}
+    for _ in range(n_chunks):
+        dev = random.randrange(n_devices)
+        idx = []
+        for length in shape:
+            start = random.randrange(length)
+            stop = random.randint(start + 1, length)
+            step = random.randint(1, 3)
+            idx.append(slice(start, stop, step))
+        index_map.setdefault(dev, []).append(tuple(idx))
+    return _index_arith._normalize_index_map(shape, index_map)
+
+
+def _simulate(plan, shape, src_index_map, dst_index_map):
+    # Execute the plan with NumPy arrays in the replica mode
+    a = numpy.arange(numpy.prod(shape)).reshape(shape)
+    src = {dev: [a[idx] for idx in idxs]
+           for dev, idxs in src_index_map.items()}
+    dst = {dev: [numpy.full(a[idx].shape, -1) for idx in idxs]
+           for dev, idxs in dst_index_map.items()}
+    for t in plan.local + [t for batch in plan.batches for t in batch]:
+        dst[t.dst_dev][t.dst[1]][t.dst_idx] = src[t.src_dev][t.src[1]][
+            t.src_idx]
+    return a, dst
+
+
+def _covered(shape, index_map):
+    covered = numpy.zeros(shape, dtype=bool)
+    for idxs in index_map.values():
+        for idx in idxs:
+            covered[idx] = True
+    return covered
+
+
+@pytest.mark.parametrize('shape', [(20,), (9, 13), (4, 5, 6)])
+@pytest.mark.parametrize('max_staging_bytes', [None, 1, 64, 512])
+def test_plan_transfers(shape, max_staging_bytes):
+    itemsize = 8
+    for _ in range(20):
+        src_index_map = _random_index_map(shape, 4, 6)
+        dst_index_map = _random_index_map(shape, 4, 6)
+        plan = _transfer_plan._plan_transfers(
+            shape, itemsize, src_index_map, dst_index_map, max_staging_bytes)
+
+        # Data are moved correctly wherever the sources cover
+        a, dst = _simulate(plan, shape, src_index_map, dst_index_map)
+        covered = _covered(shape, src_index_map)
+        for dev, idxs in dst_index_map.items():
+            for i, idx in enumerate(idxs):
+                mask = covered[idx]
+                numpy.testing.assert_array_equal(
+                    dst[dev][i][mask], a[idx][mask])
+
+        # Same transfers as the intersections of all the chunks
+        transfers = _transfer_plan._find_transfers(
+            shape, itemsize, src_index_map, dst_index_map)
+        planned = plan.local + [t for batch in plan.batches for t in batch]
+
+        def key(t):
+            return (t.src, t.dst)
+        assert sorted(planned, key=key) == sorted(transfers, key=key)
+        assert all([t.is_local for t in plan.local])
+
+        for batch in plan.batches:
+            assert batch
+            assert all([not t.is_local for t in batch])
+            # Transfers are grouped by device pairs
+            pairs = [(t.src_dev, t.dst_dev) for t in batch]
+            assert pairs == sorted(pairs)
+            # Staging memory is bounded
+            if max_staging_bytes is not None and len(batch) > 1:
+                staging: dict[int, int] = {}
+                for t in batch:
+                    staging[t.src_dev] = staging.get(t.src_dev, 0) + t.nbytes
+                    staging[t.dst_dev] = staging.get(t.dst_dev, 0) + t.nbytes
+                assert max(staging.values()) <= max_staging_bytes
+
+        assert plan.nbytes == sum([t.nbytes for t in transfers
+                                   if not t.is_local])
+        assert sum(plan.bytes_per_link().values()) == plan.nbytes
+
+
+@pytest.mark.parametrize('shape', [(20,), (9, 13), (4, 5, 6)])
+def test_plan_transfers_replica(shape):
+    itemsize = 8
+    for _ in range(20):
+        src_index_map = _random_index_map(shape, 4, 6)
+        dst_index_map = _random_index_map(shape, 4, 6)
+        plan = _transfer_plan._plan_transfers(
+            shape, itemsize, src_index_map, dst_index_map, replica=True)
+        all_plan = _transfer_plan._plan_transfers(
+            shape, itemsize, src_index_map, dst_index_map)
+        assert plan.nbytes <= all_plan.nbytes
+
+        a, dst = _simulate(plan, shape, src_index_map, dst_index_map)
+        covered = _covered(shape, src_index_map)
+        for dev, idxs in dst_index_map.items():
+            for i, idx in enumerate(idxs):
+                mask = covered[idx]
+                numpy.testing.assert_array_equal(
+                    dst[dev][i][mask], a[idx][mask])
+
+
+def test_plan_transfers_replica_no_duplicates():
+    shape = (8, 8)
+    # Every element is held by three devices
+    src_index_map = _index_arith._normalize_index_map(shape, {
+        0: [slice(None)],
+        1: [slice(None, 4), slice(4, None)],
+        2: [(slice(None), slice(None, 6)), (slice(None), slice(6, None))],
+    })
+    dst_index_map = _index_arith._normalize_index_map(shape, {
+        0: [slice(2, 6)],
+        3: [(slice(None), slice(1, 7))],
+    })
+    plan = _transfer_plan._plan_transfers(
+        shape, 1, src_index_map, dst_index_map, replica=True)
+    # Local data is used for the chunk on device 0
+    assert [t.src_dev for t in plan.local] == [0]
+    assert plan.local[0].nbytes == 4 * 8
+    # Device 3 receives each element once, spread over the sources
+    assert plan.nbytes == 8 * 6
+    assert len(plan.bytes_per_link()) > 1
+
+
+def test_plan_transfers_replica_peer_access():
+    shape = (16,)
+    src_index_map = _index_arith._normalize_index_map(
+        shape, {0: [slice(None)], 1: [slice(None)]})
+    dst_index_map = _index_arith._normalize_index_map(
+        shape, {2: [slice(None)]})
+    plan = _transfer_plan._plan_transfers(
+        shape, 1, src_index_map, dst_index_map, replica=True,
+        can_access_peer=lambda src, dst: src == 1)
+    assert plan.bytes_per_link() == {(1, 2): 16}
+
+
+def test_plan_transfers_nbytes():
+    shape = (4, 6)
+    src_index_map = _index_arith._normalize_index_map(
+        shape, {0: slice(None), 1: (slice(None), slice(3, None))})
+    dst_index_map = _index_arith._normalize_index_map(
+        shape, {0: (slice(None), slice(None, 3)), 2: (slice(2, None),)})
+    plan = _transfer_plan._plan_transfers(
+        shape, 4, src_index_map, dst_index_map)
+    assert [(t.src, t.dst, t.nbytes) for t in plan.local] == [
+        ((0, 0), (0, 0), 4 * 3 * 4)]
+    assert plan.bytes_per_link() == {(0, 2): 2 * 6 * 4, (1, 2): 2 * 3 * 4}
+    assert plan.nbytes == 2 * 6 * 4 + 2 * 3 * 4
+
+
+def test_plan_transfers_batches():
+    shape = (16, 8)
+    # Each row is sent from device 0 to device 1, and from device 2 to 3
+    src_index_map = {0: [(slice(i, i + 1, 1), slice(0, 8, 1))
+                         for i in range(8)],
+                     2: [(slice(i, i + 1, 1), slice(0, 8, 1))
+                         for i in range(8, 16)]}
+    dst_index_map = {1: [(slice(0, 8, 1), slice(0, 8, 1))],
+                     3: [(slice(8, 16, 1), slice(0, 8, 1))]}
+    plan = _transfer_plan._plan_transfers(
+        shape, 1, src_index_map, dst_index_map, max_staging_bytes=16)
+    # Two rows of each pair fit in a batch, using both links at once
+    assert len(plan.batches) == 4
+    for batch in plan.batches:
+        assert [(t.src_dev, t.dst_dev) for t in batch] == [
+            (0, 1), (0, 1), (2, 3), (2, 3)]
+
+    plan = _transfer_plan._plan_transfers(
+        shape, 1, src_index_map, dst_index_map, max_staging_bytes=None)
+    assert len(plan.batches) == 1
+
+
+@pytest.mark.parametrize('steps_func', [
+    _transfer_plan._ring_all_reduce_steps,
+    _transfer_plan._tree_all_reduce_steps,
+])
+@pytest.mark.parametrize('n', [1, 2, 3, 4, 7, 8])
+@pytest.mark.parametrize('size', [0, 1, 5, 64])
+def test_all_reduce_steps(steps_func, n, size):
+    rng = numpy.random.default_rng(0)
+    data = [rng.integers(0, 100, size) for _ in range(n)]
+    expected = sum(data, numpy.zeros(size, dtype=numpy.int64))
+    steps = steps_func(n, size)
+    for step in steps:
+        assert step
+        # No device sends or receives more than one message in a step
+        assert len({t.src for t in step}) == len(step)
+        assert len({t.dst for t in step}) == len(step)
+        # Messages of a step are exchanged simultaneously
+        sent = [data[t.src][t.start:t.stop].copy() for t in step]
+        for t, x in zip(step, sent):
+            assert t.src != t.dst and 0 <= t.start < t.stop <= size
+            if t.reduce:
+                data[t.dst][t.start:t.stop] += x
+            else:
+                data[t.dst][t.start:t.stop] = x
+    for x in data:
+        numpy.testing.assert_array_equal(x, expected)
+
+
+def test_all_reduce_steps_count():
+    n, size = 8, 1024
+    ring = _transfer_plan._ring_all_reduce_steps(n, size)
+    tree = _transfer_plan._tree_all_reduce_steps(n, size)
+    assert len(ring) == 2 * (n - 1)
+    assert len(tree) == 2 * 3
+    # Each device sends 2 * (n - 1) / n of the data in the ring
+    for r in range(n):
+        assert sum([t.stop - t.start for step in ring for t in step
+                    if t.src == r]) == 2 * (n - 1) * size // n
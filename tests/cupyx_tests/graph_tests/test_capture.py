@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import queue
+import threading
+
+import pytest
+
+import cupy
+from cupy import cuda
+from cupy import testing
+from cupy._util import PerformanceWarning
+import cupyx.graph
+
+
+@pytest.mark.skipif(cuda.runtime.is_hip,
+                    reason='HIP does not support this')
+class TestCapture:
+
+    def test_replay(self):
+        calls = []
+
+        @cupyx.graph.capture
+        def f(x, y):
+            calls.append(1)
+            return cupy.sqrt(x * 2 + y) - 1
+
+        for i in range(4):
+            x = testing.shaped_random((10,), cupy, cupy.float32, seed=i)
+            y = testing.shaped_random((10,), cupy, cupy.float32, seed=i + 10)
+            testing.assert_allclose(f(x, y), cupy.sqrt(x * 2 + y) - 1)
+        # warm-up and capture on the first call only
+        assert len(calls) == 2
+
+    def test_multiple_outputs(self):
+        @cupyx.graph.capture
+        def f(x):
+            return x + 1, (x * 2, None)
+
+        for _ in range(3):
+            x = testing.shaped_arange((2, 3), cupy, cupy.int32)
+            a, (b, c) = f(x)
+            testing.assert_array_equal(a, x + 1)
+            testing.assert_array_equal(b, x * 2)
+            assert c is None
+
+    def test_key(self):
+        calls = []
+
+        @cupyx.graph.capture
+        def f(x, scale):
+            calls.append(1)
+            return x * scale
+
+        x = testing.shaped_arange((4,), cupy, cupy.float64)
+        testing.assert_allclose(f(x, 2), x * 2)
+        testing.assert_allclose(f(x, 3), x * 3)
+        testing.assert_allclose(f(x[:2], 3), x[:2] * 3)
+        testing.assert_allclose(f(x, 3), x * 3)
+        assert len(calls) == 6
+
+    def test_no_copy_outputs(self):
+        @cupyx.graph.capture(copy_outputs=False)
+        def f(x):
+            return x + 1
+
+        x = testing.shaped_arange((4,), cupy, cupy.float32)
+        f(x)
+        out1 = f(x)
+        out2 = f(x * 2)
+        assert out1 is out2
+        testing.assert_allclose(out2, x * 2 + 1)
+
+    def test_fallback_synchronize(self):
+        calls = []
+
+        @cupyx.graph.capture
+        def f(x):
+            calls.append(1)
+            if x.sum() > 0:  # synchronize!
+                return x + 1
+            return x - 1
+
+        x = testing.shaped_arange((4,), cupy, cupy.float32)
+        with pytest.warns(PerformanceWarning):
+            testing.assert_allclose(f(x), x + 1)
+        testing.assert_allclose(f(-x - 1), -x - 2)
+        assert len(calls) == 3
+
+    def test_fallback_host_value(self):
+        @cupyx.graph.capture
+        def f(x):
+            return x + 1, 3
+
+        x = testing.shaped_arange((4,), cupy, cupy.float32)
+        with pytest.warns(PerformanceWarning):
+            f(x)
+        a, b = f(x)
+        testing.assert_allclose(a, x + 1)
+        assert b == 3
+
+    def test_capture_once_multithreaded(self):
+        calls = []
+
+        @cupyx.graph.capture
+        def f(x):
+            calls.append(1)
+            return x * 2
+
+        x = testing.shaped_arange((16,), cupy, cupy.float32)
+        barrier = threading.Barrier(4)
+        errors = queue.Queue()
+
+        def run():
+            try:
+                barrier.wait()
+                testing.assert_allclose(f(x), x * 2)
+            except Exception as e:
+                errors.put(e)
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors.empty()
+        # warm-up and capture by a single thread
+        assert len(calls) == 2
+        assert len(f._graphs) == 1
+
+    def test_multithreaded_streams(self):
+        @cupyx.graph.capture
+        def f(x):
+            return cupy.sin(x) * 2 + x
+
+        xs = [testing.shaped_random((1024, 256), cupy, cupy.float32, seed=i)
+              for i in range(4)]
+        expected = [cupy.sin(x) * 2 + x for x in xs]
+        f(xs[0])
+        errors = queue.Queue()
+
+        def run(x, out, ptds):
+            try:
+                stream = cuda.Stream.ptds if ptds else cuda.Stream()
+                with stream:
+                    for _ in range(10):
+                        testing.assert_allclose(f(x), out, rtol=1e-6)
+            except Exception as e:
+                errors.put(e)
+
+        threads = [threading.Thread(target=run, args=(x, out, i % 2 == 0))
+                   for i, (x, out) in enumerate(zip(xs, expected))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors.empty()
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import numpy
+import pytest
+
+import cupy
+from cupy import testing
+import cupyx
+import cupyx.scipy.fft as cp_fft
+
+
+def _max_device_bytes(n_elems, dtype):
+    # Device memory giving chunks of `n_elems` elements
+    return n_elems * numpy.result_type(dtype, numpy.complex64).itemsize * 4
+
+
+class TestPlanFFTnDecomposition:
+
+    @pytest.mark.parametrize('shape, axes, n_elems, kind, passes', [
+        ((8, 16, 32), None, 10 ** 6, 'in-core', ((0, 1, 2),)),
+        ((8, 16, 32), None, 16 * 32, 'slab', ((1, 2), (0,))),
+        ((8, 16, 32), None, 64, 'pencil', ((2,), (1,), (0,))),
+        ((6, 10, 12), (0, 2), 12 * 6, 'batched', ((0, 2),)),
+        ((6, 10, 12), (-1, 0), 12 * 5, 'slab', ((2,), (0,))),
+        ((6, 10, 12), (1,), 30, 'batched', ((1,),)),
+    ])
+    @pytest.mark.parametrize('n_devices', [1, 3])
+    def test_decomposition(self, shape, axes, n_elems, kind, passes,
+                           n_devices):
+        d = cp_fft.plan_fftn_decomposition(
+            shape, 'f', axes, n_devices=n_devices,
+            max_device_bytes=_max_device_bytes(n_elems, 'f'))
+        assert d.kind == kind
+        assert d.passes == passes
+        assert d.dtype == numpy.complex64
+        cover = numpy.zeros(shape, dtype=int)
+        for i in range(len(d.passes)):
+            for chunk in d.chunks(i):
+                cover[chunk] += 1
+                assert cover[chunk].size <= n_elems
+            n = [len(list(d.device_chunks(i, k))) for k in range(n_devices)]
+            assert sum(n) == d.n_chunks(i)
+            assert max(n) - min(n) <= 1
+        # Each pass visits every element once
+        assert (cover == len(d.passes)).all()
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            # A single transform of the last axis does not fit
+            cp_fft.plan_fftn_decomposition(
+                (4, 1000), 'd', max_device_bytes=_max_device_bytes(999, 'd'))
+        with pytest.raises(ValueError):
+            cp_fft.plan_fftn_decomposition(
+                (4, 10), 'd', (0, -2), max_device_bytes=10 ** 6)
+        with pytest.raises(cupy.exceptions.AxisError):
+            cp_fft.plan_fftn_decomposition(
+                (4, 10), 'd', (2,), max_device_bytes=10 ** 6)
+        with pytest.raises(ValueError, match='number of data points'):
+            cp_fft.plan_fftn_decomposition(
+                (4, 0), 'd', max_device_bytes=10 ** 6)
+        # An empty axis that is not transformed has no chunk
+        d = cp_fft.plan_fftn_decomposition(
+            (0, 10), 'd', (1,), max_device_bytes=10 ** 6)
+        assert d.n_chunks(0) == 0
+        assert list(d.chunks(0)) == []
+        assert d.kind == 'in-core'
+
+
+class TestFFTnOutOfCore:
+
+    @pytest.mark.parametrize('shape, axes, n_elems', [
+        ((8, 16, 32), None, 10 ** 6),
+        ((8, 16, 32), None, 16 * 32),
+        ((8, 16, 32), None, 64),
+        ((6, 10, 12), (0, 2), 12 * 5),
+        ((6, 10, 12), (1,), 30),
+    ])
+    @pytest.mark.parametrize('dtype', ['f', 'd', 'F', 'D'])
+    @pytest.mark.parametrize('norm', [None, 'ortho', 'forward'])
+    def test_fftn(self, shape, axes, n_elems, dtype, norm):
+        x = testing.shaped_random(shape, numpy, dtype, seed=0)
+        max_device_bytes = _max_device_bytes(n_elems, dtype)
+        y = cp_fft.fftn_out_of_core(
+            x, axes, norm, max_device_bytes=max_device_bytes)
+        assert isinstance(y, numpy.ndarray)
+        expected = numpy.fft.fftn(x, axes=axes, norm=norm)
+        rtol = 1e-4 if dtype in 'fF' else 1e-10
+        testing.assert_allclose(y, expected, rtol=rtol, atol=rtol * 10)
+        assert y.dtype == numpy.result_type(dtype, numpy.complex64)
+
+        out = cupyx.empty_pinned(shape, y.dtype)
+        z = cp_fft.ifftn_out_of_core(
+            y, axes, norm, max_device_bytes=max_device_bytes, out=out)
+        assert z is out
+        testing.assert_allclose(z, x, rtol=rtol, atol=rtol * 10)
+
+    @testing.multi_gpu(2)
+    def test_fftn_multi_gpu(self):
+        x = testing.shaped_random((8, 16, 32), numpy, 'D', seed=0)
+        d = cp_fft.plan_fftn_decomposition(
+            x.shape, x.dtype, n_devices=2,
+            max_device_bytes=_max_device_bytes(64, 'D'))
+        assert d.kind == 'pencil'
+        y = cp_fft.fftn_out_of_core(x, devices=[0, 1], decomposition=d)
+        testing.assert_allclose(
+            y, numpy.fft.fftn(x), rtol=1e-10, atol=1e-10)
+
+    def test_invalid(self):
+        x = numpy.zeros((4, 10))
+        with pytest.raises(TypeError):
+            cp_fft.fftn_out_of_core(cupy.asarray(x))
+        d = cp_fft.plan_fftn_decomposition(
+            (4, 5), x.dtype, max_device_bytes=10 ** 6)
+        with pytest.raises(ValueError):
+            cp_fft.fftn_out_of_core(x, decomposition=d)
+        with pytest.raises(ValueError):
+            cp_fft.fftn_out_of_core(x, out=numpy.empty((4, 10), 'F'))
+
+    def test_decomposition_mismatch(self):
+        x = numpy.zeros((4, 10))
+        d = cp_fft.plan_fftn_decomposition(
+            x.shape, x.dtype, axes=(1,), max_device_bytes=10 ** 6)
+        # Axes not transformed by the decomposition
+        with pytest.raises(ValueError):
+            cp_fft.fftn_out_of_core(x, decomposition=d)
+        with pytest.raises(ValueError):
+            cp_fft.fftn_out_of_core(x, axes=(0,), decomposition=d)
+        # Decomposition planned for another data type
+        with pytest.raises(ValueError):
+            cp_fft.fftn_out_of_core(
+                x.astype(numpy.float32), axes=(1,), decomposition=d)
+        y = cp_fft.fftn_out_of_core(x, axes=(-1,), decomposition=d)
+        assert y.dtype == numpy.complex128
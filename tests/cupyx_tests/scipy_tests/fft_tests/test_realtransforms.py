@@ -158,3 +158,17 @@ class TestDctnDstn:
         with scipy_fft.set_backend(backend):
             fft_func = getattr(scipy_fft, self.function)
             return self._run_transform(fft_func, xp, dtype)
+
+
+@testing.with_requires('scipy')
+class TestDctnDstnNonContiguous:
+
+    @pytest.mark.parametrize('function', ['dctn', 'dstn', 'idctn', 'idstn'])
+    @pytest.mark.parametrize('type', [2, 3])
+    @pytest.mark.parametrize('s, axes', [
+        (None, None), ((5, 3), (2, 0)), ((7,), (1,)), (None, (0, 2))])
+    @testing.numpy_cupy_allclose(scipy_name='scp', rtol=1e-10, atol=1e-10)
+    def test_transposed_input(self, xp, scp, function, type, s, axes):
+        x = testing.shaped_random((4, 6, 5), xp, xp.float64)
+        x = x.transpose(2, 0, 1)[:, ::2]
+        return getattr(scp.fft, function)(x, type=type, s=s, axes=axes)
@@ -5,6 +5,7 @@ A unit test module for czt.py
 '''
 from __future__ import annotations
 
+import concurrent.futures
 from math import pi
 
 import pytest
@@ -251,3 +252,76 @@ def test_czt_math(impulse, m, w, a):
     # z-transform of a 2-delayed impulse is z**-2
     assert_allclose(signal.czt(impulse, m=m, w=w, a=a),
                     signal.czt_points(m=m, w=w, a=a)**-2, rtol=1e-10)
+
+
+@testing.with_requires("scipy")
+class TestPlans:
+
+    def test_repeated_calls(self):
+        transform = signal.CZT(100, m=60, w=0.99 + 0.1j, a=1.05)
+        x = testing.shaped_random((3, 100), cupy, 'd', seed=0)
+        first = transform(x)
+        for shape in [(3, 100), (100,), (2, 2, 100), (3, 100)]:
+            y = testing.shaped_random(shape, cupy, 'd', seed=len(shape))
+            expected = cupy.stack(
+                [signal.czt(row, m=60, w=0.99 + 0.1j, a=1.05)
+                 for row in y.reshape(-1, 100)]).reshape(shape[:-1] + (60,))
+            assert_allclose(transform(y), expected, rtol=1e-10)
+        assert len(transform._get_plans()) == 3
+        # The output does not share the work buffer
+        assert_allclose(first, transform(x), rtol=1e-12)
+
+    def test_threads(self):
+        transform = signal.CZT(100, m=60)
+        xs = [testing.shaped_random((3, 100), cupy, 'D', seed=i)
+              for i in range(8)]
+        expected = [transform(x) for x in xs]
+        with concurrent.futures.ThreadPoolExecutor(4) as executor:
+            for _ in range(4):
+                results = list(executor.map(transform, xs))
+                for y, e in zip(results, expected):
+                    assert_allclose(y, e, rtol=1e-12)
+        # Each thread has work buffers of its own
+        assert len(transform._get_plans()) == 1
+
+    @pytest.mark.parametrize('axis', [0, 1])
+    @testing.numpy_cupy_allclose(scipy_name="scp", rtol=1e-10)
+    def test_zoom_fft_axis(self, xp, scp, axis):
+        x = testing.shaped_random((100, 80), xp, 'D', seed=1)
+        transform = scp.signal.ZoomFFT(x.shape[axis], [0.2, 0.4], m=50)
+        return transform(x, axis=axis), transform(x[::-1], axis=axis)
+
+
+@testing.with_requires("scipy")
+class TestMultiZoomFFT:
+
+    @pytest.mark.parametrize('fn', [
+        [[0.1, 0.2], [0.5, 0.55], [1.2, 1.9]], [0.3, 2.0]])
+    @pytest.mark.parametrize('endpoint', [False, True])
+    @pytest.mark.parametrize('axis', [-1, 0])
+    def test_ranges(self, fn, endpoint, axis):
+        x = testing.shaped_random((5, 129, 3), cupy, 'D', seed=2)
+        x = cupy.moveaxis(x, 1, axis)
+        transform = signal.MultiZoomFFT(
+            129, fn, m=64, fs=2.5, endpoint=endpoint)
+        result = transform(x, axis=axis)
+        axis %= x.ndim
+        assert result.shape == (
+            x.shape[:axis] + (len(fn), 64) + x.shape[axis + 1:])
+        for i, f in enumerate(fn):
+            zoom = signal.ZoomFFT(129, f, m=64, fs=2.5, endpoint=endpoint)
+            expected = zoom(x, axis=axis)
+            assert_allclose(
+                cupy.take(result, i, axis=axis), expected, rtol=1e-10,
+                atol=1e-10)
+            assert_allclose(transform.points()[i], zoom.points(),
+                            rtol=1e-12)
+
+    def test_errors(self):
+        with pytest.raises(ValueError, match='fn must be'):
+            signal.MultiZoomFFT(10, [[0.1, 0.2, 0.3]])
+        with pytest.raises(ValueError, match='Invalid number of CZT'):
+            signal.MultiZoomFFT(10, [0.5], m=0)
+        transform = signal.MultiZoomFFT(10, [0.5, 1])
+        with pytest.raises(ValueError, match='defined for length 10'):
+            transform(cupy.ones(11))
@@ -391,6 +391,86 @@ class TestFindPeaks:
             [props[k] for k in self.property_keys if k in props])
 
 
+@pytest.mark.xfail(
+    runtime.is_hip and driver.get_build_version() < 5_00_00000,
+    reason='name_expressions with ROCm 4.3 may not work')
+@testing.with_requires('scipy')
+class TestFindPeaksBatched:
+
+    def _check(self, x, axis=-1, **kwargs):
+        offsets, peaks, props = cupyx.scipy.signal.find_peaks_batched(
+            x, axis=axis, **kwargs)
+        x = np.moveaxis(cupy.asnumpy(x), axis, -1)
+
+        def row_condition(value, i):
+            # Condition on the signal `i`, with its arrays on the host
+            if isinstance(value, tuple):
+                return tuple(row_condition(v, i) for v in value)
+            if isinstance(value, cupy.ndarray):
+                return np.moveaxis(cupy.asnumpy(value), axis, -1)[i]
+            return value
+
+        assert offsets.shape == (x.shape[0] + 1,)
+        for i, signal in enumerate(x):
+            row_kwargs = {
+                key: row_condition(value, i) for key, value in kwargs.items()}
+            expected, expected_props = scipy.signal.find_peaks(
+                signal, **row_kwargs)
+            start, stop = int(offsets[i]), int(offsets[i + 1])
+            testing.assert_array_equal(peaks[start:stop], expected)
+            assert props.keys() == expected_props.keys()
+            for key, value in expected_props.items():
+                testing.assert_allclose(props[key][start:stop], value)
+
+    @pytest.mark.parametrize('axis', [0, 1])
+    def test_no_conditions(self, axis):
+        x = testing.shaped_random((7, 100), cupy, 'd', seed=0)
+        self._check(x if axis == 1 else x.T, axis=axis)
+
+    @pytest.mark.parametrize('dtype', ['f', 'd', 'l'])
+    def test_plateau_size(self, dtype):
+        x = testing.shaped_random((5, 200), cupy, dtype, scale=3, seed=1)
+        self._check(x, plateau_size=(2, None))
+
+    @pytest.mark.parametrize('distance', [1, 3, 10.5, 1000])
+    def test_distance(self, distance):
+        x = testing.shaped_random((6, 300), cupy, 'd', seed=2)
+        self._check(x, distance=distance, height=(None, None))
+
+    def test_all_conditions(self):
+        open_interval = (None, None)
+        x = testing.shaped_random((4, 500), cupy, 'd', seed=3)
+        self._check(
+            x, height=open_interval, threshold=open_interval,
+            prominence=open_interval, width=open_interval,
+            plateau_size=open_interval, distance=2, wlen=51)
+        self._check(
+            x, height=3, threshold=(0.5, None), prominence=(2, 8),
+            width=(1, 5), rel_height=0.7, distance=4)
+
+    @pytest.mark.parametrize('axis', [0, 1])
+    def test_array_conditions(self, axis):
+        x = testing.shaped_random((5, 120), cupy, 'd', seed=4)
+        height = testing.shaped_random((5, 120), cupy, 'd', seed=5)
+        if axis == 0:
+            x, height = x.T, height.T
+        self._check(x, axis=axis, height=height, prominence=(height, None))
+
+    def test_empty(self):
+        for shape in [(3, 0), (3, 2), (0, 10)]:
+            offsets, peaks, _ = cupyx.scipy.signal.find_peaks_batched(
+                cupy.zeros(shape), prominence=1)
+            testing.assert_array_equal(offsets, np.zeros(shape[0] + 1))
+            assert peaks.size == 0
+
+    def test_raises(self):
+        with pytest.raises(ValueError, match="2-D array"):
+            cupyx.scipy.signal.find_peaks_batched(cupy.ones(10))
+        with pytest.raises(ValueError, match="distance"):
+            cupyx.scipy.signal.find_peaks_batched(
+                cupy.ones((2, 10)), distance=0.5)
+
+
 @pytest.mark.xfail(
     runtime.is_hip and driver.get_build_version() < 5_00_00000,
     reason='name_expressions with ROCm 4.3 may not work')
@@ -252,6 +252,61 @@ class TestResample:
         return results
 
 
+@testing.with_requires('scipy')
+class TestResampler:
+
+    @pytest.mark.parametrize('up, down', [
+        (1, 1), (2, 2), (3, 1), (1, 3), (2, 3), (160, 441)])
+    @pytest.mark.parametrize('window', [('kaiser', 5.0), 'hann', 'array'])
+    @pytest.mark.parametrize('dtype', ['f', 'd', 'D'])
+    def test_call(self, up, down, window, dtype):
+        x = testing.shaped_random((701, 2, 3), cupy, dtype, seed=0)
+        if window == 'array':
+            window = testing.shaped_random((11,), cupy, 'd', seed=1)
+        expected = scipy.signal.resample_poly(
+            cupy.asnumpy(x), up, down,
+            window=cupy.asnumpy(window) if isinstance(
+                window, cupy.ndarray) else window)
+        resampler = cupyx.scipy.signal.Resampler(up, down, window=window)
+        rtol = 1e-4 if dtype == 'f' else 1e-10
+        for _ in range(2):
+            testing.assert_allclose(
+                resampler(x), expected, rtol=rtol, atol=rtol)
+        testing.assert_allclose(
+            resampler(x.T, axis=-1), expected.T, rtol=rtol, atol=rtol)
+
+    @pytest.mark.parametrize('up, down', [
+        (1, 1), (3, 1), (1, 3), (2, 3), (7, 5), (160, 441)])
+    @pytest.mark.parametrize('length', [1, 5, 700])
+    def test_streaming(self, up, down, length):
+        x = testing.shaped_random((2, 3, length), cupy, 'd', seed=0)
+        expected = scipy.signal.resample_poly(
+            cupy.asnumpy(x), up, down, axis=-1)
+        resampler = cupyx.scipy.signal.Resampler(up, down)
+        blocks = []
+        start = 0
+        for size in [0, 1, 2, 37, 0, 5, 300, length]:
+            blocks.append(resampler.process(x[..., start:start + size]))
+            start += size
+        blocks.append(resampler.flush())
+        result = cupy.concatenate(blocks, axis=-1)
+        testing.assert_allclose(result, expected, rtol=1e-10, atol=1e-10)
+        # The state is reset by flush
+        result = cupy.concatenate(
+            [resampler.process(x), resampler.flush()], axis=-1)
+        testing.assert_allclose(result, expected, rtol=1e-10, atol=1e-10)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            cupyx.scipy.signal.Resampler(1, 0)
+        with pytest.raises(ValueError):
+            cupyx.scipy.signal.Resampler(2, 1, window=cupy.ones((2, 3)))
+        resampler = cupyx.scipy.signal.Resampler(2, 3)
+        resampler.process(cupy.zeros((2, 10)))
+        with pytest.raises(ValueError):
+            resampler.process(cupy.zeros((3, 10)))
+
+
 @testing.with_requires('scipy')
 class TestDecimate:
     @pytest.mark.parametrize('mod', [(cupy, cupyx.scipy), (np, scipy)])
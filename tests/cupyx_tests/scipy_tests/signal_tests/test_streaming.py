@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import warnings
+
+import numpy
+import pytest
+
+import cupy
+from cupy import testing
+import cupyx.scipy.signal as signal
+
+try:
+    import scipy.signal  # NOQA
+except ImportError:
+    pass
+
+
+def _split(x, sizes):
+    # Split along the last axis into blocks of the given sizes and the rest
+    blocks = []
+    start = 0
+    for size in sizes:
+        blocks.append(x[..., start:start + size])
+        start += size
+    blocks.append(x[..., start:])
+    return blocks
+
+
+@testing.with_requires('scipy')
+class TestStreamingSTFT:
+
+    @pytest.mark.parametrize('length', [256, 1000, 1037])
+    @pytest.mark.parametrize('nperseg, noverlap, nfft', [
+        (128, None, None), (128, 100, 200), (64, 0, None), (100, 75, None)])
+    @pytest.mark.parametrize('dtype', ['f', 'd', 'D'])
+    def test_stft(self, length, nperseg, noverlap, nfft, dtype):
+        x = testing.shaped_random((3, length), cupy, dtype, seed=0)
+        kwargs = dict(fs=3.0, nperseg=nperseg, noverlap=noverlap, nfft=nfft)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            f, t, expected = scipy.signal.stft(
+                cupy.asnumpy(x), boundary=None, padded=True, **kwargs)
+            stft = signal.StreamingSTFT(**kwargs)
+            blocks = [stft.process(b)
+                      for b in _split(x, [0, 1, 130, 7, 300, 64])]
+            n_frames = stft.n_frames
+            testing.assert_allclose(stft.freqs, f)
+            testing.assert_allclose(stft.frame_times(), t[:n_frames])
+            blocks.append(stft.flush())
+        result = cupy.concatenate(blocks, axis=-1)
+        assert result.dtype == expected.dtype
+        rtol = 1e-4 if dtype == 'f' else 1e-10
+        testing.assert_allclose(result, expected, rtol=rtol, atol=rtol)
+        assert stft.n_frames == 0
+
+    @pytest.mark.parametrize('detrend', ['constant', 'linear'])
+    def test_stft_detrend(self, detrend):
+        x = testing.shaped_random((1000,), cupy, 'd', seed=1)
+        _, _, expected = scipy.signal.stft(
+            cupy.asnumpy(x), nperseg=100, boundary=None, padded=True,
+            detrend=detrend)
+        stft = signal.StreamingSTFT(nperseg=100, detrend=detrend)
+        result = cupy.concatenate(
+            [stft.process(b) for b in _split(x, [150, 333])]
+            + [stft.flush()], axis=-1)
+        testing.assert_allclose(result, expected, rtol=1e-10, atol=1e-10)
+
+    def test_stft_invalid(self):
+        with pytest.raises(ValueError):
+            signal.StreamingSTFT(nperseg=64, noverlap=64)
+        with pytest.raises(ValueError):
+            signal.StreamingSTFT(nperseg=64, nfft=32)
+        with pytest.raises(ValueError):
+            signal.StreamingSTFT(scaling='density')
+        stft = signal.StreamingSTFT(nperseg=64)
+        stft.process(cupy.zeros((2, 100)))
+        with pytest.raises(ValueError):
+            stft.process(cupy.zeros((3, 100)))
+
+    @pytest.mark.parametrize('nperseg, noverlap, nfft', [
+        (128, None, None), (128, 100, 200), (100, 75, None)])
+    @pytest.mark.parametrize('dtype', ['f', 'd', 'D'])
+    @pytest.mark.parametrize('scaling', ['spectrum', 'psd'])
+    def test_istft(self, nperseg, noverlap, nfft, dtype, scaling):
+        x = testing.shaped_random((2, 1037), cupy, dtype, seed=2)
+        kwargs = dict(fs=3.0, nperseg=nperseg, noverlap=noverlap, nfft=nfft,
+                      scaling=scaling)
+        onesided = dtype != 'D'
+        _, _, Zxx = signal.stft(
+            x, boundary=None, padded=True, return_onesided=onesided,
+            **kwargs)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            _, expected = scipy.signal.istft(
+                cupy.asnumpy(Zxx), boundary=False, input_onesided=onesided,
+                **kwargs)
+        istft = signal.StreamingISTFT(input_onesided=onesided, **kwargs)
+        blocks = [istft.process(b) for b in _split(Zxx, [1, 0, 5, 2])]
+        blocks.append(istft.flush())
+        result = cupy.concatenate(blocks, axis=-1)
+        rtol = 1e-4 if dtype == 'f' else 1e-10
+        testing.assert_allclose(result, expected, rtol=rtol, atol=rtol)
+
+    def test_roundtrip(self):
+        x = testing.shaped_random((4, 2000), cupy, 'd', seed=3)
+        stft = signal.StreamingSTFT(nperseg=256, noverlap=192)
+        istft = signal.StreamingISTFT(nperseg=256, noverlap=192)
+        blocks = []
+        for b in _split(x, [100, 500, 1]):
+            blocks.append(istft.process(stft.process(b)))
+        blocks.append(istft.process(stft.flush()))
+        blocks.append(istft.flush())
+        result = cupy.concatenate(blocks, axis=-1)
+        # Samples covered by the first and the last window only are lost
+        n = x.shape[-1]
+        testing.assert_allclose(
+            result[..., 64:n - 64], x[..., 64:n - 64], rtol=1e-10,
+            atol=1e-10)
+        assert numpy.isfinite(cupy.asnumpy(result)).all()
+
+
+@testing.with_requires('scipy')
+class TestStreamingFilters:
+
+    _sizes = [0, 1, 2, 37, 0, 5, 300, 1]
+
+    @pytest.mark.parametrize('nb, na', [(1, 1), (5, 1), (1, 4), (4, 3)])
+    @pytest.mark.parametrize('shape', [(1000,), (2, 3, 1000)])
+    @pytest.mark.parametrize('dtype', ['f', 'd', 'D'])
+    def test_lfilter(self, nb, na, shape, dtype):
+        x = testing.shaped_random(shape, cupy, dtype, seed=0)
+        b = testing.shaped_random((nb,), cupy, 'd', seed=1)
+        a = testing.shaped_random((na,), cupy, 'd', scale=0.2, seed=2)
+        a[0] = 2.0
+        expected = scipy.signal.lfilter(
+            cupy.asnumpy(b), cupy.asnumpy(a), cupy.asnumpy(x))
+        lfilter = signal.StreamingLFilter(b, a)
+        result = cupy.concatenate(
+            [lfilter.process(blk) for blk in _split(x, self._sizes)],
+            axis=-1)
+        rtol = 1e-3 if dtype in 'fF' else 1e-10
+        testing.assert_allclose(result, expected, rtol=rtol, atol=rtol)
+
+    @pytest.mark.parametrize('shape', [(1000,), (2, 3, 1000)])
+    @pytest.mark.parametrize('dtype', ['f', 'd', 'D'])
+    def test_sosfilt(self, shape, dtype):
+        x = testing.shaped_random(shape, cupy, dtype, seed=0)
+        sos = scipy.signal.butter(6, 0.2, output='sos')
+        expected = scipy.signal.sosfilt(sos, cupy.asnumpy(x))
+        sosfilt = signal.StreamingSOSFilter(cupy.asarray(sos))
+        result = cupy.concatenate(
+            [sosfilt.process(blk) for blk in _split(x, self._sizes)],
+            axis=-1)
+        rtol = 1e-3 if dtype in 'fF' else 1e-10
+        testing.assert_allclose(result, expected, rtol=rtol, atol=rtol)
+
+    @pytest.mark.parametrize('len_h', [1, 7, 30])
+    @pytest.mark.parametrize('up, down', [
+        (1, 1), (3, 1), (1, 3), (2, 3), (7, 5), (4, 4)])
+    @pytest.mark.parametrize('shape', [(700,), (2, 3, 701)])
+    def test_upfirdn(self, len_h, up, down, shape):
+        x = testing.shaped_random(shape, cupy, 'd', seed=0)
+        h = testing.shaped_random((len_h,), cupy, 'd', seed=1)
+        expected = scipy.signal.upfirdn(
+            cupy.asnumpy(h), cupy.asnumpy(x), up, down)
+        upfirdn = signal.StreamingUpFIRDn(h, up, down)
+        blocks = [upfirdn.process(blk) for blk in _split(x, self._sizes)]
+        blocks.append(upfirdn.flush())
+        result = cupy.concatenate(blocks, axis=-1)
+        testing.assert_allclose(result, expected, rtol=1e-10, atol=1e-10)
+
+    def test_reset(self):
+        x = testing.shaped_random((4, 100), cupy, 'd', seed=0)
+        sos = cupy.asarray(scipy.signal.butter(4, 0.3, output='sos'))
+        sosfilt = signal.StreamingSOSFilter(sos)
+        sosfilt.process(x)
+        sosfilt.reset()
+        testing.assert_allclose(
+            sosfilt.process(x[0]), signal.sosfilt(sos, x[0]), rtol=1e-10)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            signal.StreamingLFilter([], [1.0])
+        with pytest.raises(ValueError):
+            signal.StreamingSOSFilter(cupy.ones((2, 5)))
+        with pytest.raises(ValueError):
+            signal.StreamingUpFIRDn([1.0], up=0)
+        for engine in (signal.StreamingLFilter([1.0, 2.0], [1.0, 0.5]),
+                       signal.StreamingSOSFilter(
+                           cupy.array([[1.0, 0, 0, 1, 0, 0]])),
+                       signal.StreamingUpFIRDn([1.0, 2.0], 2)):
+            engine.process(cupy.zeros((2, 10)))
+            with pytest.raises(ValueError):
+                engine.process(cupy.zeros((3, 10)))
+
+
+@testing.with_requires('scipy')
+class TestStreamingConvolver:
+
+    @pytest.mark.parametrize('len_h', [1, 64, 65, 1000])
+    @pytest.mark.parametrize('block_size', [None, 1, 16, 100])
+    @pytest.mark.parametrize('dtype', ['f', 'd', 'D'])
+    def test_convolve(self, len_h, block_size, dtype):
+        if block_size == 1 and len_h > 100:
+            pytest.skip('too many partitions')
+        x = testing.shaped_random((2, 3, 700), cupy, dtype, seed=0)
+        h = testing.shaped_random((len_h,), cupy, 'd', seed=1)
+        expected = scipy.signal.fftconvolve(
+            cupy.asnumpy(x), cupy.asnumpy(h)[None, None, :])
+        conv = signal.StreamingConvolver(h, block_size)
+        blocks = [conv.process(blk)
+                  for blk in _split(x, [0, 1, 2, 37, 0, 5, 300, 1])]
+        blocks.append(conv.flush())
+        result = cupy.concatenate(blocks, axis=-1)
+        assert result.dtype == numpy.result_type(dtype, 'd')
+        rtol = 1e-4 if dtype == 'f' else 1e-8
+        testing.assert_allclose(result, expected, rtol=rtol, atol=rtol)
+
+    def test_block_latency(self):
+        h = testing.shaped_random((300,), cupy, 'f', seed=1)
+        conv = signal.StreamingConvolver(h, 64)
+        assert conv.n_parts == 5
+        x = testing.shaped_random((200,), cupy, 'f', seed=0)
+        y = conv.process(x)
+        assert y.dtype == numpy.float32
+        assert y.shape == (192,)
+        testing.assert_allclose(
+            y, scipy.signal.fftconvolve(
+                cupy.asnumpy(x), cupy.asnumpy(h))[:192],
+            rtol=1e-4, atol=1e-3)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            signal.StreamingConvolver(cupy.ones((2, 3)))
+        with pytest.raises(ValueError):
+            signal.StreamingConvolver(cupy.ones(3), block_size=0)
+        conv = signal.StreamingConvolver(cupy.ones(3))
+        conv.process(cupy.zeros((2, 10)))
+        with pytest.raises(ValueError):
+            conv.process(cupy.zeros((3, 10)))
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import collections
+import types
+
+import numpy
+import pytest
+
+import cupy
+from cupy import testing
+import cupyx
+
+
+class TestLazy:
+
+    def test_wrap(self):
+        a = cupy.arange(6).reshape(2, 3)
+        x = cupyx.lazy(a)
+        assert isinstance(x, cupyx.LazyArray)
+        assert x.is_evaluated
+        assert x.compute() is a
+        assert cupyx.lazy(x) is x
+
+    def test_wrap_invalid(self):
+        with pytest.raises(TypeError):
+            cupyx.lazy(numpy.arange(3))
+
+    @testing.for_float_dtypes()
+    def test_chain(self, dtype):
+        a = testing.shaped_arange((2, 3), cupy, dtype)
+        b = testing.shaped_reverse_arange((3,), cupy, dtype)
+        x = cupyx.lazy(a)
+        y = cupy.sqrt(x * x + 1) - b / 2
+        assert isinstance(y, cupyx.LazyArray)
+        assert not y.is_evaluated
+        assert y.shape == (2, 3)
+        assert y.dtype == dtype
+        assert not y.is_evaluated
+        expected = cupy.sqrt(a * a + 1) - b / 2
+        testing.assert_allclose(y.compute(), expected)
+        assert y.is_evaluated
+        assert y.compute() is y.compute()
+
+    def test_shared_subexpression(self):
+        a = testing.shaped_arange((4,), cupy, cupy.float32)
+        x = cupyx.lazy(a)
+        y = x * 2
+        z = y + y * y
+        testing.assert_allclose(z.get(), (a * 2 + (a * 2) ** 2).get())
+
+    def test_mixed_operands(self):
+        a = testing.shaped_arange((2, 3), cupy, cupy.int32)
+        x = cupyx.lazy(a)
+        y = a + x  # cupy.ndarray on the left-hand side
+        assert isinstance(y, cupyx.LazyArray)
+        y = 3 - y
+        assert isinstance(y, cupyx.LazyArray)
+        testing.assert_array_equal(y.compute(), 3 - (a + a))
+
+    def test_weak_scalar(self):
+        a = testing.shaped_arange((3,), cupy, cupy.int8)
+        y = cupyx.lazy(a) + 1
+        assert y.dtype == cupy.int8
+        testing.assert_array_equal(y.compute(), a + 1)
+
+    def test_reduction(self):
+        a = testing.shaped_arange((2, 3), cupy, cupy.float64)
+        y = cupyx.lazy(a) * 2
+        testing.assert_allclose(y.sum(axis=1), (a * 2).sum(axis=1))
+        testing.assert_allclose(cupy.max(cupyx.lazy(a) + 1), a.max() + 1)
+
+    def test_indexing(self):
+        a = testing.shaped_arange((2, 3), cupy, cupy.float64)
+        y = cupyx.lazy(a) + 1
+        testing.assert_allclose(y[1], (a + 1)[1])
+
+    def test_broadcast_error(self):
+        x = cupyx.lazy(cupy.ones((2, 3)))
+        with pytest.raises(ValueError):
+            x + cupy.ones((4,))
+
+    def test_eager_kwargs(self):
+        a = testing.shaped_arange((2, 3), cupy, cupy.float32)
+        out = cupy.empty((2, 3), cupy.float32)
+        ret = cupy.add(cupyx.lazy(a) * 2, 1, out=out)
+        assert ret is out
+        testing.assert_allclose(out, a * 2 + 1)
+
+    def test_out_lazy(self):
+        x = cupyx.lazy(cupy.ones((2, 3)))
+        with pytest.raises(TypeError):
+            cupy.add(x, 1, out=x)
+
+    def test_asarray(self):
+        a = testing.shaped_arange((2, 3), cupy, cupy.float32)
+        b = cupy.asarray(cupyx.lazy(a) + 1)
+        assert isinstance(b, cupy.ndarray)
+        testing.assert_allclose(b, a + 1)
+
+    def test_unfusable(self):
+        a = testing.shaped_arange((2, 3), cupy, cupy.float32)
+        with pytest.raises(TypeError):
+            cupy.bitwise_and(cupyx.lazy(a) + 1, 1).compute()
+
+    def test_unfusable_evicted(self, monkeypatch):
+        from cupyx import _lazy
+
+        class _Fusion:
+            def __init__(self, func, name):
+                self.func = func
+
+            def __call__(self, *args):
+                raise NotImplementedError
+
+        monkeypatch.setattr(
+            _lazy, 'new_fusion', types.SimpleNamespace(Fusion=_Fusion))
+        monkeypatch.setattr(
+            _lazy, '_fusion_cache', collections.OrderedDict())
+        monkeypatch.setattr(_lazy, '_fusion_cache_size', 1)
+        a = testing.shaped_arange((2, 3), cupy, cupy.float32)
+        x = cupyx.lazy(a)
+        testing.assert_allclose((x + 1 - a).compute(), 1 + 0 * a)
+        (_, unfusable), = _lazy._fusion_cache.values()
+        assert len(unfusable) == 1
+        # The types that failed to fuse are dropped with the expression
+        testing.assert_allclose((x * 2 - a).compute(), a)
+        assert len(_lazy._fusion_cache) == 1
+        (_, unfusable), = _lazy._fusion_cache.values()
+        assert len(unfusable) == 1
+
+    def test_fusion_error_propagates(self, monkeypatch):
+        from cupyx import _lazy
+
+        class _Fusion:
+            def __init__(self, func, name):
+                self.func = func
+
+            def __call__(self, *args):
+                raise cupy.cuda.memory.OutOfMemoryError(0, 0)
+
+        monkeypatch.setattr(
+            _lazy, 'new_fusion', types.SimpleNamespace(Fusion=_Fusion))
+        monkeypatch.setattr(
+            _lazy, '_fusion_cache', collections.OrderedDict())
+        a = testing.shaped_arange((2, 3), cupy, cupy.float32)
+        with pytest.raises(cupy.cuda.memory.OutOfMemoryError):
+            (cupyx.lazy(a) + 1 - a).compute()
+        assert all([not unfusable
+                    for _, unfusable in _lazy._fusion_cache.values()])
+
+    def test_fusion_cache_size(self, monkeypatch):
+        from cupyx import _lazy
+
+        monkeypatch.setattr(
+            _lazy, '_fusion_cache', collections.OrderedDict())
+        monkeypatch.setattr(_lazy, '_fusion_cache_size', 2)
+        a = testing.shaped_arange((2, 3), cupy, cupy.float32)
+        x = cupyx.lazy(a)
+        for expr, expected in [(x + 1 - a, 1), (x * 2 - a, a),
+                               (x - a - a, -a), (x + 1 - a, 1)]:
+            testing.assert_allclose(expr.compute(), expected + 0 * a)
+            assert len(_lazy._fusion_cache) <= 2
+        assert len(_lazy._fusion_cache) == 2